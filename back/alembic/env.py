@@ -0,0 +1,72 @@
+"""
+Alembic environment.
+
+Migrations run on `DATABASE_URL` through the app's async engine when invoked from the
+CLI, or on the connection passed in `config.attributes["connection"]` when `init_db`
+applies them at startup.
+"""
+
+import asyncio
+from logging.config import fileConfig
+
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql.elements import TextClause
+
+from alembic import context
+from app.core.config import settings
+from app.db.models import Base
+
+config = context.config
+target_metadata = Base.metadata
+# Autogenerate no sabe comparar índices con expresiones (p. ej. `risk_score DESC`)
+EXPRESSION_INDEXES = {
+    index.name
+    for table in target_metadata.tables.values()
+    for index in table.indexes
+    if any(isinstance(expression, TextClause) for expression in index.expressions)
+}
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    return not (type_ == "index" and name in EXPRESSION_INDEXES)
+
+
+def run_migrations(connection: Connection) -> None:
+    # Batch mode: SQLite no soporta la mayoría de ALTER TABLE
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    from app.db.session import engine
+
+    async with engine.connect() as connection:
+        await connection.run_sync(run_migrations)
+    await engine.dispose()
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif (connection := config.attributes.get("connection")) is not None:
+    run_migrations(connection)
+else:
+    if config.config_file_name is not None:
+        fileConfig(config.config_file_name)
+    asyncio.run(run_async_migrations())
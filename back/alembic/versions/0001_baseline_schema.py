@@ -0,0 +1,92 @@
+"""
+Baseline schema (tables created by `create_all` before migrations existed)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "transactions",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("customer_id", sa.String(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("currency", sa.String(3), nullable=False),
+        sa.Column("country", sa.String(2), nullable=False),
+        sa.Column("channel", sa.String(50), nullable=False),
+        sa.Column("device_id", sa.String(), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("merchant_id", sa.String(), nullable=False),
+        sa.Column("decision", sa.String(50), nullable=True),
+        sa.Column("confidence", sa.Float(), nullable=True),
+        sa.Column("signals", sa.JSON(), nullable=True),
+        sa.Column("explanation_customer", sa.Text(), nullable=True),
+        sa.Column("explanation_audit", sa.Text(), nullable=True),
+        sa.Column("agent_route", sa.JSON(), nullable=True),
+        sa.Column("citations_internal", sa.JSON(), nullable=True),
+        sa.Column("citations_external", sa.JSON(), nullable=True),
+        sa.Column("processing_time_ms", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_transactions_customer_id", "transactions", ["customer_id"])
+
+    op.create_table(
+        "audit_trail",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("transaction_id", sa.String(), sa.ForeignKey("transactions.id"), nullable=False),
+        sa.Column("agent_name", sa.String(100), nullable=False),
+        sa.Column("step_order", sa.Integer(), nullable=False),
+        sa.Column("input_data", sa.JSON(), nullable=True),
+        sa.Column("output_data", sa.JSON(), nullable=True),
+        sa.Column("execution_time_ms", sa.Integer(), nullable=True),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_audit_trail_transaction_id", "audit_trail", ["transaction_id"])
+
+    op.create_table(
+        "hitl_queue",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "transaction_id",
+            sa.String(),
+            sa.ForeignKey("transactions.id"),
+            unique=True,
+            nullable=False,
+        ),
+        sa.Column("status", sa.String(50), nullable=False),
+        sa.Column("assigned_to", sa.String(100), nullable=True),
+        sa.Column("reviewed_at", sa.DateTime(), nullable=True),
+        sa.Column("reviewer_decision", sa.String(50), nullable=True),
+        sa.Column("reviewer_comments", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+    op.create_table(
+        "customer_behavior",
+        sa.Column("customer_id", sa.String(), primary_key=True),
+        sa.Column("usual_amount_avg", sa.Float(), nullable=False),
+        sa.Column("usual_hours", sa.String(50), nullable=False),
+        sa.Column("usual_countries", sa.String(100), nullable=False),
+        sa.Column("usual_devices", sa.String(200), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("customer_behavior")
+    op.drop_table("hitl_queue")
+    op.drop_index("ix_audit_trail_transaction_id", table_name="audit_trail")
+    op.drop_table("audit_trail")
+    op.drop_index("ix_transactions_customer_id", table_name="transactions")
+    op.drop_table("transactions")
@@ -0,0 +1,59 @@
+"""
+Transaction status/error (async job mode) and keyset listing indexes
+
+Databases created with `create_all` during the series may already have some of these
+columns or indexes, so every step checks the live schema first.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+LISTING_INDEXES = {
+    "ix_transactions_created_at_id": ["created_at", "id"],
+    "ix_transactions_decision_created_at": ["decision", "created_at", "id"],
+    "ix_transactions_customer_created_at": ["customer_id", "created_at", "id"],
+    "ix_transactions_merchant_created_at": ["merchant_id", "created_at", "id"],
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {c["name"] for c in inspector.get_columns("transactions")}
+    indexes = {i["name"] for i in inspector.get_indexes("transactions")}
+
+    with op.batch_alter_table("transactions") as batch:
+        if "status" not in columns:
+            batch.add_column(
+                sa.Column("status", sa.String(20), nullable=False, server_default="PENDING")
+            )
+        if "error" not in columns:
+            batch.add_column(sa.Column("error", sa.Text(), nullable=True))
+    if "status" not in columns:
+        # Antes del modo asíncrono toda transacción guardada con decisión estaba analizada
+        op.execute("UPDATE transactions SET status = 'COMPLETED' WHERE decision IS NOT NULL")
+
+    if "ix_transactions_customer_id" in indexes:
+        # Cubierto por ix_transactions_customer_created_at
+        op.drop_index("ix_transactions_customer_id", table_name="transactions")
+    for name, index_columns in LISTING_INDEXES.items():
+        if name not in indexes:
+            op.create_index(name, "transactions", index_columns)
+
+
+def downgrade() -> None:
+    for name in LISTING_INDEXES:
+        op.drop_index(name, table_name="transactions")
+    op.create_index("ix_transactions_customer_id", "transactions", ["customer_id"])
+    with op.batch_alter_table("transactions") as batch:
+        batch.drop_column("error")
+        batch.drop_column("status")
@@ -0,0 +1,36 @@
+"""
+Running customer profile statistics
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("customer_profile_stats"):
+        return
+    op.create_table(
+        "customer_profile_stats",
+        sa.Column("customer_id", sa.String(), primary_key=True),
+        sa.Column("observations", sa.Integer(), nullable=False),
+        sa.Column("amount_mean", sa.Float(), nullable=False),
+        sa.Column("amount_var", sa.Float(), nullable=False),
+        sa.Column("hour_histogram", sa.LargeBinary(96), nullable=False),
+        sa.Column("countries", sa.JSON(), nullable=False),
+        sa.Column("devices", sa.JSON(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("customer_profile_stats")
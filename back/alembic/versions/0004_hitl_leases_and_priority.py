@@ -0,0 +1,70 @@
+"""
+HITL claim leases, risk/amount priority and queue indexes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Prioridad de los casos encolados antes de guardar el risk_score (DEFAULT_HITL_RISK_SCORE)
+DEFAULT_RISK_SCORE = 0.75
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {c["name"] for c in inspector.get_columns("hitl_queue")}
+    indexes = {i["name"] for i in inspector.get_indexes("hitl_queue")}
+
+    with op.batch_alter_table("hitl_queue") as batch:
+        if "risk_score" not in columns:
+            batch.add_column(
+                sa.Column(
+                    "risk_score",
+                    sa.Float(),
+                    nullable=False,
+                    server_default=sa.text(str(DEFAULT_RISK_SCORE)),
+                )
+            )
+        if "amount" not in columns:
+            batch.add_column(
+                sa.Column("amount", sa.Float(), nullable=False, server_default=sa.text("0"))
+            )
+        if "lease_expires_at" not in columns:
+            batch.add_column(sa.Column("lease_expires_at", sa.DateTime(), nullable=True))
+    if "amount" not in columns:
+        op.execute(
+            "UPDATE hitl_queue SET amount = (SELECT transactions.amount FROM transactions "
+            "WHERE transactions.id = hitl_queue.transaction_id)"
+        )
+
+    if "ix_hitl_queue_status_created_at" not in indexes:
+        op.create_index(
+            "ix_hitl_queue_status_created_at", "hitl_queue", ["status", "created_at", "id"]
+        )
+    if "ix_hitl_queue_claim_order" not in indexes:
+        op.create_index(
+            "ix_hitl_queue_claim_order",
+            "hitl_queue",
+            ["status", sa.text("risk_score DESC"), sa.text("amount DESC"), "created_at"],
+        )
+    if "ix_hitl_queue_status_lease" not in indexes:
+        op.create_index("ix_hitl_queue_status_lease", "hitl_queue", ["status", "lease_expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_hitl_queue_status_lease", table_name="hitl_queue")
+    op.drop_index("ix_hitl_queue_claim_order", table_name="hitl_queue")
+    op.drop_index("ix_hitl_queue_status_created_at", table_name="hitl_queue")
+    with op.batch_alter_table("hitl_queue") as batch:
+        batch.drop_column("lease_expires_at")
+        batch.drop_column("amount")
+        batch.drop_column("risk_score")
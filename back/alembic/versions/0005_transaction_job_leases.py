@@ -0,0 +1,36 @@
+"""
+Transaction processing leases for atomic job claims and recovery
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {c["name"] for c in inspector.get_columns("transactions")}
+    indexes = {i["name"] for i in inspector.get_indexes("transactions")}
+
+    if "lease_expires_at" not in columns:
+        with op.batch_alter_table("transactions") as batch:
+            batch.add_column(sa.Column("lease_expires_at", sa.DateTime(), nullable=True))
+    if "ix_transactions_status_created_at" not in indexes:
+        op.create_index(
+            "ix_transactions_status_created_at", "transactions", ["status", "created_at", "id"]
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_status_created_at", table_name="transactions")
+    with op.batch_alter_table("transactions") as batch:
+        batch.drop_column("lease_expires_at")
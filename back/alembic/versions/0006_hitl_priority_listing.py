@@ -0,0 +1,35 @@
+"""
+HITL listing in claim order: one priority index for claim and keyset pagination
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+PRIORITY = ["status", sa.text("risk_score DESC"), sa.text("amount DESC"), "created_at"]
+
+
+def upgrade() -> None:
+    indexes = {i["name"] for i in sa.inspect(op.get_bind()).get_indexes("hitl_queue")}
+
+    if "ix_hitl_queue_priority" not in indexes:
+        op.create_index("ix_hitl_queue_priority", "hitl_queue", [*PRIORITY, "id"])
+    # El listado ya no se ordena por antigüedad y el reclamo usa el índice con `id`
+    for name in ("ix_hitl_queue_claim_order", "ix_hitl_queue_status_created_at"):
+        if name in indexes:
+            op.drop_index(name, table_name="hitl_queue")
+
+
+def downgrade() -> None:
+    op.create_index("ix_hitl_queue_claim_order", "hitl_queue", PRIORITY)
+    op.create_index("ix_hitl_queue_status_created_at", "hitl_queue", ["status", "created_at", "id"])
+    op.drop_index("ix_hitl_queue_priority", table_name="hitl_queue")
@@ -1,16 +1,26 @@
 from .behavioral_pattern import behavioral_pattern_agent
+from .customer_profile import customer_profile_loader
 from .debate_agents import debate_agents
 from .decision_arbiter import decision_arbiter_agent
 from .evidence_aggregator import evidence_aggregator_agent
 from .explainability import explainability_agent
 from .external_threat_intel import external_threat_intel_agent
+from .fast_analysis import fast_analysis_agent
 from .internal_policy_rag import internal_policy_rag_agent
+from .prescreen import prescreen_agent
+from .risk_model import risk_model_scorer
 from .transaction_context import transaction_context_agent
+from .velocity import velocity_monitor
 
 __all__ = [
+    "customer_profile_loader",
+    "velocity_monitor",
+    "risk_model_scorer",
+    "prescreen_agent",
     "transaction_context_agent",
     "behavioral_pattern_agent",
     "internal_policy_rag_agent",
+    "fast_analysis_agent",
     "external_threat_intel_agent",
     "evidence_aggregator_agent",
     "debate_agents",
@@ -1,36 +1,84 @@
-from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 
-from app.core.constants import BEHAVIORAL_PATTERN_AGENT_NAME, MAP_AGENT_MODEL
-from app.core.llm import get_llm
-from app.data.loader import get_customer_behavior
-from app.models.schemas import AgentEvidence, AgentSignal, FraudDetectionState
+from app.agents.velocity import describe_velocity
+from app.core.cascade import invoke_json_cascade
+from app.core.constants import BEHAVIORAL_PATTERN_AGENT_NAME
+from app.models.schemas import AgentEvidence, AgentSignal, CustomerProfile, FraudDetectionState
+from app.services.profile_engine import amount_zscore, hour_share, top_items, usual_hours
+
+
+def format_hours(profile: CustomerProfile) -> str:
+    """Horas habituales como rangos contiguos, p. ej. `08-12, 14-20`"""
+    ranges: list[list[int]] = []
+    for hour in usual_hours(profile):
+        if ranges and hour == ranges[-1][1] + 1:
+            ranges[-1][1] = hour
+        else:
+            ranges.append([hour, hour])
+    return ", ".join(f"{start:02d}-{end:02d}" for start, end in ranges) or "sin datos"
+
+
+def profile_inputs(state: FraudDetectionState, profile: CustomerProfile) -> dict:
+    """Variables del prompt con el perfil del cliente y la transacción actual"""
+    return {
+        "observations": profile.observations,
+        "usual_amount": round(profile.amount_mean, 2),
+        "amount_std": round(profile.amount_var**0.5, 2),
+        "amount_z": round(amount_zscore(profile, state.transaction.amount), 2),
+        "usual_hours": format_hours(profile),
+        "hour_share": round(hour_share(profile, state.transaction.timestamp.hour) * 100, 1),
+        "usual_countries": ", ".join(top_items(profile.countries)),
+        "usual_devices": ", ".join(top_items(profile.devices)),
+        "velocity": describe_velocity(state.velocity) or "sin datos",
+        "transaction": state.transaction.model_dump_json(),
+    }
+
+
+def no_history_update() -> dict:
+    return {
+        "evidences": [
+            AgentEvidence(
+                agent_name=BEHAVIORAL_PATTERN_AGENT_NAME,
+                reasoning="No se encontró historial previo para el cliente. Se requiere precaución inicial.",
+                confidence=0.5,
+            )
+        ]
+    }
+
 
+def build_behavioral_update(response: dict) -> dict:
+    """Actualización del estado a partir de la respuesta JSON del agente de comportamiento"""
+    signals = [AgentSignal(**s) for s in response.get("signals", [])]
 
-async def behavioral_pattern_agent(state: FraudDetectionState) -> FraudDetectionState:
+    evidence = AgentEvidence(
+        agent_name=BEHAVIORAL_PATTERN_AGENT_NAME,
+        signals=signals,
+        reasoning=response.get("reasoning", "Detección de anomalías basada en historial"),
+        confidence=response.get("confidence", 0.7),
+    )
+
+    return {
+        "evidences": [evidence],
+        "agent_route": ["behavioral_pattern_agent"],
+        "signals": [f"[BEHAVIOR] {s.description}" for s in signals],
+    }
+
+
+async def behavioral_pattern_agent(state: FraudDetectionState) -> dict:
     """
     Compara la transacción actual con el perfil de comportamiento histórico del cliente.
+    El perfil (estadísticas incrementales) ya viene cargado en el estado por
+    `customer_profile_loader`.
     """
     print(
         f"🤖 [Behavioral Pattern Agent] Analizando historial de {state.transaction.customer_id}..."
     )
 
-    behavior = await get_customer_behavior(state.transaction.customer_id)
-    state.customer_behavior = behavior
+    profile = state.customer_profile
 
-    if not behavior:
+    if not profile:
         print("⚠️ No hay historial para este cliente.")
-        state.evidences.append(
-            AgentEvidence(
-                agent_name="Behavioral Pattern Agent",
-                reasoning="No se encontró historial previo para el cliente. Se requiere precaución inicial.",
-                confidence=0.5,
-            )
-        )
-        return state
-
-    model = MAP_AGENT_MODEL[BEHAVIORAL_PATTERN_AGENT_NAME]
-    llm = get_llm(model)
+        return no_history_update()
 
     prompt = ChatPromptTemplate.from_messages(
         [
@@ -39,11 +87,12 @@ async def behavioral_pattern_agent(state: FraudDetectionState) -> FraudDetection
                 """Eres un analista de comportamiento de clientes financieros.
         Compara la transacción actual con el comportamiento habitual del cliente.
 
-        Datos de Comportamiento Habitual:
-        - Monto promedio: {usual_amount}
-        - Horarios usuales: {usual_hours}
-        - Países usuales: {usual_countries}
-        - Dispositivos usuales: {usual_devices}
+        Datos de Comportamiento Habitual ({observations} transacciones aprobadas observadas):
+        - Monto promedio: {usual_amount} (desviación típica {amount_std}); z-score del monto actual: {amount_z}
+        - Horarios usuales: {usual_hours}; la hora actual concentra el {hour_share}% de su actividad
+        - Países usuales (más frecuente primero): {usual_countries}
+        - Dispositivos usuales (más frecuente primero): {usual_devices}
+        - Actividad reciente incluida la transacción actual (transacciones / monto por ventana): {velocity}
 
         Debes identificar desviaciones significativas.
         Responder en JSON:
@@ -60,36 +109,17 @@ async def behavioral_pattern_agent(state: FraudDetectionState) -> FraudDetection
         ]
     )
 
-    chain = prompt | llm | JsonOutputParser()
-
     try:
-        response = await chain.ainvoke(
-            {
-                "usual_amount": behavior.usual_amount_avg,
-                "usual_hours": behavior.usual_hours,
-                "usual_countries": behavior.usual_countries,
-                "usual_devices": behavior.usual_devices,
-                "transaction": state.transaction.model_dump_json(),
-            }
+        response = await invoke_json_cascade(
+            BEHAVIORAL_PATTERN_AGENT_NAME,
+            prompt,
+            profile_inputs(state, profile),
         )
 
         print("agent_name: Behavioral Pattern Agent", f"\n{response}")
-
-        signals = [AgentSignal(**s) for s in response.get("signals", [])]
-
-        evidence = AgentEvidence(
-            agent_name=BEHAVIORAL_PATTERN_AGENT_NAME,
-            signals=signals,
-            reasoning=response.get("reasoning", "Detección de anomalías basada en historial"),
-            confidence=response.get("confidence", 0.7),
-        )
-
-        state.evidences.append(evidence)
-        state.agent_route.append("behavioral_pattern_agent")
-        for s in signals:
-            state.signals.append(f"[BEHAVIOR] {s.description}")
+        return build_behavioral_update(response)
 
     except Exception as e:
         print(f"❌ Error en Behavioral Pattern Agent: {e}")
 
-    return state
+    return {}
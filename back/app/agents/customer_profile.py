@@ -0,0 +1,14 @@
+from app.data.loader import get_customer_profile
+from app.models.schemas import FraudDetectionState
+
+
+async def customer_profile_loader(state: FraudDetectionState) -> dict:
+    """
+    Carga el perfil histórico del cliente antes del fan-out de agentes.
+    Es la única dependencia compartida: la usan el agente de comportamiento y la
+    query del RAG (`get_better_query`).
+    """
+    print(f"👤 [Customer Profile] Cargando perfil de {state.transaction.customer_id}...")
+
+    profile = await get_customer_profile(state.transaction.customer_id)
+    return {"customer_profile": profile}
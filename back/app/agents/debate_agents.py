@@ -7,15 +7,16 @@ from app.core.constants import (
 )
 from app.core.llm import get_llm
 from app.models.schemas import AgentEvidence, FraudDetectionState
+from app.services.context_compaction import stage_context
 
 
-async def debate_agents(state: FraudDetectionState) -> FraudDetectionState:
+async def debate_agents(state: FraudDetectionState) -> dict:
     """
     Simula un debate entre dos posturas: 'Pro-Fraud' y 'Pro-Customer'.
     """
     print("🤖 [Debate Agents] Iniciando debate Pro vs Con...")
 
-    evidences_text = "\n".join([f"- {ev.agent_name}: {ev.reasoning}" for ev in state.evidences])
+    evidences_text = stage_context("debate", state.evidences)
 
     model = MAP_AGENT_MODEL[DEBATE_AGENT_PRO_FRAUD_NAME]  # both use the same model
 
@@ -54,25 +55,23 @@ async def debate_agents(state: FraudDetectionState) -> FraudDetectionState:
         print("agent_name: Debate Agent (Pro-Fraud)", f"\n{fraud_argument}")
         print("agent_name: Debate Agent (Pro-Customer)", f"\n{customer_argument}")
 
-        state.evidences.append(
-            AgentEvidence(
-                agent_name=DEBATE_AGENT_PRO_FRAUD_NAME,
-                reasoning=fraud_argument.content,
-                confidence=0.5,
-            )
-        )
-
-        state.evidences.append(
-            AgentEvidence(
-                agent_name=DEBATE_AGENT_PRO_CUSTOMER_NAME,
-                reasoning=customer_argument.content,
-                confidence=0.5,
-            )
-        )
-
-        state.agent_route.append("debate_agents")
+        return {
+            "evidences": [
+                AgentEvidence(
+                    agent_name=DEBATE_AGENT_PRO_FRAUD_NAME,
+                    reasoning=fraud_argument.content,
+                    confidence=0.5,
+                ),
+                AgentEvidence(
+                    agent_name=DEBATE_AGENT_PRO_CUSTOMER_NAME,
+                    reasoning=customer_argument.content,
+                    confidence=0.5,
+                ),
+            ],
+            "agent_route": ["debate_agents"],
+        }
 
     except Exception as e:
         print(f"❌ Error en Debate Agents: {e}")
 
-    return state
+    return {}
@@ -1,23 +1,30 @@
-from langchain_core.output_parsers import JsonOutputParser
+import math
+
 from langchain_core.prompts import ChatPromptTemplate
 
-from app.core.llm import get_llm
+from app.core.cascade import invoke_json_cascade
+from app.core.constants import DECISION_ARBITER_AGENT_NAME, DEFAULT_HITL_RISK_SCORE
 from app.models.schemas import AgentEvidence, FraudDetectionState
+from app.services.context_compaction import stage_context
+from app.services.risk_model import decision_for_risk
+
 
+def probability(value) -> float:
+    """Valor del JSON del LLM (número o texto como "0.8") acotado a [0, 1]"""
+    number = float(value)
+    if math.isnan(number):
+        raise ValueError(f"Probabilidad inválida: {value!r}")
+    return min(max(number, 0.0), 1.0)
 
-async def decision_arbiter_agent(state: FraudDetectionState) -> FraudDetectionState:
+
+async def decision_arbiter_agent(state: FraudDetectionState) -> dict:
     """
     Analiza las evidencias y el debate para tomar una decisión final estructurada.
     """
 
     print("⚖️ [Decision Arbiter Agent] Evaluando evidencias y debate para decisión final...")
 
-    llm = get_llm()
-
-    debate_text = ""
-    for ev in state.evidences:
-        if "Debate Agent" in ev.agent_name:
-            debate_text += f"\n--- {ev.agent_name} ---\n{ev.reasoning}\n"
+    debate_text = stage_context("arbiter", state.evidences)
 
     prompt = ChatPromptTemplate.from_messages(
         [
@@ -52,42 +59,39 @@ async def decision_arbiter_agent(state: FraudDetectionState) -> FraudDetectionSt
         ]
     )
 
-    chain = prompt | llm | JsonOutputParser()
-
     try:
-        response = await chain.ainvoke(
+        response = await invoke_json_cascade(
+            DECISION_ARBITER_AGENT_NAME,
+            prompt,
             {
                 "debate": debate_text,
                 "transaction": state.transaction.model_dump_json(),
-            }
+            },
         )
 
-        risk_score = response.get("risk_score", 0.5)
-        confidence = response.get("confidence", 0.5)
+        risk_score = probability(response.get("risk_score", 0.5))
+        confidence = probability(response.get("confidence", 0.5))
         if confidence < 0.6:
-            state.decision = "ESCALATE_TO_HUMAN"
+            decision = "ESCALATE_TO_HUMAN"
         else:
-            if risk_score >= 0.85:
-                state.decision = "BLOCK"
-            elif risk_score >= 0.65:
-                state.decision = "ESCALATE_TO_HUMAN"
-            elif risk_score >= 0.35:
-                state.decision = "CHALLENGE"
-            else:
-                state.decision = "APPROVE"
-
-        state.confidence = confidence
-        state.evidences.append(
-            AgentEvidence(
-                agent_name="Decision Arbiter Agent",
-                reasoning=response.get("reasoning", "Decisión final tomada por el árbitro"),
-                confidence=state.confidence,
-            )
-        )
-        state.agent_route.append("decision_arbiter_agent")
+            decision = decision_for_risk(risk_score)
+
+        return {
+            "decision": decision,
+            "confidence": confidence,
+            "risk_score": risk_score,
+            "evidences": [
+                AgentEvidence(
+                    agent_name=DECISION_ARBITER_AGENT_NAME,
+                    reasoning=response.get("reasoning", "Decisión final tomada por el árbitro"),
+                    confidence=confidence,
+                )
+            ],
+            "agent_route": ["decision_arbiter_agent"],
+        }
 
     except Exception as e:
         print(f"❌ Error en Decision Arbiter Agent: {e}")
-        state.decision = "ESCALATE_TO_HUMAN"
-
-    return state
+        # Sin respuesta usable: el score del modelo, si lo hay, ordena el caso en la cola HITL
+        risk_score = DEFAULT_HITL_RISK_SCORE if state.model_score is None else state.model_score
+        return {"decision": "ESCALATE_TO_HUMAN", "confidence": 0.0, "risk_score": risk_score}
@@ -4,9 +4,10 @@ from langchain_core.prompts import ChatPromptTemplate
 from app.core.constants import EVIDENCE_AGGREGATOR_AGENT_NAME, MAP_AGENT_MODEL
 from app.core.llm import get_llm
 from app.models.schemas import AgentEvidence, FraudDetectionState
+from app.services.context_compaction import stage_context
 
 
-async def evidence_aggregator_agent(state: FraudDetectionState) -> FraudDetectionState:
+async def evidence_aggregator_agent(state: FraudDetectionState) -> dict:
     """
     Consolida todas las evidencias recogidas hasta el momento.
     Prepara el resumen para el debate pro/con fraude.
@@ -15,14 +16,12 @@ async def evidence_aggregator_agent(state: FraudDetectionState) -> FraudDetectio
 
     if not state.evidences:
         print("⚠️ No hay evidencias para consolidar.")
-        return state
+        return {}
 
     model = MAP_AGENT_MODEL[EVIDENCE_AGGREGATOR_AGENT_NAME]
     llm = get_llm(model)
 
-    evidences_summary = ""
-    for ev in state.evidences:
-        evidences_summary += f"\n- AGENTE: {ev.agent_name}\n  Razonamiento: {ev.reasoning}\n  Señales: {[s.description for s in ev.signals]}\n"
+    evidences_summary = stage_context("aggregator", state.evidences)
 
     prompt = ChatPromptTemplate.from_messages(
         [
@@ -51,18 +50,19 @@ async def evidence_aggregator_agent(state: FraudDetectionState) -> FraudDetectio
 
         print("agent_name: Evidence Aggregator Agent", f"\n{response}")
 
-        state.evidences.append(
-            AgentEvidence(
-                agent_name=EVIDENCE_AGGREGATOR_AGENT_NAME,
-                reasoning=response.get("executive_summary", "Consolidación de evidencias"),
-                confidence=1.0,
-                signals=[],
-            )
-        )
-
-        state.agent_route.append("evidence_aggregator_agent")
+        return {
+            "evidences": [
+                AgentEvidence(
+                    agent_name=EVIDENCE_AGGREGATOR_AGENT_NAME,
+                    reasoning=response.get("executive_summary", "Consolidación de evidencias"),
+                    confidence=1.0,
+                    signals=[],
+                )
+            ],
+            "agent_route": ["evidence_aggregator_agent"],
+        }
 
     except Exception as e:
         print(f"❌ Error en Evidence Aggregator Agent: {e}")
 
-    return state
+    return {}
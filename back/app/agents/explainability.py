@@ -6,7 +6,7 @@ from app.core.llm import get_llm
 from app.models.schemas import FraudDetectionState
 
 
-async def explainability_agent(state: FraudDetectionState) -> FraudDetectionState:
+async def explainability_agent(state: FraudDetectionState) -> dict:
     """
     Genera explicaciones claras para el cliente y reportes detallados para auditoría.
     """
@@ -55,12 +55,20 @@ async def explainability_agent(state: FraudDetectionState) -> FraudDetectionStat
 
         print("agent_name: Explain Agent", f"\n{response}")
 
-        state.explanation_customer = response.get("explanation_customer", "")
-        state.explanation_audit = response.get("explanation_audit", "")
-
-        state.agent_route.append("explainability_agent")
+        return {
+            "explanation_customer": response.get("explanation_customer", ""),
+            "explanation_audit": response.get("explanation_audit", "") + degraded_note(state),
+            "agent_route": ["explainability_agent"],
+        }
 
     except Exception as e:
         print(f"❌ Error en Explainability Agent: {e}")
 
-    return state
+    return {}
+
+
+def degraded_note(state: FraudDetectionState) -> str:
+    """Etapas sustituidas por su fallback, para dejarlas en la explicación de auditoría"""
+    if not state.degraded_stages:
+        return ""
+    return "\n\nEtapas degradadas por presupuesto de latencia: " + ", ".join(state.degraded_stages)
@@ -1,14 +1,100 @@
-from langchain_core.output_parsers import JsonOutputParser
+from urllib.parse import urlsplit
+
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_tavily import TavilySearch
 
+from app.core.cascade import invoke_json_cascade
 from app.core.config import settings
-from app.core.constants import EXTERNAL_THREAT_INTEL_AGENT_NAME, MAP_AGENT_MODEL
-from app.core.llm import get_llm
+from app.core.constants import EXTERNAL_THREAT_INTEL_AGENT_NAME
+from app.core.lru import AsyncLoadingCache
+from app.core.resilience import endpoints
 from app.models.schemas import AgentEvidence, AgentSignal, ExternalCitation, FraudDetectionState
 
 
-async def external_threat_intel_agent(state: FraudDetectionState) -> FraudDetectionState:
+def tavily_endpoint():
+    """Circuit breaker y reintentos compartidos por las búsquedas de Tavily"""
+    host = urlsplit(settings.TAVILY_API_BASE_URL).hostname or "api.tavily.com"
+    return endpoints.get(f"{host}/search", idempotent=True)
+
+
+def search_failure(results) -> str | None:
+    """langchain-tavily devuelve los errores HTTP como `{"error": ...}` en lugar de lanzarlos"""
+    return "error" if isinstance(results, dict) and "error" in results else None
+
+
+async def lookup_merchant_threats(key: tuple[str, str]) -> dict:
+    """
+    Búsqueda web + análisis LLM para un (merchant_id, country).
+    Solo depende del merchant y del país, por eso su resultado se comparte entre
+    transacciones a través de `threat_intel_cache`.
+    """
+    merchant_id, country = key
+    search = TavilySearch(k=3, api_base_url=settings.TAVILY_API_BASE_URL or None)
+    query = f"fraud alerts or security reports for merchant {merchant_id} {country}"
+    if settings.RESILIENCE_ENABLED:
+        search_results = await tavily_endpoint().call(
+            lambda: search.ainvoke(query), failure=search_failure
+        )
+    else:
+        search_results = await search.ainvoke(query)
+    if search_failure(search_results) is not None:
+        # Pasado al LLM, el error se leería como "sin resultados" y ese "sin amenazas"
+        # quedaría cacheado: la carga falla y no se cachea nada
+        raise RuntimeError(f"Búsqueda de Tavily fallida: {search_results['error']}")
+
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            (
+                "system",
+                """Eres un analista de inteligencia de ciber-fraude.
+        Analiza los resultados de búsqueda web sobre el merchant y el contexto actual.
+        Identifica si hay reportes de fraude recientes, estafas conocidas o alertas.
+
+        Resultados Web:
+        {search_results}
+
+        Responder en JSON:
+        {{
+            "found_threats": bool,
+            "signals": [
+                {{ "signal_type": "external_threat", "description": "string", "severity": "high|medium|low" }}
+            ],
+            "citations": [
+                {{ "url": "string", "summary": "string" }}
+            ],
+            "reasoning": "string",
+            "confidence": float (0-1)
+        }}
+        """,
+            ),
+            ("human", "Analizar para Merchant: {merchant_id}, País: {country}"),
+        ]
+    )
+
+    return await invoke_json_cascade(
+        EXTERNAL_THREAT_INTEL_AGENT_NAME,
+        prompt,
+        {
+            "search_results": str(search_results),
+            "merchant_id": merchant_id,
+            "country": country,
+        },
+    )
+
+
+# "Sin amenazas" se cachea con su propio TTL; las búsquedas fallidas lanzan una excepción
+# y nunca se cachean
+threat_intel_cache = AsyncLoadingCache(
+    loader=lookup_merchant_threats,
+    max_entries=settings.THREAT_INTEL_CACHE_MAX_ENTRIES,
+    ttl=settings.THREAT_INTEL_CACHE_TTL_SECONDS,
+    negative_ttl=settings.THREAT_INTEL_CACHE_NEGATIVE_TTL_SECONDS,
+    is_negative=lambda response: not response.get("found_threats"),
+    refresh_ahead=settings.THREAT_INTEL_CACHE_REFRESH_AHEAD_SECONDS or None,
+)
+
+
+async def external_threat_intel_agent(state: FraudDetectionState) -> dict:
     """
     Busca inteligencia de amenazas externa en la web usando Tavily.
     """
@@ -18,83 +104,49 @@ async def external_threat_intel_agent(state: FraudDetectionState) -> FraudDetect
 
     if not settings.TAVILY_API_KEY:
         print("⚠️ TAVILY_API_KEY no configurada. Saltando búsqueda externa.")
-        state.evidences.append(
-            AgentEvidence(
-                agent_name="External Threat Intel Agent",
-                reasoning="Búsqueda externa deshabilitada (falta API KEY).",
-                confidence=0.5,
-            )
-        )
-        return state
-
-    search = TavilySearch(k=3)
-    query = f"fraud alerts or security reports for merchant {state.transaction.merchant_id} {state.transaction.country}"
-
-    try:
-        search_results = await search.ainvoke(query)
-
-        model = MAP_AGENT_MODEL[EXTERNAL_THREAT_INTEL_AGENT_NAME]
-        llm = get_llm(model)
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    """Eres un analista de inteligencia de ciber-fraude.
-            Analiza los resultados de búsqueda web sobre el merchant y el contexto actual.
-            Identifica si hay reportes de fraude recientes, estafas conocidas o alertas.
-
-            Resultados Web:
-            {search_results}
-
-            Responder en JSON:
-            {{
-                "found_threats": bool,
-                "signals": [
-                    {{ "signal_type": "external_threat", "description": "string", "severity": "high|medium|low" }}
-                ],
-                "citations": [
-                    {{ "url": "string", "summary": "string" }}
-                ],
-                "reasoning": "string",
-                "confidence": float (0-1)
-            }}
-            """,
-                ),
-                ("human", "Analizar para Merchant: {merchant_id}, País: {country}"),
+        return {
+            "evidences": [
+                AgentEvidence(
+                    agent_name="External Threat Intel Agent",
+                    reasoning="Búsqueda externa deshabilitada (falta API KEY).",
+                    confidence=0.5,
+                )
             ]
-        )
+        }
 
-        chain = prompt | llm | JsonOutputParser()
+    key = (state.transaction.merchant_id, state.transaction.country)
 
-        response = await chain.ainvoke(
-            {
-                "search_results": str(search_results),
-                "merchant_id": state.transaction.merchant_id,
-                "country": state.transaction.country,
-            }
-        )
+    try:
+        if settings.THREAT_INTEL_CACHE_ENABLED:
+            response = await threat_intel_cache.get(key)
+        else:
+            response = await lookup_merchant_threats(key)
 
         print("agent_name: External Threat Intel Agent", f"\n{response}")
+        return build_threat_update(response)
 
-        citations = [ExternalCitation(**c) for c in response.get("citations", [])]
-        signals = [AgentSignal(**s) for s in response.get("signals", [])]
+    except Exception as e:
+        print(f"❌ Error en External Threat Intel Agent: {e}")
 
-        evidence = AgentEvidence(
-            agent_name="External Threat Intel Agent",
-            signals=signals,
-            citations=citations,
-            reasoning=response.get("reasoning", "Búsqueda externa realizada exitosamente"),
-            confidence=response.get("confidence", 0.8),
-        )
+    return {}
 
-        state.evidences.append(evidence)
-        state.citations_external.extend(citations)
-        state.agent_route.append("external_threat_intel_agent")
 
-        for s in signals:
-            state.signals.append(f"[EXTERNAL] {s.description}")
+def build_threat_update(response: dict) -> dict:
+    """Actualización del estado a partir del análisis (cacheado o no) de un merchant"""
+    citations = [ExternalCitation(**c) for c in response.get("citations", [])]
+    signals = [AgentSignal(**s) for s in response.get("signals", [])]
 
-    except Exception as e:
-        print(f"❌ Error en External Threat Intel Agent: {e}")
+    evidence = AgentEvidence(
+        agent_name=EXTERNAL_THREAT_INTEL_AGENT_NAME,
+        signals=signals,
+        citations=citations,
+        reasoning=response.get("reasoning", "Búsqueda externa realizada exitosamente"),
+        confidence=response.get("confidence", 0.8),
+    )
 
-    return state
+    return {
+        "evidences": [evidence],
+        "citations_external": citations,
+        "agent_route": ["external_threat_intel_agent"],
+        "signals": [f"[EXTERNAL] {s.description}" for s in signals],
+    }
@@ -0,0 +1,125 @@
+"""
+Fallbacks de las etapas del grafo cuando se agota el presupuesto de latencia.
+
+Cada fallback es determinista e inmediato (sin LLM ni red) y deja una evidencia que
+explica la degradación, de modo que el audit trail registra qué etapa se sustituyó.
+`instrument_node` los usa cuando la etapa vence su timeout o no le queda presupuesto.
+
+Solo las etapas no críticas (amenazas externas, debate, explainability) se sustituyen
+por una aproximación. Las críticas (`CRITICAL_STAGES`: agentes de evidencia, agregador
+y árbitro) no se aproximan nunca: si no terminan a tiempo el caso se escala
+explícitamente a revisión humana.
+"""
+
+from collections.abc import Callable
+
+from app.agents.explainability import degraded_note
+from app.agents.external_threat_intel import build_threat_update, threat_intel_cache
+from app.agents.prescreen import CUSTOMER_MESSAGES
+from app.core.constants import (
+    BEHAVIORAL_PATTERN_AGENT_NAME,
+    DEBATE_AGENTS_NAME,
+    DECISION_ARBITER_AGENT_NAME,
+    EVIDENCE_AGGREGATOR_AGENT_NAME,
+    EXTERNAL_THREAT_INTEL_AGENT_NAME,
+    FAST_ANALYSIS_AGENT_NAME,
+    INTERNAL_POLICY_RAG_AGENT_NAME,
+    TRANSACTION_CONTEXT_AGENT_NAME,
+)
+from app.core.deadline import critical_overruns
+from app.models.schemas import AgentEvidence, FraudDetectionState
+
+DEGRADED_REASONING = "Etapa omitida: se agotó el presupuesto de latencia del análisis."
+INCOMPLETE_REASONING = (
+    "Etapa crítica sin terminar dentro del presupuesto de latencia: "
+    "el caso se escala a revisión humana."
+)
+
+
+def skipped(agent_name: str) -> Callable[[FraudDetectionState], dict]:
+    """Fallback de una etapa de análisis: solo registra que no se ejecutó"""
+
+    def fallback(state: FraudDetectionState) -> dict:
+        return {
+            "evidences": [
+                AgentEvidence(agent_name=agent_name, reasoning=DEGRADED_REASONING, confidence=0.0)
+            ]
+        }
+
+    return fallback
+
+
+def threat_intel_fallback(state: FraudDetectionState) -> dict:
+    """Último análisis cacheado del (merchant, país) si existe; si no, etapa omitida"""
+    cached = threat_intel_cache.peek((state.transaction.merchant_id, state.transaction.country))
+    if cached is None:
+        return skipped(EXTERNAL_THREAT_INTEL_AGENT_NAME)(state)
+    return build_threat_update(cached)
+
+
+def incomplete(agent_name: str) -> Callable[[FraudDetectionState], dict]:
+    """Fallback de una etapa crítica: registra que no terminó (el caso se escalará)"""
+
+    def fallback(state: FraudDetectionState) -> dict:
+        return {
+            "evidences": [
+                AgentEvidence(agent_name=agent_name, reasoning=INCOMPLETE_REASONING, confidence=0.0)
+            ]
+        }
+
+    return fallback
+
+
+def escalate_to_human(state: FraudDetectionState) -> dict:
+    """Decisión explícita cuando una etapa crítica (o el propio árbitro) no llegó a tiempo"""
+    stages = ", ".join(critical_overruns(state)) or "arbiter"
+    return {
+        "decision": "ESCALATE_TO_HUMAN",
+        "confidence": 0.0,
+        "risk_score": None,
+        "evidences": [
+            AgentEvidence(
+                agent_name=DECISION_ARBITER_AGENT_NAME,
+                reasoning=(
+                    f"Etapas críticas sin terminar dentro del presupuesto de latencia "
+                    f"({stages}): se escala a revisión humana sin decisión automática."
+                ),
+                confidence=0.0,
+            )
+        ],
+    }
+
+
+async def deadline_escalation(state: FraudDetectionState) -> dict:
+    """Nodo del grafo: sustituye al debate y al árbitro cuando ya hay etapas críticas vencidas"""
+    print(f"⏳ [Deadline] Escalando {state.transaction.transaction_id} a revisión humana")
+    return {**escalate_to_human(state), "agent_route": ["deadline_escalation"]}
+
+
+def explainability_fallback(state: FraudDetectionState) -> dict:
+    """Explicaciones deterministas con la decisión, las señales y la ruta"""
+    decision = state.decision or "ESCALATE_TO_HUMAN"
+    signals = "; ".join(state.signals) or "ninguna"
+    return {
+        "explanation_customer": CUSTOMER_MESSAGES[decision],
+        "explanation_audit": (
+            f"Decisión {decision} (confianza {state.confidence:.2f}). Señales: {signals}. "
+            f"Ruta: {' -> '.join(state.agent_route)}. Explicación generada sin LLM por "
+            f"presupuesto de latencia agotado.{degraded_note(state)}"
+        ),
+    }
+
+
+# Nodo del grafo -> fallback; los nodos deterministas no tienen y no llevan timeout.
+# Las etapas críticas (`CRITICAL_STAGES`) solo registran que no terminaron y escalan
+FALLBACKS: dict[str, Callable[[FraudDetectionState], dict]] = {
+    "context": incomplete(TRANSACTION_CONTEXT_AGENT_NAME),
+    "behavioral": incomplete(BEHAVIORAL_PATTERN_AGENT_NAME),
+    "rag": incomplete(INTERNAL_POLICY_RAG_AGENT_NAME),
+    "fast_analysis": incomplete(FAST_ANALYSIS_AGENT_NAME),
+    "threat_intel": threat_intel_fallback,
+    "aggregator": incomplete(EVIDENCE_AGGREGATOR_AGENT_NAME),
+    "debate": skipped(DEBATE_AGENTS_NAME),
+    "arbiter": escalate_to_human,
+    "explainability": explainability_fallback,
+}
@@ -0,0 +1,143 @@
+import asyncio
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from app.agents.behavioral_pattern import (
+    behavioral_pattern_agent,
+    build_behavioral_update,
+    no_history_update,
+    profile_inputs,
+)
+from app.agents.internal_policy_rag import (
+    build_policy_update,
+    format_policies,
+    internal_policy_rag_agent,
+    retrieve_policies,
+)
+from app.agents.transaction_context import build_context_update, transaction_context_agent
+from app.core.cascade import invoke_json_cascade
+from app.core.constants import FAST_ANALYSIS_AGENT_NAME
+from app.models.schemas import FraudDetectionState
+
+SIGNALS_SCHEMA = """"signals": [
+                {{ "signal_type": "string", "description": "string", "severity": "low|medium|high", "value": "string" }}
+            ],
+            "reasoning": "string",
+            "confidence": float (0-1)"""
+
+BEHAVIOR_SECTION = """
+        - "behavioral": compara la transacción con el comportamiento habitual del cliente
+          ({observations} transacciones aprobadas observadas) e identifica desviaciones significativas:
+          * Monto promedio: {usual_amount} (desviación típica {amount_std}); z-score del monto actual: {amount_z}
+          * Horarios usuales: {usual_hours}; la hora actual concentra el {hour_share}% de su actividad
+          * Países usuales (más frecuente primero): {usual_countries}
+          * Dispositivos usuales (más frecuente primero): {usual_devices}
+          * Actividad reciente incluida la transacción actual (transacciones / monto por ventana): {velocity}
+"""
+
+
+def merge_updates(*updates: dict) -> dict:
+    """Une las actualizaciones de varios agentes concatenando sus listas"""
+    merged: dict[str, list] = {}
+    for update in updates:
+        for key, values in update.items():
+            merged.setdefault(key, []).extend(values)
+    return merged
+
+
+def build_prompt(has_history: bool) -> ChatPromptTemplate:
+    behavior_section = BEHAVIOR_SECTION if has_history else ""
+    behavior_schema = (
+        f"""
+            "behavioral": {{{{
+            {SIGNALS_SCHEMA}
+            }}}},"""
+        if has_history
+        else ""
+    )
+    return ChatPromptTemplate.from_messages(
+        [
+            (
+                "system",
+                f"""Eres un analista de fraude financiero que realiza un análisis rápido en una sola pasada.
+        Analiza la transacción desde {"tres" if has_history else "dos"} perspectivas independientes:
+
+        - "context": detecta anomalías básicas de la transacción. Considera:
+          montos muy altos (e.g. > 5000 PEN), horarios inusuales (madrugada 00:00 - 05:00)
+          y canales de riesgo.
+        {behavior_section}
+        - "policy": como oficial de cumplimiento, determina si alguna de las políticas
+          recuperadas se viola o genera una alerta según la transacción y la actividad histórica.
+
+        Políticas Recuperadas:
+        {{context}}
+
+        Resumen de usuario:
+        {{summary}}
+
+        Debes responder EXCLUSIVAMENTE en formato JSON con la siguiente estructura:
+        {{{{
+            "context": {{{{
+            {SIGNALS_SCHEMA}
+            }}}},{behavior_schema}
+            "policy": {{{{
+                "applied_policies": [
+                    {{{{ "policy_id": "string", "reason": "string", "violated": bool }}}}
+                ],
+                "reasoning": "string",
+                "confidence": float (0-1)
+            }}}}
+        }}}}
+        """,
+            ),
+            ("human", "Transacción: {transaction}"),
+        ]
+    )
+
+
+async def fast_analysis_agent(state: FraudDetectionState) -> dict:
+    """
+    Modo de análisis rápido: una sola llamada al LLM con un esquema combinado sustituye
+    a los agentes de contexto, comportamiento y políticas. La respuesta se reparte en
+    las mismas tres evidencias, citas y entradas de `agent_route` que producirían los
+    agentes por separado, así que el agregador y los audit trails no cambian.
+    Si la recuperación de políticas o la llamada fallan se ejecutan los tres agentes
+    originales.
+    """
+    print("⚡ [Fast Analysis Agent] Contexto, comportamiento y políticas en una llamada...")
+
+    profile = state.customer_profile
+    retrieved = None
+    try:
+        query, relevant_docs = retrieved = await retrieve_policies(state)
+        inputs = {
+            "context": format_policies(relevant_docs),
+            "summary": query,
+            "transaction": state.transaction.model_dump_json(),
+        }
+        if profile:
+            inputs |= profile_inputs(state, profile)
+
+        response = await invoke_json_cascade(
+            FAST_ANALYSIS_AGENT_NAME, build_prompt(profile is not None), inputs
+        )
+        print("agent_name: Fast Analysis Agent", f"\n{response}")
+
+        return merge_updates(
+            build_context_update(response.get("context") or {}),
+            build_behavioral_update(response.get("behavioral") or {})
+            if profile
+            else no_history_update(),
+            build_policy_update(response.get("policy") or {}, relevant_docs),
+        )
+
+    except Exception as e:
+        print(f"❌ Error en Fast Analysis Agent, se ejecutan los agentes por separado: {e}")
+
+    # Las políticas ya recuperadas se reutilizan en vez de repetir la búsqueda
+    updates = await asyncio.gather(
+        transaction_context_agent(state),
+        behavioral_pattern_agent(state),
+        internal_policy_rag_agent(state, retrieved),
+    )
+    return merge_updates(*updates)
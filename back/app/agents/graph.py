@@ -2,43 +2,115 @@ from langgraph.graph import END, StateGraph
 
 from app.agents import (
     behavioral_pattern_agent,
+    customer_profile_loader,
     debate_agents,
     decision_arbiter_agent,
     evidence_aggregator_agent,
     explainability_agent,
     external_threat_intel_agent,
+    fast_analysis_agent,
     internal_policy_rag_agent,
+    prescreen_agent,
+    risk_model_scorer,
     transaction_context_agent,
+    velocity_monitor,
 )
+from app.agents.fallbacks import FALLBACKS, deadline_escalation
+from app.core.config import settings
+from app.core.deadline import critical_overruns
+from app.core.instrumentation import instrument_node
 from app.models.schemas import FraudDetectionState
 
+NODES = {
+    "profile": customer_profile_loader,
+    "velocity": velocity_monitor,
+    "risk_model": risk_model_scorer,
+    "prescreen": prescreen_agent,
+    "context": transaction_context_agent,
+    "behavioral": behavioral_pattern_agent,
+    "rag": internal_policy_rag_agent,
+    "fast_analysis": fast_analysis_agent,
+    "threat_intel": external_threat_intel_agent,
+    "aggregator": evidence_aggregator_agent,
+    "debate": debate_agents,
+    "arbiter": decision_arbiter_agent,
+    "explainability": explainability_agent,
+    "escalation": deadline_escalation,
+}
+EVIDENCE_NODES = ["context", "behavioral", "rag", "threat_intel"]
+# Modo rápido: contexto, comportamiento y políticas fusionados en una sola llamada
+FAST_EVIDENCE_NODES = ["fast_analysis", "threat_intel"]
 
-def create_fraud_detection_graph():
+
+def is_fast(state: FraudDetectionState) -> bool:
+    return (state.analysis_mode or settings.ANALYSIS_MODE) == "fast"
+
+
+def route_after_prescreen(state: FraudDetectionState) -> str | list[str]:
+    """Termina si el rule engine ya decidió; si no, continúa con los agentes de evidencia"""
+    if state.decision:
+        return END
+    return FAST_EVIDENCE_NODES if is_fast(state) else EVIDENCE_NODES
+
+
+def route_sequential(state: FraudDetectionState) -> str:
+    if state.decision:
+        return END
+    return "fast_analysis" if is_fast(state) else "context"
+
+
+def route_after_aggregator(state: FraudDetectionState) -> str:
+    """Sin alguna etapa crítica (presupuesto agotado) no se debate ni decide: se escala"""
+    return "escalation" if critical_overruns(state) else "debate"
+
+
+def create_fraud_detection_graph(parallel: bool = True):
     """
     Crea y compila el flujo de agentes de detección de fraude.
+
+    El perfil del cliente se carga primero, luego se actualizan los contadores de
+    velocidad (`velocity`), se puntúa con el modelo de riesgo local (`risk_model`) y
+    el rule engine (`prescreen`) resuelve los casos inequívocos sin invocar ningún LLM.
+    Con `parallel=True` los cuatro agentes de evidencia se ejecutan en paralelo
+    (fan-out) y se unen en el agregador, de modo
+    que la latencia es la del agente más lento y no la suma de los cuatro.
+    En modo rápido (`analysis_mode="fast"` en el estado o `ANALYSIS_MODE`) los agentes
+    de contexto, comportamiento y políticas se sustituyen por `fast_analysis`, que hace
+    una sola llamada al LLM.
+    Las etapas con fallback (`app.agents.fallbacks`) corren con el presupuesto de
+    latencia restante como timeout (`app.core.deadline`): las no críticas se degradan
+    al agotarse y, si vence una crítica, `escalation` escala el caso a revisión humana.
+    `parallel=False` conserva la cadena secuencial original (útil para depurar y
+    para comparar en los benchmarks).
     """
     workflow = StateGraph(FraudDetectionState)
 
-    workflow.add_node("context", transaction_context_agent)
-    workflow.add_node("behavioral", behavioral_pattern_agent)
-    workflow.add_node("rag", internal_policy_rag_agent)
-    workflow.add_node("threat_intel", external_threat_intel_agent)
-    workflow.add_node("aggregator", evidence_aggregator_agent)
-    workflow.add_node("debate", debate_agents)
-    workflow.add_node("arbiter", decision_arbiter_agent)
-    workflow.add_node("explainability", explainability_agent)
-
-    workflow.set_entry_point("context")
-    workflow.add_edge("context", "behavioral")
-    workflow.add_edge("behavioral", "rag")
-    workflow.add_edge("rag", "threat_intel")
-    workflow.add_edge("threat_intel", "aggregator")
-    workflow.add_edge("aggregator", "debate")
+    for name, node in NODES.items():
+        workflow.add_node(name, instrument_node(name, node, FALLBACKS.get(name)))
+
+    workflow.set_entry_point("profile")
+    workflow.add_edge("profile", "velocity")
+    workflow.add_edge("velocity", "risk_model")
+    workflow.add_edge("risk_model", "prescreen")
+    if parallel:
+        workflow.add_conditional_edges(
+            "prescreen", route_after_prescreen, [END, *EVIDENCE_NODES, "fast_analysis"]
+        )
+        workflow.add_edge(EVIDENCE_NODES, "aggregator")
+        workflow.add_edge(FAST_EVIDENCE_NODES, "aggregator")
+    else:
+        workflow.add_conditional_edges(
+            "prescreen", route_sequential, [END, "context", "fast_analysis"]
+        )
+        workflow.add_edge("context", "behavioral")
+        workflow.add_edge("behavioral", "rag")
+        workflow.add_edge("rag", "threat_intel")
+        workflow.add_edge("fast_analysis", "threat_intel")
+        workflow.add_edge("threat_intel", "aggregator")
+    workflow.add_conditional_edges("aggregator", route_after_aggregator, ["debate", "escalation"])
     workflow.add_edge("debate", "arbiter")
     workflow.add_edge("arbiter", "explainability")
+    workflow.add_edge("escalation", "explainability")
     workflow.add_edge("explainability", END)
 
     return workflow.compile()
-
-
-fraud_graph = create_fraud_detection_graph()
@@ -1,41 +1,24 @@
-from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
-from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import OpenAIEmbeddings
 
-from app.core.constants import INTERNAL_POLICY_RAG_AGENT_NAME, MAP_AGENT_MODEL
-from app.core.llm import get_llm
-from app.data.loader import load_fraud_policies
+from app.core.cascade import invoke_json_cascade
+from app.core.constants import INTERNAL_POLICY_RAG_AGENT_NAME
 from app.models.schemas import AgentEvidence, Citation, FraudDetectionState
+from app.services.features import extract_features
+from app.services.policy_index import policy_index
 
 
-async def internal_policy_rag_agent(state: FraudDetectionState) -> FraudDetectionState:
+async def internal_policy_rag_agent(
+    state: FraudDetectionState, retrieved: tuple[str, list[Document]] | None = None
+) -> dict:
     """
     Busca y aplica políticas internas de fraude mediante RAG con base vectorial local.
+    El índice se construye una sola vez y se persiste (ver `app.services.policy_index`).
+    `retrieved` reutiliza la query y las políticas ya recuperadas para este estado
+    (p. ej. por el análisis rápido) en lugar de repetir la búsqueda.
     """
     print("🤖 [Internal Policy RAG Agent] Buscando políticas aplicables...")
 
-    policies = await load_fraud_policies()
-    docs = [
-        Document(page_content=p.rule, metadata={"policy_id": p.policy_id, "version": p.version})
-        for p in policies
-    ]
-
-    embeddings = OpenAIEmbeddings()
-    vectorstore = FAISS.from_documents(docs, embeddings)
-
-    query = get_better_query(state)
-    print(f"RAG query: `{query}`")
-
-    relevant_docs = vectorstore.similarity_search(query, k=3)
-
-    context_policies = "\n".join(
-        [f"- [{d.metadata['policy_id']}]: {d.page_content}" for d in relevant_docs]
-    )
-
-    model = MAP_AGENT_MODEL[INTERNAL_POLICY_RAG_AGENT_NAME]
-    llm = get_llm(model)
     prompt = ChatPromptTemplate.from_messages(
         [
             (
@@ -65,84 +48,87 @@ async def internal_policy_rag_agent(state: FraudDetectionState) -> FraudDetectio
         ]
     )
 
-    chain = prompt | llm | JsonOutputParser()
-
     try:
-        response = await chain.ainvoke(
+        query, relevant_docs = retrieved or await retrieve_policies(state)
+        response = await invoke_json_cascade(
+            INTERNAL_POLICY_RAG_AGENT_NAME,
+            prompt,
             {
-                "context": context_policies,
+                "context": format_policies(relevant_docs),
                 "transaction": state.transaction.model_dump_json(),
                 "summary": query,
-            }
+            },
         )
 
-        print(state.customer_behavior)
         print("agent_name: Internal Policy RAG Agent", f"\n{response}")
 
-        citations = []
-        for ap in response.get("applied_policies", []):
-            if ap.get("violated"):
-                for d in relevant_docs:
-                    if d.metadata["policy_id"] == ap["policy_id"]:
-                        citations.append(
-                            Citation(
-                                policy_id=ap["policy_id"],
-                                chunk_id="1",
-                                version=d.metadata["version"],
-                            )
-                        )
-                        state.signals.append(
-                            f"[POLICY] Violación de {ap['policy_id']}: {ap['reason']}"
-                        )
-
-        evidence = AgentEvidence(
-            agent_name=INTERNAL_POLICY_RAG_AGENT_NAME,
-            citations=citations,
-            reasoning=response.get("reasoning", "Cumplimiento de políticas internas vía RAG"),
-            confidence=response.get("confidence", 0.9),
-        )
-
-        state.evidences.append(evidence)
-        state.citations_internal.extend(citations)
-        state.agent_route.append("internal_policy_rag_agent")
+        return build_policy_update(response, relevant_docs)
 
     except Exception as e:
         print(f"❌ Error en Internal Policy RAG Agent: {e}")
 
-    return state
+    return {}
 
 
 def get_better_query(state: FraudDetectionState) -> str:
     transtaction = state.transaction
-    customer_behavior = state.customer_behavior
-    if not customer_behavior:
+    features = extract_features(transtaction, state.customer_profile)
+    if not features.has_history:
         return (
             f"monto {transtaction.amount} canal {transtaction.channel} país {transtaction.country}"
         )
 
-    ratio = transtaction.amount / max(customer_behavior.usual_amount_avg, 1)
-    if ratio < 1:
-        inequality = "<="
-    else:
-        inequality = ">"
-
-    start, end = customer_behavior.usual_hours.split("-")
-
-    time_behavior = "en rango"
-    if transtaction.timestamp.hour < int(start) or transtaction.timestamp.hour > int(end):
-        time_behavior = "fuera de rango"
-
-    country_behavior = "nacional"
-    if transtaction.country not in customer_behavior.usual_countries.split(","):
-        country_behavior = "internacional"
-
-    device_behaviror = "usual"
-    if transtaction.device_id not in customer_behavior.usual_devices.split(","):
-        device_behaviror = "nuevo"
+    inequality = "<=" if features.amount_ratio < 1 else ">"
+    time_behavior = "en rango" if features.hour_in_range else "fuera de rango"
+    country_behavior = "nacional" if features.domestic else "internacional"
+    device_behaviror = "usual" if features.known_device else "nuevo"
 
     return (
-        f"Monto {inequality} {ratio} promedio habitual, "
+        f"Monto {inequality} {features.amount_ratio} promedio habitual, "
         f"horario {time_behavior}, "
         f"transacción {country_behavior}, "
         f"dispositivo {device_behaviror}"
     )
+
+
+async def retrieve_policies(state: FraudDetectionState) -> tuple[str, list[Document]]:
+    """Query de RAG construida con el perfil y las 3 políticas más relevantes"""
+    query = get_better_query(state)
+    print(f"RAG query: `{query}`")
+    return query, await policy_index.asearch(query, k=3)
+
+
+def format_policies(relevant_docs: list[Document]) -> str:
+    return "\n".join([f"- [{d.metadata['policy_id']}]: {d.page_content}" for d in relevant_docs])
+
+
+def build_policy_update(response: dict, relevant_docs: list[Document]) -> dict:
+    """Actualización del estado (citas de las políticas violadas) a partir de la respuesta JSON"""
+    citations = []
+    signals = []
+    for ap in response.get("applied_policies", []):
+        if ap.get("violated"):
+            for d in relevant_docs:
+                if d.metadata["policy_id"] == ap["policy_id"]:
+                    citations.append(
+                        Citation(
+                            policy_id=ap["policy_id"],
+                            chunk_id="1",
+                            version=d.metadata["version"],
+                        )
+                    )
+                    signals.append(f"[POLICY] Violación de {ap['policy_id']}: {ap['reason']}")
+
+    evidence = AgentEvidence(
+        agent_name=INTERNAL_POLICY_RAG_AGENT_NAME,
+        citations=citations,
+        reasoning=response.get("reasoning", "Cumplimiento de políticas internas vía RAG"),
+        confidence=response.get("confidence", 0.9),
+    )
+
+    return {
+        "evidences": [evidence],
+        "citations_internal": citations,
+        "agent_route": ["internal_policy_rag_agent"],
+        "signals": signals,
+    }
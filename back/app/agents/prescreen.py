@@ -0,0 +1,148 @@
+from app.core.config import settings
+from app.core.constants import RULE_ENGINE_AGENT_NAME
+from app.models.schemas import AgentEvidence, AgentSignal, Citation, FraudDetectionState
+from app.services.features import TransactionFeatures, extract_features
+from app.services.risk_model import decision_for_risk
+from app.services.rule_engine import RULE_ENGINE_CONFIDENCE, PrescreenResult, get_rule_engine
+from app.services.velocity import velocity_alerts
+
+CUSTOMER_MESSAGES = {
+    "APPROVE": "Tu transacción fue aprobada.",
+    "CHALLENGE": (
+        "Necesitamos validar tu identidad para completar esta transacción, "
+        "ya que es inusual respecto a tu actividad habitual."
+    ),
+    "ESCALATE_TO_HUMAN": (
+        "Tu transacción está siendo revisada por nuestro equipo de seguridad. "
+        "Te contactaremos a la brevedad."
+    ),
+    "BLOCK": (
+        "Por tu seguridad hemos bloqueado esta transacción. "
+        "Comunícate con nosotros si la reconoces."
+    ),
+}
+
+
+def describe_features(features: TransactionFeatures) -> str:
+    return (
+        f"monto {features.amount} ({features.amount_ratio:.2f}x el promedio habitual), "
+        f"horario {'habitual' if features.hour_in_range else 'fuera de rango'}, "
+        f"transacción {'nacional' if features.domestic else 'internacional'}, "
+        f"dispositivo {'conocido' if features.known_device else 'nuevo'}, "
+        f"velocidad {'anómala' if features.velocity_alert else 'normal'}"
+    )
+
+
+def build_prescreen_update(result: PrescreenResult) -> dict:
+    """Convierte la decisión determinista en una actualización de estado auditable"""
+    features_text = describe_features(result.features)
+
+    if result.matched:
+        policies_text = "; ".join(f"{p.policy_id} (v{p.version}): {p.rule}" for p in result.matched)
+        reasoning = (
+            f"Se cumplen las condiciones de {policies_text}. Características: {features_text}."
+        )
+        signals = [
+            AgentSignal(
+                signal_type="policy_rule",
+                description=f"Regla {p.policy_id} aplicada → {p.action}",
+                severity="high" if p.action in ("ESCALATE_TO_HUMAN", "BLOCK") else "medium",
+                value=p.policy_id,
+            )
+            for p in result.matched
+        ]
+    else:
+        reasoning = (
+            "La transacción coincide con el comportamiento habitual del cliente en todas "
+            f"las características ({features_text}) y no aplica ninguna política."
+        )
+        signals = []
+
+    citations = [
+        Citation(policy_id=p.policy_id, chunk_id="rule", version=p.version) for p in result.matched
+    ]
+
+    return {
+        "decision": result.decision,
+        "confidence": RULE_ENGINE_CONFIDENCE,
+        "evidences": [
+            AgentEvidence(
+                agent_name=RULE_ENGINE_AGENT_NAME,
+                signals=signals,
+                citations=list(citations),
+                reasoning=reasoning,
+                confidence=RULE_ENGINE_CONFIDENCE,
+            )
+        ],
+        "signals": [f"[RULE] {s.description}" for s in signals],
+        "citations_internal": citations,
+        "explanation_customer": CUSTOMER_MESSAGES[result.decision],
+        "explanation_audit": (
+            f"Decisión {result.decision} tomada por el pre-screening determinista sin "
+            f"invocar agentes LLM. {reasoning} Ruta: rule_engine."
+        ),
+        "agent_route": ["rule_engine"],
+    }
+
+
+def build_model_update(score: float) -> dict:
+    """Decisión del modelo de riesgo local en modo sin LLM (`DECISION_MODE=model`)"""
+    decision = decision_for_risk(score)
+    return {
+        "decision": decision,
+        "confidence": round(max(score, 1 - score), 3),
+        "risk_score": score,
+        "explanation_customer": CUSTOMER_MESSAGES[decision],
+        "explanation_audit": (
+            f"Decisión {decision} tomada por el modelo de riesgo local (score {score:.2f}) "
+            "sin invocar agentes LLM. Ruta: risk_model."
+        ),
+        "agent_route": ["risk_model"],
+    }
+
+
+def contradicting_evidence(
+    result: PrescreenResult, velocity_alert: bool, model_score: float | None
+) -> str | None:
+    """
+    Evidencia de más riesgo que la decisión del rule engine (alerta de velocidad o
+    score alto del modelo): el caso deja de ser inequívoco. Un BLOCK no se contradice.
+    """
+    if result.decision == "BLOCK":
+        return None
+    if velocity_alert:
+        return "alerta de velocidad"
+    if model_score is not None and model_score >= settings.RISK_MODEL_ALERT_SCORE:
+        return f"score del modelo {model_score:.2f}"
+    return None
+
+
+async def prescreen_agent(state: FraudDetectionState) -> dict:
+    """
+    Evalúa reglas deterministas compiladas sobre las características de la transacción.
+    Si el caso es inequívoco devuelve la decisión final y el grafo termina; si no (o si
+    la velocidad o el modelo de riesgo contradicen la regla), no modifica el estado y
+    la transacción sigue al análisis multi-agente.
+    En modo sin LLM (`DECISION_MODE=model`) los casos ambiguos los decide el score
+    del modelo de riesgo local.
+    """
+    if settings.RULE_ENGINE_ENABLED:
+        engine = await get_rule_engine()
+        velocity_alert = bool(velocity_alerts(state.velocity, state.customer_profile))
+        result = engine.evaluate(
+            extract_features(state.transaction, state.customer_profile, velocity_alert)
+        )
+        if result is not None:
+            contradiction = contradicting_evidence(result, velocity_alert, state.model_score)
+            if contradiction is None:
+                print(f"⚡ [Rule Engine] Decisión directa: {result.decision}")
+                return build_prescreen_update(result)
+            print(f"🔀 [Rule Engine] {result.decision} contradicho por {contradiction}.")
+
+    if settings.DECISION_MODE == "model" and state.model_score is not None:
+        update = build_model_update(state.model_score)
+        print(f"📈 [Risk Model] Decisión sin LLM: {update['decision']}")
+        return update
+
+    print("🔀 [Rule Engine] Caso ambiguo, se delega al grafo de agentes.")
+    return {}
@@ -0,0 +1,49 @@
+from app.core.config import settings
+from app.core.constants import RISK_MODEL_AGENT_NAME
+from app.models.schemas import AgentEvidence, AgentSignal, FraudDetectionState
+from app.services.risk_model import get_risk_model
+
+
+async def risk_model_scorer(state: FraudDetectionState) -> dict:
+    """
+    Puntúa la transacción con el modelo de riesgo local (sin LLM) y deja el score en
+    el estado como señal de primera clase para el pre-screening y los agentes.
+    Si no hay modelo entrenado no modifica el estado.
+    """
+    model = get_risk_model()
+    if model is None:
+        return {}
+
+    tx, profile = state.transaction, state.customer_profile
+    score = model.score(tx, profile)
+    drivers = ", ".join(
+        f"{name} ({value:+.2f})" for name, value in model.contributions(tx, profile)
+    )
+    signal = AgentSignal(
+        signal_type="risk_model",
+        description=f"Score del modelo de riesgo local: {score:.2f}",
+        severity=(
+            "high"
+            if score >= settings.RISK_MODEL_ALERT_SCORE
+            else "medium"
+            if score >= 0.35
+            else "low"
+        ),
+        value=round(score, 4),
+    )
+    print(f"📈 [Risk Model] Score {score:.3f}")
+
+    update = {
+        "model_score": score,
+        "evidences": [
+            AgentEvidence(
+                agent_name=RISK_MODEL_AGENT_NAME,
+                signals=[signal],
+                reasoning=f"Probabilidad de fraude estimada {score:.2f}; factores principales: {drivers}",
+                confidence=round(max(score, 1 - score), 3),
+            )
+        ],
+    }
+    if score >= settings.RISK_MODEL_ALERT_SCORE:
+        update["signals"] = [f"[MODEL] {signal.description}"]
+    return update
@@ -1,18 +1,17 @@
-from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 
-from app.core.llm import get_llm
+from app.core.cascade import invoke_json_cascade
+from app.core.constants import TRANSACTION_CONTEXT_AGENT_NAME
 from app.models.schemas import AgentEvidence, AgentSignal, FraudDetectionState
 
 
-async def transaction_context_agent(state: FraudDetectionState) -> FraudDetectionState:
+async def transaction_context_agent(state: FraudDetectionState) -> dict:
     """
     Analiza señales internas inmediatas: monto, horario, país y dispositivo.
     """
     print("🤖 [Transaction Context Agent] Analizando señales básicas...")
 
     tx = state.transaction
-    llm = get_llm()
 
     prompt = ChatPromptTemplate.from_messages(
         [
@@ -39,28 +38,32 @@ async def transaction_context_agent(state: FraudDetectionState) -> FraudDetectio
         ]
     )
 
-    chain = prompt | llm | JsonOutputParser()
-
     try:
-        response = await chain.ainvoke({"transaction": tx.model_dump_json()})
-
-        print("agent_name: Transaction Context Agent", f"\n{response}")
-        signals = [AgentSignal(**s) for s in response.get("signals", [])]
-
-        evidence = AgentEvidence(
-            agent_name="Transaction Context Agent",
-            signals=signals,
-            reasoning=response.get("reasoning", "Análisis manual de señales internas"),
-            confidence=response.get("confidence", 0.5),
+        response = await invoke_json_cascade(
+            TRANSACTION_CONTEXT_AGENT_NAME, prompt, {"transaction": tx.model_dump_json()}
         )
 
-        state.evidences.append(evidence)
-        state.agent_route.append("transaction_context_agent")
-        for s in signals:
-            state.signals.append(f"[{s.severity.upper()}] {s.description}")
+        print("agent_name: Transaction Context Agent", f"\n{response}")
+        return build_context_update(response)
 
     except Exception as e:
         print(f"❌ Error en Transaction Context Agent: {e}")
-        state.signals.append(f"Error en análisis de contexto: {str(e)}")
+        return {"signals": [f"Error en análisis de contexto: {str(e)}"]}
+
+
+def build_context_update(response: dict) -> dict:
+    """Actualización del estado a partir de la respuesta JSON del agente de contexto"""
+    signals = [AgentSignal(**s) for s in response.get("signals", [])]
+
+    evidence = AgentEvidence(
+        agent_name=TRANSACTION_CONTEXT_AGENT_NAME,
+        signals=signals,
+        reasoning=response.get("reasoning", "Análisis manual de señales internas"),
+        confidence=response.get("confidence", 0.5),
+    )
 
-    return state
+    return {
+        "evidences": [evidence],
+        "agent_route": ["transaction_context_agent"],
+        "signals": [f"[{s.severity.upper()}] {s.description}" for s in signals],
+    }
@@ -0,0 +1,43 @@
+from app.core.config import settings
+from app.core.constants import VELOCITY_AGENT_NAME
+from app.models.schemas import AgentEvidence, FraudDetectionState, VelocityStat
+from app.services.velocity import velocity_alerts, velocity_store, window_label
+
+VELOCITY_CONFIDENCE = 0.9
+
+
+def describe_velocity(stats: list[VelocityStat]) -> str:
+    """Resumen compacto para los prompts, p. ej. `customer 1 min: 2 tx / 150.0`"""
+    return "; ".join(
+        f"{s.entity} {window_label(s.window_seconds)}: {s.count} tx / {s.amount}" for s in stats
+    )
+
+
+async def velocity_monitor(state: FraudDetectionState) -> dict:
+    """
+    Registra la transacción en los contadores de velocidad (cliente, dispositivo y
+    comercio) y expone los totales de cada ventana antes de los agentes LLM.
+    Sólo genera evidencia cuando algún contador supera su umbral.
+    """
+    if not settings.VELOCITY_ENABLED:
+        return {}
+
+    stats = await velocity_store.record(state.transaction)
+    alerts = velocity_alerts(stats, state.customer_profile)
+    if not alerts:
+        return {"velocity": stats}
+
+    print(f"🚨 [Velocity Monitor] {len(alerts)} alertas de velocidad")
+    return {
+        "velocity": stats,
+        "evidences": [
+            AgentEvidence(
+                agent_name=VELOCITY_AGENT_NAME,
+                signals=alerts,
+                reasoning=f"Actividad reciente por encima de lo normal: {describe_velocity(stats)}",
+                confidence=VELOCITY_CONFIDENCE,
+            )
+        ],
+        "signals": [f"[VELOCITY] {s.description}" for s in alerts],
+        "agent_route": ["velocity"],
+    }
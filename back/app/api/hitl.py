@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.pagination import decode_priority_cursor, encode_priority_cursor
+from app.core.config import settings
 from app.db.session import get_db
+from app.models.schemas import HITLItem, HITLPage
 from app.services.db_service import HITLService
 
 router = APIRouter()
@@ -11,18 +14,77 @@ router = APIRouter()
 class ReviewInput(BaseModel):
     decision: str
     comments: str
+    reviewer: str | None = None
 
 
-@router.get("/queue")
-async def get_hitl_queue(db: AsyncSession = Depends(get_db)):
-    return await HITLService.get_pending_queue(db)
+@router.get("/queue", response_model=HITLPage)
+async def get_hitl_queue(
+    limit: int = Query(settings.HITL_PAGE_SIZE, ge=1, le=settings.HITL_MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="`next_cursor` de la página anterior"),
+    status: str | None = Query("PENDING", description="PENDING, OWNED o REVIEWED"),
+    assigned_to: str | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Listado paginado de la cola en el mismo orden en que `claim` entrega los casos:
+    riesgo, monto y antigüedad
+    """
+    items = await HITLService.get_queue(
+        db,
+        limit=limit + 1,
+        status=status,
+        assigned_to=assigned_to,
+        after=decode_priority_cursor(cursor) if cursor else None,
+    )
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_priority_cursor(last.risk_score, last.amount, last.created_at, last.id)
+    return HITLPage(
+        items=[HITLItem.model_validate(item) for item in items], next_cursor=next_cursor
+    )
+
+
+@router.post("/claim", response_model=list[HITLItem])
+async def claim_hitl_items(
+    reviewer: str = Query(..., min_length=1, max_length=100),
+    n: int = Query(10, ge=1, le=settings.HITL_CLAIM_MAX),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Reclama hasta `n` casos para el revisor, por riesgo, monto y antigüedad. Quedan
+    asignados (OWNED) durante `HITL_LEASE_SECONDS`; si no se revisan vuelven a la cola.
+    """
+    items = await HITLService.claim(db, reviewer, n, settings.HITL_LEASE_SECONDS)
+    return [HITLItem.model_validate(item) for item in items]
+
+
+@router.post("/{transaction_id}/release")
+async def release_hitl_item(
+    transaction_id: str,
+    reviewer: str = Query(..., min_length=1, max_length=100),
+    db: AsyncSession = Depends(get_db),
+):
+    if not await HITLService.release(db, transaction_id, reviewer):
+        raise HTTPException(status_code=409, detail="Item is not claimed by this reviewer")
+    return {"status": "success", "message": f"Transaction {transaction_id} returned to queue"}
 
 
 @router.post("/{transaction_id}/review")
 async def submit_manual_review(
     transaction_id: str, review: ReviewInput, db: AsyncSession = Depends(get_db)
 ):
-    await HITLService.submit_review(db, transaction_id, review.decision, review.comments)
+    reviewed = await HITLService.submit_review(
+        db, transaction_id, review.decision, review.comments, review.reviewer
+    )
+    if not reviewed:
+        if await HITLService.get_item(db, transaction_id) is None:
+            raise HTTPException(status_code=404, detail="Transaction not in HITL queue")
+        raise HTTPException(
+            status_code=409, detail="Item already reviewed or claimed by another reviewer"
+        )
     return {
         "status": "success",
         "message": f"Transaction {transaction_id} updated by human reviewer",
@@ -0,0 +1,65 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.cache import llm_cache
+from app.core.metrics import render_metrics
+from app.core.resilience import endpoints
+from app.services.job_queue import analysis_jobs
+from app.services.profile_cache import profile_cache
+from app.services.velocity import velocity_store
+
+router = APIRouter()
+prometheus_router = APIRouter()
+
+
+@prometheus_router.get("/metrics", response_class=PlainTextResponse)
+async def get_prometheus_metrics():
+    """Histogramas y contadores por agente, modelo y decisión (formato Prometheus)"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/cache")
+async def get_llm_cache_metrics():
+    """Hit/miss por agente y ocupación de la caché de respuestas LLM"""
+    return llm_cache.snapshot()
+
+
+@router.get("/profiles")
+async def get_profile_cache_metrics():
+    """Hits, misses y cargas coalescidas de la caché de perfiles de cliente"""
+    return profile_cache.snapshot()
+
+
+@router.get("/threat-intel")
+async def get_threat_intel_cache_metrics():
+    """Hits, búsquedas coalescidas y refrescos en segundo plano por (merchant, país)"""
+    # Import diferido: el agente (y langchain-tavily) se carga en el calentamiento
+    from app.agents.external_threat_intel import threat_intel_cache
+
+    return threat_intel_cache.snapshot()
+
+
+@router.get("/jobs")
+async def get_job_queue_metrics():
+    """Profundidad de la cola, tiempos de espera y utilización de los workers asíncronos"""
+    return analysis_jobs.snapshot()
+
+
+@router.get("/velocity")
+async def get_velocity_metrics():
+    """Backend, ventanas y claves activas de los contadores de velocidad"""
+    return velocity_store.snapshot()
+
+
+@router.get("/cascade")
+async def get_model_cascade_metrics():
+    """Llamadas, escalados al modelo grande por motivo y tasa de escalado por agente"""
+    from app.core.cascade import cascade_snapshot
+
+    return cascade_snapshot()
+
+
+@router.get("/resilience")
+async def get_resilience_metrics():
+    """Estado del circuit breaker, reintentos y hedging por endpoint de OpenAI/Azure/Tavily"""
+    return endpoints.snapshot()
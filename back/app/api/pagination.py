@@ -0,0 +1,39 @@
+"""
+Opaque keyset cursors shared by the paginated listings.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException
+
+
+def encode_cursor(created_at: datetime, key: str) -> str:
+    payload = json.dumps([created_at.isoformat(), key]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        created_at, key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(key)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_priority_cursor(
+    risk_score: float, amount: float, created_at: datetime, item_id: int
+) -> str:
+    payload = json.dumps([risk_score, amount, created_at.isoformat(), item_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def decode_priority_cursor(cursor: str) -> tuple[float, float, datetime, int]:
+    try:
+        risk_score, amount, created_at, item_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode("ascii"))
+        )
+        return float(risk_score), float(amount), datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
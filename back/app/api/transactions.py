@@ -1,26 +1,83 @@
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
 from datetime import UTC, datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.agents.graph import fraud_graph
-from app.db.session import get_db
+from app.api.pagination import decode_cursor, encode_cursor
+from app.core.config import settings
+from app.core.instrumentation import record_analysis
+from app.db.session import AsyncSessionLocal, get_db
 from app.models.schemas import (
+    AnalysisJobAccepted,
+    AnalysisMode,
+    BatchAnalysisRequest,
+    BatchAnalysisResult,
+    BatchItemResult,
     FraudDetectionResult,
     FraudDetectionState,
     TransactionInput,
+    TransactionListItem,
+    TransactionPage,
     TransactionSummary,
 )
 from app.services.db_service import TransactionService
+from app.services.job_queue import analysis_jobs
 from app.services.reporting_service import ReportingService
+from app.services.warmup import get_fraud_graph
 
 router = APIRouter()
 
+MODE_DESCRIPTION = "`fast`: contexto, comportamiento y políticas en una sola llamada al LLM"
+DEADLINE_DESCRIPTION = "Presupuesto de latencia en ms (por defecto, el del canal)"
 
-@router.get("/")
-async def get_transactions(db: AsyncSession = Depends(get_db)):
-    return await TransactionService.get_transactions(db)
+
+def analysis_options(
+    mode: AnalysisMode | None = Query(None, description=MODE_DESCRIPTION),
+    deadline_ms: int | None = Query(None, ge=50, description=DEADLINE_DESCRIPTION),
+) -> dict:
+    """Opciones del análisis por petición, como campos del estado inicial del grafo"""
+    return {"analysis_mode": mode, "deadline_ms": deadline_ms}
+
+
+@router.get("/", response_model=TransactionPage)
+async def get_transactions(
+    limit: int = Query(
+        settings.TRANSACTIONS_PAGE_SIZE, ge=1, le=settings.TRANSACTIONS_MAX_PAGE_SIZE
+    ),
+    cursor: str | None = Query(None, description="`next_cursor` de la página anterior"),
+    decision: str | None = None,
+    customer_id: str | None = None,
+    merchant_id: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Listado paginado (más recientes primero) con filtros. Devuelve solo las columnas
+    ligeras; el registro completo se obtiene con `GET /{transaction_id}`.
+    """
+    rows = await TransactionService.get_transactions(
+        db,
+        limit=limit + 1,
+        after=decode_cursor(cursor) if cursor else None,
+        decision=decision,
+        customer_id=customer_id,
+        merchant_id=merchant_id,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return TransactionPage(
+        items=[TransactionListItem(**row) for row in rows],
+        next_cursor=encode_cursor(rows[-1]["created_at"], rows[-1]["id"]) if has_more else None,
+    )
 
 
 @router.get("/{transaction_id}")
@@ -39,24 +96,291 @@ async def get_transaction_summary(transaction_id: str, db: AsyncSession = Depend
     return TransactionSummary(transaction_id=transaction_id, summary_text=summary_text)
 
 
-@router.post("/analyze", response_model=FraudDetectionResult)
-async def analyze_transaction(tx_input: TransactionInput, db: AsyncSession = Depends(get_db)):
+@router.post(
+    "/analyze",
+    response_model=FraudDetectionResult,
+    responses={202: {"model": AnalysisJobAccepted}},
+)
+async def analyze_transaction(
+    tx_input: TransactionInput,
+    async_mode: bool = Query(
+        False, alias="async", description="Encolar el análisis y responder 202 con el job id"
+    ),
+    options: dict = Depends(analysis_options),
+    db: AsyncSession = Depends(get_db),
+):
+    if async_mode:
+        return await enqueue_analysis(tx_input, db, options)
+
+    await claim_transaction(db, tx_input)
+
+    initial_state = FraudDetectionState(
+        transaction=tx_input, start_time=datetime.now(UTC), **options
+    )
+
+    print(f"🚀 Iniciando análisis de Agentes para {tx_input.transaction_id}...")
+    try:
+        final_state_dict = await get_fraud_graph().ainvoke(initial_state)
+        final_state = FraudDetectionState(**final_state_dict)
+        record_analysis(final_state)
+        await TransactionService.save_analysis(db, final_state)
+    except (Exception, asyncio.CancelledError) as e:
+        # Sin esto la fila reservada quedaría PROCESSING
+        await asyncio.shield(mark_failed({tx_input.transaction_id: failure_message(e)}))
+        raise
+
+    return build_result(final_state)
+
+
+async def claim_transaction(db: AsyncSession, tx_input: TransactionInput) -> None:
+    """
+    Reserva el ID con un INSERT barato (PROCESSING) antes de correr el grafo: una
+    petición concurrente con el mismo ID recibe 409 sin pagar el análisis, y la fila
+    es visible en `GET /{id}` mientras se analiza. Los resultados se escriben al final
+    en un único commit (`save_analysis`).
+    """
     try:
-        await TransactionService.create_transaction(db, tx_input)
+        await TransactionService.create_transaction(db, tx_input, status="PROCESSING")
     except IntegrityError:
         await db.rollback()
         raise HTTPException(status_code=409, detail="Transaction already exists")
 
-    initial_state = FraudDetectionState(transaction=tx_input, start_time=datetime.now(UTC))
 
-    print(f"🚀 Iniciando análisis de Agentes para {tx_input.transaction_id}...")
-    final_state_dict = await fraud_graph.ainvoke(initial_state)
+def failure_message(error: BaseException) -> str:
+    if isinstance(error, asyncio.CancelledError):
+        return "Analysis cancelled"
+    return f"Analysis failed: {error}"
+
+
+async def mark_failed(failures: dict[str, str]) -> None:
+    """
+    Marca como FAILED (con su error) transacciones reservadas cuyo análisis falló o se
+    interrumpió, en una sesión propia para que funcione también tras una cancelación.
+    """
+    async with AsyncSessionLocal() as session:
+        await TransactionService.bulk_save_analysis(session, [], failures)
+
+
+async def enqueue_analysis(
+    tx_input: TransactionInput, db: AsyncSession, options: dict | None = None
+) -> JSONResponse:
+    """
+    Modo asíncrono: persiste la transacción como QUEUED y la encola para el pool de
+    workers. Con la cola llena responde 503 en lugar de acumular latencia.
+    """
+    if not analysis_jobs.reserve():
+        raise HTTPException(
+            status_code=503,
+            detail="Analysis queue is full",
+            headers={"Retry-After": str(settings.JOB_RETRY_AFTER_SECONDS)},
+        )
+
+    try:
+        await TransactionService.create_transaction(db, tx_input, status="QUEUED")
+    except IntegrityError:
+        analysis_jobs.release()
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Transaction already exists")
+    except Exception:
+        analysis_jobs.release()
+        raise
+
+    analysis_jobs.submit(tx_input, options)
+    accepted = AnalysisJobAccepted(
+        job_id=tx_input.transaction_id,
+        status="QUEUED",
+        status_url=f"/api/transactions/{tx_input.transaction_id}",
+    )
+    return JSONResponse(
+        status_code=202,
+        content=accepted.model_dump(),
+        headers={"Location": accepted.status_url},
+    )
+
 
-    final_state = FraudDetectionState(**final_state_dict)
+@router.post("/analyze/stream")
+async def analyze_transaction_stream(
+    tx_input: TransactionInput,
+    options: dict = Depends(analysis_options),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Variante de `/analyze` que emite Server-Sent Events a medida que avanza el grafo:
+    un evento `agent` por nodo terminado, `decision` en cuanto el árbitro (o el rule
+    engine) decide —antes de que corra explainability— y `result` al final.
+    """
+    await claim_transaction(db, tx_input)
+
+    return StreamingResponse(
+        stream_analysis(tx_input, options),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def stream_analysis(
+    tx_input: TransactionInput, options: dict | None = None
+) -> AsyncIterator[str]:
+    start = time.perf_counter()
+    initial_state = FraudDetectionState(
+        transaction=tx_input, start_time=datetime.now(UTC), **(options or {})
+    )
+    final_state_dict: dict = {}
+    decision_sent = False
+
+    print(f"🚀 Iniciando análisis (streaming) para {tx_input.transaction_id}...")
+    try:
+        async for mode, chunk in get_fraud_graph().astream(
+            initial_state, stream_mode=["updates", "values"]
+        ):
+            if mode == "values":
+                final_state_dict = chunk
+                continue
+
+            for node, update in chunk.items():
+                update = update or {}
+                elapsed_ms = int((time.perf_counter() - start) * 1000)
+                yield sse_event(
+                    "agent",
+                    {
+                        "node": node,
+                        "evidences": [
+                            e.model_dump(mode="json") for e in update.get("evidences", [])
+                        ],
+                        "signals": update.get("signals", []),
+                        "elapsed_ms": elapsed_ms,
+                    },
+                )
+                if update.get("decision") and not decision_sent:
+                    decision_sent = True
+                    yield sse_event(
+                        "decision",
+                        {
+                            "transaction_id": tx_input.transaction_id,
+                            "decision": update["decision"],
+                            "confidence": update.get("confidence"),
+                            "elapsed_ms": elapsed_ms,
+                        },
+                    )
+
+        final_state = FraudDetectionState(**final_state_dict)
+        record_analysis(final_state)
+        async with AsyncSessionLocal() as session:
+            await TransactionService.save_analysis(session, final_state)
+
+        yield sse_event("result", build_result(final_state).model_dump(mode="json"))
+
+    except Exception as e:
+        print(f"❌ Error en análisis streaming de {tx_input.transaction_id}: {e}")
+        await mark_failed({tx_input.transaction_id: failure_message(e)})
+        yield sse_event("error", {"transaction_id": tx_input.transaction_id, "detail": str(e)})
+    except asyncio.CancelledError as e:
+        # Cliente desconectado a mitad del stream
+        await asyncio.shield(mark_failed({tx_input.transaction_id: failure_message(e)}))
+        raise
+
+
+@router.post("/analyze/batch", response_model=BatchAnalysisResult)
+async def analyze_transactions_batch(
+    batch: BatchAnalysisRequest,
+    concurrency: int | None = Query(None, ge=1, description="Análisis simultáneos"),
+    options: dict = Depends(analysis_options),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Analiza un lote de transacciones con concurrencia acotada.
+    Los errores (IDs duplicados, fallos de análisis) se reportan por item en lugar de
+    abortar el lote, y la persistencia se hace con inserciones masivas.
+    """
+    if len(batch.transactions) > settings.BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413, detail=f"Batch exceeds {settings.BATCH_MAX_SIZE} transactions"
+        )
+
+    start = time.perf_counter()
+    limit = min(concurrency or settings.BATCH_DEFAULT_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY)
+
+    errors: dict[int, str] = {}
+    seen: set[str] = set()
+    for i, tx in enumerate(batch.transactions):
+        if tx.transaction_id in seen:
+            errors[i] = "Duplicate transaction_id in batch"
+        seen.add(tx.transaction_id)
+
+    # Un segundo intento cubre IDs insertados por otra petición entre el SELECT y el INSERT
+    for attempt in range(2):
+        existing = await TransactionService.get_existing_ids(db, list(seen))
+        for i, tx in enumerate(batch.transactions):
+            if i not in errors and tx.transaction_id in existing:
+                errors[i] = "Transaction already exists"
+
+        accepted = {i: tx for i, tx in enumerate(batch.transactions) if i not in errors}
+        try:
+            # PROCESSING: si el proceso muere a mitad del lote, la cola de jobs las recupera
+            await TransactionService.bulk_create_transactions(
+                db, list(accepted.values()), status="PROCESSING"
+            )
+            break
+        except IntegrityError:
+            await db.rollback()
+            if attempt:
+                raise HTTPException(status_code=409, detail="Concurrent insert of batch IDs")
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(tx_input: TransactionInput) -> FraudDetectionState:
+        async with semaphore:
+            initial_state = FraudDetectionState(
+                transaction=tx_input, start_time=datetime.now(UTC), **options
+            )
+            return FraudDetectionState(**await get_fraud_graph().ainvoke(initial_state))
+
+    print(
+        f"🚀 Iniciando análisis por lotes de {len(accepted)} transacciones (concurrencia {limit})..."
+    )
+    try:
+        outcomes = await asyncio.gather(
+            *(run(tx) for tx in accepted.values()), return_exceptions=True
+        )
+    except asyncio.CancelledError as e:
+        # Cliente desconectado: sin esto las filas quedarían PROCESSING hasta un reinicio
+        cancelled = {tx.transaction_id: failure_message(e) for tx in accepted.values()}
+        await asyncio.shield(mark_failed(cancelled))
+        raise
+
+    states: dict[int, FraudDetectionState] = {}
+    failures: dict[str, str] = {}
+    for i, outcome in zip(accepted, outcomes, strict=True):
+        if isinstance(outcome, BaseException):
+            errors[i] = f"Analysis failed: {outcome}"
+            failures[accepted[i].transaction_id] = errors[i]
+        else:
+            states[i] = outcome
+            record_analysis(outcome)
+
+    await TransactionService.bulk_save_analysis(db, list(states.values()), failures)
+
+    items = [
+        BatchItemResult(
+            transaction_id=tx.transaction_id, status="ok", result=build_result(states[i])
+        )
+        if i in states
+        else BatchItemResult(transaction_id=tx.transaction_id, status="error", error=errors[i])
+        for i, tx in enumerate(batch.transactions)
+    ]
+    return BatchAnalysisResult(
+        items=items,
+        succeeded=len(states),
+        failed=len(errors),
+        processing_time_ms=int((time.perf_counter() - start) * 1000),
+    )
 
-    await TransactionService.update_analysis_results(db, final_state)
-    await TransactionService.save_audit_trail(db, final_state)
 
+def build_result(final_state: FraudDetectionState) -> FraudDetectionResult:
     return FraudDetectionResult(
         transaction_id=final_state.transaction.transaction_id,
         decision=final_state.decision,
@@ -67,5 +391,6 @@ async def analyze_transaction(tx_input: TransactionInput, db: AsyncSession = Dep
         explanation_customer=final_state.explanation_customer,
         explanation_audit=final_state.explanation_audit,
         agent_route=final_state.agent_route,
+        degraded_stages=final_state.degraded_stages,
         processing_time_ms=int((datetime.now(UTC) - final_state.start_time).total_seconds() * 1000),
     )
@@ -0,0 +1,202 @@
+"""
+Content-addressed cache for LLM responses.
+
+Installed as LangChain's global LLM cache, so it sits under every
+`prompt | llm | parser` chain without touching the agents. Keys are a SHA-256 of the
+LLM configuration string (model, temperature, ...) and the rendered messages. An
+in-process LRU with TTL and byte budget is checked first, then an optional Redis tier
+shared by every worker.
+"""
+
+import hashlib
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+import redis
+import redis.asyncio as aredis
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.load import dumps, loads
+
+from app.core.config import settings
+from app.core.lru import LRUCache
+
+# Agente (nodo del grafo o servicio) que está invocando al LLM en el contexto actual
+current_agent: ContextVar[str] = ContextVar("current_agent", default="unknown")
+
+
+@contextmanager
+def agent_scope(agent: str) -> Iterator[None]:
+    """Attribute LLM calls made inside the block to `agent` (metrics and opt-out)"""
+    token = current_agent.set(agent)
+    try:
+        yield
+    finally:
+        current_agent.reset(token)
+
+
+class LLMResponseCache(BaseCache):
+    """Two-tier (local LRU + optional Redis) cache of chat model generations"""
+
+    def __init__(
+        self,
+        local: LRUCache,
+        ttl: int,
+        bypass_agents: list[str] | None = None,
+        redis_client: redis.Redis | None = None,
+        aredis_client: aredis.Redis | None = None,
+    ):
+        self.local = local
+        self.ttl = ttl
+        self.bypass_agents = set(bypass_agents or [])
+        self.redis = redis_client
+        self.aredis = aredis_client
+        self.stats: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "bypassed": 0}
+        )
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        digest = hashlib.sha256(llm_string.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(prompt.encode("utf-8"))
+        return f"llm-cache:{digest.hexdigest()}"
+
+    def _bypassed(self, agent: str) -> bool:
+        if agent in self.bypass_agents:
+            self.stats[agent]["bypassed"] += 1
+            return True
+        return False
+
+    def _record(self, agent: str, hit: bool) -> None:
+        self.stats[agent]["hits" if hit else "misses"] += 1
+
+    def _store_local(self, key: str, value: RETURN_VAL_TYPE, payload: bytes | str) -> None:
+        self.local.set(key, value, size=len(payload))
+
+    @staticmethod
+    def _decode(payload: bytes | str) -> RETURN_VAL_TYPE:
+        if isinstance(payload, bytes):
+            payload = payload.decode()
+        value: RETURN_VAL_TYPE = loads(payload, allowed_objects="core")
+        return value
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        agent = current_agent.get()
+        if self._bypassed(agent):
+            return None
+
+        key = self.make_key(prompt, llm_string)
+        value: RETURN_VAL_TYPE | None = self.local.get(key)
+        if value is None and self.redis is not None:
+            try:
+                payload = self.redis.get(key)
+            except redis.RedisError as e:
+                print(f"⚠️ Redis no disponible para la caché LLM: {e}")
+                payload = None
+            if payload is not None:
+                value = self._decode(payload)
+                self._store_local(key, value, payload)
+
+        self._record(agent, value is not None)
+        return value
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if current_agent.get() in self.bypass_agents:
+            return
+
+        key = self.make_key(prompt, llm_string)
+        payload = dumps(return_val)
+        self._store_local(key, return_val, payload)
+        if self.redis is not None:
+            try:
+                self.redis.set(key, payload, ex=self.ttl)
+            except redis.RedisError as e:
+                print(f"⚠️ Redis no disponible para la caché LLM: {e}")
+
+    async def alookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        agent = current_agent.get()
+        if self._bypassed(agent):
+            return None
+
+        key = self.make_key(prompt, llm_string)
+        value: RETURN_VAL_TYPE | None = self.local.get(key)
+        if value is None and self.aredis is not None:
+            try:
+                payload = await self.aredis.get(key)
+            except redis.RedisError as e:
+                print(f"⚠️ Redis no disponible para la caché LLM: {e}")
+                payload = None
+            if payload is not None:
+                value = self._decode(payload)
+                self._store_local(key, value, payload)
+
+        self._record(agent, value is not None)
+        return value
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if current_agent.get() in self.bypass_agents:
+            return
+
+        key = self.make_key(prompt, llm_string)
+        payload = dumps(return_val)
+        self._store_local(key, return_val, payload)
+        if self.aredis is not None:
+            try:
+                await self.aredis.set(key, payload, ex=self.ttl)
+            except redis.RedisError as e:
+                print(f"⚠️ Redis no disponible para la caché LLM: {e}")
+
+    def clear(self, **kwargs: Any) -> None:
+        self.local.clear()
+        self.stats.clear()
+
+    def snapshot(self) -> dict:
+        """Hit/miss metrics per agent plus occupancy of the local tier"""
+        agents = {}
+        for agent, counters in self.stats.items():
+            lookups = counters["hits"] + counters["misses"]
+            agents[agent] = {**counters, "hit_rate": counters["hits"] / lookups if lookups else 0.0}
+        return {
+            "agents": agents,
+            "local_entries": len(self.local),
+            "local_bytes": self.local.bytes,
+            "local_evictions": self.local.evictions,
+            "redis_enabled": self.aredis is not None,
+        }
+
+    async def aclose(self) -> None:
+        if self.aredis is not None:
+            await self.aredis.aclose()
+        if self.redis is not None:
+            self.redis.close()
+
+
+def build_llm_cache() -> LLMResponseCache:
+    redis_client = aredis_client = None
+    if settings.REDIS_ENABLED:
+        redis_client = redis.Redis.from_url(settings.REDIS_URL)
+        aredis_client = aredis.Redis.from_url(settings.REDIS_URL)
+
+    return LLMResponseCache(
+        local=LRUCache(
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl=settings.LLM_CACHE_TTL_SECONDS,
+            max_bytes=settings.LLM_CACHE_MAX_BYTES,
+        ),
+        ttl=settings.LLM_CACHE_TTL_SECONDS,
+        bypass_agents=settings.LLM_CACHE_BYPASS_AGENTS,
+        redis_client=redis_client,
+        aredis_client=aredis_client,
+    )
+
+
+llm_cache = build_llm_cache()
+
+
+def install_llm_cache() -> None:
+    """Register the cache globally for every LangChain chat model (if enabled)"""
+    set_llm_cache(llm_cache if settings.LLM_CACHE_ENABLED else None)
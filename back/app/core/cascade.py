@@ -0,0 +1,105 @@
+"""
+Confidence-gated model cascade for the JSON-answering agents.
+
+Agents listed in `MODEL_CASCADE` first run on their small model; the same prompt is
+re-run on the agent's `MAP_AGENT_MODEL` only when the small model's answer is not
+good enough:
+
+- the JSON cannot be parsed (`parse_error`);
+- `confidence` is below `MODEL_CASCADE_MIN_CONFIDENCE` (`low_confidence`);
+- `risk_score` falls in `MODEL_CASCADE_AMBIGUOUS_RISK` (`ambiguous_risk`).
+
+Every cascaded call is counted in `fraud_model_cascade_calls_total{agent, outcome}`,
+so the escalation rate per agent is visible in Prometheus and `GET /api/metrics/cascade`.
+"""
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.constants import MAP_AGENT_MODEL
+from app.core.instrumentation import current_run
+from app.core.llm import get_llm
+
+ACCEPTED = "accepted"
+
+
+def cascade_models(agent_name: str) -> tuple[str, ...]:
+    """Models to try in order for `agent_name`: (small, large) or just its own model"""
+    large = MAP_AGENT_MODEL.get(agent_name, settings.OPENAI_MODEL)
+    small = settings.MODEL_CASCADE.get(agent_name) if settings.MODEL_CASCADE_ENABLED else None
+    if not small or small == large:
+        return (large,)
+    return (small, large)
+
+
+def escalation_reason(agent_name: str, response: dict) -> str | None:
+    """Why the small model's answer must be re-checked by the large model, if it must"""
+    try:
+        confidence = response.get("confidence")
+        risk_score = response.get("risk_score")
+        confidence = None if confidence is None else float(confidence)
+        risk_score = None if risk_score is None else float(risk_score)
+    except (AttributeError, TypeError, ValueError):
+        return "parse_error"
+
+    min_confidence = settings.MODEL_CASCADE_AGENT_MIN_CONFIDENCE.get(
+        agent_name, settings.MODEL_CASCADE_MIN_CONFIDENCE
+    )
+    if confidence is not None and confidence < min_confidence:
+        return "low_confidence"
+
+    low, high = settings.MODEL_CASCADE_AMBIGUOUS_RISK
+    if risk_score is not None and low <= risk_score <= high:
+        return "ambiguous_risk"
+    return None
+
+
+async def invoke_json_cascade(agent_name: str, prompt: ChatPromptTemplate, inputs: dict) -> dict:
+    """Run `prompt | llm | JsonOutputParser()` through the cascade configured for the agent"""
+
+    async def invoke(model: str) -> dict:
+        response: dict = await (prompt | get_llm(model) | JsonOutputParser()).ainvoke(inputs)
+        return response
+
+    models = cascade_models(agent_name)
+    if len(models) == 1:
+        return await invoke(models[0])
+
+    small, large = models
+    try:
+        response = await invoke(small)
+        reason = escalation_reason(agent_name, response)
+    except OutputParserException:
+        reason = "parse_error"
+
+    metrics.CASCADE_CALLS.inc(agent=agent_name, outcome=reason or ACCEPTED)
+    if reason is None:
+        return response
+
+    print(f"⬆️ [Cascade] {agent_name}: {small} → {large} ({reason})")
+    run = current_run.get()
+    if run is not None:
+        run.escalations += 1
+    return await invoke(large)
+
+
+def cascade_snapshot() -> dict:
+    """Calls, escalations by reason and escalation rate per cascaded agent"""
+    agents: dict[str, dict] = {}
+    for (agent, outcome), count in metrics.CASCADE_CALLS.values().items():
+        entry = agents.setdefault(agent, {"calls": 0, "escalated": 0, "reasons": {}})
+        entry["calls"] += int(count)
+        if outcome != ACCEPTED:
+            entry["escalated"] += int(count)
+            entry["reasons"][outcome] = int(count)
+
+    for entry in agents.values():
+        entry["escalation_rate"] = round(entry["escalated"] / entry["calls"], 4)
+    return {
+        "enabled": settings.MODEL_CASCADE_ENABLED,
+        "models": {agent: cascade_models(agent) for agent in settings.MODEL_CASCADE},
+        "agents": agents,
+    }
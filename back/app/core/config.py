@@ -2,6 +2,8 @@
 Configuration settings using Pydantic Settings
 """
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -20,6 +22,13 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     VERSION: str = "0.1.0"
 
+    # Startup warm-up (agents, graph, policy index): until it ends, GET /ready and the
+    # analysis endpoints answer 503 with this Retry-After
+    WARMUP_RETRY_AFTER_SECONDS: int = 2
+    # Backoff between attempts of a failed critical stage (database, graph, job workers)
+    WARMUP_RETRY_BASE_SECONDS: float = 1.0
+    WARMUP_RETRY_MAX_SECONDS: float = 30.0
+
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./fraud_detection.db"
 
@@ -27,25 +36,178 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = ""
     OPENAI_MODEL: str = "gpt-4o-mini"
     OPENAI_TEMPERATURE: float = 0.1
+    OPENAI_EMBEDDING_MODEL: str = "text-embedding-ada-002"
+    # OpenAI-compatible endpoint (e.g. the local stub of benchmarks/stub_server.py)
+    OPENAI_BASE_URL: str = ""
 
     # Azure OpenAI (optional)
     AZURE_OPENAI_API_KEY: str = ""
     AZURE_OPENAI_ENDPOINT: str = ""
     AZURE_OPENAI_DEPLOYMENT: str = ""
     AZURE_OPENAI_API_VERSION: str = "2024-02-15-preview"
+    # Model -> deployment routing (e.g. {"gpt-4.1": "fraud-gpt41"}), used with MAP_AGENT_MODEL
+    AZURE_OPENAI_DEPLOYMENTS: dict[str, str] = {}
+
+    # Shared HTTP connection pool for LLM clients
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_HTTP_TIMEOUT: float = 60.0
+
+    # Resilience of OpenAI/Azure/Tavily calls: circuit breaker per endpoint, retries with
+    # backoff and jitter (replacing the OpenAI SDK retries) and optional hedging
+    RESILIENCE_ENABLED: bool = True
+    RESILIENCE_MAX_ATTEMPTS: int = 3
+    RESILIENCE_BACKOFF_BASE_SECONDS: float = 0.25
+    RESILIENCE_BACKOFF_MAX_SECONDS: float = 4.0
+    # A longer Retry-After is not waited for: the error is returned right away
+    RESILIENCE_MAX_RETRY_AFTER_SECONDS: float = 10.0
+    # Consecutive failures that open a circuit, and seconds before it lets a probe through
+    RESILIENCE_BREAKER_FAILURES: int = 5
+    RESILIENCE_BREAKER_RESET_SECONDS: float = 30.0
+    # Idempotent calls still running past this latency percentile are sent a second time
+    RESILIENCE_HEDGE_ENABLED: bool = False
+    RESILIENCE_HEDGE_PERCENTILE: float = 95.0
+    RESILIENCE_HEDGE_MIN_SAMPLES: int = 20
+    RESILIENCE_HEDGE_WINDOW: int = 200
+
+    # Model cascade: agents listed here run first on the small model and re-run on their
+    # MAP_AGENT_MODEL only on low confidence, unparseable JSON or an ambiguous risk score
+    MODEL_CASCADE_ENABLED: bool = True
+    MODEL_CASCADE: dict[str, str] = {
+        "Internal Policy RAG Agent": "gpt-4o-mini",
+        "External Threat Intel Agent": "gpt-4o-mini",
+        "Decision Arbiter Agent": "gpt-4o-mini",
+    }
+    MODEL_CASCADE_MIN_CONFIDENCE: float = 0.7
+    # Per-agent override of MODEL_CASCADE_MIN_CONFIDENCE
+    MODEL_CASCADE_AGENT_MIN_CONFIDENCE: dict[str, float] = {}
+    # [low, high] risk_score band re-checked by the large model (ESCALATE/BLOCK boundaries)
+    MODEL_CASCADE_AMBIGUOUS_RISK: list[float] = [0.6, 0.9]
+
+    # Prompt compaction for the aggregator, debate and arbiter (budgets in tokens)
+    TOKENIZER_ENCODING: str = "o200k_base"
+    COMPACTION_ENABLED: bool = True
+    COMPACTION_REASONING_TOKENS: int = 80
+    # Per-agent override of COMPACTION_REASONING_TOKENS (e.g. {"Internal Policy RAG Agent": 120})
+    COMPACTION_AGENT_TOKENS: dict[str, int] = {}
+    COMPACTION_SUMMARY_TOKENS: int = 200
+    COMPACTION_DEBATE_TOKENS: int = 160
+    COMPACTION_MAX_SIGNALS: int = 20
+    # Share of calls whose uncompacted context is also tokenized for the raw-token metric
+    COMPACTION_RAW_SAMPLE_RATE: float = 0.05
 
     # Azure AI Search (Vector DB)
     AZURE_SEARCH_ENDPOINT: str = ""
     AZURE_SEARCH_KEY: str = ""
     AZURE_SEARCH_INDEX_NAME: str = "fraud-policies"
 
+    # Local policy index (FAISS, persisted and memory-mapped)
+    POLICY_INDEX_DIR: str = ".cache/policy_index"
+
+    # Deterministic pre-screening (rule engine fast path)
+    RULE_ENGINE_ENABLED: bool = True
+    RULE_ENGINE_APPROVE_MAX_AMOUNT: float = 5000.0
+
+    # Batch analysis
+    BATCH_MAX_SIZE: int = 500
+    BATCH_DEFAULT_CONCURRENCY: int = 8
+    BATCH_MAX_CONCURRENCY: int = 32
+
+    # Transaction listing (GET /api/transactions/)
+    TRANSACTIONS_PAGE_SIZE: int = 50
+    TRANSACTIONS_MAX_PAGE_SIZE: int = 500
+
+    # HITL review queue (leases of POST /api/hitl/claim)
+    HITL_LEASE_SECONDS: int = 900
+    HITL_CLAIM_MAX: int = 50
+    HITL_PAGE_SIZE: int = 50
+    HITL_MAX_PAGE_SIZE: int = 500
+
+    # Async job mode (POST /api/transactions/analyze?async=true)
+    JOB_WORKERS: int = 4
+    JOB_QUEUE_MAX_DEPTH: int = 1000
+    JOB_RETRY_AFTER_SECONDS: int = 5
+    # A PROCESSING analysis older than this is taken as abandoned and recovered on startup
+    JOB_LEASE_SECONDS: int = 600
+
+    # Customer profile cache (in front of customer_profile_stats / customer_behavior)
+    PROFILE_CACHE_MAX_ENTRIES: int = 100_000
+    PROFILE_CACHE_TTL_SECONDS: int = 900
+    PROFILE_CACHE_NEGATIVE_TTL_SECONDS: int = 60
+
+    # Customer profile engine (running statistics updated on approvals)
+    PROFILE_EWMA_ALPHA: float = 0.1
+    PROFILE_SKETCH_SIZE: int = 8
+    PROFILE_BOOTSTRAP_WEIGHT: float = 10.0
+    PROFILE_USUAL_HOUR_MIN_SHARE: float = 0.02
+
+    # Streaming profile import (python -m app.data.importer)
+    PROFILE_IMPORT_CHUNK_SIZE: int = 5000
+
+    # Local risk model (trained with python -m app.data.train_risk_model)
+    RISK_MODEL_ENABLED: bool = True
+    RISK_MODEL_PATH: str = "models/risk_model.json"
+    RISK_MODEL_MERCHANT_BUCKETS: int = 16
+    RISK_MODEL_L2: float = 1.0
+    # Weight of a HITL reviewer label relative to a decision taken by the pipeline
+    RISK_MODEL_HITL_WEIGHT: float = 5.0
+    # Scores from here on are reported as a high-severity signal
+    RISK_MODEL_ALERT_SCORE: float = 0.65
+    # "agents": LLM graph for ambiguous cases; "model": rule engine + risk model, no LLM
+    DECISION_MODE: Literal["agents", "model"] = "agents"
+
+    # Default analysis mode ("fast": context, behavioral and policy agents in one LLM call);
+    # overridable per request with `?mode=`
+    ANALYSIS_MODE: Literal["standard", "fast"] = "standard"
+
+    # Latency budget per analysis (deadline propagation); overridable per request with
+    # `?deadline_ms=`. Each LLM stage gets the remaining budget as its timeout; a critical
+    # stage that overruns escalates the case to human review (off by default)
+    DEADLINE_ENABLED: bool = False
+    DEADLINE_DEFAULT_MS: int = 5000
+    DEADLINE_CHANNEL_MS: dict[str, int] = {"web": 5000, "pos": 800, "atm": 800}
+    # Share of the budget kept for the arbiter: the stages before it get the rest
+    DEADLINE_ARBITER_SHARE: float = 0.3
+    # A stage with less time left than this is not started and its fallback is used
+    DEADLINE_MIN_STAGE_MS: int = 50
+
+    # Velocity counters per customer/device/merchant (sliding windows of time buckets)
+    VELOCITY_ENABLED: bool = True
+    VELOCITY_WINDOWS_SECONDS: list[int] = [60, 600, 3600]
+    VELOCITY_SLOTS: int = 12
+    VELOCITY_MAX_KEYS: int = 500_000
+    VELOCITY_SNAPSHOT_PATH: str = ".cache/velocity.json"
+    # Shares the counters between workers through REDIS_URL (no snapshot needed)
+    VELOCITY_REDIS_ENABLED: bool = False
+    # Transactions of the same customer/device that raise an alert, one per window
+    VELOCITY_COUNT_ALERTS: list[int] = [3, 5, 10]
+    # Customer spend in the longest window vs. its usual amount
+    VELOCITY_AMOUNT_ALERT_RATIO: float = 5.0
+
     # Tavily (Web Search)
     TAVILY_API_KEY: str = ""
+    TAVILY_API_BASE_URL: str = ""
+
+    # Threat-intel cache keyed by (merchant_id, country)
+    THREAT_INTEL_CACHE_ENABLED: bool = True
+    THREAT_INTEL_CACHE_TTL_SECONDS: int = 900
+    THREAT_INTEL_CACHE_NEGATIVE_TTL_SECONDS: int = 300
+    THREAT_INTEL_CACHE_REFRESH_AHEAD_SECONDS: int = 120
+    THREAT_INTEL_CACHE_MAX_ENTRIES: int = 10_000
 
     # Redis (optional)
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_ENABLED: bool = False
 
+    # LLM response cache (local LRU + optional Redis tier when REDIS_ENABLED)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 3600
+    LLM_CACHE_MAX_ENTRIES: int = 10_000
+    LLM_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Graph nodes / services that must always hit the LLM (e.g. "threat_intel", "reporting")
+    LLM_CACHE_BYPASS_AGENTS: list[str] = ["threat_intel"]
+
     # LangSmith (optional)
     LANGCHAIN_TRACING_V2: bool = False
     LANGCHAIN_API_KEY: str = ""
@@ -5,14 +5,25 @@ EXTERNAL_THREAT_INTEL_AGENT_NAME = "External Threat Intel Agent"
 EVIDENCE_AGGREGATOR_AGENT_NAME = "Evidence Aggregator Agent"
 DEBATE_AGENT_PRO_FRAUD_NAME = "Debate Agent (Pro-Fraud)"
 DEBATE_AGENT_PRO_CUSTOMER_NAME = "Debate Agent (Pro-Customer)"
+DEBATE_AGENTS_NAME = "Debate Agents"
 DECISION_ARBITER_AGENT_NAME = "Decision Arbiter Agent"
 EXPLAINABILITY_AGENT_NAME = "Explain Agent"
+RULE_ENGINE_AGENT_NAME = "Rule Engine"
+VELOCITY_AGENT_NAME = "Velocity Monitor"
+RISK_MODEL_AGENT_NAME = "Risk Model"
+FAST_ANALYSIS_AGENT_NAME = "Fast Analysis Agent"
+
+# Risk score de los escalamientos sin risk score del árbitro (pre-screening, árbitro
+# fallido), que fija su prioridad en la cola HITL: centro de la banda ESCALATE_TO_HUMAN
+# del árbitro (0.65-0.85)
+DEFAULT_HITL_RISK_SCORE = 0.75
 
 
 MAP_AGENT_MODEL = {
     TRANSACTION_CONTEXT_AGENT_NAME: "gpt-4o-mini",
     BEHAVIORAL_PATTERN_AGENT_NAME: "gpt-4o-mini",
     INTERNAL_POLICY_RAG_AGENT_NAME: "gpt-4.1",
+    FAST_ANALYSIS_AGENT_NAME: "gpt-4.1",
     EXTERNAL_THREAT_INTEL_AGENT_NAME: "gpt-4.1",
     EVIDENCE_AGGREGATOR_AGENT_NAME: "gpt-4o-mini",
     DEBATE_AGENT_PRO_FRAUD_NAME: "gpt-4o-mini",
@@ -0,0 +1,66 @@
+"""
+End-to-end latency budget of an analysis (deadline propagation).
+
+The budget is set per request (`deadline_ms` in the state) or per channel
+(`DEADLINE_CHANNEL_MS`, e.g. 800 ms card-present, 5 s web) and counts from
+`state.start_time`. Every graph node that has a fallback runs with the remaining
+budget as its timeout; stages before the arbiter leave `DEADLINE_ARBITER_SHARE` of the
+budget untouched so the decision itself always gets time. When a stage times out, or
+has less than `DEADLINE_MIN_STAGE_MS` left, `instrument_node` uses its fallback instead.
+
+Only non-critical stages (threat intel, debate, explainability) are approximated. A
+critical stage (`CRITICAL_STAGES`) that overruns is recorded as such and the analysis is
+escalated to human review instead of being decided without it.
+"""
+
+from datetime import UTC, datetime
+
+from app.core.config import settings
+from app.models.schemas import FraudDetectionState
+
+# Etapas que se ejecutan con todo el presupuesto restante (el resto reserva el del árbitro)
+FINAL_STAGES = frozenset({"arbiter", "explainability"})
+# Etapas sin las que no se decide automáticamente: si vencen, el caso se escala
+CRITICAL_STAGES = frozenset(
+    {"context", "behavioral", "rag", "fast_analysis", "aggregator", "arbiter"}
+)
+
+
+def budget_ms(state: FraudDetectionState) -> int | None:
+    if not settings.DEADLINE_ENABLED:
+        return None
+    if state.deadline_ms:
+        return state.deadline_ms
+    channel = state.transaction.channel.lower()
+    return settings.DEADLINE_CHANNEL_MS.get(channel, settings.DEADLINE_DEFAULT_MS)
+
+
+def _elapsed_seconds(state: FraudDetectionState) -> float:
+    start = state.start_time
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=UTC)
+    return (datetime.now(UTC) - start).total_seconds()
+
+
+def remaining_seconds(state: FraudDetectionState) -> float | None:
+    """Seconds left in the budget (negative once exceeded); None without a deadline"""
+    budget = budget_ms(state)
+    if budget is None:
+        return None
+    return budget / 1000 - _elapsed_seconds(state)
+
+
+def stage_timeout(state: FraudDetectionState, node: str) -> float | None:
+    """Timeout in seconds for `node`, keeping the arbiter's share for earlier stages"""
+    budget = budget_ms(state)
+    if budget is None:
+        return None
+    remaining = budget / 1000 - _elapsed_seconds(state)
+    if node in FINAL_STAGES:
+        return remaining
+    return remaining - budget * settings.DEADLINE_ARBITER_SHARE / 1000
+
+
+def critical_overruns(state: FraudDetectionState) -> list[str]:
+    """`node:reason` of the critical stages that did not finish within the budget"""
+    return [s for s in state.degraded_stages if s.split(":", 1)[0] in CRITICAL_STAGES]
@@ -0,0 +1,203 @@
+"""
+Cross-cutting instrumentation of the agent graph.
+
+`instrument_node` wraps every graph node: it attributes LLM calls to the node
+(`agent_scope`), measures its wall time and collects, through a LangChain callback
+attached to every run, the latency and token usage of its LLM calls, output-parser
+failures and HTTP retries of LLM calls. Each node appends an
+`AgentRunMetrics` record to the state (persisted in `audit_trail`) and everything is
+exported as Prometheus series on `GET /metrics`. Nodes registered with a fallback
+also run under the analysis deadline (`app.core.deadline`).
+"""
+
+import asyncio
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from uuid import UUID
+
+import httpx
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.exceptions import OutputParserException
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+
+from app.core import metrics
+from app.core.cache import agent_scope, current_agent
+from app.core.config import settings
+from app.core.deadline import CRITICAL_STAGES, stage_timeout
+from app.models.schemas import AgentRunMetrics, FraudDetectionState
+
+# Registro del nodo en ejecución en el contexto actual
+current_run: ContextVar[AgentRunMetrics | None] = ContextVar("current_run", default=None)
+
+
+def _token_usage(response: LLMResult) -> tuple[int, int]:
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+    for generations in response.generations:
+        for generation in generations:
+            usage_metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage_metadata:
+                return usage_metadata.get("input_tokens", 0), usage_metadata.get("output_tokens", 0)
+    return 0, 0
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """Records LLM latency, token usage and parse failures for every run"""
+
+    run_inline = True
+
+    def __init__(self):
+        self._llm_runs: dict[UUID, tuple[float, str]] = {}
+        self._parser_runs: set[UUID] = set()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        params = kwargs.get("invocation_params") or {}
+        model = (
+            params.get("model")
+            or params.get("model_name")
+            or (metadata or {}).get("ls_model_name")
+            or "unknown"
+        )
+        self._llm_runs[run_id] = (time.perf_counter(), model)
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs):
+        started = self._llm_runs.pop(run_id, None)
+        if started is None:
+            return
+        t0, model = started
+        elapsed = time.perf_counter() - t0
+        prompt_tokens, completion_tokens = _token_usage(response)
+        agent = current_agent.get()
+
+        metrics.LLM_DURATION.observe(elapsed, agent=agent, model=model)
+        metrics.LLM_TOKENS.inc(prompt_tokens, agent=agent, model=model, kind="prompt")
+        metrics.LLM_TOKENS.inc(completion_tokens, agent=agent, model=model, kind="completion")
+
+        run = current_run.get()
+        if run is not None:
+            run.llm_calls += 1
+            run.llm_ms += int(elapsed * 1000)
+            run.prompt_tokens += prompt_tokens
+            run.completion_tokens += completion_tokens
+            if model not in run.models:
+                run.models.append(model)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        started = self._llm_runs.pop(run_id, None)
+        model = started[1] if started else "unknown"
+        metrics.LLM_ERRORS.inc(agent=current_agent.get(), model=model)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, run_type=None, **kwargs):
+        if run_type == "parser":
+            self._parser_runs.add(run_id)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._parser_runs.discard(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        # Solo el run del parser: la cadena que lo contiene propaga el mismo error
+        if run_id not in self._parser_runs:
+            return
+        self._parser_runs.discard(run_id)
+        if not isinstance(error, OutputParserException):
+            return
+        metrics.PARSE_FAILURES.inc(agent=current_agent.get())
+        run = current_run.get()
+        if run is not None:
+            run.parse_failures += 1
+
+
+llm_metrics_handler = LLMMetricsHandler()
+
+# Se adjunta a todas las ejecuciones de LangChain (LLMs, parsers, cadenas), sin tocar
+# los agentes. El valor por defecto de la variable es el propio handler.
+_handler_var: ContextVar[LLMMetricsHandler | None] = ContextVar(
+    "llm_metrics_handler", default=llm_metrics_handler
+)
+register_configure_hook(_handler_var, inheritable=True)
+
+
+def record_llm_retry() -> None:
+    """Attribute an HTTP retry of an LLM call to the running agent"""
+    metrics.LLM_RETRIES.inc(agent=current_agent.get())
+    run = current_run.get()
+    if run is not None:
+        run.retries += 1
+
+
+async def count_llm_retry(request: httpx.Request) -> None:
+    """httpx request hook: the OpenAI SDK numbers its retries in a header"""
+    if int(request.headers.get("x-stainless-retry-count", "0") or 0) > 0:
+        record_llm_retry()
+
+
+async def _run_within_deadline(
+    name: str, node, fallback: Callable[[FraudDetectionState], dict], state, record
+) -> dict:
+    """Run `node` with the remaining budget as timeout; its fallback once that runs out"""
+    timeout = stage_timeout(state, name)
+    if timeout is not None and timeout * 1000 < settings.DEADLINE_MIN_STAGE_MS:
+        record.degraded = "budget_exhausted"
+    else:
+        try:
+            return await asyncio.wait_for(node(state), timeout) or {}
+        except TimeoutError:
+            record.degraded = "timeout"
+
+    action = "se escala a revisión humana" if name in CRITICAL_STAGES else "se usa el fallback"
+    print(f"⏳ [Deadline] {name}: {record.degraded}, {action}")
+    metrics.DEGRADED_STAGES.inc(agent=name, reason=record.degraded)
+    update = fallback(state)
+    return {**update, "degraded_stages": [f"{name}:{record.degraded}"]}
+
+
+def instrument_node(name: str, node, fallback: Callable[[FraudDetectionState], dict] | None = None):
+    """
+    Wrap a graph node with agent attribution, timing and per-run LLM metrics.
+    With a `fallback`, the node is also bounded by the analysis deadline.
+    """
+
+    async def run(state: FraudDetectionState) -> dict:
+        record = AgentRunMetrics(node=name)
+        token = current_run.set(record)
+        start = time.perf_counter()
+        try:
+            with agent_scope(name):
+                if fallback is None:
+                    update = await node(state) or {}
+                else:
+                    update = await _run_within_deadline(name, node, fallback, state, record)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_run.reset(token)
+            record.wall_ms = int(elapsed * 1000)
+            metrics.NODE_DURATION.observe(elapsed, agent=name)
+
+        evidences = [e.model_copy(update={"node": name}) for e in update.get("evidences", [])]
+        if evidences:
+            update = {**update, "evidences": evidences}
+        return {**update, "agent_metrics": [record]}
+
+    return run
+
+
+def record_analysis(state: FraudDetectionState) -> None:
+    """Per-decision latency and cost of a finished analysis"""
+    decision = state.decision or "NONE"
+    route = next((r for r in ("rule_engine", "risk_model") if r in state.agent_route), "agents")
+    if route == "agents" and any(m.node == "fast_analysis" for m in state.agent_metrics):
+        route = "fast_analysis"
+    elapsed = (datetime.now(UTC) - state.start_time).total_seconds()
+    metrics.ANALYSIS_DURATION.observe(elapsed, decision=decision, route=route)
+    metrics.DECISION_TOKENS.inc(
+        sum(m.prompt_tokens for m in state.agent_metrics), decision=decision, kind="prompt"
+    )
+    metrics.DECISION_TOKENS.inc(
+        sum(m.completion_tokens for m in state.agent_metrics), decision=decision, kind="completion"
+    )
+    metrics.DECISION_LLM_CALLS.inc(sum(m.llm_calls for m in state.agent_metrics), decision=decision)
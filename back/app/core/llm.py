@@ -1,25 +1,117 @@
-from langchain_openai import AzureChatOpenAI, ChatOpenAI
+import httpx
+from langchain_core.language_models.chat_models import BaseChatModel
 
 from app.core.config import settings
+from app.core.instrumentation import count_llm_retry, record_llm_retry
+from app.core.resilience import ResilientTransport
 
+# Reintentos propios del SDK de OpenAI cuando la capa de resiliencia está desactivada
+SDK_MAX_RETRIES = 2
 
-def get_llm(
-    model: str = "gpt-4o-mini",
-):
+
+class LLMRegistry:
     """
-    Retorna la instancia del LLM configurado (OpenAI o Azure).
+    Registro de clientes LLM de larga vida, uno por (proveedor, modelo/deployment).
+
+    Todos comparten un único `httpx.AsyncClient` con pool de conexiones configurable,
+    de modo que las llamadas reutilizan conexiones keep-alive y sesiones TLS en lugar
+    de abrir un cliente HTTP nuevo por invocación de agente. Con `RESILIENCE_ENABLED`
+    su transporte aplica circuit breaker, reintentos y hedging por endpoint
+    (`app.core.resilience`) y el SDK no reintenta por su cuenta.
     """
 
-    model = model or settings.OPENAI_MODEL
-    if settings.use_azure_openai:
-        return AzureChatOpenAI(
-            azure_deployment=settings.AZURE_OPENAI_DEPLOYMENT,
-            api_version=settings.AZURE_OPENAI_API_VERSION,
-            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
-            api_key=settings.AZURE_OPENAI_API_KEY,
+    def __init__(self):
+        self._clients: dict[tuple[str, str], BaseChatModel] = {}
+        self._http_client: httpx.AsyncClient | None = None
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+                )
+            )
+            if settings.RESILIENCE_ENABLED:
+                transport = ResilientTransport(transport, on_retry=record_llm_retry)
+            self._http_client = httpx.AsyncClient(
+                transport=transport,
+                timeout=httpx.Timeout(settings.LLM_HTTP_TIMEOUT),
+                event_hooks={"request": [count_llm_retry]},
+            )
+        return self._http_client
+
+    @property
+    def sdk_max_retries(self) -> int:
+        return 0 if settings.RESILIENCE_ENABLED else SDK_MAX_RETRIES
+
+    @staticmethod
+    def azure_deployment(model: str) -> str:
+        """
+        Deployment de Azure para `model`: mapeo explícito en `AZURE_OPENAI_DEPLOYMENTS`,
+        luego el deployment por defecto y, si no hay ninguno, el propio nombre del modelo.
+        """
+        return (
+            settings.AZURE_OPENAI_DEPLOYMENTS.get(model)
+            or settings.AZURE_OPENAI_DEPLOYMENT
+            or model
         )
-    else:
+
+    def get(self, model: str) -> BaseChatModel:
+        key = ("azure" if settings.use_azure_openai else "openai", model)
+
+        client = self._clients.get(key)
+        if client is None:
+            client = self._create(key[0], model)
+            self._clients[key] = client
+        return client
+
+    def _create(self, provider: str, model: str) -> BaseChatModel:
+        # Import diferido: langchain-openai y el SDK cargan en la fase de calentamiento,
+        # no al importar la app
+        from langchain_openai import AzureChatOpenAI, ChatOpenAI
+
+        if provider == "azure":
+            return AzureChatOpenAI(
+                azure_deployment=self.azure_deployment(model),
+                model=model,
+                api_version=settings.AZURE_OPENAI_API_VERSION,
+                azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+                api_key=settings.AZURE_OPENAI_API_KEY,
+                max_retries=self.sdk_max_retries,
+                http_async_client=self.http_client,
+            )
         return ChatOpenAI(
             model=model,
             api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None,
+            max_retries=self.sdk_max_retries,
+            http_async_client=self.http_client,
         )
+
+    def start(self) -> None:
+        """Crea el pool HTTP compartido (llamado desde el `lifespan` de FastAPI)"""
+        _ = self.http_client
+
+    async def aclose(self) -> None:
+        """Cierra el pool HTTP y descarta los clientes registrados"""
+        self._clients.clear()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+
+llm_registry = LLMRegistry()
+
+
+def get_llm(
+    model: str | None = None,
+):
+    """
+    Retorna la instancia compartida del LLM configurado (OpenAI o Azure) para `model`.
+    """
+
+    model = model or settings.OPENAI_MODEL
+    return llm_registry.get(model)
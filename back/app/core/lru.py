@@ -0,0 +1,209 @@
+"""
+Bounded in-process caches
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    LRU cache with per-entry TTL and optional byte budget.
+
+    Entries are evicted when they expire, when `max_entries` is exceeded or when the
+    sum of the sizes declared on `set` exceeds `max_bytes`. Not thread-safe: meant to be
+    used from the event loop.
+    """
+
+    def __init__(self, max_entries: int, ttl: float | None = None, max_bytes: int | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._data: OrderedDict[Hashable, tuple[float, int, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        expires_at, _, value = entry
+        if expires_at and expires_at < time.monotonic():
+            self.pop(key)
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None, size: int = 0) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else 0.0
+
+        self.pop(key)
+        self._data[key] = (expires_at, size, value)
+        self.bytes += size
+
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self.bytes > self.max_bytes and len(self._data) > 1
+        ):
+            _, (_, evicted_size, _) = self._data.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+        self.bytes -= entry[1]
+        return entry[2]
+
+    def ttl_left(self, key: Hashable) -> float | None:
+        """Seconds left before `key` expires (None if absent or without TTL)"""
+        entry = self._data.get(key)
+        if entry is None or not entry[0]:
+            return None
+        return entry[0] - time.monotonic()
+
+    def items(self) -> list[tuple[Hashable, Any]]:
+        """Live (key, value) pairs, least recently used first, without touching the order"""
+        now = time.monotonic()
+        return [
+            (key, value)
+            for key, (expires_at, _, value) in self._data.items()
+            if not expires_at or expires_at >= now
+        ]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.bytes = 0
+
+
+class AsyncLoadingCache:
+    """
+    `LRUCache` that fills misses through an async `loader`.
+
+    Concurrent misses for the same key share a single in-flight load (single-flight),
+    and "negative" values (by default `None`) can use their own, shorter TTL. With
+    `refresh_ahead`, a hit on an entry that expires within that many seconds returns the
+    cached value and reloads it in the background, so hot keys never block on the loader.
+    Loads run in their own task: a caller cancelled mid-load (e.g. by its deadline) does
+    not cancel the load, which still fills the cache for the next callers.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[Any], Awaitable[Any]],
+        max_entries: int,
+        ttl: float | None = None,
+        negative_ttl: float | None = None,
+        is_negative: Callable[[Any], bool] = lambda value: value is None,
+        refresh_ahead: float | None = None,
+    ):
+        self.loader = loader
+        self.cache = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.negative_ttl = negative_ttl
+        self.is_negative = is_negative
+        self.refresh_ahead = refresh_ahead
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0, "refreshes": 0}
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def get(self, key: Hashable) -> Any:
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            self.stats["hits"] += 1
+            self._maybe_refresh(key)
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        self.stats["misses"] += 1
+        return await asyncio.shield(self._spawn_load(key))
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Cached value without loading it or counting a hit"""
+        return self.cache.get(key, default)
+
+    def _spawn_load(self, key: Hashable) -> asyncio.Task:
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        task = asyncio.create_task(self._load(key, future))
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    async def _load(self, key: Hashable, future: asyncio.Future) -> Any:
+        try:
+            value = await self.loader(key)
+        except Exception as e:
+            self.stats["errors"] += 1
+            future.set_exception(e)
+            future.exception()  # evita el warning si nadie más esperaba esta carga
+            raise
+        else:
+            # Si la clave se invalidó durante la carga, el valor puede estar obsoleto
+            if self._inflight.get(key) is future:
+                self.put(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            if not future.done():  # carga cancelada por `aclose`
+                future.cancel()
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _maybe_refresh(self, key: Hashable) -> None:
+        if not self.refresh_ahead or key in self._inflight:
+            return
+        left = self.cache.ttl_left(key)
+        if left is None or left > self.refresh_ahead:
+            return
+
+        self.stats["refreshes"] += 1
+        self._spawn_load(key)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled():
+            # Refrescos fallidos o cargas sin nadie esperando: el error ya se contó
+            task.exception()
+
+    def put(self, key: Hashable, value: Any) -> None:
+        # Un valor escrito durante una carga es más reciente que el que esta leyó: la
+        # carga en curso ya no debe sobrescribirlo (igual que tras `invalidate`)
+        self._inflight.pop(key, None)
+        ttl = self.negative_ttl if self.is_negative(value) else None
+        self.cache.set(key, value, ttl=ttl)
+
+    def invalidate(self, key: Hashable) -> None:
+        self.cache.pop(key)
+        self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self.cache.clear()
+        self._inflight.clear()
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "entries": len(self.cache), "inflight": len(self._inflight)}
+
+    async def aclose(self) -> None:
+        """Cancel pending loads and background refreshes"""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
@@ -0,0 +1,226 @@
+"""
+Minimal Prometheus metrics (text exposition format 0.0.4) for `GET /metrics`.
+
+Only counters, gauges and histograms with labels are needed, so they are implemented
+here instead of pulling in an extra client library.
+"""
+
+import threading
+from collections import defaultdict
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+class Metric:
+    type: str = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple[str, ...], float] = defaultdict(float)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] += amount
+
+    def values(self) -> dict[tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+        # Por serie: conteos por bucket (no acumulados), suma y total
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total, count) in self._series.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts, strict=True):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labels, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labels, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+REGISTRY: list[Metric] = []
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# --- Métricas del pipeline de agentes ---
+
+NODE_DURATION = Histogram(
+    "fraud_agent_duration_seconds", "Wall time of each graph node", ("agent",)
+)
+LLM_DURATION = Histogram(
+    "fraud_llm_request_duration_seconds", "Latency of LLM calls", ("agent", "model")
+)
+LLM_TOKENS = Counter("fraud_llm_tokens_total", "LLM tokens consumed", ("agent", "model", "kind"))
+LLM_ERRORS = Counter("fraud_llm_errors_total", "Failed LLM calls", ("agent", "model"))
+LLM_RETRIES = Counter("fraud_llm_retries_total", "HTTP retries of LLM calls", ("agent",))
+PARSE_FAILURES = Counter(
+    "fraud_output_parse_failures_total", "LLM outputs that failed to parse", ("agent",)
+)
+ANALYSIS_DURATION = Histogram(
+    "fraud_analysis_duration_seconds", "End-to-end analysis time", ("decision", "route")
+)
+DECISION_TOKENS = Counter(
+    "fraud_decision_tokens_total", "LLM tokens spent per final decision", ("decision", "kind")
+)
+CASCADE_CALLS = Counter(
+    "fraud_model_cascade_calls_total",
+    "Cascaded agent calls by outcome (accepted on the small model or escalation reason)",
+    ("agent", "outcome"),
+)
+CONTEXT_TOKENS = Counter(
+    "fraud_context_tokens_total",
+    "Evidence context tokens per stage, before (raw) and after compaction",
+    ("stage", "kind"),
+)
+DECISION_LLM_CALLS = Counter(
+    "fraud_decision_llm_calls_total", "LLM calls made per final decision", ("decision",)
+)
+DEGRADED_STAGES = Counter(
+    "fraud_degraded_stages_total",
+    "Graph stages replaced by their fallback because the latency budget ran out",
+    ("agent", "reason"),
+)
+
+# --- Resiliencia de los proveedores (OpenAI/Azure/Tavily) ---
+
+CIRCUIT_STATE = Gauge(
+    "fraud_circuit_state",
+    "Circuit breaker state per upstream endpoint (0 closed, 1 half-open, 2 open)",
+    ("endpoint",),
+)
+CIRCUIT_REJECTED = Counter(
+    "fraud_circuit_rejected_total", "Calls failed fast by an open circuit", ("endpoint",)
+)
+UPSTREAM_RETRIES = Counter(
+    "fraud_upstream_retries_total",
+    "Retried upstream calls by failure reason",
+    ("endpoint", "reason"),
+)
+HEDGED_REQUESTS = Counter(
+    "fraud_hedged_requests_total",
+    "Hedged upstream calls by the copy that answered first (primary, hedge or none)",
+    ("endpoint", "winner"),
+)
+
+# --- Arranque ---
+
+WARMUP_SECONDS = Gauge(
+    "fraud_warmup_seconds",
+    "Duration of each startup warm-up stage (stage=total: until the app was ready)",
+    ("stage",),
+)
+WARMUP_FAILURES = Counter(
+    "fraud_warmup_failures_total",
+    "Failed attempts of a startup warm-up stage (critical stages are retried)",
+    ("stage",),
+)
+
+# --- Cola de análisis asíncronos (POST /analyze?async=true) ---
+
+JOB_WORKERS = Gauge("fraud_job_workers", "Async analysis workers running")
+JOB_BUSY_WORKERS = Gauge("fraud_job_busy_workers", "Async analysis workers running an analysis")
+JOB_QUEUE_DEPTH = Gauge(
+    "fraud_job_queue_depth", "Async analysis jobs waiting for a worker (incl. reserved slots)"
+)
+JOB_WAIT = Histogram(
+    "fraud_job_wait_seconds", "Time async analysis jobs spent queued before a worker took them"
+)
+JOB_BUSY_SECONDS = Counter(
+    "fraud_job_busy_seconds_total",
+    "Worker time spent on async analyses (utilization: rate / fraud_job_workers)",
+)
+JOBS = Counter(
+    "fraud_jobs_total",
+    "Async analysis jobs by outcome (enqueued, rejected, recovered, skipped, completed, failed)",
+    ("outcome",),
+)
@@ -0,0 +1,356 @@
+"""
+Resilience layer for the upstream providers (OpenAI / Azure OpenAI and Tavily).
+
+Every endpoint (host + path, e.g. the chat completions URL of one Azure deployment) gets
+a `ResilientEndpoint` with:
+
+- a circuit breaker: after `RESILIENCE_BREAKER_FAILURES` consecutive failures the
+  circuit opens and calls fail at once with `CircuitOpenError`; after
+  `RESILIENCE_BREAKER_RESET_SECONDS` one probe call goes through (half-open) and its
+  outcome closes or re-opens the circuit;
+- retries with exponential backoff and full jitter that honour `Retry-After`, and stop
+  as soon as the circuit opens;
+- optional hedging of idempotent calls: a call still running after the endpoint's
+  `RESILIENCE_HEDGE_PERCENTILE` latency is sent a second time and the first good
+  answer wins.
+
+LLM and embedding requests go through `ResilientTransport`, the transport of the shared
+httpx client of `LLMRegistry`; Tavily searches are wrapped with `ResilientEndpoint.call`.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import httpx
+
+from app.core import metrics
+from app.core.config import settings
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Paths whose POST has no side effects, so repeating or hedging them is safe
+IDEMPOTENT_PATHS = ("/chat/completions", "/embeddings", "/search")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit is open"""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"Circuit open for {endpoint}, next probe in {retry_in:.1f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open (one probe) -> closed/open"""
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.stats = {"opened": 0, "rejected": 0}
+        self._opened_at = 0.0
+        self._probing = False
+        metrics.CIRCUIT_STATE.set(STATE_VALUES[CLOSED], endpoint=name)
+
+    def acquire(self) -> None:
+        """Let a call through or raise `CircuitOpenError`"""
+        if self.state == OPEN:
+            retry_in = self._opened_at + self.reset_timeout - time.monotonic()
+            if retry_in > 0:
+                self._reject(retry_in)
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probing:
+                self._reject(0.0)
+            self._probing = True
+
+    def release(self) -> None:
+        """A call ended without a verdict on the endpoint (cancelled, client error)"""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probing = False
+        if self.state != CLOSED:
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        # Las llamadas que ya estaban en curso al abrirse no alargan el periodo abierto
+        if self.state != OPEN and (
+            self.state == HALF_OPEN or self.failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self.stats["opened"] += 1
+            self._transition(OPEN)
+
+    def _reject(self, retry_in: float):
+        self.stats["rejected"] += 1
+        metrics.CIRCUIT_REJECTED.inc(endpoint=self.name)
+        raise CircuitOpenError(self.name, retry_in)
+
+    def _transition(self, state: str) -> None:
+        print(f"🔌 [Circuit Breaker] {self.name}: {self.state} -> {state}")
+        self.state = state
+        metrics.CIRCUIT_STATE.set(STATE_VALUES[state], endpoint=self.name)
+
+
+def backoff_delay(attempt: int, retry_after: float | None = None) -> float:
+    """Full-jitter exponential backoff; `Retry-After` is a floor, not a replacement"""
+    cap = min(
+        settings.RESILIENCE_BACKOFF_MAX_SECONDS,
+        settings.RESILIENCE_BACKOFF_BASE_SECONDS * 2**attempt,
+    )
+    delay = random.uniform(0, cap)
+    return (
+        max(delay, retry_after + random.uniform(0, settings.RESILIENCE_BACKOFF_BASE_SECONDS))
+        if retry_after
+        else delay
+    )
+
+
+def _no_failure(result: Any) -> str | None:
+    return None
+
+
+class ResilientEndpoint:
+    """Circuit breaker, retries and hedging for the calls to one upstream endpoint"""
+
+    def __init__(
+        self,
+        name: str,
+        idempotent: bool = False,
+        on_retry: Callable[[], None] | None = None,
+    ):
+        self.name = name
+        self.idempotent = idempotent
+        self.on_retry = on_retry
+        self.breaker = CircuitBreaker(
+            name, settings.RESILIENCE_BREAKER_FAILURES, settings.RESILIENCE_BREAKER_RESET_SECONDS
+        )
+        self.stats = {"calls": 0, "failures": 0, "retries": 0, "hedged": 0, "hedge_wins": 0}
+        self._latencies: deque[float] = deque(maxlen=settings.RESILIENCE_HEDGE_WINDOW)
+
+    async def call(
+        self,
+        send: Callable[[], Awaitable[Any]],
+        failure: Callable[[Any], str | None] = _no_failure,
+        retry_after: Callable[[Any], float | None] = lambda result: None,
+        discard: Callable[[Any], Awaitable[None]] | None = None,
+        retry_on: tuple[type[BaseException], ...] = (OSError, TimeoutError),
+    ) -> Any:
+        """
+        Call `send()` under the breaker, retrying failures. `failure(result)` names what
+        is wrong with a returned result (e.g. "status_503") or returns None; exceptions in
+        `retry_on` are failures too, any other exception propagates without a verdict.
+        The last failed result is returned as is (after retries, or when the wait asked
+        by `retry_after` is too long); discarded results are released with `discard`.
+        """
+        error: BaseException | None
+        for attempt in range(settings.RESILIENCE_MAX_ATTEMPTS):
+            self.breaker.acquire()
+            self.stats["calls"] += 1
+            start = time.perf_counter()
+            try:
+                result = await self._send(send, failure, discard)
+            except retry_on as e:
+                reason, wait, error = type(e).__name__, None, e
+            except BaseException:
+                self.breaker.release()
+                raise
+            else:
+                verdict = failure(result)
+                if verdict is None:
+                    self.breaker.record_success()
+                    self._latencies.append(time.perf_counter() - start)
+                    return result
+                reason, wait, error = verdict, retry_after(result), None
+
+            self.stats["failures"] += 1
+            self.breaker.record_failure()
+            give_up = (
+                attempt == settings.RESILIENCE_MAX_ATTEMPTS - 1
+                or self.breaker.state == OPEN
+                or (wait is not None and wait > settings.RESILIENCE_MAX_RETRY_AFTER_SECONDS)
+            )
+            if give_up:
+                if error is not None:
+                    raise error
+                return result
+            if error is None and discard is not None:
+                await discard(result)
+
+            self.stats["retries"] += 1
+            metrics.UPSTREAM_RETRIES.inc(endpoint=self.name, reason=reason)
+            if self.on_retry is not None:
+                self.on_retry()
+            await asyncio.sleep(backoff_delay(attempt, wait))
+
+    def hedge_delay(self) -> float | None:
+        """Latency percentile after which an idempotent call is hedged; None: no hedging"""
+        if (
+            not settings.RESILIENCE_HEDGE_ENABLED
+            or not self.idempotent
+            or self.breaker.state != CLOSED
+            or len(self._latencies) < settings.RESILIENCE_HEDGE_MIN_SAMPLES
+        ):
+            return None
+        ordered = sorted(self._latencies)
+        rank = int(len(ordered) * settings.RESILIENCE_HEDGE_PERCENTILE / 100)
+        return ordered[min(rank, len(ordered) - 1)]
+
+    async def _send(
+        self,
+        send: Callable[[], Awaitable[Any]],
+        failure: Callable[[Any], str | None],
+        discard: Callable[[Any], Awaitable[None]] | None,
+    ) -> Any:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await send()
+
+        primary = asyncio.ensure_future(send())
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            hedge = asyncio.ensure_future(send())
+            pending.add(hedge)
+            self.stats["hedged"] += 1
+            failed: list[asyncio.Future] = []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                good = [t for t in done if t.exception() is None and failure(t.result()) is None]
+                failed.extend(t for t in done if t not in good)
+                if good:
+                    task = good[0]
+                    winner = "hedge" if task is hedge else "primary"
+                    self.stats["hedge_wins"] += winner == "hedge"
+                    metrics.HEDGED_REQUESTS.inc(endpoint=self.name, winner=winner)
+                    await self._discard([*failed, *good[1:]], discard)
+                    return task.result()
+
+            # Fallaron las dos: se devuelve el resultado (o error) de la última
+            metrics.HEDGED_REQUESTS.inc(endpoint=self.name, winner="none")
+            await self._discard(failed[:-1], discard)
+            return failed[-1].result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    async def _discard(
+        tasks: list[asyncio.Future], discard: Callable[[Any], Awaitable[None]] | None
+    ) -> None:
+        if discard is None:
+            return
+        for task in tasks:
+            if task.exception() is None:
+                await discard(task.result())
+
+    def snapshot(self) -> dict:
+        hedge_delay = self.hedge_delay()
+        return {
+            **self.stats,
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            **self.breaker.stats,
+            "hedge_win_rate": (
+                round(self.stats["hedge_wins"] / self.stats["hedged"], 3)
+                if self.stats["hedged"]
+                else 0.0
+            ),
+            "hedge_after_ms": round(hedge_delay * 1000, 1) if hedge_delay is not None else None,
+        }
+
+
+class EndpointRegistry:
+    """One `ResilientEndpoint` per upstream endpoint, shared by every client"""
+
+    def __init__(self):
+        self._endpoints: dict[str, ResilientEndpoint] = {}
+
+    def get(self, name: str, **kwargs) -> ResilientEndpoint:
+        endpoint = self._endpoints.get(name)
+        if endpoint is None:
+            endpoint = self._endpoints[name] = ResilientEndpoint(name, **kwargs)
+        return endpoint
+
+    def snapshot(self) -> dict:
+        return {name: endpoint.snapshot() for name, endpoint in self._endpoints.items()}
+
+    def clear(self) -> None:
+        self._endpoints.clear()
+
+
+endpoints = EndpointRegistry()
+
+
+def is_retryable_status(status: int) -> bool:
+    """Same statuses the OpenAI SDK retries: timeouts, conflicts, rate limits and 5xx"""
+    return status in (408, 409, 429) or status >= 500
+
+
+def parse_retry_after(headers: httpx.Headers) -> float | None:
+    """Seconds asked by `retry-after-ms` (OpenAI) or `Retry-After` (seconds or HTTP date)"""
+    if value := headers.get("retry-after-ms"):
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """httpx transport that sends every request through the endpoint of its URL"""
+
+    def __init__(
+        self, transport: httpx.AsyncBaseTransport, on_retry: Callable[[], None] | None = None
+    ):
+        self._transport = transport
+        self.on_retry = on_retry
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        endpoint = endpoints.get(
+            f"{request.url.host}{path}",
+            idempotent=request.method in ("GET", "HEAD") or path.endswith(IDEMPOTENT_PATHS),
+            on_retry=self.on_retry,
+        )
+        # El cuerpo se lee una vez para poder reenviarlo en reintentos y hedging
+        await request.aread()
+        response: httpx.Response = await endpoint.call(
+            lambda: self._transport.handle_async_request(request),
+            failure=lambda r: (
+                f"status_{r.status_code}" if is_retryable_status(r.status_code) else None
+            ),
+            retry_after=lambda r: parse_retry_after(r.headers),
+            discard=lambda r: r.aclose(),
+            retry_on=(httpx.TransportError,),
+        )
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,58 @@
+"""
+Token counting and truncation with the tokenizer of the deployed models.
+
+Uses `tiktoken` (`TOKENIZER_ENCODING`, `o200k_base` for the gpt-4o / gpt-4.1 family).
+Loading the encoding may download its file (unless it is in `TIKTOKEN_CACHE_DIR`), so
+it is never loaded from a request: the startup warm-up runs `load_encoding` in a
+thread. Until then, or if it cannot be loaded, counts fall back to an approximation of
+~4 characters per token so that budgets still apply.
+"""
+
+import tiktoken
+
+from app.core.config import settings
+
+CHARS_PER_TOKEN = 4
+ELLIPSIS = "…"
+
+_encoding: tiktoken.Encoding | None = None
+
+
+def load_encoding() -> tiktoken.Encoding:
+    """Load `TOKENIZER_ENCODING` (blocking; raises if it cannot be loaded)"""
+    global _encoding
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding(settings.TOKENIZER_ENCODING)
+    return _encoding
+
+
+def get_encoding() -> tiktoken.Encoding | None:
+    """The loaded encoding, or None before `load_encoding` succeeds; never blocks"""
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, budget: int) -> str:
+    """Cut `text` to at most `budget` tokens, preferably at the end of a sentence"""
+    encoding = get_encoding()
+    if encoding is None:
+        if len(text) <= budget * CHARS_PER_TOKEN:
+            return text
+        cut = text[: budget * CHARS_PER_TOKEN]
+    else:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= budget:
+            return text
+        cut = encoding.decode(tokens[:budget])
+
+    # Se conserva la última frase completa si no se pierde más de un tercio del presupuesto
+    end = max(cut.rfind(". "), cut.rfind(".\n"))
+    if end >= len(cut) * 2 // 3:
+        return cut[: end + 1]
+    return cut.rstrip() + ELLIPSIS
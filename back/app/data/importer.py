@@ -0,0 +1,254 @@
+"""
+Streaming bulk import of customer profiles (`customer_behavior`).
+
+Reads CSV, NDJSON or Parquet in fixed-size chunks (constant memory), validates each
+chunk column-wise with NumPy and writes it with one dialect-aware bulk upsert
+(`INSERT ... ON CONFLICT DO UPDATE` on Postgres and SQLite) and one commit per chunk.
+Rejected rows are counted and reported, never inserted; rows superseded by a later
+valid row for the same customer in the chunk are reported as deduplicated.
+
+    uv run python -m app.data.importer profiles.csv
+    uv run python -m app.data.importer profiles.parquet --chunk-size 20000
+    uv run python -m app.data.importer profiles.ndjson --insert-only
+
+Parquet needs `pyarrow` (`uv pip install pyarrow`).
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import String
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import CustomerBehaviorDB
+from app.db.session import AsyncSessionLocal, init_db
+from app.db.upsert import upsert_statement
+
+COLUMNS = ("customer_id", "usual_amount_avg", "usual_hours", "usual_countries", "usual_devices")
+UPDATABLE = COLUMNS[1:]
+
+Chunk = dict[str, list]
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    written: int = 0
+    rejected: int = 0
+    deduplicated: int = 0
+    chunks: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+
+# --- Lectura por chunks (columnas como listas) ---
+
+
+def _rows_to_chunk(rows: list[dict]) -> Chunk:
+    return {column: [row.get(column) for row in rows] for column in COLUMNS}
+
+
+def iter_csv_chunks(path: Path, chunk_size: int) -> Iterator[Chunk]:
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        while rows := list(islice(reader, chunk_size)):
+            yield _rows_to_chunk(rows)
+
+
+def iter_ndjson_chunks(path: Path, chunk_size: int) -> Iterator[Chunk]:
+    with open(path, encoding="utf-8") as f:
+        lines = (line for line in f if line.strip())
+        while batch := list(islice(lines, chunk_size)):
+            yield _rows_to_chunk([json.loads(line) for line in batch])
+
+
+def iter_parquet_chunks(path: Path, chunk_size: int) -> Iterator[Chunk]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet import requires pyarrow: uv pip install pyarrow") from e
+
+    parquet = pq.ParquetFile(path)
+    for batch in parquet.iter_batches(batch_size=chunk_size, columns=list(COLUMNS)):
+        yield batch.to_pydict()
+
+
+READERS = {
+    ".csv": iter_csv_chunks,
+    ".ndjson": iter_ndjson_chunks,
+    ".jsonl": iter_ndjson_chunks,
+    ".parquet": iter_parquet_chunks,
+}
+
+
+def iter_chunks(path: Path, chunk_size: int) -> Iterator[Chunk]:
+    reader = READERS.get(path.suffix.lower())
+    if reader is None:
+        raise ValueError(f"Unsupported format {path.suffix!r} (expected {', '.join(READERS)})")
+    return reader(path, chunk_size)
+
+
+# --- Validación vectorizada ---
+
+
+def _max_length(column: str) -> int | None:
+    column_type = CustomerBehaviorDB.__table__.c[column].type
+    return column_type.length if isinstance(column_type, String) else None
+
+
+def _text_column(values: list, max_length: int | None) -> tuple[np.ndarray, np.ndarray]:
+    text = np.char.strip(np.array(["" if v is None else str(v) for v in values], dtype=str))
+    lengths = np.char.str_len(text)
+    valid = lengths > 0
+    if max_length:
+        valid &= lengths <= max_length
+    return text, valid
+
+
+def _float_column(values: list) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Algún valor no numérico: conversión fila a fila sólo para este chunk
+        parsed = np.full(len(values), np.nan)
+        for i, value in enumerate(values):
+            try:
+                parsed[i] = float(value)
+            except (TypeError, ValueError):
+                pass
+        return parsed
+
+
+def _valid_hours(hours: np.ndarray) -> np.ndarray:
+    """`HH-HH` with both hours in 0-24"""
+    parts = np.char.partition(hours, "-")
+    start, sep, end = parts[:, 0], parts[:, 1], parts[:, 2]
+    valid: np.ndarray = (sep == "-") & np.char.isdigit(start) & np.char.isdigit(end)
+    valid &= (np.char.str_len(start) <= 2) & (np.char.str_len(end) <= 2)
+    start_h = np.where(valid, start, "0").astype(np.int64)
+    end_h = np.where(valid, end, "0").astype(np.int64)
+    return valid & (start_h <= 24) & (end_h <= 24)
+
+
+def validate_chunk(chunk: Chunk) -> tuple[list[dict], int, int]:
+    """
+    Rows of the chunk that pass validation (as dicts ready to insert), the count of
+    rows rejected by validation and the count of valid duplicates superseded in the chunk
+    """
+    size = len(chunk["customer_id"])
+    if size == 0:
+        return [], 0, 0
+
+    customer_id, valid = _text_column(chunk["customer_id"], _max_length("customer_id"))
+    hours, valid_hours_len = _text_column(chunk["usual_hours"], _max_length("usual_hours"))
+    countries, valid_countries = _text_column(
+        chunk["usual_countries"], _max_length("usual_countries")
+    )
+    devices, valid_devices = _text_column(chunk["usual_devices"], _max_length("usual_devices"))
+    amount = _float_column(chunk["usual_amount_avg"])
+
+    valid &= valid_hours_len & valid_countries & valid_devices
+    valid &= np.isfinite(amount) & (amount >= 0)
+    valid &= _valid_hours(hours)
+
+    # Un mismo cliente repetido en el chunk: ON CONFLICT no admite tocar dos veces la misma
+    # fila en una sentencia, así que se conserva su última aparición válida (una fila
+    # posterior inválida no descarta la anterior correcta)
+    candidates = np.flatnonzero(valid)
+    _, last = np.unique(customer_id[candidates][::-1], return_index=True)
+    valid = np.zeros(size, dtype=bool)
+    valid[candidates[len(candidates) - 1 - last]] = True
+
+    now = datetime.now(UTC).replace(tzinfo=None)
+    columns = zip(
+        *(c[valid].tolist() for c in (customer_id, amount, hours, countries, devices)),
+        strict=True,
+    )
+    rows = [{**dict(zip(COLUMNS, values, strict=True)), "updated_at": now} for values in columns]
+    return rows, size - len(candidates), len(candidates) - len(rows)
+
+
+# --- Escritura por chunk ---
+
+
+async def write_chunk(session: AsyncSession, rows: list[dict], update: bool = True) -> None:
+    if not rows:
+        return
+    stmt = upsert_statement(
+        session.get_bind().dialect.name,
+        CustomerBehaviorDB.__table__,
+        "customer_id",
+        (*UPDATABLE, "updated_at") if update else None,
+    )
+    await session.execute(stmt, rows)
+    await session.commit()
+
+
+async def import_customer_profiles(
+    path: Path,
+    chunk_size: int = settings.PROFILE_IMPORT_CHUNK_SIZE,
+    update: bool = True,
+    progress: bool = True,
+) -> ImportStats:
+    """Stream `path` into `customer_behavior`, one upsert and one commit per chunk"""
+    stats = ImportStats()
+
+    async with AsyncSessionLocal() as session:
+        for chunk in iter_chunks(path, chunk_size):
+            rows, rejected, deduplicated = validate_chunk(chunk)
+            await write_chunk(session, rows, update)
+
+            stats.chunks += 1
+            stats.read += len(rows) + rejected + deduplicated
+            stats.written += len(rows)
+            stats.rejected += rejected
+            stats.deduplicated += deduplicated
+            if progress:
+                print(
+                    f"📦 Chunk {stats.chunks}: {stats.read:,} filas leídas, "
+                    f"{stats.rejected:,} rechazadas, {stats.deduplicated:,} duplicadas "
+                    f"({stats.rows_per_second:,.0f} filas/s)"
+                )
+
+    return stats
+
+
+async def main(args: argparse.Namespace) -> None:
+    await init_db()
+    # Registra la invalidación de la caché de perfiles en los commits de este proceso
+    import app.services.profile_cache  # noqa: F401
+
+    print(f"🚚 Importando perfiles de {args.path}...")
+    stats = await import_customer_profiles(args.path, args.chunk_size, update=not args.insert_only)
+    print(
+        f"✅ {stats.written:,} perfiles escritos, {stats.rejected:,} rechazados, "
+        f"{stats.deduplicated:,} duplicados en {stats.elapsed:.1f} s "
+        f"({stats.rows_per_second:,.0f} filas/s)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", type=Path, help="CSV, NDJSON (.ndjson/.jsonl) or Parquet file")
+    parser.add_argument("--chunk-size", type=int, default=settings.PROFILE_IMPORT_CHUNK_SIZE)
+    parser.add_argument(
+        "--insert-only", action="store_true", help="keep existing profiles instead of updating"
+    )
+    asyncio.run(main(parser.parse_args()))
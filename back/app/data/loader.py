@@ -7,13 +7,12 @@ import csv
 import json
 from pathlib import Path
 
-from sqlalchemy import select
-
-from app.db.models import CustomerBehaviorDB
-from app.db.session import AsyncSessionLocal, init_db
-from app.models.schemas import CustomerBehavior, FraudPolicy
+from app.data.importer import import_customer_profiles
+from app.db.session import init_db
+from app.models.schemas import CustomerBehavior, CustomerProfile, FraudPolicy
 
 DATA_DIR = Path(__file__).parent
+POLICIES_PATH = DATA_DIR / "fraud_policies.json"
 
 
 async def load_customer_behavior() -> list[CustomerBehavior]:
@@ -39,9 +38,7 @@ async def load_customer_behavior() -> list[CustomerBehavior]:
 
 async def load_fraud_policies() -> list[FraudPolicy]:
     """Load fraud policies from JSON"""
-    json_path = DATA_DIR / "fraud_policies.json"
-
-    with open(json_path) as f:
+    with open(POLICIES_PATH) as f:
         data = json.load(f)
 
     return [FraudPolicy(**policy) for policy in data]
@@ -55,52 +52,21 @@ async def seed_database():
     await init_db()
     print("✅ Database initialized")
 
-    async with AsyncSessionLocal() as session:
-        # Seed customer behavior
-        behaviors = await load_customer_behavior()
-        for behavior in behaviors:
-            # Check if exists
-            result = await session.execute(
-                select(CustomerBehaviorDB).where(
-                    CustomerBehaviorDB.customer_id == behavior.customer_id
-                )
-            )
-            existing = result.scalar_one_or_none()
-
-            if not existing:
-                db_behavior = CustomerBehaviorDB(
-                    customer_id=behavior.customer_id,
-                    usual_amount_avg=behavior.usual_amount_avg,
-                    usual_hours=behavior.usual_hours,
-                    usual_countries=behavior.usual_countries,
-                    usual_devices=behavior.usual_devices,
-                )
-                session.add(db_behavior)
-
-        await session.commit()
-        print(f"✅ Seeded {len(behaviors)} customer behaviors")
+    # Seed customer behavior: upsert por chunks que conserva los perfiles existentes
+    stats = await import_customer_profiles(
+        DATA_DIR / "customer_behavior.csv", update=False, progress=False
+    )
+    print(f"✅ Seeded {stats.written} customer behaviors")
 
     print("🎉 Database seeding complete!")
 
 
-async def get_customer_behavior(customer_id: str) -> CustomerBehavior | None:
-    """Get customer behavior from database"""
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(
-            select(CustomerBehaviorDB).where(CustomerBehaviorDB.customer_id == customer_id)
-        )
-        db_behavior = result.scalar_one_or_none()
-
-        if db_behavior:
-            return CustomerBehavior(
-                customer_id=db_behavior.customer_id,
-                usual_amount_avg=db_behavior.usual_amount_avg,
-                usual_hours=db_behavior.usual_hours,
-                usual_countries=db_behavior.usual_countries,
-                usual_devices=db_behavior.usual_devices,
-            )
+async def get_customer_profile(customer_id: str) -> CustomerProfile | None:
+    """Get the customer profile through the in-process profile cache"""
+    from app.services.profile_cache import profile_cache
 
-    return None
+    profile: CustomerProfile | None = await profile_cache.get(customer_id)
+    return profile
 
 
 if __name__ == "__main__":
@@ -0,0 +1,122 @@
+"""
+Offline training of the local risk-scoring model.
+
+Replays the stored transactions in chronological order: features are computed from
+the customer profile as it was at that moment (bootstrapped from `customer_behavior`
+and updated with each approval, like the profile engine does online), so the model
+never sees information from the future. Labels are the final decision (`BLOCK` = 1,
+`APPROVE` = 0, the rest is skipped); decisions confirmed by a HITL reviewer weigh
+`RISK_MODEL_HITL_WEIGHT` times more. The most recent `--validation` fraction is held
+out to report AUC and log-loss, then the model is refitted on everything and saved.
+
+    uv run python -m app.data.train_risk_model
+    uv run python -m app.data.train_risk_model --output models/risk_model.json --min-samples 200
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.models import CustomerBehaviorDB, HITLQueue, Transaction
+from app.db.session import AsyncSessionLocal, init_db
+from app.models.schemas import CustomerProfile
+from app.services.db_service import TransactionService
+from app.services.profile_cache import to_schema
+from app.services.profile_engine import bootstrap_profile, new_profile, observe
+from app.services.risk_model import RiskModel, feature_names, fill_features, roc_auc
+
+LABELS = {"BLOCK": 1.0, "APPROVE": 0.0}
+
+
+async def load_training_set(merchant_buckets: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Point-in-time feature matrix, labels and sample weights of the labelled history"""
+    async with AsyncSessionLocal() as session:
+        behaviors = (await session.execute(select(CustomerBehaviorDB))).scalars().all()
+        profiles: dict[str, CustomerProfile] = {
+            b.customer_id: bootstrap_profile(to_schema(b)) for b in behaviors
+        }
+        result = await session.execute(
+            select(Transaction, HITLQueue.reviewer_decision)
+            .outerjoin(HITLQueue, HITLQueue.transaction_id == Transaction.id)
+            .where(Transaction.decision.is_not(None))
+            .order_by(Transaction.timestamp, Transaction.id)
+        )
+        rows = result.all()
+
+    width = len(feature_names(merchant_buckets))
+    matrix = np.zeros((len(rows), width))
+    labels = np.zeros(len(rows))
+    weights = np.zeros(len(rows))
+    n = 0
+    for db_tx, reviewer_decision in rows:
+        tx = TransactionService.to_input(db_tx)
+        profile = profiles.get(tx.customer_id)
+        label = LABELS.get(db_tx.decision)
+        if label is not None:
+            fill_features(matrix[n], tx, profile, merchant_buckets)
+            labels[n] = label
+            weights[n] = settings.RISK_MODEL_HITL_WEIGHT if reviewer_decision else 1.0
+            n += 1
+        if db_tx.decision == "APPROVE":
+            profiles[tx.customer_id] = observe(
+                profile or new_profile(tx.customer_id, tx.amount), tx
+            )
+    return matrix[:n], labels[:n], weights[:n]
+
+
+def log_loss(labels: np.ndarray, scores: np.ndarray, weights: np.ndarray) -> float:
+    p = np.clip(scores, 1e-9, 1 - 1e-9)
+    losses = -(labels * np.log(p) + (1 - labels) * np.log(1 - p))
+    return float(np.average(losses, weights=weights))
+
+
+async def main(args: argparse.Namespace) -> None:
+    await init_db()
+    buckets = settings.RISK_MODEL_MERCHANT_BUCKETS
+
+    print("🧮 Construyendo el conjunto de entrenamiento...")
+    matrix, labels, weights = await load_training_set(buckets)
+    positives = int(labels.sum())
+    print(f"   {len(labels):,} transacciones etiquetadas ({positives:,} BLOCK)")
+    if len(labels) < args.min_samples or positives == 0 or positives == len(labels):
+        print(f"❌ Se necesitan al menos {args.min_samples} muestras de ambas clases")
+        return
+
+    split = int(len(labels) * (1 - args.validation))
+    metadata = {"trained_at": datetime.now(UTC).isoformat(), "samples": len(labels)}
+    if 0 < split < len(labels):
+        start = time.perf_counter()
+        model = RiskModel.fit(
+            matrix[:split], labels[:split], weights[:split], l2=args.l2, merchant_buckets=buckets
+        )
+        elapsed = time.perf_counter() - start
+        scores = model.score_matrix(matrix[split:])
+        metadata["validation_auc"] = round(roc_auc(labels[split:], scores), 4)
+        metadata["validation_log_loss"] = round(
+            log_loss(labels[split:], scores, weights[split:]), 4
+        )
+        print(
+            f"📊 Validación ({len(labels) - split:,} más recientes): "
+            f"AUC {metadata['validation_auc']:.3f}, log-loss {metadata['validation_log_loss']:.3f} "
+            f"(entrenamiento {elapsed * 1000:.0f} ms)"
+        )
+
+    model = RiskModel.fit(matrix, labels, weights, l2=args.l2, merchant_buckets=buckets)
+    model.metadata = metadata
+    model.save(args.output)
+    print(f"✅ Modelo guardado en {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", type=Path, default=Path(settings.RISK_MODEL_PATH))
+    parser.add_argument("--min-samples", type=int, default=50)
+    parser.add_argument("--validation", type=float, default=0.2, help="held-out fraction")
+    parser.add_argument("--l2", type=float, default=settings.RISK_MODEL_L2)
+    asyncio.run(main(parser.parse_args()))
@@ -4,46 +4,75 @@ SQLAlchemy database models
 
 from datetime import datetime
 
-from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Integer, String, Text
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    JSON,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    text,
+)
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
-Base = declarative_base()
+
+class Base(DeclarativeBase):
+    pass
 
 
 class Transaction(Base):
     """Transaction table"""
 
     __tablename__ = "transactions"
+    # Listado con paginación keyset (created_at, id) y filtros por igualdad
+    __table_args__ = (
+        Index("ix_transactions_created_at_id", "created_at", "id"),
+        Index("ix_transactions_decision_created_at", "decision", "created_at", "id"),
+        Index("ix_transactions_customer_created_at", "customer_id", "created_at", "id"),
+        Index("ix_transactions_merchant_created_at", "merchant_id", "created_at", "id"),
+        # Recuperación de jobs sin terminar al arrancar
+        Index("ix_transactions_status_created_at", "status", "created_at", "id"),
+    )
 
-    id = Column(String, primary_key=True)
-    customer_id = Column(String, nullable=False, index=True)
-    amount = Column(Float, nullable=False)
-    currency = Column(String(3), nullable=False)
-    country = Column(String(2), nullable=False)
-    channel = Column(String(50), nullable=False)
-    device_id = Column(String, nullable=False)
-    timestamp = Column(DateTime, nullable=False)
-    merchant_id = Column(String, nullable=False)
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    customer_id: Mapped[str] = mapped_column(String, nullable=False)
+    amount: Mapped[float] = mapped_column(Float, nullable=False)
+    currency: Mapped[str] = mapped_column(String(3), nullable=False)
+    country: Mapped[str] = mapped_column(String(2), nullable=False)
+    channel: Mapped[str] = mapped_column(String(50), nullable=False)
+    device_id: Mapped[str] = mapped_column(String, nullable=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    merchant_id: Mapped[str] = mapped_column(String, nullable=False)
 
     # Analysis results
-    decision = Column(String(50), nullable=True)
-    confidence = Column(Float, nullable=True)
-    signals = Column(JSON, nullable=True)
-    explanation_customer = Column(Text, nullable=True)
-    explanation_audit = Column(Text, nullable=True)
-    agent_route = Column(JSON, nullable=True)
-    citations_internal = Column(JSON, nullable=True)
-    citations_external = Column(JSON, nullable=True)
-    processing_time_ms = Column(Integer, nullable=True)
-
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    status: Mapped[str] = mapped_column(
+        String(20), default="PENDING", nullable=False
+    )  # PENDING, QUEUED, PROCESSING, COMPLETED, FAILED
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # PROCESSING: el análisis se da por abandonado (y se recupera) tras este instante
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    decision: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    confidence: Mapped[float | None] = mapped_column(Float, nullable=True)
+    signals: Mapped[list[str] | None] = mapped_column(JSON, nullable=True)
+    explanation_customer: Mapped[str | None] = mapped_column(Text, nullable=True)
+    explanation_audit: Mapped[str | None] = mapped_column(Text, nullable=True)
+    agent_route: Mapped[list[str] | None] = mapped_column(JSON, nullable=True)
+    citations_internal: Mapped[list[dict] | None] = mapped_column(JSON, nullable=True)
+    citations_external: Mapped[list[dict] | None] = mapped_column(JSON, nullable=True)
+    processing_time_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
-    audit_trail = relationship(
+    audit_trail: Mapped[list["AuditTrail"]] = relationship(
         "AuditTrail", back_populates="transaction", cascade="all, delete-orphan"
     )
-    hitl_queue = relationship("HITLQueue", back_populates="transaction", uselist=False)
+    hitl_queue: Mapped["HITLQueue | None"] = relationship(
+        "HITLQueue", back_populates="transaction", uselist=False
+    )
 
 
 class AuditTrail(Base):
@@ -51,35 +80,56 @@ class AuditTrail(Base):
 
     __tablename__ = "audit_trail"
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    transaction_id = Column(String, ForeignKey("transactions.id"), nullable=False, index=True)
-    agent_name = Column(String(100), nullable=False)
-    step_order = Column(Integer, nullable=False)
-    input_data = Column(JSON, nullable=True)
-    output_data = Column(JSON, nullable=True)
-    execution_time_ms = Column(Integer, nullable=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    transaction_id: Mapped[str] = mapped_column(
+        String, ForeignKey("transactions.id"), nullable=False, index=True
+    )
+    agent_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    step_order: Mapped[int] = mapped_column(Integer, nullable=False)
+    input_data: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    output_data: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    execution_time_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
-    transaction = relationship("Transaction", back_populates="audit_trail")
+    transaction: Mapped[Transaction] = relationship(back_populates="audit_trail")
 
 
 class HITLQueue(Base):
     """Human-in-the-loop queue"""
 
     __tablename__ = "hitl_queue"
+    # Reclamo y listado paginado por estado en orden de prioridad (riesgo, monto, antigüedad)
+    __table_args__ = (
+        Index(
+            "ix_hitl_queue_priority",
+            "status",
+            text("risk_score DESC"),
+            text("amount DESC"),
+            "created_at",
+            "id",
+        ),
+        Index("ix_hitl_queue_status_lease", "status", "lease_expires_at"),
+    )
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    transaction_id = Column(String, ForeignKey("transactions.id"), unique=True, nullable=False)
-    status = Column(String(50), default="PENDING", nullable=False)  # PENDING, APPROVED, REJECTED
-    assigned_to = Column(String(100), nullable=True)
-    reviewed_at = Column(DateTime, nullable=True)
-    reviewer_decision = Column(String(50), nullable=True)
-    reviewer_comments = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    transaction_id: Mapped[str] = mapped_column(
+        String, ForeignKey("transactions.id"), unique=True, nullable=False
+    )
+    status: Mapped[str] = mapped_column(
+        String(50), default="PENDING", nullable=False
+    )  # PENDING, OWNED, REVIEWED
+    risk_score: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    amount: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    assigned_to: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    reviewed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    reviewer_decision: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    reviewer_comments: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
-    transaction = relationship("Transaction", back_populates="hitl_queue")
+    transaction: Mapped[Transaction] = relationship(back_populates="hitl_queue")
 
 
 class CustomerBehaviorDB(Base):
@@ -87,9 +137,28 @@ class CustomerBehaviorDB(Base):
 
     __tablename__ = "customer_behavior"
 
-    customer_id = Column(String, primary_key=True)
-    usual_amount_avg = Column(Float, nullable=False)
-    usual_hours = Column(String(50), nullable=False)
-    usual_countries = Column(String(100), nullable=False)
-    usual_devices = Column(String(200), nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    customer_id: Mapped[str] = mapped_column(String, primary_key=True)
+    usual_amount_avg: Mapped[float] = mapped_column(Float, nullable=False)
+    usual_hours: Mapped[str] = mapped_column(String(50), nullable=False)
+    usual_countries: Mapped[str] = mapped_column(String(100), nullable=False)
+    usual_devices: Mapped[str] = mapped_column(String(200), nullable=False)
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+class CustomerProfileStatsDB(Base):
+    """Running customer behavior statistics (see app/services/profile_engine.py)"""
+
+    __tablename__ = "customer_profile_stats"
+
+    customer_id: Mapped[str] = mapped_column(String, primary_key=True)
+    observations: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    amount_mean: Mapped[float] = mapped_column(Float, nullable=False)
+    amount_var: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    hour_histogram: Mapped[bytes] = mapped_column(LargeBinary(96), nullable=False)  # 24 x float32
+    countries: Mapped[dict] = mapped_column(JSON, nullable=False)  # {country: [count, error]}
+    devices: Mapped[dict] = mapped_column(JSON, nullable=False)  # {device: [count, error]}
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
@@ -2,11 +2,19 @@
 Database connection and session management
 """
 
+from pathlib import Path
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+# Revisión equivalente al esquema que creaba `create_all` antes de usar Alembic
+BASELINE_REVISION = "0001"
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
@@ -28,9 +36,31 @@ async def get_db() -> AsyncSession:
         yield session
 
 
-async def init_db():
-    """Initialize database (create tables)"""
+def migrate(connection: Connection) -> None:
+    """
+    Create the schema on an empty database; otherwise apply pending Alembic migrations.
+    Databases created with `create_all` before migrations existed are stamped with the
+    baseline revision first.
+    """
+    from alembic.config import Config
+
+    from alembic import command
     from app.db.models import Base
 
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["connection"] = connection
+    tables = set(inspect(connection).get_table_names())
+
+    if not tables & set(Base.metadata.tables):
+        Base.metadata.create_all(connection)
+        command.stamp(config, "head")
+        return
+    if "alembic_version" not in tables:
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+
+async def init_db():
+    """Initialize database (create tables or migrate them to the current schema)"""
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(migrate)
@@ -0,0 +1,30 @@
+"""
+Dialect-aware bulk upsert statements
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import FromClause
+
+
+def upsert_statement(dialect: str, table: FromClause, key: str, update: tuple[str, ...] | None):
+    """
+    `INSERT ... ON CONFLICT (key) DO UPDATE` of the `update` columns for Postgres and
+    SQLite; with `update=None` existing rows are left untouched (`DO NOTHING`).
+    Execute it with a list of row dicts for a single batched statement.
+    """
+    dialect_insert: Callable[[Any], Any]
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise ValueError(f"Bulk upsert not supported for dialect {dialect!r}")
+
+    stmt = dialect_insert(table)
+    if not update:
+        return stmt.on_conflict_do_nothing(index_elements=[key])
+    return stmt.on_conflict_do_update(
+        index_elements=[key], set_={column: stmt.excluded[column] for column in update}
+    )
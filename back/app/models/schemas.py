@@ -2,8 +2,9 @@
 Pydantic models for fraud detection system
 """
 
+import operator
 from datetime import datetime
-from typing import Literal
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, Field
 
@@ -47,15 +48,52 @@ class CustomerBehavior(BaseModel):
     usual_devices: str = Field(..., description="Usual devices (comma-separated)")
 
 
+class CustomerProfile(BaseModel):
+    """Running behavior statistics of a customer, maintained by the profile engine"""
+
+    customer_id: str
+    observations: int = Field(
+        default=0, description="Approved transactions folded into the profile"
+    )
+    amount_mean: float = Field(..., description="EWMA of the transaction amount")
+    amount_var: float = Field(
+        default=0.0, description="Exponentially weighted variance of the amount"
+    )
+    hour_histogram: list[float] = Field(
+        default_factory=lambda: [0.0] * 24, description="Weight per hour of day (0-23)"
+    )
+    countries: dict[str, tuple[float, float]] = Field(
+        default_factory=dict, description="Space-Saving sketch: country -> (count, error)"
+    )
+    devices: dict[str, tuple[float, float]] = Field(
+        default_factory=dict, description="Space-Saving sketch: device -> (count, error)"
+    )
+
+
+DecisionType = Literal["APPROVE", "CHALLENGE", "BLOCK", "ESCALATE_TO_HUMAN"]
+AnalysisMode = Literal["standard", "fast"]
+
+
+class PolicyCondition(BaseModel):
+    """Machine-readable condition over a `TransactionFeatures` field"""
+
+    feature: str = Field(..., description="Feature name (e.g., 'amount_ratio')")
+    op: Literal[">", ">=", "<", "<=", "==", "!="]
+    value: bool | float | str
+
+
 class FraudPolicy(BaseModel):
     """Fraud detection policy model"""
 
     policy_id: str
     rule: str = Field(..., description="Policy rule description")
     version: str = Field(..., description="Policy version")
-
-
-DecisionType = Literal["APPROVE", "CHALLENGE", "BLOCK", "ESCALATE_TO_HUMAN"]
+    action: DecisionType | None = Field(
+        None, description="Decision applied when every condition holds"
+    )
+    conditions: list[PolicyCondition] = Field(
+        default_factory=list, description="Conditions evaluated by the rule engine"
+    )
 
 
 class Citation(BaseModel):
@@ -89,6 +127,9 @@ class FraudDetectionResult(BaseModel):
     explanation_customer: str = Field(..., description="Customer-facing explanation")
     explanation_audit: str = Field(..., description="Audit trail explanation")
     agent_route: list[str] = Field(default_factory=list, description="Route of agents executed")
+    degraded_stages: list[str] = Field(
+        default_factory=list, description="Stages cut short by the latency budget"
+    )
     processing_time_ms: int = Field(..., description="Processing time in milliseconds")
 
     class Config:
@@ -133,10 +174,41 @@ class AgentSignal(BaseModel):
     value: str | float | None = None
 
 
+VelocityEntity = Literal["customer", "device", "merchant"]
+
+
+class VelocityStat(BaseModel):
+    """Transactions and amount of one entity within one sliding window"""
+
+    entity: VelocityEntity
+    key: str
+    window_seconds: int
+    count: int
+    amount: float
+
+
+class AgentRunMetrics(BaseModel):
+    """Timing and LLM usage of one graph node run"""
+
+    node: str
+    wall_ms: int = 0
+    llm_ms: int = 0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    retries: int = 0
+    parse_failures: int = 0
+    escalations: int = 0
+    # Why the node's fallback was used instead of the node (deadline)
+    degraded: str | None = None
+    models: list[str] = Field(default_factory=list)
+
+
 class AgentEvidence(BaseModel):
     """Evidence gathered by an agent"""
 
     agent_name: str
+    node: str | None = None
     signals: list[AgentSignal] = Field(default_factory=list)
     citations: list[Citation | ExternalCitation] = Field(default_factory=list)
     reasoning: str
@@ -144,28 +216,130 @@ class AgentEvidence(BaseModel):
 
 
 class FraudDetectionState(BaseModel):
-    """State shared across all agents in LangGraph"""
+    """State shared across all agents in LangGraph
 
-    transaction: TransactionInput
-    customer_behavior: CustomerBehavior | None = None
+    List fields carry an ``operator.add`` reducer: nodes return only the items they
+    add, so branches running in parallel are merged instead of overwriting each other.
+    """
 
-    evidences: list[AgentEvidence] = Field(default_factory=list)
-    signals: list[str] = Field(default_factory=list)
-    citations_internal: list[Citation] = Field(default_factory=list)
-    citations_external: list[ExternalCitation] = Field(default_factory=list)
+    transaction: TransactionInput
+    # None: `settings.ANALYSIS_MODE`
+    analysis_mode: AnalysisMode | None = None
+    # Latency budget in ms; None: per channel (`DEADLINE_CHANNEL_MS`)
+    deadline_ms: int | None = None
+    customer_profile: CustomerProfile | None = None
+    velocity: list[VelocityStat] = Field(default_factory=list)
+    model_score: float | None = None
+
+    evidences: Annotated[list[AgentEvidence], operator.add] = Field(default_factory=list)
+    signals: Annotated[list[str], operator.add] = Field(default_factory=list)
+    citations_internal: Annotated[list[Citation], operator.add] = Field(default_factory=list)
+    citations_external: Annotated[list[ExternalCitation], operator.add] = Field(
+        default_factory=list
+    )
 
     decision: DecisionType | None = None
     confidence: float = 0.0
+    risk_score: float | None = None
     explanation_customer: str = ""
     explanation_audit: str = ""
 
-    agent_route: list[str] = Field(default_factory=list)
+    agent_route: Annotated[list[str], operator.add] = Field(default_factory=list)
+    # `node:reason` of the stages replaced by their fallback (timeout, budget_exhausted);
+    # a critical one (`CRITICAL_STAGES`) escalates the analysis to human review
+    degraded_stages: Annotated[list[str], operator.add] = Field(default_factory=list)
+    agent_metrics: Annotated[list[AgentRunMetrics], operator.add] = Field(default_factory=list)
     start_time: datetime = Field(default_factory=datetime.utcnow)
 
     class Config:
         arbitrary_types_allowed = True
 
 
+class TransactionListItem(BaseModel):
+    """Lightweight projection of a transaction for listings (no text/JSON columns)"""
+
+    id: str
+    customer_id: str
+    amount: float
+    currency: str
+    country: str
+    channel: str
+    device_id: str
+    timestamp: datetime
+    merchant_id: str
+    status: str
+    decision: str | None = None
+    confidence: float | None = None
+    processing_time_ms: int | None = None
+    created_at: datetime
+
+
+class TransactionPage(BaseModel):
+    """Page of transactions, newest first; pass `next_cursor` to get the next one"""
+
+    items: list[TransactionListItem]
+    next_cursor: str | None = None
+
+
+class HITLItem(BaseModel):
+    """Entry of the human review queue"""
+
+    id: int
+    transaction_id: str
+    status: Literal["PENDING", "OWNED", "REVIEWED"]
+    risk_score: float
+    amount: float
+    assigned_to: str | None = None
+    lease_expires_at: datetime | None = None
+    reviewed_at: datetime | None = None
+    reviewer_decision: str | None = None
+    reviewer_comments: str | None = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class HITLPage(BaseModel):
+    """Page of the review queue in claim order (risk, amount, age); pass `next_cursor` to
+    get the next one"""
+
+    items: list[HITLItem]
+    next_cursor: str | None = None
+
+
+class AnalysisJobAccepted(BaseModel):
+    """Response of `POST /analyze?async=true`"""
+
+    job_id: str
+    status: Literal["QUEUED"]
+    status_url: str
+
+
+class BatchAnalysisRequest(BaseModel):
+    """Batch of transactions to analyze in a single request"""
+
+    transactions: list[TransactionInput] = Field(..., min_length=1)
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of a single transaction inside a batch"""
+
+    transaction_id: str
+    status: Literal["ok", "error"]
+    result: FraudDetectionResult | None = None
+    error: str | None = None
+
+
+class BatchAnalysisResult(BaseModel):
+    """Per-item results of a batch analysis"""
+
+    items: list[BatchItemResult]
+    succeeded: int
+    failed: int
+    processing_time_ms: int
+
+
 class TransactionSummary(BaseModel):
     """AI generated summary of the transaction audit"""
 
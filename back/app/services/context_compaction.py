@@ -0,0 +1,185 @@
+"""
+Compact, size-capped views of the evidence for the aggregator, debate and arbiter.
+
+Without compaction every stage re-sends the free text of the previous ones: the
+aggregator gets every reasoning in full, both debaters get every evidence (including
+the aggregator summary) and the arbiter gets both debate essays. With
+`COMPACTION_ENABLED` each stage gets instead:
+
+- aggregator: one line per agent with its confidence and its reasoning cut to a
+  per-agent token budget, and its signals as compact tuples deduplicated across agents;
+- debate: the aggregator summary (budgeted), the deduplicated signals and the
+  confidence of each agent, without the individual reasonings;
+- arbiter: both debate essays cut to a per-essay budget, plus the deduplicated signals.
+
+Token counts of the raw and compacted context are exported per stage as
+`fraud_context_tokens_total{stage, kind}` (the raw count is estimated from a sample).
+"""
+
+import random
+import re
+from collections.abc import Callable
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.constants import (
+    DEBATE_AGENT_PRO_CUSTOMER_NAME,
+    DEBATE_AGENT_PRO_FRAUD_NAME,
+    DEBATE_AGENTS_NAME,
+    DECISION_ARBITER_AGENT_NAME,
+    EVIDENCE_AGGREGATOR_AGENT_NAME,
+    EXPLAINABILITY_AGENT_NAME,
+)
+from app.core.tokens import count_tokens, truncate_tokens
+from app.models.schemas import AgentEvidence, AgentSignal
+
+DEBATE_AGENTS = (DEBATE_AGENT_PRO_FRAUD_NAME, DEBATE_AGENT_PRO_CUSTOMER_NAME)
+# Evidencias que no son de los agentes de análisis (las producen etapas posteriores)
+DERIVED_AGENTS = (
+    EVIDENCE_AGGREGATOR_AGENT_NAME,
+    *DEBATE_AGENTS,
+    DEBATE_AGENTS_NAME,
+    DECISION_ARBITER_AGENT_NAME,
+    EXPLAINABILITY_AGENT_NAME,
+)
+SEVERITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _clean(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _budget(agent_name: str) -> int:
+    return settings.COMPACTION_AGENT_TOKENS.get(agent_name, settings.COMPACTION_REASONING_TOKENS)
+
+
+def _find(evidences: list[AgentEvidence], agent_name: str) -> AgentEvidence | None:
+    return next((ev for ev in reversed(evidences) if ev.agent_name == agent_name), None)
+
+
+def _analysis_evidences(evidences: list[AgentEvidence]) -> list[AgentEvidence]:
+    return [ev for ev in evidences if ev.agent_name not in DERIVED_AGENTS]
+
+
+# --- Vistas originales (sin compactar) ---
+
+
+def raw_aggregator_context(evidences: list[AgentEvidence]) -> str:
+    summary = ""
+    for ev in evidences:
+        summary += f"\n- AGENTE: {ev.agent_name}\n  Razonamiento: {ev.reasoning}\n  Señales: {[s.description for s in ev.signals]}\n"
+    return summary
+
+
+def raw_debate_context(evidences: list[AgentEvidence]) -> str:
+    return "\n".join([f"- {ev.agent_name}: {ev.reasoning}" for ev in evidences])
+
+
+def raw_arbiter_context(evidences: list[AgentEvidence]) -> str:
+    debate = ""
+    for ev in evidences:
+        if "Debate Agent" in ev.agent_name:
+            debate += f"\n--- {ev.agent_name} ---\n{ev.reasoning}\n"
+    return debate
+
+
+# --- Vistas compactas ---
+
+
+def signal_key(signal: AgentSignal) -> tuple[str, str]:
+    return signal.signal_type, _clean(signal.description).lower()
+
+
+def format_signal(signal: AgentSignal) -> str:
+    """`(tipo|severidad|descripción|valor)`"""
+    fields = [signal.signal_type, signal.severity, _clean(signal.description)]
+    if signal.value not in (None, ""):
+        fields.append(str(signal.value))
+    return f"({'|'.join(fields)})"
+
+
+def unique_signals(evidences: list[AgentEvidence]) -> list[AgentSignal]:
+    """Signals deduplicated by (type, description), most severe first, capped"""
+    seen: dict[tuple[str, str], AgentSignal] = {}
+    for ev in evidences:
+        for signal in ev.signals:
+            key = signal_key(signal)
+            current = seen.get(key)
+            if (
+                current is None
+                or SEVERITY_ORDER[signal.severity] < SEVERITY_ORDER[current.severity]
+            ):
+                seen[key] = signal
+    ordered = sorted(seen.values(), key=lambda s: SEVERITY_ORDER[s.severity])
+    return ordered[: settings.COMPACTION_MAX_SIGNALS]
+
+
+def signals_block(evidences: list[AgentEvidence]) -> str:
+    signals = unique_signals(evidences)
+    return "Señales: " + ("; ".join(format_signal(s) for s in signals) if signals else "ninguna")
+
+
+def compact_aggregator_context(evidences: list[AgentEvidence]) -> str:
+    lines = []
+    seen: set[tuple[str, str]] = set()
+    for ev in _analysis_evidences(evidences):
+        reasoning = truncate_tokens(_clean(ev.reasoning), _budget(ev.agent_name))
+        lines.append(f"- {ev.agent_name} ({ev.confidence:.2f}): {reasoning}")
+        new = [s for s in ev.signals if signal_key(s) not in seen]
+        seen.update(signal_key(s) for s in new)
+        if new:
+            lines.append("  " + " ".join(format_signal(s) for s in new))
+    return "\n".join(lines)
+
+
+def compact_debate_context(evidences: list[AgentEvidence]) -> str:
+    aggregator = _find(evidences, EVIDENCE_AGGREGATOR_AGENT_NAME)
+    if aggregator is None:
+        # Sin resumen del agregador se usa la vista por agente
+        return compact_aggregator_context(evidences)
+
+    analysis = _analysis_evidences(evidences)
+    confidences = ", ".join(f"{ev.agent_name} {ev.confidence:.2f}" for ev in analysis)
+    summary = truncate_tokens(_clean(aggregator.reasoning), settings.COMPACTION_SUMMARY_TOKENS)
+    return f"Resumen: {summary}\n{signals_block(analysis)}\nConfianza por agente: {confidences}"
+
+
+def compact_arbiter_context(evidences: list[AgentEvidence]) -> str:
+    essays = []
+    for name in DEBATE_AGENTS:
+        ev = _find(evidences, name)
+        if ev is not None:
+            essay = truncate_tokens(_clean(ev.reasoning), settings.COMPACTION_DEBATE_TOKENS)
+            essays.append(f"--- {name} ---\n{essay}")
+    return "\n".join([*essays, signals_block(_analysis_evidences(evidences))])
+
+
+STAGES: dict[str, tuple[Callable[[list[AgentEvidence]], str], ...]] = {
+    "aggregator": (raw_aggregator_context, compact_aggregator_context),
+    "debate": (raw_debate_context, compact_debate_context),
+    "arbiter": (raw_arbiter_context, compact_arbiter_context),
+}
+
+
+def stage_context(stage: str, evidences: list[AgentEvidence]) -> str:
+    """
+    Evidence text for `stage`: compacted when `COMPACTION_ENABLED`, raw otherwise.
+    With compaction on, the raw view is only built and tokenized for a sample
+    (`COMPACTION_RAW_SAMPLE_RATE`) of the calls, counted scaled by the rate.
+    """
+    raw_view, compact_view = STAGES[stage]
+    if not settings.COMPACTION_ENABLED:
+        raw = raw_view(evidences)
+        metrics.CONTEXT_TOKENS.inc(count_tokens(raw), stage=stage, kind="raw")
+        return raw
+
+    rate = settings.COMPACTION_RAW_SAMPLE_RATE
+    if rate > 0 and random.random() < rate:
+        raw_tokens = count_tokens(raw_view(evidences))
+        metrics.CONTEXT_TOKENS.inc(raw_tokens / rate, stage=stage, kind="raw")
+
+    compacted = compact_view(evidences)
+    metrics.CONTEXT_TOKENS.inc(count_tokens(compacted), stage=stage, kind="compacted")
+    return compacted
@@ -1,29 +1,67 @@
-from datetime import UTC, datetime
+import asyncio
+from contextlib import AsyncExitStack
+from datetime import UTC, datetime, timedelta
+from typing import cast
 
-from sqlalchemy import select, update
+from sqlalchemy import CursorResult, and_, insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import AuditTrail, HITLQueue, Transaction
-from app.models.schemas import FraudDetectionState, TransactionInput
+from app.core.config import settings
+from app.core.constants import DEFAULT_HITL_RISK_SCORE
+from app.db.models import AuditTrail, CustomerProfileStatsDB, HITLQueue, Transaction
+from app.db.session import AsyncSessionLocal
+from app.db.upsert import upsert_statement
+from app.models.schemas import FraudDetectionState, TransactionInput, TransactionListItem
+from app.services.profile_cache import profile_cache
+from app.services.profile_engine import from_row, new_profile, observe, to_row
 
 
 class TransactionService:
     @staticmethod
-    async def create_transaction(session: AsyncSession, tx_input: TransactionInput) -> Transaction:
+    def _transaction_values(tx_input: TransactionInput) -> dict:
+        return {
+            "id": tx_input.transaction_id,
+            "customer_id": tx_input.customer_id,
+            "amount": tx_input.amount,
+            "currency": tx_input.currency,
+            "country": tx_input.country,
+            "channel": tx_input.channel,
+            "device_id": tx_input.device_id,
+            "timestamp": tx_input.timestamp,
+            "merchant_id": tx_input.merchant_id,
+        }
+
+    @staticmethod
+    def _lease_for(status: str) -> datetime | None:
+        """Lease of a row entering PROCESSING; past it the analysis counts as abandoned"""
+        if status != "PROCESSING":
+            return None
+        return datetime.now(UTC).replace(tzinfo=None) + timedelta(
+            seconds=settings.JOB_LEASE_SECONDS
+        )
+
+    @staticmethod
+    def _abandoned(now: datetime):
+        """Jobs a worker may take: QUEUED, or PROCESSING with an expired (or no) lease"""
+        return or_(
+            Transaction.status == "QUEUED",
+            and_(
+                Transaction.status == "PROCESSING",
+                or_(Transaction.lease_expires_at.is_(None), Transaction.lease_expires_at < now),
+            ),
+        )
+
+    @staticmethod
+    async def create_transaction(
+        session: AsyncSession, tx_input: TransactionInput, status: str = "PENDING"
+    ) -> Transaction:
         db_tx = Transaction(
-            id=tx_input.transaction_id,
-            customer_id=tx_input.customer_id,
-            amount=tx_input.amount,
-            currency=tx_input.currency,
-            country=tx_input.country,
-            channel=tx_input.channel,
-            device_id=tx_input.device_id,
-            timestamp=tx_input.timestamp,
-            merchant_id=tx_input.merchant_id,
+            **TransactionService._transaction_values(tx_input),
+            status=status,
+            lease_expires_at=TransactionService._lease_for(status),
         )
         session.add(db_tx)
         await session.commit()
-        await session.refresh(db_tx)
         return db_tx
 
     @staticmethod
@@ -32,61 +70,266 @@ class TransactionService:
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def get_transactions(session: AsyncSession):
-        result = await session.execute(select(Transaction))
-        return result.scalars().all()
+    async def get_transactions(
+        session: AsyncSession,
+        limit: int,
+        after: tuple[datetime, str] | None = None,
+        decision: str | None = None,
+        customer_id: str | None = None,
+        merchant_id: str | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> list[dict]:
+        """
+        Página de transacciones más recientes primero, paginada por keyset sobre
+        (created_at, id) y proyectada a las columnas ligeras del listado.
+        `after` es el (created_at, id) de la última fila de la página anterior.
+        """
+        columns = [getattr(Transaction, name) for name in TransactionListItem.model_fields]
+        stmt = select(*columns)
 
-    @staticmethod
-    async def update_analysis_results(session: AsyncSession, state: FraudDetectionState):
-        stmt = (
-            update(Transaction)
-            .where(Transaction.id == state.transaction.transaction_id)
-            .values(
-                decision=state.decision,
-                confidence=state.confidence,
-                signals=state.signals,
-                explanation_customer=state.explanation_customer,
-                explanation_audit=state.explanation_audit,
-                agent_route=state.agent_route,
-                citations_internal=[
-                    c.model_dump() if hasattr(c, "model_dump") else c
-                    for c in state.citations_internal
-                ],
-                citations_external=[
-                    c.model_dump() if hasattr(c, "model_dump") else c
-                    for c in state.citations_external
-                ],
-                processing_time_ms=int(
-                    (datetime.now(UTC) - state.start_time).total_seconds() * 1000
-                ),
+        if decision:
+            stmt = stmt.where(Transaction.decision == decision)
+        if customer_id:
+            stmt = stmt.where(Transaction.customer_id == customer_id)
+        if merchant_id:
+            stmt = stmt.where(Transaction.merchant_id == merchant_id)
+        if created_from:
+            stmt = stmt.where(Transaction.created_at >= created_from)
+        if created_to:
+            stmt = stmt.where(Transaction.created_at < created_to)
+        if after:
+            created_at, tx_id = after
+            stmt = stmt.where(
+                or_(
+                    Transaction.created_at < created_at,
+                    and_(Transaction.created_at == created_at, Transaction.id < tx_id),
+                )
             )
-        )
-        await session.execute(stmt)
 
-        # Si la decisión es ESCALATE, agregar a la cola de HITL
-        if state.decision == "ESCALATE_TO_HUMAN":
-            hitl_entry = HITLQueue(transaction_id=state.transaction.transaction_id)
-            session.add(hitl_entry)
+        stmt = stmt.order_by(Transaction.created_at.desc(), Transaction.id.desc()).limit(limit)
+        result = await session.execute(stmt)
+        return [dict(row) for row in result.mappings()]
 
-        await session.commit()
+    @staticmethod
+    def _analysis_values(state: FraudDetectionState) -> dict:
+        return {
+            "status": "COMPLETED",
+            "error": None,
+            "decision": state.decision,
+            "confidence": state.confidence,
+            "signals": state.signals,
+            "explanation_customer": state.explanation_customer,
+            "explanation_audit": state.explanation_audit,
+            "agent_route": state.agent_route,
+            "citations_internal": [
+                c.model_dump() if hasattr(c, "model_dump") else c for c in state.citations_internal
+            ],
+            "citations_external": [
+                c.model_dump() if hasattr(c, "model_dump") else c for c in state.citations_external
+            ],
+            "processing_time_ms": int(
+                (datetime.now(UTC) - state.start_time).total_seconds() * 1000
+            ),
+        }
 
     @staticmethod
-    async def save_audit_trail(session: AsyncSession, state: FraudDetectionState):
-        for i, evidence in enumerate(state.evidences):
-            audit = AuditTrail(
-                transaction_id=state.transaction.transaction_id,
-                agent_name=evidence.agent_name,
-                step_order=i,
-                output_data={
+    def _audit_rows(state: FraudDetectionState) -> list[dict]:
+        run_metrics = {m.node: m for m in state.agent_metrics}
+        return [
+            {
+                "transaction_id": state.transaction.transaction_id,
+                "agent_name": evidence.agent_name,
+                "step_order": i,
+                "execution_time_ms": (
+                    run_metrics[evidence.node].wall_ms if evidence.node in run_metrics else None
+                ),
+                "input_data": (
+                    run_metrics[evidence.node].model_dump(exclude={"wall_ms"})
+                    if evidence.node in run_metrics
+                    else None
+                ),
+                "output_data": {
                     "reasoning": evidence.reasoning,
                     "confidence": evidence.confidence,
                     "signals": [
                         s.model_dump() if hasattr(s, "model_dump") else s for s in evidence.signals
                     ],
                 },
+            }
+            for i, evidence in enumerate(state.evidences)
+        ]
+
+    @staticmethod
+    async def _insert_audit_and_hitl(session: AsyncSession, states: list[FraudDetectionState]):
+        audit_rows = [row for s in states for row in TransactionService._audit_rows(s)]
+        if audit_rows:
+            await session.execute(insert(AuditTrail), audit_rows)
+
+        # Si la decisión es ESCALATE, agregar a la cola de HITL
+        hitl_rows = [
+            {
+                "transaction_id": s.transaction.transaction_id,
+                "risk_score": s.risk_score if s.risk_score is not None else DEFAULT_HITL_RISK_SCORE,
+                "amount": s.transaction.amount,
+            }
+            for s in states
+            if s.decision == "ESCALATE_TO_HUMAN"
+        ]
+        if hitl_rows:
+            await session.execute(insert(HITLQueue), hitl_rows)
+
+    @staticmethod
+    def _approved(states: list[FraudDetectionState]) -> list[TransactionInput]:
+        return [s.transaction for s in states if s.decision == "APPROVE"]
+
+    @staticmethod
+    def to_input(db_tx: Transaction) -> TransactionInput:
+        return TransactionInput(
+            transaction_id=db_tx.id,
+            customer_id=db_tx.customer_id,
+            amount=db_tx.amount,
+            currency=db_tx.currency,
+            country=db_tx.country,
+            channel=db_tx.channel,
+            device_id=db_tx.device_id,
+            timestamp=db_tx.timestamp,
+            merchant_id=db_tx.merchant_id,
+        )
+
+    @staticmethod
+    async def save_analysis(session: AsyncSession, state: FraudDetectionState):
+        """
+        Unidad de trabajo de un análisis: la fila reservada al empezar (PROCESSING) recibe
+        sus resultados, y sus audit trails (executemany) y la entrada HITL se insertan en
+        la misma transacción, con un único commit y sin refresh.
+        """
+        await session.execute(
+            update(Transaction)
+            .where(Transaction.id == state.transaction.transaction_id)
+            .values(**TransactionService._analysis_values(state))
+        )
+        await TransactionService._insert_audit_and_hitl(session, [state])
+        await session.commit()
+        await ProfileService.observe_approved(TransactionService._approved([state]))
+
+    @staticmethod
+    async def get_existing_ids(session: AsyncSession, transaction_ids: list[str]) -> set[str]:
+        result = await session.execute(
+            select(Transaction.id).where(Transaction.id.in_(transaction_ids))
+        )
+        return set(result.scalars().all())
+
+    @staticmethod
+    async def bulk_create_transactions(
+        session: AsyncSession, tx_inputs: list[TransactionInput], status: str = "PENDING"
+    ):
+        """Inserta todas las transacciones con un único INSERT (executemany) y un commit"""
+        if not tx_inputs:
+            return
+        await session.execute(
+            insert(Transaction),
+            [
+                {
+                    **TransactionService._transaction_values(tx),
+                    "status": status,
+                    "lease_expires_at": TransactionService._lease_for(status),
+                }
+                for tx in tx_inputs
+            ],
+        )
+        await session.commit()
+
+    @staticmethod
+    async def bulk_save_analysis(
+        session: AsyncSession,
+        states: list[FraudDetectionState],
+        failures: dict[str, str] | None = None,
+    ):
+        """
+        Persiste resultados, audit trails y entradas HITL de varios análisis en una sola
+        transacción: un UPDATE por lotes por clave primaria y un INSERT masivo por tabla.
+        Las transacciones cuyo análisis falló (`failures`: id -> error) quedan FAILED con
+        su error en la misma transacción.
+        """
+        if not states and not failures:
+            return
+
+        if states:
+            await session.execute(
+                update(Transaction),
+                [
+                    {"id": s.transaction.transaction_id, **TransactionService._analysis_values(s)}
+                    for s in states
+                ],
+            )
+        if failures:
+            await session.execute(
+                update(Transaction),
+                [
+                    {"id": transaction_id, "status": "FAILED", "error": error}
+                    for transaction_id, error in failures.items()
+                ],
             )
-            session.add(audit)
+
+        await TransactionService._insert_audit_and_hitl(session, states)
         await session.commit()
+        await ProfileService.observe_approved(TransactionService._approved(states))
+
+    @staticmethod
+    async def set_status(
+        session: AsyncSession, transaction_id: str, status: str, error: str | None = None
+    ):
+        await session.execute(
+            update(Transaction)
+            .where(Transaction.id == transaction_id)
+            .values(status=status, error=error)
+        )
+        await session.commit()
+
+    @staticmethod
+    async def claim_job(session: AsyncSession, transaction_id: str) -> bool:
+        """
+        Pasa un job a PROCESSING con un lease nuevo si sigue QUEUED o su lease venció, en
+        un único UPDATE condicional: si varios procesos recuperaron el mismo job, solo uno
+        lo reclama. False si otro worker ya lo tiene o ya terminó.
+        """
+        now = datetime.now(UTC).replace(tzinfo=None)
+        result = await session.execute(
+            update(Transaction)
+            .where(Transaction.id == transaction_id, TransactionService._abandoned(now))
+            .values(
+                status="PROCESSING",
+                error=None,
+                lease_expires_at=TransactionService._lease_for("PROCESSING"),
+            )
+        )
+        await session.commit()
+        return cast(CursorResult, result).rowcount == 1
+
+    @staticmethod
+    async def get_unfinished_jobs(
+        session: AsyncSession, limit: int, after: tuple[datetime, str] | None = None
+    ) -> list[Transaction]:
+        """
+        Página de jobs que quedaron pendientes (p. ej. tras un reinicio): encolados, o en
+        proceso con el lease vencido. Más antiguos primero, keyset sobre (created_at, id).
+        """
+        stmt = select(Transaction).where(
+            TransactionService._abandoned(datetime.now(UTC).replace(tzinfo=None))
+        )
+        if after is not None:
+            created_at, last_id = after
+            stmt = stmt.where(
+                or_(
+                    Transaction.created_at > created_at,
+                    and_(Transaction.created_at == created_at, Transaction.id > last_id),
+                )
+            )
+        result = await session.execute(
+            stmt.order_by(Transaction.created_at, Transaction.id).limit(limit)
+        )
+        return list(result.scalars().all())
 
     @staticmethod
     async def get_audit_trails(session: AsyncSession, transaction_id: str):
@@ -97,26 +340,168 @@ class TransactionService:
 
 
 class HITLService:
+    # Orden de reclamo y del listado: mayor riesgo, mayor monto, más antiguo (índice
+    # ix_hitl_queue_priority)
+    PRIORITY = (
+        HITLQueue.risk_score.desc(),
+        HITLQueue.amount.desc(),
+        HITLQueue.created_at,
+        HITLQueue.id,
+    )
+
     @staticmethod
-    async def get_pending_queue(session: AsyncSession):
-        result = await session.execute(select(HITLQueue).where(HITLQueue.status == "PENDING"))
-        return result.scalars().all()
+    def _now() -> datetime:
+        # Las columnas DateTime se guardan sin zona horaria, en UTC (como `created_at`)
+        return datetime.now(UTC).replace(tzinfo=None)
+
+    @staticmethod
+    def _priority_key(item: HITLQueue) -> tuple:
+        return (-item.risk_score, -item.amount, item.created_at, item.id)
+
+    @staticmethod
+    async def get_queue(
+        session: AsyncSession,
+        limit: int,
+        status: str | None = "PENDING",
+        assigned_to: str | None = None,
+        after: tuple[float, float, datetime, int] | None = None,
+    ) -> list[HITLQueue]:
+        """
+        Página de la cola en orden de reclamo (`PRIORITY`), paginada por keyset sobre
+        (risk_score, amount, created_at, id) con el índice ix_hitl_queue_priority.
+        """
+        stmt = select(HITLQueue)
+        if status:
+            stmt = stmt.where(HITLQueue.status == status)
+        if assigned_to:
+            stmt = stmt.where(HITLQueue.assigned_to == assigned_to)
+        if after:
+            risk_score, amount, created_at, item_id = after
+            same_risk = HITLQueue.risk_score == risk_score
+            same_amount = and_(same_risk, HITLQueue.amount == amount)
+            stmt = stmt.where(
+                or_(
+                    HITLQueue.risk_score < risk_score,
+                    and_(same_risk, HITLQueue.amount < amount),
+                    and_(same_amount, HITLQueue.created_at > created_at),
+                    and_(same_amount, HITLQueue.created_at == created_at, HITLQueue.id > item_id),
+                )
+            )
+        stmt = stmt.order_by(*HITLService.PRIORITY).limit(limit)
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_item(session: AsyncSession, transaction_id: str) -> HITLQueue | None:
+        result = await session.execute(
+            select(HITLQueue).where(HITLQueue.transaction_id == transaction_id)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def claim(
+        session: AsyncSession, reviewer: str, n: int, lease_seconds: int
+    ) -> list[HITLQueue]:
+        """
+        Asigna atómicamente al revisor hasta `n` casos PENDING, por riesgo, monto y
+        antigüedad, con un lease de `lease_seconds`. Antes devuelve a la cola los
+        leases vencidos.
+
+        Cada paso es un único UPDATE ... WHERE id IN (SELECT ... LIMIT n FOR UPDATE SKIP
+        LOCKED) RETURNING: en Postgres los revisores concurrentes se saltan las filas que
+        otro está reclamando en lugar de esperarlas; en SQLite (sin FOR UPDATE) el UPDATE
+        toma el lock de escritura de la base, así que los reclamos se serializan y
+        tampoco pueden entregar el mismo caso dos veces.
+        """
+        now = HITLService._now()
+
+        expired = (
+            select(HITLQueue.id)
+            .where(HITLQueue.status == "OWNED", HITLQueue.lease_expires_at < now)
+            .with_for_update(skip_locked=True)
+        )
+        await session.execute(
+            update(HITLQueue)
+            .where(HITLQueue.id.in_(expired.scalar_subquery()))
+            .values(status="PENDING", assigned_to=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+
+        candidates = (
+            select(HITLQueue.id)
+            .where(HITLQueue.status == "PENDING")
+            .order_by(*HITLService.PRIORITY)
+            .limit(n)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(
+            update(HITLQueue)
+            .where(HITLQueue.id.in_(candidates.scalar_subquery()), HITLQueue.status == "PENDING")
+            .values(
+                status="OWNED",
+                assigned_to=reviewer,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+            )
+            .returning(HITLQueue)
+            .execution_options(synchronize_session=False)
+        )
+        items = result.scalars().all()
+        await session.commit()
+        # RETURNING no garantiza el orden de la subconsulta
+        return sorted(items, key=HITLService._priority_key)
+
+    @staticmethod
+    async def release(session: AsyncSession, transaction_id: str, reviewer: str) -> bool:
+        """Devuelve a la cola un caso reclamado por `reviewer` sin revisarlo"""
+        result = await session.execute(
+            update(HITLQueue)
+            .where(
+                HITLQueue.transaction_id == transaction_id,
+                HITLQueue.status == "OWNED",
+                HITLQueue.assigned_to == reviewer,
+            )
+            .values(status="PENDING", assigned_to=None, lease_expires_at=None)
+        )
+        await session.commit()
+        return cast(CursorResult, result).rowcount > 0
 
     @staticmethod
     async def submit_review(
-        session: AsyncSession, transaction_id: str, decision: str, comments: str
-    ):
+        session: AsyncSession,
+        transaction_id: str,
+        decision: str,
+        comments: str,
+        reviewer: str | None = None,
+    ) -> bool:
+        """
+        Registra la revisión si el caso sigue abierto y no está reclamado por otro
+        revisor con un lease vigente. Devuelve False si no se pudo revisar.
+        """
+        now = HITLService._now()
+        open_to_reviewer = [HITLQueue.status == "PENDING", HITLQueue.lease_expires_at < now]
+        if reviewer:
+            open_to_reviewer.append(HITLQueue.assigned_to == reviewer)
+
         stmt = (
             update(HITLQueue)
-            .where(HITLQueue.transaction_id == transaction_id)
+            .where(
+                HITLQueue.transaction_id == transaction_id,
+                HITLQueue.status != "REVIEWED",
+                or_(*open_to_reviewer),
+            )
             .values(
                 status="REVIEWED",
+                assigned_to=reviewer or HITLQueue.assigned_to,
+                lease_expires_at=None,
                 reviewer_decision=decision,
                 reviewer_comments=comments,
-                reviewed_at=datetime.now(UTC),
+                reviewed_at=now,
             )
         )
-        await session.execute(stmt)
+        result = await session.execute(stmt)
+        if cast(CursorResult, result).rowcount == 0:
+            await session.rollback()
+            return False
 
         # También actualizar la decisión final en la transacción
         tx_stmt = (
@@ -124,3 +509,74 @@ class HITLService:
         )
         await session.execute(tx_stmt)
         await session.commit()
+
+        # Una aprobación humana también alimenta el perfil del cliente
+        if decision == "APPROVE":
+            db_tx = await TransactionService.get_transaction(session, transaction_id)
+            if db_tx is not None:
+                await ProfileService.observe_approved([TransactionService.to_input(db_tx)])
+        return True
+
+
+class ProfileService:
+    # Locks por franja de clientes: serializan la lectura-actualización-escritura de un
+    # mismo perfil entre análisis concurrentes de este proceso sin ocupar conexiones
+    _locks = [asyncio.Lock() for _ in range(64)]
+
+    @staticmethod
+    async def observe_approved(transactions: list[TransactionInput]):
+        """
+        Incorpora transacciones aprobadas a los perfiles de sus clientes (O(1) por
+        transacción) con un único upsert y un commit, y actualiza la caché de perfiles.
+        Es best-effort: un fallo aquí no invalida el análisis ya guardado.
+
+        Los perfiles existentes se leen con `SELECT ... FOR UPDATE` en la misma
+        transacción del upsert, así que workers de distintos procesos que actualizan el
+        mismo cliente se serializan en la base de datos en lugar de pisarse. Solo la
+        primera observación de un cliente sin fila (nada que bloquear) es
+        last-write-wins entre procesos; en SQLite, sin `FOR UPDATE`, lo es siempre.
+        """
+        if not transactions:
+            return
+
+        locks = ProfileService._locks
+        stripes = sorted({hash(tx.customer_id) % len(locks) for tx in transactions})
+        customer_ids = sorted({tx.customer_id for tx in transactions})
+        try:
+            async with AsyncExitStack() as stack:
+                for stripe in stripes:
+                    await stack.enter_async_context(locks[stripe])
+
+                async with AsyncSessionLocal() as session:
+                    # Orden fijo de bloqueo para no crear deadlocks entre workers
+                    result = await session.execute(
+                        select(CustomerProfileStatsDB)
+                        .where(CustomerProfileStatsDB.customer_id.in_(customer_ids))
+                        .order_by(CustomerProfileStatsDB.customer_id)
+                        .with_for_update()
+                    )
+                    profiles = {row.customer_id: from_row(row) for row in result.scalars()}
+
+                    for tx in transactions:
+                        profile = (
+                            profiles.get(tx.customer_id)
+                            or await profile_cache.get(tx.customer_id)
+                            or new_profile(tx.customer_id, tx.amount)
+                        )
+                        profiles[tx.customer_id] = observe(profile, tx)
+
+                    now = datetime.now(UTC).replace(tzinfo=None)
+                    rows = [{**to_row(p), "updated_at": now} for p in profiles.values()]
+                    stmt = upsert_statement(
+                        session.get_bind().dialect.name,
+                        CustomerProfileStatsDB.__table__,
+                        "customer_id",
+                        tuple(column for column in rows[0] if column != "customer_id"),
+                    )
+                    await session.execute(stmt, rows)
+                    await session.commit()
+
+                for customer_id, profile in profiles.items():
+                    profile_cache.put(customer_id, profile)
+        except Exception as e:
+            print(f"⚠️ No se pudieron actualizar los perfiles de cliente: {e}")
@@ -0,0 +1,50 @@
+"""
+Deterministic transaction features derived from the customer's historical behavior
+"""
+
+from dataclasses import dataclass
+
+from app.models.schemas import CustomerProfile, TransactionInput
+from app.services.profile_engine import is_known, is_usual_hour
+
+
+@dataclass(frozen=True, slots=True)
+class TransactionFeatures:
+    """Features shared by the RAG query builder and the rule engine"""
+
+    amount: float
+    channel: str
+    has_history: bool
+    amount_ratio: float
+    hour_in_range: bool
+    domestic: bool
+    known_device: bool
+    velocity_alert: bool = False
+
+
+def extract_features(
+    tx: TransactionInput, profile: CustomerProfile | None, velocity_alert: bool = False
+) -> TransactionFeatures:
+    """Compare the transaction against the customer's usual amount, hours, countries and devices"""
+    if not profile:
+        return TransactionFeatures(
+            amount=tx.amount,
+            channel=tx.channel,
+            has_history=False,
+            amount_ratio=0.0,
+            hour_in_range=False,
+            domestic=False,
+            known_device=False,
+            velocity_alert=velocity_alert,
+        )
+
+    return TransactionFeatures(
+        amount=tx.amount,
+        channel=tx.channel,
+        has_history=True,
+        amount_ratio=tx.amount / max(profile.amount_mean, 1),
+        hour_in_range=is_usual_hour(profile, tx.timestamp.hour),
+        domestic=is_known(profile.countries, tx.country),
+        known_device=is_known(profile.devices, tx.device_id),
+        velocity_alert=velocity_alert,
+    )
@@ -0,0 +1,206 @@
+"""
+In-process queue of asynchronous analysis jobs (`POST /analyze?async=true`).
+
+The endpoint persists the transaction as QUEUED and returns 202 right away; a fixed
+pool of workers drains the queue, runs the graph and stores the results, so HTTP
+connections and DB sessions are not held for the whole analysis. The queue depth is
+bounded: `reserve()` fails when it is full and the endpoint answers 503 instead of
+letting latency grow without limit.
+
+A worker claims each job with a conditional UPDATE that also sets a lease
+(`JOB_LEASE_SECONDS`), so several API processes sharing the database never run the same
+job twice. On startup every QUEUED job, and every PROCESSING one whose lease expired, is
+re-enqueued; a large backlog keeps the queue over `max_depth` (new jobs get 503) until
+it drains.
+"""
+
+import asyncio
+import time
+from datetime import UTC, datetime
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.instrumentation import record_analysis
+from app.db.session import AsyncSessionLocal
+from app.models.schemas import FraudDetectionState, TransactionInput
+from app.services.db_service import TransactionService
+from app.services.warmup import get_fraud_graph
+
+
+class AnalysisJobQueue:
+    """Bounded queue + worker pool for background fraud analyses"""
+
+    def __init__(self, workers: int, max_depth: int):
+        self.workers = workers
+        self.max_depth = max_depth
+        self.stats = {
+            "enqueued": 0,
+            "rejected": 0,
+            "completed": 0,
+            "failed": 0,
+            "recovered": 0,
+            "skipped": 0,
+        }
+        self._queue: asyncio.Queue[tuple[TransactionInput, dict, float]] = asyncio.Queue()
+        self._reserved = 0
+        self._busy = 0
+        self._busy_seconds = 0.0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._started_at: float | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def depth(self) -> int:
+        """Jobs waiting for a worker, including slots reserved by in-flight requests"""
+        return self._queue.qsize() + self._reserved
+
+    def _count(self, outcome: str, amount: int = 1) -> None:
+        self.stats[outcome] += amount
+        metrics.JOBS.inc(amount, outcome=outcome)
+
+    def _publish(self) -> None:
+        metrics.JOB_QUEUE_DEPTH.set(self.depth)
+        metrics.JOB_BUSY_WORKERS.set(self._busy)
+
+    def reserve(self) -> bool:
+        """Reserve a queue slot before persisting the transaction; False if full"""
+        if not self._tasks or self.depth >= self.max_depth:
+            self._count("rejected")
+            return False
+        self._reserved += 1
+        self._publish()
+        return True
+
+    def release(self) -> None:
+        """Give back a reserved slot that will not be used"""
+        self._reserved -= 1
+        self._publish()
+
+    def submit(self, tx_input: TransactionInput, options: dict | None = None) -> None:
+        """
+        Enqueue a transaction whose slot was reserved with `reserve()`. `options` are
+        initial state fields of the request (analysis mode, latency budget); the budget
+        counts from when a worker picks the job up.
+        """
+        self._reserved -= 1
+        self._queue.put_nowait((tx_input, options or {}, time.perf_counter()))
+        self._count("enqueued")
+        self._publish()
+
+    async def start(self) -> None:
+        """Start the workers and re-enqueue jobs left unfinished by a previous process"""
+        if self._tasks or self.workers <= 0:
+            return
+        self._started_at = time.perf_counter()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"analysis-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+        metrics.JOB_WORKERS.set(len(self._tasks))
+
+        recovered = await self._recover()
+        print(f"🧵 {self.workers} workers de análisis iniciados ({recovered} jobs recuperados)")
+
+    async def _recover(self) -> int:
+        """Re-enqueue every unfinished job, paging through them by (created_at, id)"""
+        recovered = 0
+        after = None
+        while True:
+            async with AsyncSessionLocal() as session:
+                page = await TransactionService.get_unfinished_jobs(session, self.max_depth, after)
+            for tx in page:
+                # Las opciones de la petición original no se persisten: se usan las por defecto
+                self._queue.put_nowait((TransactionService.to_input(tx), {}, time.perf_counter()))
+            recovered += len(page)
+            if len(page) < self.max_depth:
+                break
+            after = (page[-1].created_at, page[-1].id)
+        self._count("recovered", recovered)
+        self._publish()
+        return recovered
+
+    async def aclose(self) -> None:
+        """Stop the workers; queued jobs stay QUEUED in the DB and are recovered on start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        metrics.JOB_WORKERS.set(0)
+
+    async def _worker(self) -> None:
+        while True:
+            tx_input, options, enqueued_at = await self._queue.get()
+            started = time.perf_counter()
+            wait = started - enqueued_at
+            self._wait_seconds += wait
+            self._max_wait_seconds = max(self._max_wait_seconds, wait)
+            metrics.JOB_WAIT.observe(wait)
+            self._busy += 1
+            self._publish()
+            try:
+                await self._process(tx_input, options)
+            except Exception as e:
+                # Nada de un job (ni la BD caída al marcarlo FAILED) debe matar al worker;
+                # la fila queda PROCESSING y se recupera cuando venza su lease
+                print(f"❌ Error no controlado en el job {tx_input.transaction_id}: {e}")
+            finally:
+                busy_seconds = time.perf_counter() - started
+                self._busy -= 1
+                self._busy_seconds += busy_seconds
+                metrics.JOB_BUSY_SECONDS.inc(busy_seconds)
+                self._publish()
+                self._queue.task_done()
+
+    async def _process(self, tx_input: TransactionInput, options: dict) -> None:
+        transaction_id = tx_input.transaction_id
+        async with AsyncSessionLocal() as session:
+            if not await TransactionService.claim_job(session, transaction_id):
+                print(f"⏭️ {transaction_id} ya lo procesa otro worker o ya terminó")
+                self._count("skipped")
+                return
+
+        try:
+            initial_state = FraudDetectionState(
+                transaction=tx_input, start_time=datetime.now(UTC), **options
+            )
+            print(f"🚀 Iniciando análisis asíncrono para {transaction_id}...")
+            final_state = FraudDetectionState(**await get_fraud_graph().ainvoke(initial_state))
+            record_analysis(final_state)
+
+            async with AsyncSessionLocal() as session:
+                await TransactionService.bulk_save_analysis(session, [final_state])
+            self._count("completed")
+
+        except Exception as e:
+            print(f"❌ Error en análisis asíncrono de {transaction_id}: {e}")
+            self._count("failed")
+            async with AsyncSessionLocal() as session:
+                await TransactionService.set_status(session, transaction_id, "FAILED", str(e))
+
+    def snapshot(self) -> dict:
+        uptime = time.perf_counter() - self._started_at if self._started_at else 0.0
+        dequeued = (
+            self.stats["completed"] + self.stats["failed"] + self.stats["skipped"] + self._busy
+        )
+        return {
+            **self.stats,
+            "workers": len(self._tasks),
+            "busy_workers": self._busy,
+            "queue_depth": self.depth,
+            "max_depth": self.max_depth,
+            "avg_wait_ms": round(self._wait_seconds / dequeued * 1000, 1) if dequeued else 0.0,
+            "max_wait_ms": round(self._max_wait_seconds * 1000, 1),
+            "utilization": (
+                round(self._busy_seconds / (uptime * len(self._tasks)), 3)
+                if uptime and self._tasks
+                else 0.0
+            ),
+        }
+
+
+analysis_jobs = AnalysisJobQueue(
+    workers=settings.JOB_WORKERS,
+    max_depth=settings.JOB_QUEUE_MAX_DEPTH,
+)
@@ -0,0 +1,222 @@
+"""
+Persisted FAISS index over the internal fraud policies.
+
+The index is built once (at startup or through the CLI) and stored on disk under a
+key derived from the policy set (`policy_id`, `rule`, `version`) and the embedding
+model. Workers load it memory-mapped, so per-request RAG cost is a single query
+embedding plus an in-memory search. When a policy is added or changed only that
+policy is re-embedded; the vectors of unchanged policies are reused.
+
+    uv run python -m app.services.policy_index build [--force]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_openai import OpenAIEmbeddings
+from pydantic import SecretStr
+
+from app.core.config import settings
+from app.core.llm import llm_registry
+from app.data.loader import POLICIES_PATH, load_fraud_policies
+from app.models.schemas import FraudPolicy
+
+MANIFEST_FILE = "manifest.json"
+
+
+def policy_hash(policy: FraudPolicy) -> str:
+    """Hash of everything that affects a policy's embedding or citation"""
+    payload = f"{policy.policy_id}\x1f{policy.version}\x1f{policy.rule}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def corpus_key(policies: list[FraudPolicy], model: str) -> str:
+    """Key of the whole policy set for a given embedding model"""
+    digest = hashlib.sha256(model.encode("utf-8"))
+    for h in sorted(policy_hash(p) for p in policies):
+        digest.update(h.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PolicyIndex:
+    """Build-once, memory-mapped vector index of the fraud policies"""
+
+    def __init__(self, index_dir: str | Path, model: str | None = None):
+        self.index_dir = Path(index_dir)
+        self.model = model or settings.OPENAI_EMBEDDING_MODEL
+        self.key: str | None = None
+        self._index: faiss.Index | None = None
+        self._docs: list[Document] = []
+        self._embeddings: OpenAIEmbeddings | None = None
+        self._source_mtime: float | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def embeddings(self) -> OpenAIEmbeddings:
+        if self._embeddings is None:
+            self._embeddings = OpenAIEmbeddings(
+                model=self.model,
+                api_key=SecretStr(settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None,
+                base_url=settings.OPENAI_BASE_URL or None,
+                # Los endpoints compatibles no aceptan listas de tokens de tiktoken
+                check_embedding_ctx_length=not settings.OPENAI_BASE_URL,
+                max_retries=llm_registry.sdk_max_retries,
+                http_async_client=llm_registry.http_client,
+            )
+        return self._embeddings
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._index is not None
+
+    def _read_manifest(self) -> dict | None:
+        path = self.index_dir / MANIFEST_FILE
+        if not path.exists():
+            return None
+        with open(path) as f:
+            manifest: dict = json.load(f)
+        return manifest
+
+    def load(self, key: str | None = None) -> bool:
+        """Load the persisted index (memory-mapped) if it matches `key`"""
+        manifest = self._read_manifest()
+        if manifest is None or (key is not None and manifest["key"] != key):
+            return False
+
+        index_path = str(self.index_dir / manifest["index_file"])
+        try:
+            index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            index = faiss.read_index(index_path)
+
+        self._index = index
+        self._docs = [
+            Document(
+                page_content=p["rule"],
+                metadata={"policy_id": p["policy_id"], "version": p["version"]},
+            )
+            for p in manifest["policies"]
+        ]
+        self.key = manifest["key"]
+        return True
+
+    async def build(self, policies: list[FraudPolicy] | None = None, force: bool = False) -> int:
+        """
+        (Re)build the index for `policies` and persist it.
+        Returns the number of policies that had to be embedded (0 if up to date).
+        """
+        if policies is None:
+            policies = await load_fraud_policies()
+        key = corpus_key(policies, self.model)
+
+        if not force and self.load(key):
+            return 0
+
+        previous: dict[str, np.ndarray] = {}
+        manifest = self._read_manifest()
+        if manifest is not None and manifest.get("model") == self.model and not force:
+            vectors = np.load(self.index_dir / manifest["vectors_file"], mmap_mode="r")
+            previous = {p["hash"]: vectors[i] for i, p in enumerate(manifest["policies"])}
+
+        hashes = [policy_hash(p) for p in policies]
+        missing = [p for p, h in zip(policies, hashes, strict=True) if h not in previous]
+        if missing:
+            new_vectors = await self.embeddings.aembed_documents([p.rule for p in missing])
+            for p, vec in zip(missing, new_vectors, strict=True):
+                previous[policy_hash(p)] = np.asarray(vec, dtype=np.float32)
+
+        matrix = np.vstack([previous[h] for h in hashes]).astype(np.float32)
+        index = faiss.IndexFlatL2(matrix.shape[1])
+        index.add(matrix)
+
+        self._persist(key, policies, hashes, matrix, index)
+        self.load(key)
+        print(f"📚 Policy index {key[:12]} listo ({len(missing)}/{len(policies)} embebidas)")
+        return len(missing)
+
+    def _persist(
+        self,
+        key: str,
+        policies: list[FraudPolicy],
+        hashes: list[str],
+        matrix: np.ndarray,
+        index: faiss.Index,
+    ) -> None:
+        """
+        Write versioned data files first and swap the manifest atomically last, so
+        other workers never observe a half-written index.
+        """
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        index_file = f"policies-{key[:16]}.faiss"
+        vectors_file = f"vectors-{key[:16]}.npy"
+
+        faiss.write_index(index, str(self.index_dir / index_file))
+        np.save(self.index_dir / vectors_file, matrix)
+
+        manifest = {
+            "key": key,
+            "model": self.model,
+            "dim": int(matrix.shape[1]),
+            "index_file": index_file,
+            "vectors_file": vectors_file,
+            "policies": [
+                {"policy_id": p.policy_id, "version": p.version, "rule": p.rule, "hash": h}
+                for p, h in zip(policies, hashes, strict=True)
+            ],
+        }
+        tmp_path = self.index_dir / f"{MANIFEST_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_dir / MANIFEST_FILE)
+
+        for stale in self.index_dir.glob("*-*.*"):
+            if stale.name not in (index_file, vectors_file) and stale.suffix in (".faiss", ".npy"):
+                stale.unlink(missing_ok=True)
+
+    async def ensure_ready(self) -> None:
+        """Load or (incrementally) rebuild the index when the policy file changes"""
+        mtime = POLICIES_PATH.stat().st_mtime
+        if self.is_loaded and mtime == self._source_mtime:
+            return
+
+        async with self._lock:
+            if self.is_loaded and mtime == self._source_mtime:
+                return
+            await self.build()
+            self._source_mtime = mtime
+
+    async def asearch(self, query: str, k: int = 3) -> list[Document]:
+        """Embed `query` once and return the `k` closest policies"""
+        await self.ensure_ready()
+
+        vector = await self.embeddings.aembed_query(query)
+        index = self._index
+        if index is None:
+            raise RuntimeError(f"Policy index not loaded from {self.index_dir}")
+        k = min(k, index.ntotal)
+        _, ids = index.search(np.asarray([vector], dtype=np.float32), k)
+        return [self._docs[i] for i in ids[0] if i >= 0]
+
+
+policy_index = PolicyIndex(settings.POLICY_INDEX_DIR)
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Gestión del índice de políticas de fraude")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--force", action="store_true", help="re-embed every policy")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        await policy_index.build(force=args.force)
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,118 @@
+"""
+In-process cache of customer profiles.
+
+Sits in front of `customer_profile_stats` / `customer_behavior` so that, in steady
+state, profile lookups never touch the DB connection pool. The cache is warmed at
+startup and concurrent misses for the same customer are coalesced into one query.
+Profiles updated by the profile engine are written through by `ProfileService`;
+committed changes to the `CustomerBehaviorDB` snapshot (ORM objects or ORM-enabled bulk
+statements) invalidate the cached entries.
+"""
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.core.config import settings
+from app.core.lru import AsyncLoadingCache
+from app.db.models import CustomerBehaviorDB, CustomerProfileStatsDB
+from app.db.session import AsyncSessionLocal
+from app.models.schemas import CustomerBehavior, CustomerProfile
+from app.services.profile_engine import bootstrap_profile, from_row
+
+CHANGED_KEY = "customer_behavior_changed"
+CLEAR_KEY = "customer_behavior_bulk_changed"
+
+
+def to_schema(db_behavior: CustomerBehaviorDB) -> CustomerBehavior:
+    return CustomerBehavior(
+        customer_id=db_behavior.customer_id,
+        usual_amount_avg=db_behavior.usual_amount_avg,
+        usual_hours=db_behavior.usual_hours,
+        usual_countries=db_behavior.usual_countries,
+        usual_devices=db_behavior.usual_devices,
+    )
+
+
+async def fetch_customer_profile(customer_id: str) -> CustomerProfile | None:
+    """Running statistics if any, else the profile bootstrapped from the static snapshot"""
+    async with AsyncSessionLocal() as session:
+        stats = await session.get(CustomerProfileStatsDB, customer_id)
+        if stats is not None:
+            return from_row(stats)
+        db_behavior = await session.get(CustomerBehaviorDB, customer_id)
+        return bootstrap_profile(to_schema(db_behavior)) if db_behavior else None
+
+
+class CustomerProfileCache(AsyncLoadingCache):
+    """LRU/TTL cache of `CustomerProfile` keyed by `customer_id`"""
+
+    async def warm(self) -> int:
+        """Preload up to `max_entries` profiles: running statistics first, then snapshots"""
+        limit = self.cache.max_entries
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(CustomerProfileStatsDB)
+                .order_by(CustomerProfileStatsDB.updated_at.desc())
+                .limit(limit)
+            )
+            profiles = [from_row(row) for row in result.scalars().all()]
+
+            if len(profiles) < limit:
+                result = await session.execute(
+                    select(CustomerBehaviorDB)
+                    .where(
+                        CustomerBehaviorDB.customer_id.not_in(
+                            select(CustomerProfileStatsDB.customer_id)
+                        )
+                    )
+                    .order_by(CustomerBehaviorDB.updated_at.desc())
+                    .limit(limit - len(profiles))
+                )
+                profiles += [bootstrap_profile(to_schema(row)) for row in result.scalars()]
+
+        for profile in profiles:
+            self.put(profile.customer_id, profile)
+        print(f"👥 Caché de perfiles precargada con {len(profiles)} clientes")
+        return len(profiles)
+
+
+profile_cache = CustomerProfileCache(
+    loader=fetch_customer_profile,
+    max_entries=settings.PROFILE_CACHE_MAX_ENTRIES,
+    ttl=settings.PROFILE_CACHE_TTL_SECONDS,
+    negative_ttl=settings.PROFILE_CACHE_NEGATIVE_TTL_SECONDS,
+)
+
+
+# --- Invalidación: los cambios confirmados en customer_behavior descartan la entrada ---
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_profiles(session: Session, flush_context) -> None:
+    changed = session.info.setdefault(CHANGED_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, CustomerBehaviorDB):
+            changed.add(obj.customer_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_changes(orm_execute_state: ORMExecuteState) -> None:
+    statement = orm_execute_state.statement
+    if orm_execute_state.is_select or not hasattr(statement, "table"):
+        return
+    if statement.table.name == CustomerBehaviorDB.__tablename__:
+        orm_execute_state.session.info[CLEAR_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_profile_changes(session: Session) -> None:
+    if session.info.pop(CLEAR_KEY, False):
+        profile_cache.clear()
+    for customer_id in session.info.pop(CHANGED_KEY, ()):
+        profile_cache.invalidate(customer_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_profile_changes(session: Session) -> None:
+    session.info.pop(CHANGED_KEY, None)
+    session.info.pop(CLEAR_KEY, None)
@@ -0,0 +1,159 @@
+"""
+Incrementally maintained customer behavior profiles.
+
+Each approved transaction is folded into the customer's `CustomerProfile` in O(1):
+
+- amount: exponentially weighted mean and variance (`PROFILE_EWMA_ALPHA`);
+- hour of day: 24-bucket histogram;
+- countries and devices: Space-Saving sketches bounded to `PROFILE_SKETCH_SIZE`
+  entries, so a customer with hundreds of devices still costs a few bytes.
+
+Customers without running statistics are bootstrapped once from the static
+`customer_behavior` snapshot (`usual_hours`, comma-separated countries/devices), which
+then weighs as `PROFILE_BOOTSTRAP_WEIGHT` observations. Consumers (features, agents)
+query the structured profile with the helpers below and never parse strings.
+"""
+
+import numpy as np
+
+from app.core.config import settings
+from app.db.models import CustomerProfileStatsDB
+from app.models.schemas import CustomerBehavior, CustomerProfile, TransactionInput
+
+Sketch = dict[str, tuple[float, float]]
+
+HOURS = 24
+# Coeficiente de variación asumido para la varianza inicial del monto
+BOOTSTRAP_AMOUNT_CV = 0.5
+
+
+def _usual_hours(usual_hours: str) -> list[int]:
+    start, end = (int(h) % HOURS for h in usual_hours.split("-"))
+    if start <= end:
+        return list(range(start, end + 1))
+    return [*range(start, HOURS), *range(0, end + 1)]  # rango que cruza la medianoche
+
+
+def bootstrap_profile(behavior: CustomerBehavior) -> CustomerProfile:
+    """Profile prior from the static snapshot (the only place its strings are parsed)"""
+    weight = settings.PROFILE_BOOTSTRAP_WEIGHT
+    hours = _usual_hours(behavior.usual_hours)
+    histogram = [0.0] * HOURS
+    for hour in hours:
+        histogram[hour] = weight / len(hours)
+
+    def sketch(items: str) -> Sketch:
+        values = [v.strip() for v in items.split(",") if v.strip()]
+        return {v: (weight, 0.0) for v in values[: settings.PROFILE_SKETCH_SIZE]}
+
+    return CustomerProfile(
+        customer_id=behavior.customer_id,
+        amount_mean=behavior.usual_amount_avg,
+        amount_var=(BOOTSTRAP_AMOUNT_CV * behavior.usual_amount_avg) ** 2,
+        hour_histogram=histogram,
+        countries=sketch(behavior.usual_countries),
+        devices=sketch(behavior.usual_devices),
+    )
+
+
+def new_profile(customer_id: str, amount: float) -> CustomerProfile:
+    return CustomerProfile(customer_id=customer_id, amount_mean=amount)
+
+
+def _space_saving(sketch: Sketch, item: str, capacity: int) -> None:
+    """Space-Saving update: when full, the least frequent entry is evicted and the new
+    item inherits its count as error, so `count - error` never overestimates"""
+    if item in sketch:
+        count, error = sketch[item]
+        sketch[item] = (count + 1, error)
+    elif len(sketch) < capacity:
+        sketch[item] = (1.0, 0.0)
+    else:
+        victim = min(sketch, key=lambda k: sketch[k][0])
+        floor = sketch.pop(victim)[0]
+        sketch[item] = (floor + 1, floor)
+
+
+def observe(profile: CustomerProfile, tx: TransactionInput) -> CustomerProfile:
+    """New profile with `tx` folded in (the input is not mutated)"""
+    alpha = settings.PROFILE_EWMA_ALPHA
+    diff = tx.amount - profile.amount_mean
+    increment = alpha * diff
+
+    histogram = list(profile.hour_histogram)
+    histogram[tx.timestamp.hour] += 1
+    countries, devices = dict(profile.countries), dict(profile.devices)
+    _space_saving(countries, tx.country, settings.PROFILE_SKETCH_SIZE)
+    _space_saving(devices, tx.device_id, settings.PROFILE_SKETCH_SIZE)
+
+    return profile.model_copy(
+        update={
+            "observations": profile.observations + 1,
+            "amount_mean": profile.amount_mean + increment,
+            "amount_var": (1 - alpha) * (profile.amount_var + diff * increment),
+            "hour_histogram": histogram,
+            "countries": countries,
+            "devices": devices,
+        }
+    )
+
+
+# --- Consultas sobre el perfil ---
+
+
+def amount_zscore(profile: CustomerProfile, amount: float) -> float:
+    std = profile.amount_var**0.5
+    return (amount - profile.amount_mean) / std if std > 0 else 0.0
+
+
+def hour_share(profile: CustomerProfile, hour: int) -> float:
+    total = sum(profile.hour_histogram)
+    return profile.hour_histogram[hour] / total if total else 0.0
+
+
+def is_usual_hour(profile: CustomerProfile, hour: int) -> bool:
+    histogram = profile.hour_histogram
+    return histogram[hour] > 0 and (
+        histogram[hour] >= settings.PROFILE_USUAL_HOUR_MIN_SHARE * sum(histogram)
+    )
+
+
+def usual_hours(profile: CustomerProfile) -> list[int]:
+    return [h for h in range(HOURS) if is_usual_hour(profile, h)]
+
+
+def is_known(sketch: Sketch, item: str) -> bool:
+    """Seen at least once since it entered the sketch (guaranteed count >= 1)"""
+    entry = sketch.get(item)
+    return entry is not None and entry[0] - entry[1] >= 1
+
+
+def top_items(sketch: Sketch) -> list[str]:
+    return [k for k, _ in sorted(sketch.items(), key=lambda kv: kv[1][0], reverse=True)]
+
+
+# --- Persistencia compacta (customer_profile_stats) ---
+
+
+def to_row(profile: CustomerProfile) -> dict:
+    return {
+        "customer_id": profile.customer_id,
+        "observations": profile.observations,
+        "amount_mean": profile.amount_mean,
+        "amount_var": profile.amount_var,
+        "hour_histogram": np.asarray(profile.hour_histogram, dtype="<f4").tobytes(),
+        "countries": {k: list(v) for k, v in profile.countries.items()},
+        "devices": {k: list(v) for k, v in profile.devices.items()},
+    }
+
+
+def from_row(row: CustomerProfileStatsDB) -> CustomerProfile:
+    return CustomerProfile(
+        customer_id=row.customer_id,
+        observations=row.observations,
+        amount_mean=row.amount_mean,
+        amount_var=row.amount_var,
+        hour_histogram=np.frombuffer(row.hour_histogram, dtype="<f4").tolist(),
+        countries={k: tuple(v) for k, v in row.countries.items()},
+        devices={k: tuple(v) for k, v in row.devices.items()},
+    )
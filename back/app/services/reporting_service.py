@@ -1,7 +1,6 @@
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.prompts import ChatPromptTemplate
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import agent_scope
 from app.core.constants import EXPLAINABILITY_AGENT_NAME, MAP_AGENT_MODEL
 from app.core.llm import get_llm
 from app.services.db_service import TransactionService
@@ -10,6 +9,10 @@ from app.services.db_service import TransactionService
 class ReportingService:
     @staticmethod
     async def generate_audit_summary(session: AsyncSession, transaction_id: str) -> str:
+        # Import diferido: los prompts de LangChain no se cargan al importar la API
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import ChatPromptTemplate
+
         transaction = await TransactionService.get_transaction(session, transaction_id)
         if not transaction:
             return "Transaction not found."
@@ -61,18 +64,19 @@ class ReportingService:
 
         chain = prompt | llm | StrOutputParser()
 
-        summary = await chain.ainvoke(
-            {
-                "tx_id": transaction_id,
-                "amount": transaction.amount,
-                "currency": transaction.currency,
-                "customer_id": transaction.customer_id,
-                "decision": transaction.decision,
-                "confidence": f"{transaction.confidence * 100:.1f}%"
-                if transaction.confidence
-                else "N/A",
-                "trails": trails_context,
-            }
-        )
+        with agent_scope("reporting"):
+            summary = await chain.ainvoke(
+                {
+                    "tx_id": transaction_id,
+                    "amount": transaction.amount,
+                    "currency": transaction.currency,
+                    "customer_id": transaction.customer_id,
+                    "decision": transaction.decision,
+                    "confidence": f"{transaction.confidence * 100:.1f}%"
+                    if transaction.confidence
+                    else "N/A",
+                    "trails": trails_context,
+                }
+            )
 
         return summary
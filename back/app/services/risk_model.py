@@ -0,0 +1,236 @@
+"""
+Local risk-scoring model (L2-regularised logistic regression in NumPy).
+
+Every transaction is mapped to a fixed feature vector built from the transaction and
+the customer profile: amount and amount ratio, hour deviation from the usual hours,
+new country/device, channel one-hot and a hashed merchant one-hot. The model is
+trained offline (`python -m app.data.train_risk_model`) from past decisions and HITL
+labels, stored as JSON in `RISK_MODEL_PATH` and reloaded when the file changes.
+Scoring is one feature vector and one dot product (tens of microseconds per
+transaction, no I/O), or a single matrix-vector product for a whole batch.
+"""
+
+import json
+import math
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.schemas import CustomerProfile, DecisionType, TransactionInput
+from app.services.profile_engine import amount_zscore, is_known, usual_hours
+
+CHANNELS = ("web", "mobile", "atm", "pos")
+NUMERIC_FEATURES = (
+    "log_amount",
+    "log_amount_ratio",
+    "amount_zscore",
+    "hour_deviation",
+    "new_country",
+    "new_device",
+    "no_history",
+)
+
+# Mismos umbrales que el árbitro para convertir un riesgo en decisión
+RISK_THRESHOLDS: tuple[tuple[float, DecisionType], ...] = (
+    (0.85, "BLOCK"),
+    (0.65, "ESCALATE_TO_HUMAN"),
+    (0.35, "CHALLENGE"),
+)
+
+
+def decision_for_risk(risk_score: float) -> DecisionType:
+    for threshold, decision in RISK_THRESHOLDS:
+        if risk_score >= threshold:
+            return decision
+    return "APPROVE"
+
+
+def feature_names(merchant_buckets: int) -> list[str]:
+    return [
+        *NUMERIC_FEATURES,
+        *(f"channel_{c}" for c in (*CHANNELS, "other")),
+        *(f"merchant_{i}" for i in range(merchant_buckets)),
+    ]
+
+
+def hour_deviation(profile: CustomerProfile, hour: int) -> float:
+    """Circular distance (in half-days) from `hour` to the nearest usual hour"""
+    hours = usual_hours(profile)
+    if not hours:
+        return 1.0
+    return min(min(abs(hour - h), 24 - abs(hour - h)) for h in hours) / 12
+
+
+def fill_features(
+    row: np.ndarray, tx: TransactionInput, profile: CustomerProfile | None, merchant_buckets: int
+) -> None:
+    """Write the feature vector of `tx` into `row` (zeroed, `len(feature_names(...))`)"""
+    row[0] = math.log1p(max(tx.amount, 0.0))
+    if profile is None:
+        row[3] = row[4] = row[5] = row[6] = 1.0
+    else:
+        row[1] = max(min(math.log(max(tx.amount, 0.01) / max(profile.amount_mean, 1)), 5.0), -5.0)
+        row[2] = max(min(amount_zscore(profile, tx.amount), 10.0), -10.0)
+        row[3] = hour_deviation(profile, tx.timestamp.hour)
+        row[4] = 0.0 if is_known(profile.countries, tx.country) else 1.0
+        row[5] = 0.0 if is_known(profile.devices, tx.device_id) else 1.0
+
+    offset = len(NUMERIC_FEATURES)
+    channel = tx.channel.lower()
+    row[offset + (CHANNELS.index(channel) if channel in CHANNELS else len(CHANNELS))] = 1.0
+    offset += len(CHANNELS) + 1
+    row[offset + zlib.crc32(tx.merchant_id.encode()) % merchant_buckets] = 1.0
+
+
+def feature_matrix(
+    transactions: list[TransactionInput],
+    profiles: list[CustomerProfile | None],
+    merchant_buckets: int,
+) -> np.ndarray:
+    matrix = np.zeros((len(transactions), len(feature_names(merchant_buckets))))
+    for row, tx, profile in zip(matrix, transactions, profiles, strict=True):
+        fill_features(row, tx, profile, merchant_buckets)
+    return matrix
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    probability: np.ndarray = 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+    return probability
+
+
+def roc_auc(labels: np.ndarray, scores: np.ndarray) -> float:
+    """Mann-Whitney AUC, tied scores get their average rank"""
+    positives, negatives = scores[labels == 1], scores[labels == 0]
+    if not len(positives) or not len(negatives):
+        return float("nan")
+    _, inverse, counts = np.unique(
+        np.concatenate([positives, negatives]), return_inverse=True, return_counts=True
+    )
+    ranks = (np.cumsum(counts) - (counts - 1) / 2)[inverse]
+    rank_sum = ranks[: len(positives)].sum()
+    n_pos, n_neg = len(positives), len(negatives)
+    return float((rank_sum - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg))
+
+
+@dataclass
+class RiskModel:
+    """Standardised logistic regression over `feature_names(merchant_buckets)`"""
+
+    merchant_buckets: int
+    mean: list[float]
+    scale: list[float]
+    weights: list[float]
+    bias: float
+    metadata: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        # Pesos ya divididos por la escala: score = sigmoid(x @ w + b) sin normalizar x
+        scale = np.asarray(self.scale)
+        self._w = np.asarray(self.weights) / scale
+        self._b = self.bias - float(np.asarray(self.mean) @ self._w)
+        self._row = np.zeros(len(self.weights))
+
+    @property
+    def features(self) -> list[str]:
+        return feature_names(self.merchant_buckets)
+
+    def score_matrix(self, matrix: np.ndarray) -> np.ndarray:
+        return _sigmoid(matrix @ self._w + self._b)
+
+    def score(self, tx: TransactionInput, profile: CustomerProfile | None) -> float:
+        row = self._row
+        row.fill(0.0)
+        fill_features(row, tx, profile, self.merchant_buckets)
+        return 1.0 / (1.0 + math.exp(-max(min(float(row @ self._w) + self._b, 30.0), -30.0)))
+
+    def score_batch(
+        self, transactions: list[TransactionInput], profiles: list[CustomerProfile | None]
+    ) -> np.ndarray:
+        return self.score_matrix(feature_matrix(transactions, profiles, self.merchant_buckets))
+
+    def contributions(
+        self, tx: TransactionInput, profile: CustomerProfile | None, top: int = 3
+    ) -> list[tuple[str, float]]:
+        """Features that push the score the most (signed log-odds contributions)"""
+        row = np.zeros(len(self.weights))
+        fill_features(row, tx, profile, self.merchant_buckets)
+        standardized = (row - np.asarray(self.mean)) / np.asarray(self.scale)
+        contrib = standardized * np.asarray(self.weights)
+        order = np.argsort(-np.abs(contrib))[:top]
+        return [(self.features[i], round(float(contrib[i]), 3)) for i in order]
+
+    @classmethod
+    def fit(
+        cls,
+        matrix: np.ndarray,
+        labels: np.ndarray,
+        sample_weight: np.ndarray | None = None,
+        l2: float = settings.RISK_MODEL_L2,
+        merchant_buckets: int = settings.RISK_MODEL_MERCHANT_BUCKETS,
+        max_iter: int = 50,
+        tol: float = 1e-8,
+    ) -> "RiskModel":
+        """Newton-Raphson (IRLS) on standardised features, L2 on the weights only"""
+        weight = np.ones(len(labels)) if sample_weight is None else sample_weight
+        mean = np.average(matrix, axis=0, weights=weight)
+        scale = np.sqrt(np.average((matrix - mean) ** 2, axis=0, weights=weight))
+        scale[scale < 1e-9] = 1.0
+
+        x = np.hstack([(matrix - mean) / scale, np.ones((len(matrix), 1))])
+        theta = np.zeros(x.shape[1])
+        penalty = np.full(x.shape[1], l2)
+        penalty[-1] = 0.0
+        for _ in range(max_iter):
+            p = _sigmoid(x @ theta)
+            gradient = x.T @ (weight * (p - labels)) + penalty * theta
+            hessian = (x.T * (weight * p * (1 - p))) @ x + np.diag(penalty + 1e-9)
+            step = np.linalg.solve(hessian, gradient)
+            theta -= step
+            if np.max(np.abs(step)) < tol:
+                break
+
+        return cls(
+            merchant_buckets=merchant_buckets,
+            mean=mean.tolist(),
+            scale=scale.tolist(),
+            weights=theta[:-1].tolist(),
+            bias=float(theta[-1]),
+        )
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"features": self.features, **asdict(self)}
+        path.write_text(json.dumps(payload, indent=2))
+
+    @classmethod
+    def load(cls, path: Path) -> "RiskModel":
+        payload = json.loads(path.read_text())
+        if payload.pop("features") != feature_names(payload["merchant_buckets"]):
+            raise ValueError(f"{path} was trained with a different feature set")
+        return cls(**payload)
+
+
+_model: RiskModel | None = None
+_model_mtime: float | None = None
+
+
+def get_risk_model() -> RiskModel | None:
+    """Model stored in `RISK_MODEL_PATH`, reloaded when the file changes; None if absent"""
+    global _model, _model_mtime
+
+    path = Path(settings.RISK_MODEL_PATH)
+    if not settings.RISK_MODEL_ENABLED or not path.exists():
+        return None
+
+    mtime = path.stat().st_mtime
+    if mtime != _model_mtime:
+        try:
+            _model = RiskModel.load(path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Modelo de riesgo inválido en {path}: {e}")
+            _model = None
+        _model_mtime = mtime
+    return _model
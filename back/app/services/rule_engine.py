@@ -0,0 +1,130 @@
+"""
+Deterministic pre-screening of transactions.
+
+Policies with machine-readable `conditions` in `fraud_policies.json` are compiled into
+plain predicates over `TransactionFeatures` once, and evaluated in microseconds before
+the LLM graph runs. Only unambiguous cases are decided here:
+
+- one or more policies match → the most severe policy action;
+- the transaction matches the customer's habits on every feature and no velocity
+  counter is above its threshold → APPROVE.
+
+Everything else returns `None` and falls through to the multi-agent graph.
+"""
+
+import operator
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.config import settings
+from app.data.loader import POLICIES_PATH, load_fraud_policies
+from app.models.schemas import DecisionType, FraudPolicy, PolicyCondition
+from app.services.features import TransactionFeatures
+
+OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# Orden de severidad para resolver varias políticas aplicables a la vez
+DECISION_SEVERITY: dict[str, int] = {
+    "APPROVE": 0,
+    "CHALLENGE": 1,
+    "ESCALATE_TO_HUMAN": 2,
+    "BLOCK": 3,
+}
+
+RULE_ENGINE_CONFIDENCE = 0.95
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledPolicy:
+    policy_id: str
+    version: str
+    rule: str
+    action: DecisionType
+    predicate: Callable[[TransactionFeatures], bool]
+
+
+@dataclass(frozen=True, slots=True)
+class PrescreenResult:
+    decision: DecisionType
+    matched: tuple[CompiledPolicy, ...]
+    features: TransactionFeatures
+
+
+def _compile_condition(condition: PolicyCondition) -> Callable[[TransactionFeatures], bool]:
+    if condition.feature not in TransactionFeatures.__slots__:
+        raise ValueError(f"Unknown feature in policy condition: {condition.feature}")
+
+    getter = operator.attrgetter(condition.feature)
+    compare = OPERATORS[condition.op]
+    value = condition.value
+    return lambda features: compare(getter(features), value)
+
+
+def compile_policy(policy: FraudPolicy) -> CompiledPolicy | None:
+    """Compile a policy into a predicate; policies without conditions stay LLM-only"""
+    if not policy.action or not policy.conditions:
+        return None
+
+    checks = tuple(_compile_condition(c) for c in policy.conditions)
+    return CompiledPolicy(
+        policy_id=policy.policy_id,
+        version=policy.version,
+        rule=policy.rule,
+        action=policy.action,
+        predicate=lambda features: all(check(features) for check in checks),
+    )
+
+
+class RuleEngine:
+    """Compiled set of machine-readable fraud policies"""
+
+    def __init__(self, policies: list[FraudPolicy]):
+        compiled = (compile_policy(p) for p in policies)
+        self.policies: tuple[CompiledPolicy, ...] = tuple(p for p in compiled if p)
+
+    @staticmethod
+    def is_clearly_normal(features: TransactionFeatures) -> bool:
+        return (
+            features.has_history
+            and features.amount_ratio <= 1
+            and features.amount <= settings.RULE_ENGINE_APPROVE_MAX_AMOUNT
+            and features.hour_in_range
+            and features.domestic
+            and features.known_device
+            and not features.velocity_alert
+        )
+
+    def evaluate(self, features: TransactionFeatures) -> PrescreenResult | None:
+        """Return a decision when the case is unambiguous, `None` otherwise"""
+        matched = tuple(p for p in self.policies if p.predicate(features))
+        if matched:
+            decision = max((p.action for p in matched), key=DECISION_SEVERITY.__getitem__)
+            return PrescreenResult(decision=decision, matched=matched, features=features)
+
+        if self.is_clearly_normal(features):
+            return PrescreenResult(decision="APPROVE", matched=(), features=features)
+
+        return None
+
+
+_engine: RuleEngine | None = None
+_engine_mtime: float | None = None
+
+
+async def get_rule_engine() -> RuleEngine:
+    """Rule engine compiled from the policy file, recompiled when the file changes"""
+    global _engine, _engine_mtime
+
+    mtime = POLICIES_PATH.stat().st_mtime
+    if _engine is None or mtime != _engine_mtime:
+        _engine = RuleEngine(await load_fraud_policies())
+        _engine_mtime = mtime
+    return _engine
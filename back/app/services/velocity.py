@@ -0,0 +1,310 @@
+"""
+Sliding-window velocity counters per customer, device and merchant.
+
+Every analysed transaction is counted (with its amount) under `customer:<id>`,
+`device:<id>` and `merchant:<id>` for each window of `VELOCITY_WINDOWS_SECONDS`, using
+event time (the transaction timestamp). A window is a ring of `VELOCITY_SLOTS` time
+buckets with running totals, so both recording and reading are O(1) (amortised over
+bucket expiry); its edge has the resolution of one bucket (`window / slots`).
+
+Two interchangeable stores:
+
+- `InMemoryVelocityStore`: per-process, LRU-bounded (`VELOCITY_MAX_KEYS`), with JSON
+  snapshot/restore across restarts (`VELOCITY_SNAPSHOT_PATH`);
+- `RedisVelocityStore` (`VELOCITY_REDIS_ENABLED`): one hash per bucket with a TTL,
+  shared by every worker, one pipelined round trip per transaction.
+"""
+
+import json
+from datetime import UTC
+from pathlib import Path
+
+import redis
+import redis.asyncio as aredis
+
+from app.core.config import settings
+from app.core.lru import LRUCache
+from app.models.schemas import (
+    AgentSignal,
+    CustomerProfile,
+    TransactionInput,
+    VelocityEntity,
+    VelocityStat,
+)
+
+# Entidades cuyo número de transacciones dispara alertas (el volumen de un comercio es normal)
+COUNT_ALERT_ENTITIES = ("customer", "device")
+
+
+def event_time(tx: TransactionInput) -> float:
+    ts = tx.timestamp
+    return (ts if ts.tzinfo else ts.replace(tzinfo=UTC)).timestamp()
+
+
+def window_label(seconds: int) -> str:
+    return f"{seconds // 60} min" if seconds % 60 == 0 else f"{seconds} s"
+
+
+def entity_keys(tx: TransactionInput) -> dict[VelocityEntity, str]:
+    return {
+        "customer": f"customer:{tx.customer_id}",
+        "device": f"device:{tx.device_id}",
+        "merchant": f"merchant:{tx.merchant_id}",
+    }
+
+
+class SlidingWindow:
+    """Ring of `slots` time buckets covering `window_seconds`, with running totals"""
+
+    __slots__ = ("bucket_seconds", "slots", "last", "counts", "sums", "count", "total")
+
+    def __init__(self, window_seconds: float, slots: int):
+        self.bucket_seconds = window_seconds / slots
+        self.slots = slots
+        self.last = 0
+        self.counts = [0] * slots
+        self.sums = [0.0] * slots
+        self.count = 0
+        self.total = 0.0
+
+    def _advance(self, bucket: int) -> None:
+        """Expire the buckets that fall out of the window when time moves to `bucket`"""
+        if bucket <= self.last:
+            return
+        if bucket - self.last >= self.slots:
+            self.counts = [0] * self.slots
+            self.sums = [0.0] * self.slots
+            self.count, self.total = 0, 0.0
+        else:
+            for b in range(self.last + 1, bucket + 1):
+                i = b % self.slots
+                self.count -= self.counts[i]
+                self.total -= self.sums[i]
+                self.counts[i], self.sums[i] = 0, 0.0
+        self.last = bucket
+
+    def add(self, ts: float, amount: float) -> None:
+        bucket = int(ts // self.bucket_seconds)
+        self._advance(bucket)
+        if bucket <= self.last - self.slots:
+            return  # evento más antiguo que la ventana
+        i = bucket % self.slots
+        self.counts[i] += 1
+        self.sums[i] += amount
+        self.count += 1
+        self.total += amount
+
+    def totals(self, ts: float) -> tuple[int, float]:
+        self._advance(int(ts // self.bucket_seconds))
+        return self.count, max(self.total, 0.0)
+
+    def dump(self) -> list:
+        return [self.last, self.counts, self.sums]
+
+    def load(self, state: list) -> None:
+        self.last, self.counts, self.sums = state[0], list(state[1]), list(state[2])
+        self.count, self.total = sum(self.counts), sum(self.sums)
+
+
+class InMemoryVelocityStore:
+    """Per-process velocity counters, LRU-bounded, with JSON snapshot/restore"""
+
+    def __init__(self, windows: list[int], slots: int, max_keys: int, snapshot_path: str = ""):
+        self.windows = list(windows)
+        self.slots = slots
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        # Las claves sin actividad durante la ventana más larga ya no aportan nada
+        self.keys = LRUCache(max_entries=max_keys, ttl=max(self.windows))
+
+    def _windows(self, key: str) -> list[SlidingWindow]:
+        windows: list[SlidingWindow] | None = self.keys.get(key)
+        if windows is None:
+            windows = [SlidingWindow(w, self.slots) for w in self.windows]
+        self.keys.set(key, windows)
+        return windows
+
+    async def record(self, tx: TransactionInput) -> list[VelocityStat]:
+        """Count `tx` and return the totals (including it) of every entity and window"""
+        ts = event_time(tx)
+        stats = []
+        for entity, key in entity_keys(tx).items():
+            for window_seconds, window in zip(self.windows, self._windows(key), strict=True):
+                window.add(ts, tx.amount)
+                count, amount = window.totals(ts)
+                stats.append(
+                    VelocityStat(
+                        entity=entity,
+                        key=key.split(":", 1)[1],
+                        window_seconds=window_seconds,
+                        count=count,
+                        amount=round(amount, 2),
+                    )
+                )
+        return stats
+
+    def save(self) -> int:
+        """Write every live key to `snapshot_path`; returns the number of keys saved"""
+        if self.snapshot_path is None:
+            return 0
+        keys = {key: [w.dump() for w in windows] for key, windows in self.keys.items()}
+        payload = {"windows": self.windows, "slots": self.slots, "keys": keys}
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.snapshot_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload))
+        tmp.replace(self.snapshot_path)
+        return len(keys)
+
+    def restore(self) -> int:
+        """Load the snapshot if it matches the configured windows; returns keys restored"""
+        if self.snapshot_path is None or not self.snapshot_path.exists():
+            return 0
+        try:
+            payload = json.loads(self.snapshot_path.read_text())
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Snapshot de velocidad ilegible, se ignora: {e}")
+            return 0
+        if payload.get("windows") != self.windows or payload.get("slots") != self.slots:
+            print("⚠️ Snapshot de velocidad con otras ventanas, se ignora")
+            return 0
+
+        for key, states in payload["keys"].items():
+            windows = [SlidingWindow(w, self.slots) for w in self.windows]
+            for window, state in zip(windows, states, strict=True):
+                window.load(state)
+            self.keys.set(key, windows)
+        print(f"⏱️ Contadores de velocidad restaurados ({len(payload['keys'])} claves)")
+        return len(payload["keys"])
+
+    def snapshot(self) -> dict:
+        return {
+            "backend": "memory",
+            "windows_seconds": self.windows,
+            "keys": len(self.keys),
+            "evictions": self.keys.evictions,
+        }
+
+    async def aclose(self) -> None:
+        saved = self.save()
+        if saved:
+            print(f"💾 Snapshot de velocidad guardado ({saved} claves)")
+
+
+class RedisVelocityStore:
+    """Velocity counters shared across workers: one Redis hash per (key, window, bucket)"""
+
+    def __init__(self, client: aredis.Redis, windows: list[int], slots: int, prefix: str):
+        self.client = client
+        self.windows = list(windows)
+        self.slots = slots
+        self.prefix = prefix
+
+    async def record(self, tx: TransactionInput) -> list[VelocityStat]:
+        ts = event_time(tx)
+        layout: list[tuple[VelocityEntity, str, int]] = []
+        pipe = self.client.pipeline(transaction=False)
+        for entity, key in entity_keys(tx).items():
+            for window_seconds in self.windows:
+                bucket_seconds = window_seconds / self.slots
+                bucket = int(ts // bucket_seconds)
+                current = f"{self.prefix}:{window_seconds}:{key}:{bucket}"
+                pipe.hincrby(current, "n", 1)
+                pipe.hincrbyfloat(current, "s", tx.amount)
+                pipe.expire(current, int(window_seconds + bucket_seconds) + 1)
+                for b in range(bucket - self.slots + 1, bucket + 1):
+                    pipe.hmget(f"{self.prefix}:{window_seconds}:{key}:{b}", "n", "s")
+                layout.append((entity, key, window_seconds))
+
+        try:
+            results = await pipe.execute()
+        except redis.RedisError as e:
+            print(f"⚠️ Redis no disponible para los contadores de velocidad: {e}")
+            return []
+
+        stats = []
+        per_window = 3 + self.slots
+        for i, (entity, key, window_seconds) in enumerate(layout):
+            buckets = results[i * per_window + 3 : (i + 1) * per_window]
+            stats.append(
+                VelocityStat(
+                    entity=entity,
+                    key=key.split(":", 1)[1],
+                    window_seconds=window_seconds,
+                    count=sum(int(n) for n, _ in buckets if n is not None),
+                    amount=round(sum(float(s) for _, s in buckets if s is not None), 2),
+                )
+            )
+        return stats
+
+    def save(self) -> int:
+        return 0  # Redis ya persiste los contadores
+
+    def restore(self) -> int:
+        return 0
+
+    def snapshot(self) -> dict:
+        return {"backend": "redis", "windows_seconds": self.windows}
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def velocity_alerts(
+    stats: list[VelocityStat], profile: CustomerProfile | None = None
+) -> list[AgentSignal]:
+    """Counts of customer/device above `VELOCITY_COUNT_ALERTS` for their window, and
+    customer spend in the longest window above `VELOCITY_AMOUNT_ALERT_RATIO` times the
+    usual amount"""
+    thresholds = dict(zip(settings.VELOCITY_WINDOWS_SECONDS, settings.VELOCITY_COUNT_ALERTS))
+    longest = max(settings.VELOCITY_WINDOWS_SECONDS)
+    alerts = []
+    for stat in stats:
+        threshold = thresholds.get(stat.window_seconds)
+        if stat.entity in COUNT_ALERT_ENTITIES and threshold and stat.count >= threshold:
+            alerts.append(
+                AgentSignal(
+                    signal_type="velocity",
+                    description=(
+                        f"{stat.count} transacciones del {stat.entity} {stat.key} "
+                        f"en {window_label(stat.window_seconds)}"
+                    ),
+                    severity="high" if stat.count >= 2 * threshold else "medium",
+                    value=str(stat.count),
+                )
+            )
+        if (
+            profile
+            and stat.entity == "customer"
+            and stat.window_seconds == longest
+            and stat.amount >= settings.VELOCITY_AMOUNT_ALERT_RATIO * max(profile.amount_mean, 1)
+        ):
+            alerts.append(
+                AgentSignal(
+                    signal_type="velocity",
+                    description=(
+                        f"Monto acumulado {stat.amount} en {window_label(longest)} "
+                        f"({stat.amount / max(profile.amount_mean, 1):.1f}x el monto habitual)"
+                    ),
+                    severity="high",
+                    value=str(stat.amount),
+                )
+            )
+    return alerts
+
+
+def build_velocity_store() -> InMemoryVelocityStore | RedisVelocityStore:
+    if settings.VELOCITY_REDIS_ENABLED:
+        return RedisVelocityStore(
+            aredis.Redis.from_url(settings.REDIS_URL),
+            settings.VELOCITY_WINDOWS_SECONDS,
+            settings.VELOCITY_SLOTS,
+            prefix="velocity",
+        )
+    return InMemoryVelocityStore(
+        settings.VELOCITY_WINDOWS_SECONDS,
+        settings.VELOCITY_SLOTS,
+        settings.VELOCITY_MAX_KEYS,
+        settings.VELOCITY_SNAPSHOT_PATH,
+    )
+
+
+velocity_store = build_velocity_store()
@@ -0,0 +1,149 @@
+"""
+Startup warm-up and readiness.
+
+Importing the app only loads FastAPI, SQLAlchemy and the settings: LangGraph, the
+agents (LangChain, langchain-openai, langchain-tavily, FAISS) and the compiled graph are
+loaded by the warm-up task that `lifespan` starts in the background, so the process
+answers liveness probes (`GET /health`) within a fraction of a second.
+
+Critical stages (database, graph, job workers) are retried with backoff until they
+succeed; `GET /ready` and the analysis endpoints answer 503 meanwhile. Optional stages
+(tokenizer, policy index, profile preload, velocity snapshot) only degrade the app when
+they fail: token counts are approximated and the rest is loaded on demand later.
+"""
+
+import asyncio
+import inspect
+import random
+import time
+from collections.abc import Callable
+from functools import cache
+from typing import Any
+
+from app.core import metrics
+from app.core.config import settings
+
+
+@cache
+def get_fraud_graph():
+    """
+    Compiled fraud detection graph. The first call imports the agents and compiles it
+    (normally from the warm-up); later calls return the same instance.
+    """
+    from app.agents.graph import create_fraud_detection_graph
+
+    return create_fraud_detection_graph()
+
+
+def retry_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff between attempts of a critical stage"""
+    cap = min(
+        settings.WARMUP_RETRY_MAX_SECONDS,
+        settings.WARMUP_RETRY_BASE_SECONDS * 2**attempt,
+    )
+    return random.uniform(cap / 2, cap)
+
+
+class WarmUp:
+    """Background warm-up task with per-stage timings, retries and errors"""
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+        self.attempts: dict[str, int] = {}
+        self.current: str | None = None
+        self._started_at = 0.0
+        self._ready_at: float | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready_at is not None
+
+    @property
+    def degraded(self) -> bool:
+        """Ready, but some optional stage failed"""
+        return self.ready and bool(self.errors)
+
+    def done(self, stage: str) -> bool:
+        return stage in self.stages
+
+    def start(self, run: Callable[[], Any]) -> None:
+        """Run `run` in the background; the app is ready once it returns"""
+        self._started_at = time.perf_counter()
+        self._task = asyncio.create_task(self._run(run))
+
+    async def _run(self, run: Callable[[], Any]) -> None:
+        await run()
+        self.current = None
+        self._ready_at = time.perf_counter()
+        total = self._ready_at - self._started_at
+        metrics.WARMUP_SECONDS.set(round(total, 3), stage="total")
+        suffix = f", degradada: {', '.join(self.errors)}" if self.errors else ""
+        print(f"✅ App lista tras {total * 1000:.0f} ms de calentamiento{suffix}")
+
+    async def stage(self, name: str, step: Callable[[], Any], critical: bool = True) -> None:
+        """
+        Run one timed warm-up stage (`step` may be sync or async). A critical stage is
+        retried with backoff until it succeeds; an optional one is recorded as failed
+        and the warm-up goes on.
+        """
+        self.current = name
+        attempt = 0
+        while True:
+            self.attempts[name] = attempt + 1
+            start = time.perf_counter()
+            try:
+                result = step()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                self.errors[name] = repr(e)
+                metrics.WARMUP_FAILURES.inc(stage=name)
+                if not critical:
+                    print(f"⚠️ Etapa opcional {name} fallida, se continúa sin ella: {e}")
+                    return
+                delay = retry_delay(attempt)
+                print(f"⚠️ Etapa {name} fallida, reintento en {delay:.1f} s: {e}")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            seconds = time.perf_counter() - start
+            self.errors.pop(name, None)
+            self.stages[name] = round(seconds * 1000, 1)
+            metrics.WARMUP_SECONDS.set(round(seconds, 3), stage=name)
+            return
+
+    async def wait(self, timeout: float | None = None) -> None:
+        """Wait for the warm-up to finish"""
+        if self._task is not None:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+
+    def snapshot(self) -> dict:
+        if self.degraded:
+            status = "degraded"
+        elif self.ready:
+            status = "ready"
+        else:
+            status = "warming_up"
+        total = None
+        if self._ready_at is not None:
+            total = round((self._ready_at - self._started_at) * 1000, 1)
+        return {
+            "status": status,
+            "current_stage": self.current,
+            "stages_ms": dict(self.stages),
+            "attempts": dict(self.attempts),
+            "errors": dict(self.errors),
+            "total_ms": total,
+        }
+
+    async def aclose(self) -> None:
+        """Cancel a warm-up still running at shutdown"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+warmup = WarmUp()
@@ -0,0 +1,3 @@
+"""
+Benchmarks reproducibles del backend (sin llamadas reales a OpenAI/Tavily)
+"""
@@ -0,0 +1,126 @@
+"""
+Decision latency with and without the analysis deadline under a heavy-tailed LLM.
+
+Runs the same transactions (web and card-present channels) through the parallel graph
+with `DEADLINE_ENABLED` on and off. Every stubbed LLM call sleeps a latency drawn from
+`--llm-latency` (lognormal by default, so a few calls are very slow). Reports p50/p95/
+p99/max per channel, how often and where stages were degraded, and how many decisions
+changed with respect to the unbounded run.
+
+    uv run python -m benchmarks.deadline --n 200 --llm-latency lognormal:300:0.6
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+from datetime import UTC, datetime
+from unittest.mock import patch
+
+from app.agents.external_threat_intel import threat_intel_cache
+from app.agents.graph import create_fraud_detection_graph
+from app.core.config import settings
+from app.models.schemas import FraudDetectionState, TransactionInput
+from benchmarks.load_test import summarize
+from benchmarks.stub_server import LatencyModel
+from benchmarks.stubs import LLM_AGENT_MODULES, StubChatModel, stubbed_agents
+
+CHANNELS = ("web", "pos")
+
+
+class HeavyTailStub(StubChatModel):
+    """Stub whose latency per call is drawn from `latency_spec`"""
+
+    latency_spec: str = "fixed:0"
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(LatencyModel.parse(self.latency_spec).sample())
+        return self._respond(messages)
+
+
+def transaction(i: int, run: str) -> TransactionInput:
+    """One customer per transaction and run, so velocity counters never short-circuit"""
+    return TransactionInput(
+        transaction_id=f"T-DEADLINE-{run}-{i}",
+        customer_id=f"CU-{run}-{i:04d}",
+        amount=(1200.0, 1800.0, 2600.0)[i % 3],
+        currency="PEN",
+        country="PE",
+        channel=CHANNELS[i % 2],
+        device_id="D-01",
+        timestamp=datetime(2025, 12, 17, 3, 15),
+        merchant_id=f"M-00{i % 4 + 1}",
+    )
+
+
+Run = tuple[FraudDetectionState, float]
+
+
+async def measure(n: int, concurrency: int, deadline: bool) -> list[Run]:
+    graph = create_fraud_detection_graph(parallel=True)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(i: int) -> Run:
+        async with semaphore:
+            tx = transaction(i, "on" if deadline else "off")
+            state = FraudDetectionState(transaction=tx, start_time=datetime.now(UTC))
+            start = time.perf_counter()
+            result = await graph.ainvoke(state)
+            return FraudDetectionState(**result), (time.perf_counter() - start) * 1000
+
+    threat_intel_cache.clear()
+    with (
+        patch.object(settings, "DEADLINE_ENABLED", deadline),
+        contextlib.redirect_stdout(io.StringIO()),
+    ):
+        return await asyncio.gather(*(run(i) for i in range(n)))
+
+
+async def main(n: int, concurrency: int, latency: str, seed: int) -> None:
+    llm = HeavyTailStub(latency_spec=latency)
+    results: dict[bool, list[Run]] = {}
+    with stubbed_agents(), ExitStack() as stack:
+        for module in LLM_AGENT_MODULES:
+            stack.enter_context(patch(f"{module}.get_llm", lambda *a, **k: llm))
+        for deadline in (False, True):
+            random.seed(seed)
+            results[deadline] = await measure(n, concurrency, deadline)
+
+    budgets = ", ".join(f"{c} {settings.DEADLINE_CHANNEL_MS.get(c)} ms" for c in CHANNELS)
+    print(f"{n} analyses, LLM latency {latency}, concurrency {concurrency}; budgets: {budgets}")
+    print(
+        f"  {'deadline':<9} {'channel':<8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'max ms':>8} {'degraded':>9}"
+    )
+    for deadline, runs in results.items():
+        for channel in CHANNELS:
+            subset = [(s, ms) for s, ms in runs if s.transaction.channel == channel]
+            stats = summarize([ms for _, ms in subset])
+            degraded = sum(bool(s.degraded_stages) for s, _ in subset) / len(subset)
+            print(
+                f"  {'on' if deadline else 'off':<9} {channel:<8} {stats['p50_ms']:>8.0f} "
+                f"{stats['p95_ms']:>8.0f} {stats['p99_ms']:>8.0f} {stats['max_ms']:>8.0f} "
+                f"{degraded:>9.0%}"
+            )
+
+    stages = Counter(stage for s, _ in results[True] for stage in s.degraded_stages)
+    print("  degraded stages: " + (", ".join(f"{k} {v}" for k, v in stages.most_common()) or "-"))
+    pairs = list(zip(results[False], results[True], strict=True))
+    changed = [(a, b) for (a, _), (b, _) in pairs if a.decision != b.decision]
+    print(f"  decisions changed by the deadline: {len(changed)}/{len(pairs)}")
+    for (before, after), count in Counter((a.decision, b.decision) for a, b in changed).items():
+        print(f"    {before} → {after}: {count}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--llm-latency", default="lognormal:300:0.6")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(main(args.n, args.concurrency, args.llm_latency, args.seed))
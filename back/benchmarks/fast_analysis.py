@@ -0,0 +1,142 @@
+"""
+Standard graph vs fast analysis mode: latency, LLM calls, tokens and decision agreement.
+
+Runs the same transactions through the parallel and the sequential graph with
+`analysis_mode="standard"` (context, behavioral and policy agents as three LLM calls)
+and `"fast"` (one fused call). The stubbed LLM costs a fixed latency per call plus a
+time per output token, so the longer fused answer is not free. The stub answers are
+canned, so decision agreement is only meaningful with `--live` (real models and a
+seeded DB; uses OpenAI/Tavily credits). The analysis deadline is disabled so that
+card-present transactions are not cut short by their 800 ms budget.
+
+    uv run python -m benchmarks.fast_analysis --n 20
+    uv run python -m benchmarks.fast_analysis --n 20 --live
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+from app.agents.graph import create_fraud_detection_graph
+from app.core.config import settings
+from app.core.tokens import count_tokens
+from app.models.schemas import FraudDetectionState, TransactionInput
+from benchmarks.stubs import StubChatModel, stubbed_agents
+
+MODES = ("standard", "fast")
+GRAPHS = ("parallel", "sequential")
+
+
+class TokenLatencyStub(StubChatModel):
+    """Stub whose latency is `latency` plus `seconds_per_token` per output token"""
+
+    seconds_per_token: float = 0.0
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        result = self._respond(messages)
+        tokens = count_tokens(result.generations[0].message.content)
+        await asyncio.sleep(self.latency + tokens * self.seconds_per_token)
+        return result
+
+
+def varied_transaction(i: int) -> TransactionInput:
+    """Mix of amounts, hours, countries and devices for the seeded customers"""
+    return TransactionInput(
+        transaction_id=f"T-FAST-{i}",
+        customer_id=("CU-001", "CU-002")[i % 2],
+        amount=(350.0, 1200.0, 4800.0, 9500.0)[i % 4],
+        currency="PEN",
+        country=("PE", "PE", "CL")[i % 3],
+        channel=("web", "mobile", "pos")[i % 3],
+        device_id=("D-01", "D-02", "D-99")[i % 3],
+        timestamp=datetime(2025, 12, 17, (3, 11, 15, 23, 19)[i % 5], 15),
+        merchant_id=f"M-00{i % 4 + 1}",
+    )
+
+
+Run = tuple[FraudDetectionState, float]
+
+
+async def measure(n: int, mode: str, parallel: bool) -> list[Run]:
+    graph = create_fraud_detection_graph(parallel=parallel)
+    runs = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(n):
+            start = time.perf_counter()
+            state = FraudDetectionState(transaction=varied_transaction(i), analysis_mode=mode)
+            result = await graph.ainvoke(state)
+            runs.append((FraudDetectionState(**result), (time.perf_counter() - start) * 1000))
+    return runs
+
+
+def summarize(runs: list[Run]) -> dict:
+    timings = [ms for _, ms in runs]
+    analysed = [s for s, _ in runs if "rule_engine" not in s.agent_route] or [s for s, _ in runs]
+    return {
+        "mean": statistics.mean(timings),
+        "p95": statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0],
+        "calls": statistics.mean(sum(m.llm_calls for m in s.agent_metrics) for s in analysed),
+        "prompt": statistics.mean(sum(m.prompt_tokens for m in s.agent_metrics) for s in analysed),
+        "completion": statistics.mean(
+            sum(m.completion_tokens for m in s.agent_metrics) for s in analysed
+        ),
+    }
+
+
+async def run_all(n: int) -> dict[tuple[str, str], list[Run]]:
+    return {
+        (graph, mode): await measure(n, mode, parallel=graph == "parallel")
+        for graph in GRAPHS
+        for mode in MODES
+    }
+
+
+async def main(n: int, live: bool, latency: float, seconds_per_token: float) -> None:
+    with patch.object(settings, "DEADLINE_ENABLED", False):
+        if live:
+            results = await run_all(n)
+        else:
+            llm = TokenLatencyStub(latency=latency, seconds_per_token=seconds_per_token)
+            with stubbed_agents(latency), patch("app.core.cascade.get_llm", lambda *a, **k: llm):
+                results = await run_all(n)
+
+    source = (
+        "real models"
+        if live
+        else f"stub {latency * 1000:.0f} ms + {seconds_per_token * 1000:.0f} ms/output token"
+    )
+    print(f"{n} analyses per row ({source}); calls and tokens per LLM-analysed transaction")
+    print(
+        f"  {'graph':<11} {'mode':<9} {'mean ms':>9} {'p95 ms':>9} "
+        f"{'calls':>6} {'prompt':>8} {'output':>7}"
+    )
+    for (graph, mode), runs in results.items():
+        s = summarize(runs)
+        print(
+            f"  {graph:<11} {mode:<9} {s['mean']:>9.1f} {s['p95']:>9.1f} "
+            f"{s['calls']:>6.1f} {s['prompt']:>8.0f} {s['completion']:>7.0f}"
+        )
+
+    pairs = list(zip(results["parallel", "standard"], results["parallel", "fast"], strict=True))
+    agree = sum(a.decision == b.decision for (a, _), (b, _) in pairs)
+    print(f"  decision agreement standard vs fast: {agree}/{len(pairs)} ({agree / len(pairs):.0%})")
+    for (a, _), (b, _) in pairs:
+        if a.decision != b.decision:
+            print(f"    {a.transaction.transaction_id}: {a.decision} → {b.decision}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=20)
+    parser.add_argument("--live", action="store_true", help="use the configured models")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="seconds per call")
+    parser.add_argument(
+        "--token-latency", type=float, default=0.01, help="seconds per output token"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.n, args.live, args.llm_latency, args.token_latency))
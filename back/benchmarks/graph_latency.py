@@ -0,0 +1,64 @@
+"""
+End-to-end latency of the fraud graph: sequential chain vs parallel fan-out.
+
+Uses the stubbed LLM from `benchmarks.stubs`, so every LLM call costs exactly
+`--llm-latency` seconds and no network is involved.
+
+    uv run python -m benchmarks.graph_latency --llm-latency 0.2 --runs 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+from app.agents.graph import create_fraud_detection_graph
+from app.models.schemas import FraudDetectionState, TransactionInput
+from benchmarks.stubs import stubbed_agents
+
+
+def sample_transaction(i: int = 0) -> TransactionInput:
+    """Ambiguous case (2.4x the usual amount at night): the rule engine defers to the agents"""
+    return TransactionInput(
+        transaction_id=f"T-BENCH-{i}",
+        customer_id="CU-001",
+        amount=1200.0,
+        currency="PEN",
+        country="PE",
+        channel="web",
+        device_id="D-01",
+        timestamp=datetime(2025, 12, 17, 3, 15),
+        merchant_id="M-001",
+    )
+
+
+async def measure(graph, runs: int) -> list[float]:
+    timings = []
+    for i in range(runs):
+        state = FraudDetectionState(transaction=sample_transaction(i))
+        start = time.perf_counter()
+        await graph.ainvoke(state)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def main(llm_latency: float, runs: int) -> None:
+    with stubbed_agents(llm_latency):
+        sequential = await measure(create_fraud_detection_graph(parallel=False), runs)
+        parallel = await measure(create_fraud_detection_graph(parallel=True), runs)
+
+    seq_median = statistics.median(sequential)
+    par_median = statistics.median(parallel)
+    print(f"LLM latency per call: {llm_latency * 1000:.0f} ms, runs: {runs}")
+    print(f"  sequential  median {seq_median:8.1f} ms")
+    print(f"  parallel    median {par_median:8.1f} ms")
+    print(f"  speed-up    {seq_median / par_median:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per LLM call")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.llm_latency, args.runs))
@@ -0,0 +1,271 @@
+"""
+Offline load test of the real FastAPI app against the local OpenAI/Tavily stub server.
+
+Starts `benchmarks.stub_server` in a background thread, points the app at it through
+`OPENAI_BASE_URL` / `TAVILY_API_BASE_URL`, seeds a throw-away SQLite database and replays
+a synthetic (or CSV) transaction stream against `POST /api/transactions/analyze` at a
+target rate. Reports end-to-end p50/p95/p99, per-agent latency, throughput and DB time.
+
+    uv run python -m benchmarks.load_test --rps 5 --requests 100 --llm-latency lognormal:300:0.5
+    uv run python -m benchmarks.load_test --source app/data/transactions.csv --output load.json
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def summarize(values_ms: list[float]) -> dict:
+    return {
+        "count": len(values_ms),
+        "p50_ms": round(percentile(values_ms, 50), 1),
+        "p95_ms": round(percentile(values_ms, 95), 1),
+        "p99_ms": round(percentile(values_ms, 99), 1),
+        "max_ms": round(max(values_ms, default=0.0), 1),
+    }
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Wall time of every LangGraph node run, attached to all runs via a configure hook"""
+
+    run_inline = True
+
+    def __init__(self):
+        self.timings: dict[str, list[float]] = defaultdict(list)
+        self._started: dict[UUID, tuple[str, float]] = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            self._started[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        if started:
+            node, t0 = started
+            self.timings[node].append((time.perf_counter() - t0) * 1000)
+
+    on_chain_error = on_chain_end
+
+
+class QueryTimer:
+    """Accumulated time spent in DB cursor executions (SQLAlchemy engine events)"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.total_ms = 0.0
+        self.queries = 0
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.total_ms += (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        self.queries += 1
+
+
+def synthetic_stream(n: int, customers: list, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    stream = []
+    for i in range(n):
+        customer = rng.choice(customers)
+        stream.append(
+            {
+                "transaction_id": f"T-LOAD-{i}",
+                "customer_id": customer.customer_id,
+                "amount": round(customer.usual_amount_avg * rng.lognormvariate(0, 0.7), 2),
+                "currency": "PEN",
+                "country": rng.choices(["PE", "US", "CL"], weights=[90, 6, 4])[0],
+                "channel": rng.choice(["web", "mobile", "atm"]),
+                "device_id": rng.choices(
+                    [customer.usual_devices.split(",")[0], "D-99"], weights=[92, 8]
+                )[0],
+                "timestamp": datetime(2025, 12, 17, rng.randrange(24), rng.randrange(60)),
+                "merchant_id": f"M-{rng.randrange(50):03d}",
+            }
+        )
+    return stream
+
+
+def csv_stream(path: Path, n: int) -> list[dict]:
+    """Cycle the CSV rows until `n` transactions, keeping transaction IDs unique"""
+    with open(path, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    return [
+        {**rows[i % len(rows)], "transaction_id": f"{rows[i % len(rows)]['transaction_id']}-{i}"}
+        for i in range(n)
+    ]
+
+
+def configure_environment(args: argparse.Namespace, workdir: str) -> None:
+    """Settings are read at import time, so this must run before importing `app`"""
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    os.environ.update(
+        {
+            "OPENAI_API_KEY": "stub",
+            "OPENAI_BASE_URL": f"{stub_url}/v1",
+            "AZURE_OPENAI_ENDPOINT": "",
+            "TAVILY_API_KEY": "stub",
+            "TAVILY_API_BASE_URL": stub_url,
+            "DATABASE_URL": args.database_url or f"sqlite+aiosqlite:///{workdir}/load.db",
+            "POLICY_INDEX_DIR": f"{workdir}/policy_index",
+            "LLM_CACHE_ENABLED": str(args.llm_cache).lower(),
+            "REDIS_URL": "",
+        }
+    )
+
+
+async def replay(client, stream: list[dict], rps: float) -> list[tuple[int, float]]:
+    """Open-loop replay: request i is sent at t0 + i / rps regardless of earlier responses"""
+
+    async def send(tx: dict) -> tuple[int, float]:
+        start = time.perf_counter()
+        try:
+            response = await client.post("/api/transactions/analyze", json=tx)
+            status = response.status_code
+        except Exception as e:
+            print(f"❌ {tx['transaction_id']}: {e}")
+            status = 0
+        return status, (time.perf_counter() - start) * 1000
+
+    t0 = time.perf_counter()
+    tasks = []
+    for i, tx in enumerate(stream):
+        delay = t0 + i / rps - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(tx)))
+    return await asyncio.gather(*tasks)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    # Importados tras configurar el entorno (ver `configure_environment`)
+    import httpx
+    from langchain_core.tracers.context import register_configure_hook
+
+    from app.data.loader import load_customer_behavior, seed_database
+    from app.db.session import engine
+    from app.services.warmup import warmup
+    from benchmarks.stub_server import LatencyModel, StubServer, create_stub_app
+    from main import app
+
+    node_timer = NodeTimer()
+    timer_var: ContextVar[NodeTimer | None] = ContextVar("load_test_node_timer", default=None)
+    register_configure_hook(timer_var, inheritable=True)
+    timer_var.set(node_timer)
+    query_timer = QueryTimer(engine.sync_engine)
+
+    await seed_database()
+    if args.source == "synthetic":
+        stream = synthetic_stream(args.requests, await load_customer_behavior(), args.seed)
+    else:
+        stream = csv_stream(Path(args.source), args.requests)
+    stream = json.loads(json.dumps(stream, default=str))
+
+    stub_app = create_stub_app(
+        LatencyModel.parse(args.llm_latency), LatencyModel.parse(args.search_latency)
+    )
+    with StubServer(stub_app, port=args.stub_port) as stub:
+        async with app.router.lifespan_context(app):
+            await warmup.wait()
+            db_before = (query_timer.total_ms, query_timer.queries)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://load-test", timeout=None
+            ) as client:
+                start = time.perf_counter()
+                outcomes = await replay(client, stream, args.rps)
+                wall = time.perf_counter() - start
+        stub_calls = dict(stub.calls)
+
+    ok = [latency for status, latency in outcomes if status == 200]
+    db_ms = query_timer.total_ms - db_before[0]
+    return {
+        "target_rps": args.rps,
+        "requests": len(outcomes),
+        "ok": len(ok),
+        "errors": len(outcomes) - len(ok),
+        "wall_s": round(wall, 2),
+        "throughput_rps": round(len(ok) / wall, 2) if wall else 0.0,
+        "end_to_end": summarize(ok),
+        "agents": {node: summarize(t) for node, t in sorted(node_timer.timings.items())},
+        "db": {
+            "queries": query_timer.queries - db_before[1],
+            "total_ms": round(db_ms, 1),
+            "per_request_ms": round(db_ms / len(outcomes), 2) if outcomes else 0.0,
+        },
+        "stub_calls": stub_calls,
+    }
+
+
+def print_report(report: dict) -> None:
+    e2e = report["end_to_end"]
+    print(
+        f"\n{report['requests']} requests @ {report['target_rps']} rps target → "
+        f"{report['throughput_rps']} rps achieved ({report['errors']} errors, "
+        f"{report['wall_s']} s)"
+    )
+    print(
+        f"  end-to-end     p50 {e2e['p50_ms']:8.1f}  p95 {e2e['p95_ms']:8.1f}  p99 {e2e['p99_ms']:8.1f} ms"
+    )
+    for node, stats in report["agents"].items():
+        print(
+            f"  {node:<14} p50 {stats['p50_ms']:8.1f}  p95 {stats['p95_ms']:8.1f}  "
+            f"p99 {stats['p99_ms']:8.1f} ms  (n={stats['count']})"
+        )
+    db = report["db"]
+    print(
+        f"  db             {db['queries']} queries, {db['total_ms']} ms ({db['per_request_ms']} ms/request)"
+    )
+    print(f"  stub calls     {report['stub_calls']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rps", type=float, default=5.0, help="target request rate")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--source", default="synthetic", help="'synthetic' or a CSV path")
+    parser.add_argument("--llm-latency", default="lognormal:300:0.5")
+    parser.add_argument("--search-latency", default="lognormal:500:0.5")
+    parser.add_argument("--stub-port", type=int, default=8900)
+    parser.add_argument("--database-url", default=None, help="defaults to a temp SQLite DB")
+    parser.add_argument("--llm-cache", action="store_true", help="keep the LLM response cache")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="write the report as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_environment(args, workdir)
+        report = asyncio.run(run(args))
+
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
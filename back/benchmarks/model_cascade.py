@@ -0,0 +1,89 @@
+"""
+Latency of the graph with the model cascade on and off.
+
+The stubbed small and large models have their own latency; the small model answers
+with low confidence on a `--hard` fraction of the transactions, which then escalate to
+the large model. With the cascade off every cascaded agent uses its large model.
+
+    uv run python -m benchmarks.model_cascade --n 20 --hard 0.2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import re
+import statistics
+import time
+import zlib
+from unittest.mock import patch
+
+from app.agents.graph import create_fraud_detection_graph
+from app.core.cascade import cascade_snapshot
+from app.core.config import settings
+from app.models.schemas import FraudDetectionState
+from benchmarks.graph_latency import sample_transaction
+from benchmarks.stubs import StubChatModel, stubbed_agents
+
+TRANSACTION_ID = re.compile(r"T-BENCH-\d+")
+
+
+class SmallStubModel(StubChatModel):
+    """Stub small model that is unsure (confidence 0.4) about the hard transactions"""
+
+    hard: float = 0.0
+
+    def _respond(self, messages):
+        result = super()._respond(messages)
+        match = TRANSACTION_ID.search("\n".join(str(m.content) for m in messages))
+        if match and zlib.crc32(match.group().encode()) % 1000 < self.hard * 1000:
+            message = result.generations[0].message
+            message.content = re.sub(r'"confidence": [\d.]+', '"confidence": 0.4', message.content)
+        return result
+
+
+async def measure(n: int, cascade: bool) -> list[float]:
+    graph = create_fraud_detection_graph()
+
+    async def analyse(i: int) -> float:
+        start = time.perf_counter()
+        await graph.ainvoke(FraudDetectionState(transaction=sample_transaction(i)))
+        return (time.perf_counter() - start) * 1000
+
+    with patch.object(settings, "MODEL_CASCADE_ENABLED", cascade):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [await analyse(i) for i in range(n)]
+
+
+def p95(values: list[float]) -> float:
+    return statistics.quantiles(values, n=20)[-1]
+
+
+async def main(n: int, hard: float, small_latency: float, large_latency: float) -> None:
+    small = SmallStubModel(latency=small_latency, hard=hard)
+    large = StubChatModel(latency=large_latency)
+    small_models = set(settings.MODEL_CASCADE.values())
+
+    with stubbed_agents(small_latency):
+        with patch("app.core.cascade.get_llm", lambda m: small if m in small_models else large):
+            baseline = await measure(n, cascade=False)
+            cascaded = await measure(n, cascade=True)
+
+    print(
+        f"{n} analyses, small model {small_latency * 1000:.0f} ms, "
+        f"large model {large_latency * 1000:.0f} ms, hard cases {hard:.0%}"
+    )
+    for name, timings in (("large only", baseline), ("cascade", cascaded)):
+        print(f"  {name:<11} mean {statistics.mean(timings):8.1f} ms   p95 {p95(timings):8.1f} ms")
+    for agent, entry in cascade_snapshot()["agents"].items():
+        print(f"  {agent:<30} escalation rate {entry['escalation_rate']:6.1%} {entry['reasons']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=20)
+    parser.add_argument("--hard", type=float, default=0.2, help="fraction of hard transactions")
+    parser.add_argument("--small-latency", type=float, default=0.1)
+    parser.add_argument("--large-latency", type=float, default=0.4)
+    args = parser.parse_args()
+    asyncio.run(main(args.n, args.hard, args.small_latency, args.large_latency))
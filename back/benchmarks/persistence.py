@@ -0,0 +1,119 @@
+"""
+Write throughput of persisting one analysis: legacy three-commit path vs claiming the
+ID up front and writing the results in the single unit of work of
+`TransactionService.save_analysis`.
+
+Each analysis writes the transaction row with its results, one `audit_trail` row per
+evidence and, for escalations, a `hitl_queue` entry. Runs on a temporary SQLite file
+by default, where every commit is an fsync.
+
+    uv run python -m benchmarks.persistence --n 500
+    uv run python -m benchmarks.persistence --database-url postgresql+asyncpg://...
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import UTC, datetime
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import AuditTrail, Base, HITLQueue, Transaction
+from app.models.schemas import AgentEvidence, AgentRunMetrics, FraudDetectionState
+from app.services.db_service import TransactionService
+from benchmarks.graph_latency import sample_transaction
+
+NODES = ["context", "behavioral", "rag", "threat_intel", "aggregator", "debate", "arbiter"]
+
+
+def analysed_state(i: int, prefix: str) -> FraudDetectionState:
+    tx = sample_transaction(i).model_copy(update={"transaction_id": f"T-{prefix}-{i}"})
+    evidences = [
+        AgentEvidence(agent_name=f"{node} agent", node=node, reasoning="...", confidence=0.8)
+        for node in NODES
+    ]
+    return FraudDetectionState(
+        transaction=tx,
+        start_time=datetime.now(UTC),
+        evidences=evidences,
+        signals=["[RULE] FP-01"],
+        decision="ESCALATE_TO_HUMAN" if i % 5 == 0 else "CHALLENGE",
+        confidence=0.8,
+        explanation_customer="Necesitamos validar esta operación.",
+        explanation_audit="FP-01 aplicada.",
+        agent_route=NODES,
+        agent_metrics=[AgentRunMetrics(node=node, wall_ms=100, llm_calls=1) for node in NODES],
+    )
+
+
+def rows_written(state: FraudDetectionState) -> int:
+    return 1 + len(state.evidences) + (state.decision == "ESCALATE_TO_HUMAN")
+
+
+async def legacy_persist(session: AsyncSession, state: FraudDetectionState) -> None:
+    """Previous path: add+commit+refresh, UPDATE (+HITL)+commit, one `add` per audit row+commit"""
+    db_tx = Transaction(**TransactionService._transaction_values(state.transaction))
+    session.add(db_tx)
+    await session.commit()
+    await session.refresh(db_tx)
+
+    await session.execute(
+        update(Transaction)
+        .where(Transaction.id == state.transaction.transaction_id)
+        .values(**TransactionService._analysis_values(state))
+    )
+    if state.decision == "ESCALATE_TO_HUMAN":
+        session.add(HITLQueue(transaction_id=state.transaction.transaction_id))
+    await session.commit()
+
+    for row in TransactionService._audit_rows(state):
+        session.add(AuditTrail(**row))
+    await session.commit()
+
+
+async def claimed_persist(session: AsyncSession, state: FraudDetectionState) -> None:
+    """Current path: INSERT PROCESSING + commit before the graph, then the unit of work"""
+    await TransactionService.create_transaction(session, state.transaction, status="PROCESSING")
+    await TransactionService.save_analysis(session, state)
+
+
+async def measure(session_factory, persist, states: list[FraudDetectionState]) -> float:
+    start = time.perf_counter()
+    for state in states:
+        async with session_factory() as session:
+            await persist(session, state)
+    return time.perf_counter() - start
+
+
+async def main(n: int, database_url: str | None) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_async_engine(database_url or f"sqlite+aiosqlite:///{workdir}/bench.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        print(f"{n} analyses ({engine.dialect.name})")
+        run_id = int(time.time())
+        for label, prefix, persist in (
+            ("legacy (3 commits)", "LEGACY", legacy_persist),
+            ("claim + unit of work", "UOW", claimed_persist),
+        ):
+            states = [analysed_state(i, f"{prefix}-{run_id}") for i in range(n)]
+            elapsed = await measure(session_factory, persist, states)
+            rows = sum(rows_written(s) for s in states)
+            print(
+                f"  {label:<22} {n / elapsed:8.1f} analyses/s  {rows / elapsed:9.1f} rows/s  "
+                f"({elapsed * 1000 / n:.2f} ms per analysis)"
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=500)
+    parser.add_argument("--database-url", default=None, help="defaults to a temp SQLite file")
+    args = parser.parse_args()
+    asyncio.run(main(args.n, args.database_url))
@@ -0,0 +1,133 @@
+"""
+Throughput and memory of loading customer profiles: legacy per-row `seed_database` loop
+(one SELECT per row, then `session.add`) vs the streaming importer of
+`app.data.importer` (chunked NumPy validation + one bulk upsert per chunk).
+
+Generates a synthetic CSV of `--n` profiles and loads it into a temporary SQLite file
+twice per method: once into an empty table and once more as a full refresh of the
+existing rows. `--memory` also reports the peak Python heap (tracemalloc, which slows
+every run down several times, so throughput is only comparable between runs with the
+same flag).
+
+    uv run python -m benchmarks.profile_import --n 50000
+    uv run python -m benchmarks.profile_import --n 1000000 --skip-legacy --memory
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+
+def write_profiles(path: Path, n: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["customer_id", "usual_amount_avg", "usual_hours", "usual_countries", "usual_devices"]
+        )
+        for i in range(n):
+            start = rng.randrange(0, 12)
+            writer.writerow(
+                [
+                    f"CU-{i:08d}",
+                    f"{rng.lognormvariate(6, 1):.2f}",
+                    f"{start:02d}-{start + rng.randrange(6, 12):02d}",
+                    rng.choice(["PE", "PE,CL", "PE,US"]),
+                    f"D-{rng.randrange(10**6):06d}",
+                ]
+            )
+
+
+async def legacy_load(path: Path) -> int:
+    """Previous `seed_database` body: whole CSV into memory, one SELECT + add per row"""
+    from sqlalchemy import select
+
+    from app.db.models import CustomerBehaviorDB
+    from app.db.session import AsyncSessionLocal
+    from app.models.schemas import CustomerBehavior
+
+    with open(path) as f:
+        behaviors = [
+            CustomerBehavior(**{**row, "usual_amount_avg": float(row["usual_amount_avg"])})
+            for row in csv.DictReader(f)
+        ]
+    async with AsyncSessionLocal() as session:
+        for behavior in behaviors:
+            result = await session.execute(
+                select(CustomerBehaviorDB).where(
+                    CustomerBehaviorDB.customer_id == behavior.customer_id
+                )
+            )
+            if not result.scalar_one_or_none():
+                session.add(CustomerBehaviorDB(**behavior.model_dump()))
+        await session.commit()
+    return len(behaviors)
+
+
+async def streaming_load(path: Path, chunk_size: int) -> int:
+    from app.data.importer import import_customer_profiles
+
+    stats = await import_customer_profiles(path, chunk_size, progress=False)
+    return stats.read
+
+
+async def measure(label: str, load, memory: bool) -> None:
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    rows = await load()
+    elapsed = time.perf_counter() - start
+    line = f"  {label:<28} {rows / elapsed:10,.0f} rows/s  {elapsed:7.2f} s"
+    if memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        line += f"  peak {peak / 2**20:7.1f} MiB"
+    print(line)
+
+
+async def main(args: argparse.Namespace, workdir: str) -> None:
+    from sqlalchemy import delete
+
+    from app.db.models import CustomerBehaviorDB
+    from app.db.session import AsyncSessionLocal, init_db
+
+    csv_path = Path(workdir) / "profiles.csv"
+    write_profiles(csv_path, args.n)
+    await init_db()
+
+    async def truncate():
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(CustomerBehaviorDB))
+            await session.commit()
+
+    print(f"{args.n:,} profiles (chunk size {args.chunk_size:,})")
+    if not args.skip_legacy:
+        await measure("legacy, empty table", lambda: legacy_load(csv_path), args.memory)
+        await measure("legacy, existing rows", lambda: legacy_load(csv_path), args.memory)
+        await truncate()
+
+    def streaming():
+        return streaming_load(csv_path, args.chunk_size)
+
+    await measure("streaming, empty table", streaming, args.memory)
+    await measure("streaming, full refresh", streaming, args.memory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=50_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--skip-legacy", action="store_true", help="only run the importer")
+    parser.add_argument("--memory", action="store_true", help="report peak heap (slower)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # La URL se lee al importar `app`, así que se fija antes
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{workdir}/profiles.db"
+        asyncio.run(main(args, workdir))
@@ -0,0 +1,198 @@
+"""
+Prompt tokens per stage with and without context compaction.
+
+Runs the real graph with the stubbed LLM answering with reasonings and debate essays
+of realistic length, and sums the prompt tokens (counted with the tokenizer) that the
+aggregator, debate and arbiter send, with `COMPACTION_ENABLED` off and on.
+
+    uv run python -m benchmarks.prompt_compaction --runs 3
+"""
+
+import argparse
+import asyncio
+import statistics
+from collections import defaultdict
+from unittest.mock import patch
+
+from app.agents.graph import create_fraud_detection_graph
+from app.core.tokens import get_encoding
+from app.models.schemas import FraudDetectionState
+from benchmarks.graph_latency import sample_transaction
+from benchmarks.stubs import STUB_RESPONSES, stubbed_agents
+
+STAGES = ("aggregator", "debate", "arbiter")
+
+CONTEXT_REASONING = (
+    "La transacción de 1200 PEN realizada a las 03:15 desde el canal web presenta varias "
+    "características que merecen atención. En primer lugar, el monto es aproximadamente "
+    "2.4 veces superior al promedio habitual del cliente, lo que por sí solo no es "
+    "concluyente pero sí relevante. En segundo lugar, el horario de madrugada se encuentra "
+    "fuera de la franja en la que el cliente suele operar, y este tipo de operaciones "
+    "nocturnas concentra una proporción mayor de fraudes por toma de cuenta. Por otro lado, "
+    "el país de origen y el dispositivo coinciden con los registrados previamente, lo que "
+    "reduce la probabilidad de un acceso desde un equipo comprometido. En conjunto, el "
+    "contexto sugiere un riesgo moderado que justifica una verificación adicional antes de "
+    "aprobar la operación, sin llegar a indicar un fraude evidente."
+)
+BEHAVIOR_REASONING = (
+    "Al comparar la transacción con el perfil histórico del cliente se observa que el monto "
+    "actual se desvía de forma significativa del promedio de sus operaciones aprobadas, con "
+    "un z-score elevado. La hora de la operación concentra una fracción muy pequeña de su "
+    "actividad histórica, ya que el cliente opera casi exclusivamente entre las 08:00 y las "
+    "20:00. No obstante, el país y el dispositivo son los más frecuentes de su historial, lo "
+    "cual es consistente con un uso legítimo. La combinación de monto elevado y horario "
+    "atípico es un patrón que aparece con frecuencia en fraudes de toma de cuenta, aunque "
+    "también puede explicarse por una compra planificada o un viaje. Se recomienda tratar la "
+    "operación como anómala de severidad media."
+)
+POLICY_REASONING = (
+    "Revisando las políticas internas recuperadas, la política FP-01 establece que las "
+    "transacciones cuyo monto supera en más de dos veces el promedio habitual del cliente y "
+    "que se realizan fuera de su horario habitual deben ser desafiadas. Ambas condiciones se "
+    "cumplen en este caso: el monto es 2.4 veces el promedio y la hora es las 03:15. La "
+    "política FP-02, relativa a transacciones internacionales, no aplica porque la operación "
+    "es nacional. La política FP-03 sobre dispositivos nuevos tampoco aplica, ya que el "
+    "dispositivo es conocido. Por lo tanto, la acción sugerida por las políticas es CHALLENGE, "
+    "con una confianza alta en la aplicabilidad de FP-01."
+)
+THREAT_REASONING = (
+    "La búsqueda de inteligencia de amenazas sobre el comercio M-001 en Perú no devolvió "
+    "reportes recientes de fraude, filtraciones de datos ni campañas de phishing asociadas. "
+    "Tampoco se encontraron alertas sectoriales relevantes para el tipo de comercio en los "
+    "últimos treinta días. La ausencia de señales externas no descarta el fraude, pero indica "
+    "que el riesgo no proviene de una amenaza conocida del comercio, sino en todo caso del "
+    "comportamiento de la cuenta."
+)
+SUMMARY = (
+    "La transacción presenta un monto 2.4 veces superior al promedio del cliente y se realiza "
+    "a las 03:15, fuera de su horario habitual, lo que activa la política FP-01 (CHALLENGE). "
+    "El país y el dispositivo son los habituales y no hay amenazas externas conocidas sobre "
+    "el comercio. El riesgo global es moderado: las señales apuntan a una operación inusual "
+    "más que a un fraude evidente, por lo que conviene una verificación adicional del cliente."
+)
+FRAUD_ESSAY = " ".join(
+    [
+        "Existen varios indicios que hacen sospechosa esta transacción.",
+        "El monto de 1200 PEN supera ampliamente el promedio habitual del cliente, y las",
+        "operaciones de importe anómalo son el primer síntoma de una toma de cuenta.",
+        "Además, la operación se realiza a las 03:15, una hora en la que el cliente",
+        "prácticamente nunca opera y en la que la víctima difícilmente detecta el cargo.",
+        "La política FP-01 existe precisamente para este patrón combinado de monto y horario,",
+        "y los defraudadores suelen usar el dispositivo y la red de la víctima mediante",
+        "malware o acceso remoto, de modo que un dispositivo conocido no es garantía.",
+        "La ausencia de reportes sobre el comercio tampoco exculpa la operación: muchos",
+        "fraudes se canalizan a través de comercios legítimos para no levantar alertas.",
+    ]
+    * 3
+)
+CUSTOMER_ESSAY = " ".join(
+    [
+        "Hay explicaciones legítimas razonables para esta transacción.",
+        "El cliente usa su dispositivo y país habituales, lo que descarta la mayoría de",
+        "escenarios de acceso desde un equipo o ubicación desconocidos.",
+        "Un monto 2.4 veces superior al promedio es compatible con una compra planificada,",
+        "como un electrodoméstico o un pasaje, y no es un valor extremo.",
+        "El horario nocturno puede deberse a un cambio de rutina, un viaje o una compra en",
+        "línea con ofertas por tiempo limitado.",
+        "No existe ninguna amenaza conocida asociada al comercio, y bloquear o desafiar",
+        "operaciones legítimas deteriora la experiencia del cliente y su confianza.",
+    ]
+    * 3
+)
+
+
+def _signal(signal_type: str, description: str, severity: str, value: str) -> dict:
+    return {
+        "signal_type": signal_type,
+        "description": description,
+        "severity": severity,
+        "value": value,
+    }
+
+
+# Mismos marcadores que `STUB_RESPONSES`, con textos de longitud realista
+VERBOSE_RESPONSES = [
+    (
+        "experto en detección de fraude financiero",
+        {
+            "signals": [
+                _signal("amount", "Monto elevado respecto al promedio", "medium", "1200"),
+                _signal("time", "Horario de madrugada", "medium", "03:15"),
+            ],
+            "reasoning": CONTEXT_REASONING,
+            "confidence": 0.7,
+        },
+    ),
+    (
+        "analista de comportamiento",
+        {
+            "signals": [
+                _signal("amount", "Monto elevado respecto al promedio", "medium", "1200"),
+                _signal("behavior_anomaly", "Horario fuera de rango", "medium", "03:15"),
+            ],
+            "reasoning": BEHAVIOR_REASONING,
+            "confidence": 0.8,
+        },
+    ),
+    (
+        "oficial de cumplimiento",
+        {
+            "applied_policies": [
+                {"policy_id": "FP-01", "reason": "Monto y horario inusual", "violated": True}
+            ],
+            "reasoning": POLICY_REASONING,
+            "confidence": 0.85,
+        },
+    ),
+    (
+        "inteligencia de ciber-fraude",
+        {
+            "found_threats": False,
+            "signals": [],
+            "citations": [],
+            "reasoning": THREAT_REASONING,
+            "confidence": 0.6,
+        },
+    ),
+    (
+        "síntesis de evidencia",
+        {"executive_summary": SUMMARY, "total_risk_score": 0.6, "key_findings": ["FP-01"]},
+    ),
+    ("fiscal especializado", FRAUD_ESSAY),
+    ("defensor del cliente", CUSTOMER_ESSAY),
+]
+
+
+async def measure(runs: int, compaction: bool) -> dict[str, float]:
+    """Median prompt tokens per stage over `runs` analyses"""
+    graph = create_fraud_detection_graph()
+    tokens: dict[str, list[int]] = defaultdict(list)
+    with patch("app.core.config.settings.COMPACTION_ENABLED", compaction):
+        for i in range(runs):
+            state = await graph.ainvoke(FraudDetectionState(transaction=sample_transaction(i)))
+            for run in state["agent_metrics"]:
+                tokens[run.node].append(run.prompt_tokens)
+    return {node: statistics.median(values) for node, values in tokens.items()}
+
+
+async def main(runs: int) -> None:
+    responses = VERBOSE_RESPONSES + STUB_RESPONSES
+    with stubbed_agents(), patch("benchmarks.stubs.STUB_RESPONSES", responses):
+        before = await measure(runs, compaction=False)
+        after = await measure(runs, compaction=True)
+
+    tokenizer = "tiktoken" if get_encoding() else "aproximación de 4 caracteres/token"
+    print(f"Prompt tokens por etapa (mediana de {runs} análisis, {tokenizer})")
+    print(f"  {'stage':<12} {'before':>8} {'after':>8} {'saved':>7}")
+    for stage in STAGES:
+        b, a = before.get(stage, 0), after.get(stage, 0)
+        print(f"  {stage:<12} {b:>8.0f} {a:>8.0f} {1 - a / b if b else 0:>7.1%}")
+    b, a = sum(before.get(s, 0) for s in STAGES), sum(after.get(s, 0) for s in STAGES)
+    print(f"  {'total':<12} {b:>8.0f} {a:>8.0f} {1 - a / b if b else 0:>7.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.runs))
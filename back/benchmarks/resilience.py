@@ -0,0 +1,131 @@
+"""
+Upstream resilience under injected faults: OpenAI SDK retries vs the resilience layer.
+
+Starts `benchmarks.stub_server` in a background thread and sends chat completions with
+the real OpenAI client of `LLMRegistry`, arriving at a fixed rate, through these fault
+scenarios:
+
+- errors: a share of 503 responses (and 429 with `Retry-After`);
+- outage: every call fails for the first half of the run, then the provider recovers;
+- slow tail: a few responses take seconds (hedging on vs off).
+
+Reports success rate, p50/p99 per call, requests that reached the stub, and breaker and
+hedging activity for each client configuration.
+
+    uv run python -m benchmarks.resilience --n 200 --rps 50
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from langchain_core.messages import HumanMessage
+
+from app.core.config import settings
+from app.core.llm import LLMRegistry
+from app.core.resilience import endpoints
+from benchmarks.load_test import percentile
+from benchmarks.stub_server import FaultModel, LatencyModel, StubServer, create_stub_app
+
+# Nombre -> ajustes de la configuración del cliente
+CLIENTS = {
+    "sdk retries": {"RESILIENCE_ENABLED": False},
+    "resilience": {"RESILIENCE_ENABLED": True, "RESILIENCE_HEDGE_ENABLED": False},
+    "resilience+hedge": {"RESILIENCE_ENABLED": True, "RESILIENCE_HEDGE_ENABLED": True},
+}
+SCENARIOS = {
+    "errors 20% 503": FaultModel(error_rate=0.2),
+    "errors 20% 429+RA": FaultModel(error_rate=0.2, error_status=429, retry_after=0.3),
+    "outage, recovery": FaultModel(outage=True),
+    "slow tail 5% +2s": FaultModel(slow_rate=0.05, slow_ms=2000),
+}
+
+
+async def run_calls(
+    registry: LLMRegistry, n: int, rps: float, outage_ends: float | None, stub: StubServer
+) -> list[tuple[bool, float]]:
+    """`n` calls arriving at `rps`; an outage, if any, ends `outage_ends` seconds in"""
+    llm = registry.get(settings.OPENAI_MODEL)
+    if outage_ends is not None:
+        asyncio.get_running_loop().call_later(
+            outage_ends, setattr, stub.app.state.faults, "outage", False
+        )
+
+    async def call(i: int) -> tuple[bool, float]:
+        await asyncio.sleep(i / rps)
+        start = time.perf_counter()
+        try:
+            await llm.ainvoke([HumanMessage(content=f"Transacción {i}")])
+            ok = True
+        except Exception:
+            ok = False
+        return ok, (time.perf_counter() - start) * 1000
+
+    return await asyncio.gather(*(call(i) for i in range(n)))
+
+
+async def scenario(
+    stub: StubServer, faults: FaultModel, n: int, rps: float
+) -> list[tuple[bool, float]]:
+    stub.app.state.faults = FaultModel(**vars(faults))
+    registry = LLMRegistry()
+    try:
+        # Con caída, el proveedor se recupera a mitad de la serie
+        outage_ends = n / rps / 2 if faults.outage else None
+        return await run_calls(registry, n, rps, outage_ends, stub)
+    finally:
+        await registry.aclose()
+
+
+def report(name: str, calls: list[tuple[bool, float]], upstream: int) -> None:
+    timings = [ms for _, ms in calls]
+    success = sum(ok for ok, _ in calls) / len(calls)
+    snapshot = next(iter(endpoints.snapshot().values()), {})
+    print(
+        f"    {name:<17} {success:>8.0%} {percentile(timings, 50):>8.0f} "
+        f"{percentile(timings, 99):>8.0f} {upstream:>9} {snapshot.get('opened', 0):>7} "
+        f"{snapshot.get('rejected', 0):>9} {snapshot.get('hedged', 0):>7} "
+        f"{snapshot.get('hedge_win_rate', 0.0):>9.0%}"
+    )
+
+
+async def main(n: int, rps: float, latency: str, port: int) -> None:
+    stub_app = create_stub_app(LatencyModel.parse(latency), LatencyModel.parse("fixed:0"))
+    overrides = {
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{port}/v1",
+        "OPENAI_API_KEY": "stub",
+        "RESILIENCE_BREAKER_RESET_SECONDS": 1.0,
+    }
+    with StubServer(stub_app, port=port) as stub, ExitStack() as stack:
+        for name, value in overrides.items():
+            stack.enter_context(patch.object(settings, name, value))
+
+        print(f"{n} chat completions per row at {rps:g}/s, stub latency {latency}")
+        for scenario_name, faults in SCENARIOS.items():
+            print(f"  {scenario_name}")
+            print(
+                f"    {'client':<17} {'success':>8} {'p50 ms':>8} {'p99 ms':>8} "
+                f"{'upstream':>9} {'opened':>7} {'rejected':>9} {'hedged':>7} {'hedge won':>9}"
+            )
+            for client_name, client_settings in CLIENTS.items():
+                endpoints.clear()
+                before = stub.calls["chat"]
+                with ExitStack() as client_stack, contextlib.redirect_stdout(io.StringIO()):
+                    for name, value in client_settings.items():
+                        client_stack.enter_context(patch.object(settings, name, value))
+                    calls = await scenario(stub, faults, n, rps)
+                report(client_name, calls, stub.calls["chat"] - before)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=200)
+    parser.add_argument("--rps", type=float, default=50.0, help="call arrival rate")
+    parser.add_argument("--llm-latency", default="lognormal:100:0.3")
+    parser.add_argument("--port", type=int, default=8901)
+    args = parser.parse_args()
+    asyncio.run(main(args.n, args.rps, args.llm_latency, args.port))
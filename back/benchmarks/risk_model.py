@@ -0,0 +1,116 @@
+"""
+Training time, holdout AUC and scoring latency of the local risk model.
+
+Generates synthetic labelled transactions for a few hundred customers (fraud is more
+likely with unusual amounts, night hours, new devices/countries and a few risky
+merchants), trains on 80% and evaluates on the rest, then times single-transaction
+scoring (the graph node) and batch scoring.
+
+    uv run python -m benchmarks.risk_model --n 20000
+"""
+
+import argparse
+import math
+import random
+import time
+from datetime import datetime
+
+import numpy as np
+
+from app.models.schemas import CustomerBehavior, CustomerProfile, TransactionInput
+from app.services.profile_engine import bootstrap_profile
+from app.services.risk_model import RiskModel, feature_matrix, roc_auc
+
+RISKY_MERCHANTS = {"M-007", "M-013"}
+
+
+def synthetic_dataset(
+    n: int, seed: int = 7
+) -> tuple[list[TransactionInput], list[CustomerProfile], np.ndarray]:
+    rng = random.Random(seed)
+    profiles = [
+        bootstrap_profile(
+            CustomerBehavior(
+                customer_id=f"CU-{i:04d}",
+                usual_amount_avg=rng.choice([150.0, 400.0, 900.0, 2500.0]),
+                usual_hours="08-20",
+                usual_countries="PE",
+                usual_devices=f"D-{i:04d}",
+            )
+        )
+        for i in range(300)
+    ]
+
+    transactions, tx_profiles, labels = [], [], []
+    for i in range(n):
+        profile = rng.choice(profiles)
+        ratio = math.exp(rng.gauss(0, 0.6))
+        night = rng.random() < 0.15
+        new_device = rng.random() < 0.1
+        new_country = rng.random() < 0.05
+        merchant = f"M-{rng.randrange(20):03d}"
+        logit = (
+            -4.0
+            + 1.5 * math.log(ratio)
+            + 1.2 * night
+            + 1.5 * new_device
+            + 1.8 * new_country
+            + 1.0 * (merchant in RISKY_MERCHANTS)
+        )
+        labels.append(rng.random() < 1 / (1 + math.exp(-logit)))
+        transactions.append(
+            TransactionInput(
+                transaction_id=f"T-SYN-{i}",
+                customer_id=profile.customer_id,
+                amount=round(profile.amount_mean * ratio, 2),
+                currency="PEN",
+                country="CL" if new_country else "PE",
+                channel=rng.choice(["web", "mobile", "pos"]),
+                device_id="D-NEW" if new_device else next(iter(profile.devices)),
+                timestamp=datetime(
+                    2025, 12, 17, rng.choice([2, 3, 4]) if night else rng.randint(8, 20)
+                ),
+                merchant_id=merchant,
+            )
+        )
+        tx_profiles.append(profile)
+    return transactions, tx_profiles, np.array(labels, dtype=float)
+
+
+def main(n: int, buckets: int) -> None:
+    transactions, profiles, labels = synthetic_dataset(n)
+    split = int(n * 0.8)
+
+    start = time.perf_counter()
+    matrix = feature_matrix(transactions, profiles, buckets)
+    features_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    model = RiskModel.fit(matrix[:split], labels[:split], merchant_buckets=buckets)
+    fit_ms = (time.perf_counter() - start) * 1000
+    auc = roc_auc(labels[split:], model.score_matrix(matrix[split:]))
+
+    holdout = list(zip(transactions[split:], profiles[split:], strict=True))
+    start = time.perf_counter()
+    for tx, profile in holdout:
+        model.score(tx, profile)
+    single_us = (time.perf_counter() - start) / len(holdout) * 1e6
+
+    start = time.perf_counter()
+    model.score_batch(transactions[split:], profiles[split:])
+    batch_us = (time.perf_counter() - start) / len(holdout) * 1e6
+
+    print(f"{n:,} synthetic transactions ({labels.mean():.1%} fraud), {matrix.shape[1]} features")
+    print(f"  features      {features_ms:8.1f} ms")
+    print(f"  training      {fit_ms:8.1f} ms ({split:,} samples)")
+    print(f"  holdout AUC   {auc:8.3f} ({n - split:,} samples)")
+    print(f"  score         {single_us:8.1f} µs/transaction (one by one)")
+    print(f"  score_batch   {batch_us:8.1f} µs/transaction")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--buckets", type=int, default=16, help="merchant hash buckets")
+    args = parser.parse_args()
+    main(args.n, args.buckets)
@@ -0,0 +1,61 @@
+"""
+Throughput of the deterministic pre-screening stage.
+
+Generates a synthetic stream of transactions around the stub customer profile and
+reports the cost per evaluation and the share of transactions decided without LLM.
+
+    uv run python -m benchmarks.rule_engine --n 100000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from datetime import datetime
+
+from app.models.schemas import TransactionInput
+from app.services.features import extract_features
+from app.services.rule_engine import get_rule_engine
+from benchmarks.stubs import STUB_PROFILE
+
+
+def synthetic_transactions(n: int, seed: int = 7) -> list[TransactionInput]:
+    rng = random.Random(seed)
+    return [
+        TransactionInput(
+            transaction_id=f"T-RULE-{i}",
+            customer_id=STUB_PROFILE.customer_id,
+            amount=round(rng.lognormvariate(6.0, 0.8), 2),
+            currency="PEN",
+            country=rng.choices(["PE", "US", "CL"], weights=[90, 6, 4])[0],
+            channel=rng.choice(["web", "mobile", "atm"]),
+            device_id=rng.choices(["D-01", "D-99"], weights=[92, 8])[0],
+            timestamp=datetime(2025, 12, 17, rng.randrange(24), rng.randrange(60)),
+            merchant_id=f"M-{rng.randrange(50):03d}",
+        )
+        for i in range(n)
+    ]
+
+
+async def main(n: int) -> None:
+    engine = await get_rule_engine()
+    transactions = synthetic_transactions(n)
+
+    start = time.perf_counter()
+    outcomes = Counter()
+    for tx in transactions:
+        result = engine.evaluate(extract_features(tx, STUB_PROFILE))
+        outcomes[result.decision if result else "LLM_GRAPH"] += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"{n} transactions, {elapsed * 1e6 / n:.2f} µs per feature extraction + evaluation")
+    for outcome, count in outcomes.most_common():
+        print(f"  {outcome:<18} {count:>8} ({count / n:6.1%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=100_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.n))
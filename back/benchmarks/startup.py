@@ -0,0 +1,175 @@
+"""
+Cold start of the API: module import, liveness and readiness.
+
+Every run uses a fresh interpreter:
+
+- import: `python -X importtime -c "import main"`. Reports the import time of `main`, the
+  slowest top-level packages, and fails if a module that must load lazily (LangGraph,
+  the agents, langchain-openai, FAISS, Tavily) is imported together with the app;
+- serve: starts `uvicorn main:app` against `benchmarks.stub_server` with an empty
+  database and policy index, and polls `GET /health` and `GET /ready` to time liveness
+  and readiness from process start, plus the warm-up stages reported by `/ready`.
+
+`--max-import-ms` makes the median import time a regression gate (exit code 1).
+
+    uv run python -m benchmarks.startup --runs 5 --max-import-ms 2000
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+from benchmarks.stub_server import LatencyModel, StubServer, create_stub_app
+
+BACK_DIR = Path(__file__).resolve().parents[1]
+# Módulos que solo deben cargarse en el calentamiento, nunca al importar `main`
+LAZY_MODULES = (
+    "langgraph",
+    "langchain_openai",
+    "openai",
+    "faiss",
+    "langchain_tavily",
+    "langchain_community",
+    "app.agents",
+)
+
+
+def import_profile() -> tuple[float, dict[str, float], set[str]]:
+    """Import time of `main` (ms), self time per top-level package (ms) and modules loaded"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACK_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    packages: dict[str, float] = defaultdict(float)
+    modules: set[str] = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        name = name.strip()
+        modules.add(name)
+        packages[name.split(".")[0]] += int(self_us) / 1000
+        if name == "main":
+            total = int(cumulative_us) / 1000
+    return total, packages, modules
+
+
+def eager_modules(modules: set[str]) -> list[str]:
+    return sorted(
+        lazy for lazy in LAZY_MODULES if any(m == lazy or m.startswith(f"{lazy}.") for m in modules)
+    )
+
+
+def serve_once(stub_url: str, port: int, timeout: float) -> tuple[float, float, dict]:
+    """Seconds from process start to /health 200 and to /ready 200, and the /ready body"""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "OPENAI_BASE_URL": f"{stub_url}/v1",
+            "OPENAI_API_KEY": "stub",
+            "TAVILY_API_BASE_URL": stub_url,
+            "TAVILY_API_KEY": "stub",
+            "DATABASE_URL": f"sqlite+aiosqlite:///{tmp}/startup.db",
+            "POLICY_INDEX_DIR": f"{tmp}/policy_index",
+        }
+        command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)]
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [*command, "--log-level", "warning"],
+            cwd=BACK_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        live = ready = None
+        body: dict = {}
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+                while ready is None and time.perf_counter() - start < timeout:
+                    try:
+                        if live is None and client.get("/health").status_code == 200:
+                            live = time.perf_counter() - start
+                        response = client.get("/ready")
+                        if response.status_code == 200:
+                            ready = time.perf_counter() - start
+                            body = response.json()
+                    except httpx.TransportError:
+                        pass
+                    time.sleep(0.01)
+        finally:
+            process.terminate()
+            process.wait()
+        if ready is None:
+            raise RuntimeError(f"The app was not ready after {timeout:.0f}s")
+        return live, ready, body
+
+
+def summary(values: list[float]) -> str:
+    return (
+        f"median {statistics.median(values):>7.0f}  min {min(values):>7.0f}  "
+        f"max {max(values):>7.0f}"
+    )
+
+
+def main(runs: int, top: int, serve: bool, port: int, max_import_ms: float | None) -> int:
+    totals, packages, eager = [], defaultdict(list), set()
+    for _ in range(runs):
+        total, per_package, modules = import_profile()
+        totals.append(total)
+        for package, ms in per_package.items():
+            packages[package].append(ms)
+        eager.update(eager_modules(modules))
+
+    print(f"import main ({runs} runs, ms)   {summary(totals)}")
+    print("  slowest packages (self time, median ms)")
+    medians = {package: statistics.median(ms) for package, ms in packages.items()}
+    for package, ms in sorted(medians.items(), key=lambda item: -item[1])[:top]:
+        print(f"    {package:<28} {ms:>7.1f}")
+    print("  lazy modules imported with the app: " + (", ".join(sorted(eager)) or "none"))
+
+    if serve:
+        stub_app = create_stub_app(LatencyModel.parse("fixed:0"), LatencyModel.parse("fixed:0"))
+        live, ready, stages = [], [], defaultdict(list)
+        with StubServer(stub_app, port=port + 1) as stub:
+            for _ in range(runs):
+                seconds_live, seconds_ready, body = serve_once(stub.url, port, timeout=60)
+                live.append(seconds_live * 1000)
+                ready.append(seconds_ready * 1000)
+                for stage, ms in body.get("stages_ms", {}).items():
+                    stages[stage].append(ms)
+        print(f"uvicorn main:app ({runs} runs, ms from process start)")
+        print(f"  /health 200   {summary(live)}")
+        print(f"  /ready 200    {summary(ready)}")
+        print(
+            "  warm-up stages (median ms): "
+            + ", ".join(f"{stage} {statistics.median(ms):.0f}" for stage, ms in stages.items())
+        )
+
+    failed = bool(eager)
+    if max_import_ms is not None and statistics.median(totals) > max_import_ms:
+        print(f"❌ median import time above {max_import_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="packages listed by import time")
+    parser.add_argument("--no-serve", dest="serve", action="store_false", help="import only")
+    parser.add_argument("--port", type=int, default=8910, help="app port (stub on port + 1)")
+    parser.add_argument("--max-import-ms", type=float, help="fail above this median")
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.top, args.serve, args.port, args.max_import_ms))
@@ -0,0 +1,241 @@
+"""
+Local OpenAI-compatible and Tavily stand-in for offline load tests.
+
+Serves `/v1/chat/completions` and `/v1/embeddings` (OpenAI API shape) and `/search`
+(Tavily API shape) with the canned responses of `benchmarks.stubs`, which match each
+agent's JSON schema, after a latency drawn from a configurable distribution. Point the
+app at it with `OPENAI_BASE_URL=http://127.0.0.1:8900/v1` and
+`TAVILY_API_BASE_URL=http://127.0.0.1:8900`.
+
+    uv run python -m benchmarks.stub_server --port 8900 --llm-latency lognormal:300:0.5
+
+Latency specs (milliseconds): `fixed:MS`, `uniform:LO:HI`, `lognormal:MEDIAN:SIGMA`.
+
+Faults can be injected on every endpoint: a share of error responses (`--error-rate`,
+`--error-status`, optional `--retry-after`), a share of extra-slow responses
+(`--slow-rate`, `--slow-ms`) and a full outage. They can be changed while the server
+runs with `POST /_faults` (same fields as `FaultModel`) or, in-process, through
+`app.state.faults`.
+
+    uv run python -m benchmarks.stub_server --error-rate 0.3 --retry-after 0.5
+"""
+
+import argparse
+import asyncio
+import hashlib
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, fields
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.core.tokens import count_tokens
+from benchmarks.stubs import canned_response, load_tokenizer
+
+EMBEDDING_DIM = 64
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    kind: str
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, *params = spec.split(":")
+        values = [float(p) for p in params]
+        if kind == "fixed" and len(values) == 1:
+            return cls(kind, values[0])
+        if kind in ("uniform", "lognormal") and len(values) == 2:
+            return cls(kind, *values)
+        raise ValueError(f"Invalid latency spec: {spec}")
+
+    def sample(self) -> float:
+        """Latency in seconds"""
+        if self.kind == "fixed":
+            ms = self.a
+        elif self.kind == "uniform":
+            ms = random.uniform(self.a, self.b)
+        else:
+            ms = random.lognormvariate(0, self.b) * self.a
+        return ms / 1000
+
+
+@dataclass
+class FaultModel:
+    """Injected failures: error responses, extra-slow responses and a full outage"""
+
+    error_rate: float = 0.0
+    error_status: int = 503
+    retry_after: float | None = None
+    slow_rate: float = 0.0
+    slow_ms: float = 0.0
+    outage: bool = False
+
+    async def apply(self) -> JSONResponse | None:
+        """Sleep for slow responses; the error response to send, or None"""
+        if self.slow_rate and random.random() < self.slow_rate:
+            await asyncio.sleep(self.slow_ms / 1000)
+        if not self.outage and random.random() >= self.error_rate:
+            return None
+        headers = {"retry-after": f"{self.retry_after:g}"} if self.retry_after else {}
+        return JSONResponse(
+            {"error": {"message": "Injected fault", "type": "server_error"}},
+            status_code=self.error_status,
+            headers=headers,
+        )
+
+
+def fake_embedding(text: str) -> list[float]:
+    """Deterministic unit vector derived from the text hash"""
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    vector = [rng.gauss(0, 1) for _ in range(EMBEDDING_DIM)]
+    norm = sum(v * v for v in vector) ** 0.5
+    return [v / norm for v in vector]
+
+
+def create_stub_app(
+    llm_latency: LatencyModel, search_latency: LatencyModel, faults: FaultModel | None = None
+) -> FastAPI:
+    load_tokenizer()
+    app = FastAPI(title="OpenAI/Tavily stub")
+    app.state.calls = Counter()
+    app.state.faults = faults or FaultModel()
+
+    async def injected_fault() -> JSONResponse | None:
+        error = await app.state.faults.apply()
+        if error is not None:
+            app.state.calls["faults"] += 1
+        return error
+
+    @app.post("/_faults")
+    async def set_faults(request: Request):
+        body = await request.json()
+        names = {f.name for f in fields(FaultModel)}
+        for name, value in body.items():
+            if name in names:
+                setattr(app.state.faults, name, value)
+        return app.state.faults
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls["chat"] += 1
+        await asyncio.sleep(llm_latency.sample())
+        if error := await injected_fault():
+            return error
+
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        content = canned_response(prompt)
+        prompt_tokens, completion_tokens = count_tokens(prompt), count_tokens(content)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        app.state.calls["embeddings"] += 1
+        if error := await injected_fault():
+            return error
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        return {
+            "object": "list",
+            "model": body.get("model", "stub"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": fake_embedding(str(text))}
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": 0, "total_tokens": 0},
+        }
+
+    @app.post("/search")
+    async def search(request: Request):
+        body = await request.json()
+        app.state.calls["search"] += 1
+        await asyncio.sleep(search_latency.sample())
+        if error := await injected_fault():
+            return error
+        return {
+            "query": body.get("query", ""),
+            "answer": None,
+            "images": [],
+            "results": [],
+            "response_time": 0.0,
+        }
+
+    return app
+
+
+class StubServer:
+    """Runs the stub app with uvicorn in a background thread (its own event loop)"""
+
+    def __init__(self, app: FastAPI, host: str = "127.0.0.1", port: int = 8900):
+        self.app = app
+        self.url = f"http://{host}:{port}"
+        self._server = uvicorn.Server(
+            uvicorn.Config(app, host=host, port=port, log_level="warning", access_log=False)
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join()
+
+    @property
+    def calls(self) -> Counter:
+        return self.app.state.calls
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--llm-latency", default="lognormal:300:0.5")
+    parser.add_argument("--search-latency", default="lognormal:500:0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of error responses")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds on errors")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="share of slow responses")
+    parser.add_argument("--slow-ms", type=float, default=0.0, help="extra latency when slow")
+    args = parser.parse_args()
+
+    stub_app = create_stub_app(
+        LatencyModel.parse(args.llm_latency),
+        LatencyModel.parse(args.search_latency),
+        FaultModel(
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            retry_after=args.retry_after,
+            slow_rate=args.slow_rate,
+            slow_ms=args.slow_ms,
+        ),
+    )
+    uvicorn.run(stub_app, host=args.host, port=args.port)
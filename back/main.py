@@ -1,17 +1,72 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.api import hitl, transactions
+from app.api import hitl, metrics, transactions
+from app.core.cache import install_llm_cache, llm_cache
 from app.core.config import settings
+from app.core.llm import llm_registry
 from app.db.session import init_db
+from app.services.job_queue import analysis_jobs
+from app.services.profile_cache import profile_cache
+from app.services.velocity import velocity_store
+from app.services.warmup import get_fraud_graph, warmup
+
+
+async def start_llm_clients() -> None:
+    llm_registry.start()
+    install_llm_cache()
+
+
+async def load_tokenizer() -> None:
+    # Puede descargar el fichero del encoding: en un hilo, nunca desde una petición
+    from app.core.tokens import load_encoding
+
+    await asyncio.to_thread(load_encoding)
+
+
+async def load_policy_index() -> None:
+    from app.services.policy_index import policy_index
+
+    await policy_index.ensure_ready()
+
+
+async def warm_up() -> None:
+    """
+    Fase de calentamiento: todo lo que la app necesita antes de declararse lista.
+    Los agentes (LangGraph, LangChain, FAISS, Tavily) se importan aquí y no al
+    importar `main`, así `/health` responde mientras se cargan. Las etapas críticas
+    se reintentan con backoff; si falla una opcional la app arranca degradada (los
+    tokens se aproximan, el agente RAG carga el índice bajo demanda y los perfiles se
+    leen de la BD).
+    """
+    await warmup.stage("database", init_db)
+    await warmup.stage("llm_clients", start_llm_clients)
+    # Importar y compilar en un hilo deja libre el event loop para los probes
+    await warmup.stage("graph", lambda: asyncio.to_thread(get_fraud_graph))
+    await warmup.stage("tokenizer", load_tokenizer, critical=False)
+    await warmup.stage("policy_index", load_policy_index, critical=False)
+    await warmup.stage("profiles", profile_cache.warm, critical=False)
+    await warmup.stage("velocity", velocity_store.restore, critical=False)
+    await warmup.stage("job_workers", analysis_jobs.start)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await init_db()
+    warmup.start(warm_up)
     yield
+    await warmup.aclose()
+    await analysis_jobs.aclose()
+    if warmup.done("graph"):
+        from app.agents.external_threat_intel import threat_intel_cache
+
+        await threat_intel_cache.aclose()
+    await llm_registry.aclose()
+    await llm_cache.aclose()
+    await velocity_store.aclose()
 
 
 app = FastAPI(
@@ -44,13 +99,49 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness: el proceso responde, aunque el calentamiento siga o esté degradado"""
     return {"status": "healthy"}
 
 
-app.include_router(transactions.router, prefix="/api/transactions", tags=["transactions"])
-app.include_router(hitl.router, prefix="/api/hitl", tags=["hitl"])
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 200 cuando terminaron las etapas críticas (BD, grafo, workers)"""
+    snapshot = warmup.snapshot()
+    if not warmup.ready:
+        headers = {"Retry-After": str(settings.WARMUP_RETRY_AFTER_SECONDS)}
+        return JSONResponse(snapshot, status_code=503, headers=headers)
+    return snapshot
+
+
+def require_stage(stage: str | None = None):
+    """503 con Retry-After hasta que termina `stage` (o todo el calentamiento)"""
+
+    async def dependency() -> None:
+        if not (warmup.done(stage) if stage else warmup.ready):
+            raise HTTPException(
+                status_code=503,
+                detail="Servicio calentando, reintente en unos segundos",
+                headers={"Retry-After": str(settings.WARMUP_RETRY_AFTER_SECONDS)},
+            )
 
+    return dependency
+
+
+app.include_router(
+    transactions.router,
+    prefix="/api/transactions",
+    tags=["transactions"],
+    dependencies=[Depends(require_stage())],
+)
+# La revisión humana no usa el grafo ni el LLM: solo necesita el esquema de la BD
+app.include_router(
+    hitl.router,
+    prefix="/api/hitl",
+    tags=["hitl"],
+    dependencies=[Depends(require_stage("database"))],
+)
+app.include_router(metrics.router, prefix="/api/metrics", tags=["metrics"])
+app.include_router(metrics.prometheus_router, tags=["metrics"])
 
 if __name__ == "__main__":
     import uvicorn
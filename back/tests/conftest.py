@@ -0,0 +1,62 @@
+import asyncio
+import os
+import tempfile
+
+# Base de datos propia de los tests: debe fijarse antes de importar `app`, que crea el
+# engine al importarse
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db"
+
+import pytest  # noqa: E402
+
+from app.db.models import Base  # noqa: E402
+from app.db.session import AsyncSessionLocal, engine  # noqa: E402
+
+
+@pytest.fixture
+async def db():
+    """Session on an empty schema, recreated for every test"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        yield session
+    # Cada test corre en su propio event loop: no se reutilizan conexiones entre tests
+    await engine.dispose()
+
+
+# Nodos de evidencia del grafo: sus stubs dejan una evidencia y una señal cada uno
+EVIDENCE_NODES = ("context", "behavioral", "rag", "fast_analysis", "threat_intel")
+
+
+def stub_node(name: str, delay: float = 0.0):
+    """Instant (or `delay` seconds slow) graph node that records itself in `agent_route`"""
+    from app.models.schemas import AgentEvidence
+
+    async def node(state) -> dict:
+        await asyncio.sleep(delay)
+        update: dict = {"agent_route": [name]}
+        if name in EVIDENCE_NODES:
+            update["evidences"] = [AgentEvidence(agent_name=name, reasoning="stub", confidence=0.9)]
+            update["signals"] = [f"[{name}] stub"]
+        if name == "arbiter":
+            update |= {"decision": "APPROVE", "confidence": 0.9, "risk_score": 0.1}
+        return update
+
+    return node
+
+
+@pytest.fixture
+def stub_graph(monkeypatch):
+    """
+    Builds the fraud graph with stub nodes (the real topology, instrumentation,
+    fallbacks and deadline escalation); `delays` slows down some nodes, in seconds
+    """
+    from app.agents import graph
+
+    def build(parallel: bool = True, delays: dict[str, float] | None = None):
+        for name in graph.NODES:
+            if name != "escalation":
+                monkeypatch.setitem(graph.NODES, name, stub_node(name, (delays or {}).get(name, 0)))
+        return graph.create_fraud_detection_graph(parallel=parallel)
+
+    return build
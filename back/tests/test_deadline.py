@@ -0,0 +1,140 @@
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.agents.fallbacks import DEGRADED_REASONING, FALLBACKS
+from app.core.config import settings
+from app.core.deadline import budget_ms, critical_overruns, stage_timeout
+from app.core.instrumentation import instrument_node
+from app.models.schemas import FraudDetectionState, TransactionInput
+
+
+def make_state(channel: str = "web", **fields) -> FraudDetectionState:
+    fields.setdefault("start_time", datetime.now(UTC))
+    return FraudDetectionState(
+        transaction=TransactionInput(
+            transaction_id="T-1001",
+            customer_id="CU-001",
+            amount=150.0,
+            currency="PEN",
+            country="PE",
+            channel=channel,
+            device_id="D-01",
+            timestamp=datetime(2025, 12, 17, 14, 15),
+            merchant_id="M-001",
+        ),
+        **fields,
+    )
+
+
+@pytest.fixture
+def deadline(monkeypatch):
+    monkeypatch.setattr(settings, "DEADLINE_ENABLED", True)
+    monkeypatch.setattr(settings, "DEADLINE_ARBITER_SHARE", 0.3)
+    monkeypatch.setattr(settings, "DEADLINE_MIN_STAGE_MS", 50)
+
+
+def slow_node(seconds: float, calls: list | None = None):
+    async def node(state):
+        if calls is not None:
+            calls.append(state)
+        await asyncio.sleep(seconds)
+        return {"agent_route": ["slow"]}
+
+    return node
+
+
+def test_budget_is_per_request_or_per_channel(deadline):
+    assert budget_ms(make_state("pos")) == settings.DEADLINE_CHANNEL_MS["pos"]
+    assert budget_ms(make_state("pos", deadline_ms=300)) == 300
+
+
+def test_no_budget_when_disabled():
+    assert settings.DEADLINE_ENABLED is False
+    assert budget_ms(make_state(deadline_ms=300)) is None
+    assert stage_timeout(make_state(deadline_ms=300), "context") is None
+
+
+def test_stage_timeout_keeps_the_arbiter_share(deadline):
+    state = make_state(deadline_ms=1000)
+
+    assert stage_timeout(state, "context") == pytest.approx(0.7, abs=0.05)
+    assert stage_timeout(state, "arbiter") == pytest.approx(1.0, abs=0.05)
+    assert stage_timeout(state, "explainability") == pytest.approx(1.0, abs=0.05)
+
+
+async def test_slow_stage_times_out_into_its_fallback(deadline):
+    run = instrument_node("debate", slow_node(5), FALLBACKS["debate"])
+
+    start = time.perf_counter()
+    update = await run(make_state(deadline_ms=200))
+
+    assert time.perf_counter() - start < 1
+    assert update["degraded_stages"] == ["debate:timeout"]
+    assert [e.reasoning for e in update["evidences"]] == [DEGRADED_REASONING]
+    assert update["agent_metrics"][0].degraded == "timeout"
+    assert "agent_route" not in update
+
+
+async def test_exhausted_budget_skips_the_stage(deadline):
+    calls = []
+    run = instrument_node("debate", slow_node(0, calls), FALLBACKS["debate"])
+    state = make_state(deadline_ms=200, start_time=datetime.now(UTC) - timedelta(seconds=1))
+
+    update = await run(state)
+
+    assert calls == []
+    assert update["degraded_stages"] == ["debate:budget_exhausted"]
+
+
+async def test_stage_within_budget_is_not_degraded(deadline):
+    update = await instrument_node("debate", slow_node(0), FALLBACKS["debate"])(
+        make_state(deadline_ms=1000)
+    )
+
+    assert update["agent_route"] == ["slow"]
+    assert "degraded_stages" not in update
+
+
+def test_only_critical_overruns_escalate():
+    state = make_state(degraded_stages=["debate:timeout", "threat_intel:timeout"])
+    assert critical_overruns(state) == []
+
+    state = make_state(degraded_stages=["threat_intel:timeout", "behavioral:budget_exhausted"])
+    assert critical_overruns(state) == ["behavioral:budget_exhausted"]
+
+
+async def test_critical_overrun_escalates_to_human(deadline, stub_graph):
+    graph = stub_graph(delays={"behavioral": 5})
+
+    result = await graph.ainvoke(make_state(deadline_ms=500))
+
+    assert result["decision"] == "ESCALATE_TO_HUMAN"
+    assert result["confidence"] == 0.0
+    assert "behavioral:timeout" in result["degraded_stages"]
+    assert "deadline_escalation" in result["agent_route"]
+    assert not {"debate", "arbiter"} & set(result["agent_route"])
+    assert "explainability" in result["agent_route"]
+
+
+async def test_non_critical_overrun_keeps_the_arbiter_decision(deadline, stub_graph):
+    graph = stub_graph(delays={"debate": 5})
+
+    result = await graph.ainvoke(make_state(deadline_ms=500))
+
+    assert result["decision"] == "APPROVE"
+    assert result["degraded_stages"] == ["debate:timeout"]
+    assert "arbiter" in result["agent_route"]
+    assert "deadline_escalation" not in result["agent_route"]
+
+
+async def test_without_deadline_slow_stages_run_to_completion(stub_graph):
+    graph = stub_graph(delays={"behavioral": 0.2})
+
+    result = await graph.ainvoke(make_state(deadline_ms=50))
+
+    assert result["decision"] == "APPROVE"
+    assert result["degraded_stages"] == []
+    assert "behavioral" in result["agent_route"]
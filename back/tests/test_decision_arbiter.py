@@ -0,0 +1,68 @@
+from datetime import datetime
+
+import pytest
+
+from app.agents import decision_arbiter
+from app.core.constants import DEFAULT_HITL_RISK_SCORE
+from app.models.schemas import FraudDetectionState, TransactionInput
+from app.services.risk_model import decision_for_risk
+
+
+def make_state(model_score: float | None = None) -> FraudDetectionState:
+    return FraudDetectionState(
+        transaction=TransactionInput(
+            transaction_id="T-1001",
+            customer_id="CU-001",
+            amount=1800.0,
+            currency="PEN",
+            country="PE",
+            channel="web",
+            device_id="D-01",
+            timestamp=datetime(2025, 12, 17, 3, 15),
+            merchant_id="M-001",
+        ),
+        model_score=model_score,
+    )
+
+
+def answer(monkeypatch, response: dict) -> None:
+    async def cascade(agent_name, prompt, inputs):
+        return response
+
+    monkeypatch.setattr(decision_arbiter, "invoke_json_cascade", cascade)
+
+
+@pytest.mark.parametrize(
+    ("risk_score", "confidence", "expected"),
+    [("0.9", "0.8", (0.9, 0.8)), (1.7, -0.2, (1.0, 0.0)), (0.3, 1, (0.3, 1.0))],
+)
+async def test_scores_are_converted_and_clamped(monkeypatch, risk_score, confidence, expected):
+    answer(monkeypatch, {"risk_score": risk_score, "confidence": confidence})
+
+    update = await decision_arbiter.decision_arbiter_agent(make_state())
+
+    assert (update["risk_score"], update["confidence"]) == expected
+    if expected[1] < 0.6:
+        assert update["decision"] == "ESCALATE_TO_HUMAN"
+    else:
+        assert update["decision"] == decision_for_risk(expected[0])
+
+
+async def test_low_confidence_escalates_with_the_risk_score(monkeypatch):
+    answer(monkeypatch, {"risk_score": "0.2", "confidence": "0.4"})
+
+    update = await decision_arbiter.decision_arbiter_agent(make_state())
+
+    assert (update["decision"], update["risk_score"]) == ("ESCALATE_TO_HUMAN", 0.2)
+
+
+@pytest.mark.parametrize(
+    ("model_score", "expected"), [(None, DEFAULT_HITL_RISK_SCORE), (0.91, 0.91)]
+)
+@pytest.mark.parametrize("bad", ["alto", None, "nan"])
+async def test_unusable_scores_escalate_with_a_risk_score(monkeypatch, bad, model_score, expected):
+    answer(monkeypatch, {"risk_score": bad, "confidence": 0.9})
+
+    update = await decision_arbiter.decision_arbiter_agent(make_state(model_score))
+
+    assert update == {"decision": "ESCALATE_TO_HUMAN", "confidence": 0.0, "risk_score": expected}
@@ -0,0 +1,107 @@
+from datetime import datetime
+
+import pytest
+from langchain_core.documents import Document
+
+from app.agents import fast_analysis, internal_policy_rag
+from app.models.schemas import FraudDetectionState, TransactionInput
+
+POLICY = Document(
+    page_content="Transacciones nocturnas de monto alto requieren revisión",
+    metadata={"policy_id": "FP-01", "version": "2025.1"},
+)
+
+
+class Retriever:
+    """Stands in for `retrieve_policies`, failing the first `failures` calls"""
+
+    def __init__(self, failures: int = 0):
+        self.calls = 0
+        self.failures = failures
+
+    async def __call__(self, state):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("policy index unavailable")
+        return "monto 1800 canal web país PE", [POLICY]
+
+
+async def failing_cascade(*args, **kwargs):
+    raise RuntimeError("LLM unavailable")
+
+
+async def policy_cascade(*args, **kwargs):
+    return {
+        "applied_policies": [{"policy_id": "FP-01", "reason": "madrugada", "violated": True}],
+        "reasoning": "viola FP-01",
+        "confidence": 0.8,
+    }
+
+
+@pytest.fixture
+def state() -> FraudDetectionState:
+    return FraudDetectionState(
+        transaction=TransactionInput(
+            transaction_id="T-1001",
+            customer_id="CU-001",
+            amount=1800.0,
+            currency="PEN",
+            country="PE",
+            channel="web",
+            device_id="D-01",
+            timestamp=datetime(2025, 12, 17, 3, 15),
+            merchant_id="M-001",
+        )
+    )
+
+
+@pytest.fixture
+def fallback_agents(monkeypatch):
+    """Context and behavioral agents of the fallback path, without LLM calls"""
+
+    async def context_agent(state):
+        return {"agent_route": ["transaction_context_agent"]}
+
+    async def behavioral_agent(state):
+        return {"agent_route": ["behavioral_pattern_agent"]}
+
+    monkeypatch.setattr(fast_analysis, "transaction_context_agent", context_agent)
+    monkeypatch.setattr(fast_analysis, "behavioral_pattern_agent", behavioral_agent)
+    monkeypatch.setattr(internal_policy_rag, "invoke_json_cascade", policy_cascade)
+
+
+async def test_fallback_reuses_the_retrieved_policies(monkeypatch, state, fallback_agents):
+    retriever = Retriever()
+    monkeypatch.setattr(fast_analysis, "retrieve_policies", retriever)
+    monkeypatch.setattr(internal_policy_rag, "retrieve_policies", retriever)
+    monkeypatch.setattr(fast_analysis, "invoke_json_cascade", failing_cascade)
+
+    update = await fast_analysis.fast_analysis_agent(state)
+
+    assert retriever.calls == 1
+    assert [c.policy_id for c in update["citations_internal"]] == ["FP-01"]
+    assert sorted(update["agent_route"]) == [
+        "behavioral_pattern_agent",
+        "internal_policy_rag_agent",
+        "transaction_context_agent",
+    ]
+
+
+async def test_retrieval_failure_falls_back_to_the_separate_agents(
+    monkeypatch, state, fallback_agents
+):
+    retriever = Retriever(failures=1)
+    monkeypatch.setattr(fast_analysis, "retrieve_policies", retriever)
+    monkeypatch.setattr(internal_policy_rag, "retrieve_policies", retriever)
+
+    update = await fast_analysis.fast_analysis_agent(state)
+
+    assert retriever.calls == 2  # el agente RAG vuelve a intentar la búsqueda
+    assert "internal_policy_rag_agent" in update["agent_route"]
+    assert [c.policy_id for c in update["citations_internal"]] == ["FP-01"]
+
+
+async def test_rag_agent_survives_a_retrieval_failure(monkeypatch, state):
+    monkeypatch.setattr(internal_policy_rag, "retrieve_policies", Retriever(failures=1))
+
+    assert await internal_policy_rag.internal_policy_rag_agent(state) == {}
@@ -0,0 +1,64 @@
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from app.models.schemas import FraudDetectionState, TransactionInput
+
+PIPELINE = ["profile", "velocity", "risk_model", "prescreen"]
+STANDARD_EVIDENCE = ["behavioral", "context", "rag", "threat_intel"]
+FAST_EVIDENCE = ["fast_analysis", "threat_intel"]
+DECISION = ["aggregator", "debate", "arbiter", "explainability"]
+
+
+def make_state(analysis_mode: str = "standard") -> FraudDetectionState:
+    return FraudDetectionState(
+        transaction=TransactionInput(
+            transaction_id="T-1001",
+            customer_id="CU-001",
+            amount=150.0,
+            currency="PEN",
+            country="PE",
+            channel="web",
+            device_id="D-01",
+            timestamp=datetime(2025, 12, 17, 14, 15),
+            merchant_id="M-001",
+        ),
+        analysis_mode=analysis_mode,
+    )
+
+
+def merged(result: dict) -> dict:
+    """Fields filled by the `operator.add` reducers, independent of branch order"""
+    return {
+        "evidences": sorted(e.agent_name for e in result["evidences"]),
+        "signals": sorted(result["signals"]),
+        "agent_route": sorted(result["agent_route"]),
+        "decision": result["decision"],
+        "risk_score": result["risk_score"],
+    }
+
+
+@pytest.mark.parametrize(
+    ("analysis_mode", "evidence"), [("standard", STANDARD_EVIDENCE), ("fast", FAST_EVIDENCE)]
+)
+async def test_fan_out_merges_each_branch_once(stub_graph, analysis_mode, evidence):
+    result = await stub_graph(parallel=True).ainvoke(make_state(analysis_mode))
+
+    assert sorted(e.agent_name for e in result["evidences"]) == evidence
+    assert sorted(result["signals"]) == [f"[{name}] stub" for name in evidence]
+    assert Counter(result["agent_route"]) == Counter(PIPELINE + evidence + DECISION)
+    # La unión espera a todas las ramas: el agregador corre una vez, tras la última
+    route = result["agent_route"]
+    assert route[: len(PIPELINE)] == PIPELINE
+    assert sorted(route[len(PIPELINE) : -len(DECISION)]) == evidence
+    assert route[-len(DECISION) :] == DECISION
+
+
+@pytest.mark.parametrize("analysis_mode", ["standard", "fast"])
+async def test_sequential_graph_reaches_the_same_state(stub_graph, analysis_mode):
+    parallel = await stub_graph(parallel=True).ainvoke(make_state(analysis_mode))
+    sequential = await stub_graph(parallel=False).ainvoke(make_state(analysis_mode))
+
+    assert merged(sequential) == merged(parallel)
+    assert sequential["decision"] == "APPROVE"
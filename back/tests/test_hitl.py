@@ -0,0 +1,165 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import update
+
+from app.api import hitl
+from app.db.models import HITLQueue, Transaction
+from app.db.session import AsyncSessionLocal
+from app.services.db_service import HITLService
+
+LEASE_SECONDS = 300
+
+
+async def add_case(db, transaction_id: str, risk_score: float = 0.75, amount: float = 100.0):
+    db.add(
+        Transaction(
+            id=transaction_id,
+            customer_id="CU-001",
+            amount=amount,
+            currency="PEN",
+            country="PE",
+            channel="web",
+            device_id="D-01",
+            timestamp=datetime(2025, 12, 17, 3, 15),
+            merchant_id="M-001",
+            status="COMPLETED",
+            decision="ESCALATE_TO_HUMAN",
+        )
+    )
+    db.add(HITLQueue(transaction_id=transaction_id, risk_score=risk_score, amount=amount))
+    await db.commit()
+
+
+async def expire_leases(db) -> None:
+    await db.execute(
+        update(HITLQueue)
+        .where(HITLQueue.status == "OWNED")
+        .values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+    )
+    await db.commit()
+
+
+async def claim(reviewer: str, n: int) -> list[str]:
+    async with AsyncSessionLocal() as session:
+        items = await HITLService.claim(session, reviewer, n, LEASE_SECONDS)
+    return [item.transaction_id for item in items]
+
+
+@pytest.fixture
+async def client(db):
+    app = FastAPI()
+    app.include_router(hitl.router, prefix="/api/hitl")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_claim_orders_by_risk_then_amount(db):
+    await add_case(db, "T-LOW", risk_score=0.66, amount=5000)
+    await add_case(db, "T-HIGH-SMALL", risk_score=0.84, amount=10)
+    await add_case(db, "T-HIGH-BIG", risk_score=0.84, amount=900)
+
+    assert await claim("ana", 3) == ["T-HIGH-BIG", "T-HIGH-SMALL", "T-LOW"]
+
+
+async def test_concurrent_claims_never_share_an_item(db):
+    for i in range(7):
+        await add_case(db, f"T-{i}")
+
+    claims = await asyncio.gather(*(claim(f"reviewer-{r}", 3) for r in range(4)))
+
+    claimed = [tx for items in claims for tx in items]
+    assert len(claimed) == len(set(claimed)) == 7
+    assert sorted(len(items) for items in claims) == [0, 1, 3, 3]
+
+
+async def test_claimed_items_are_not_claimed_again_while_the_lease_is_live(db):
+    await add_case(db, "T-1")
+    assert await claim("ana", 5) == ["T-1"]
+    assert await claim("bob", 5) == []
+
+
+async def test_expired_lease_returns_the_item_to_the_queue(db):
+    await add_case(db, "T-1")
+    await add_case(db, "T-2")
+    assert len(await claim("ana", 2)) == 2
+    await expire_leases(db)
+
+    assert sorted(await claim("bob", 5)) == ["T-1", "T-2"]
+    item = await HITLService.get_item(db, "T-1")
+    await db.refresh(item)
+    assert (item.status, item.assigned_to) == ("OWNED", "bob")
+
+
+async def test_review_by_another_reviewer_with_a_live_lease_is_409(client, db):
+    await add_case(db, "T-1")
+    await claim("ana", 1)
+
+    review = {"decision": "APPROVE", "comments": "ok"}
+    response = await client.post("/api/hitl/T-1/review", json={**review, "reviewer": "bob"})
+    assert response.status_code == 409
+    response = await client.post("/api/hitl/T-1/review", json=review)
+    assert response.status_code == 409
+
+    response = await client.post("/api/hitl/T-1/review", json={**review, "reviewer": "ana"})
+    assert response.status_code == 200
+    response = await client.post("/api/hitl/T-1/review", json={**review, "reviewer": "ana"})
+    assert response.status_code == 409
+
+
+async def test_review_of_an_unknown_item_is_404(client, db):
+    response = await client.post(
+        "/api/hitl/T-MISSING/review", json={"decision": "APPROVE", "comments": "ok"}
+    )
+    assert response.status_code == 404
+
+
+async def test_review_without_reviewer_on_an_expired_lease(db):
+    await add_case(db, "T-1")
+    await claim("ana", 1)
+    await expire_leases(db)
+
+    assert await HITLService.submit_review(db, "T-1", "DECLINE", "fraude confirmado")
+
+    item = await HITLService.get_item(db, "T-1")
+    tx = await db.get(Transaction, "T-1")
+    await db.refresh(item)
+    await db.refresh(tx)
+    # Conserva al revisor que lo tenía reclamado
+    assert (item.status, item.assigned_to, item.lease_expires_at) == ("REVIEWED", "ana", None)
+    assert item.reviewer_decision == "DECLINE"
+    assert tx.decision == "DECLINE"
+
+
+async def test_review_without_reviewer_of_a_pending_item(db):
+    await add_case(db, "T-1")
+
+    assert await HITLService.submit_review(db, "T-1", "APPROVE", "ok")
+    assert not await HITLService.submit_review(db, "T-1", "APPROVE", "otra vez")
+
+
+async def test_queue_listing_pages_in_claim_order(client, db):
+    cases = [("T-A", 0.70, 300), ("T-B", 0.84, 10), ("T-C", 0.70, 300), ("T-D", 0.84, 900)]
+    for transaction_id, risk_score, amount in [*cases, ("T-E", 0.70, 800)]:
+        await add_case(db, transaction_id, risk_score=risk_score, amount=amount)
+
+    listed, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/api/hitl/queue", params=params)).json()
+        listed += [item["transaction_id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert listed == ["T-D", "T-B", "T-E", "T-A", "T-C"]
+    assert await claim("ana", 5) == listed
+
+
+async def test_queue_listing_rejects_an_invalid_cursor(client, db):
+    response = await client.get("/api/hitl/queue", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
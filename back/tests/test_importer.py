@@ -0,0 +1,82 @@
+import csv
+
+from app.data.importer import COLUMNS, import_customer_profiles, validate_chunk
+
+
+def make_chunk(*rows: tuple) -> dict[str, list]:
+    return {column: [row[i] for row in rows] for i, column in enumerate(COLUMNS)}
+
+
+def written(rows: list[dict]) -> list[tuple]:
+    return [tuple(row[column] for column in COLUMNS) for row in rows]
+
+
+def test_validate_chunk_rejects_invalid_rows():
+    rows, rejected, deduplicated = validate_chunk(
+        make_chunk(
+            ("CU-001", "150.5", "8-22", "PE", "D-01"),
+            ("", "10", "8-22", "PE", "D-01"),
+            ("CU-002", "-1", "8-22", "PE", "D-01"),
+            ("CU-003", "abc", "8-22", "PE", "D-01"),
+            ("CU-004", "10", "8-25", "PE", "D-01"),
+            ("CU-005", "10", "night", "PE", "D-01"),
+            ("CU-006", "10", "8-22", None, "D-01"),
+        )
+    )
+
+    assert written(rows) == [("CU-001", 150.5, "8-22", "PE", "D-01")]
+    assert (rejected, deduplicated) == (6, 0)
+
+
+def test_validate_chunk_keeps_the_last_valid_duplicate():
+    rows, rejected, deduplicated = validate_chunk(
+        make_chunk(
+            ("CU-001", "10", "8-22", "PE", "D-01"),
+            ("CU-002", "20", "8-22", "PE", "D-02"),
+            ("CU-001", "30", "9-18", "PE,CL", "D-01"),
+        )
+    )
+
+    assert written(rows) == [
+        ("CU-002", 20.0, "8-22", "PE", "D-02"),
+        ("CU-001", 30.0, "9-18", "PE,CL", "D-01"),
+    ]
+    assert (rejected, deduplicated) == (0, 1)
+
+
+def test_validate_chunk_does_not_drop_a_valid_row_for_a_later_invalid_duplicate():
+    rows, rejected, deduplicated = validate_chunk(
+        make_chunk(
+            ("CU-001", "10", "8-22", "PE", "D-01"),
+            ("CU-001", "30", "8-22", "PE", "D-01"),
+            ("CU-001", "-5", "8-22", "PE", "D-01"),
+            ("CU-002", "20", "25-30", "PE", "D-02"),
+        )
+    )
+
+    assert written(rows) == [("CU-001", 30.0, "8-22", "PE", "D-01")]
+    assert (rejected, deduplicated) == (2, 1)
+
+
+def test_validate_chunk_with_no_valid_rows():
+    assert validate_chunk(make_chunk(("", "x", "", "", ""))) == ([], 1, 0)
+    assert validate_chunk(make_chunk()) == ([], 0, 0)
+
+
+async def test_import_reports_rejected_and_deduplicated_rows_apart(db, tmp_path):
+    path = tmp_path / "profiles.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(
+            [
+                ("CU-001", "10", "8-22", "PE", "D-01"),
+                ("CU-001", "30", "8-22", "PE", "D-01"),
+                ("CU-002", "-5", "8-22", "PE", "D-02"),
+                ("CU-003", "20", "8-22", "PE", "D-03"),
+            ]
+        )
+
+    stats = await import_customer_profiles(path, chunk_size=10, progress=False)
+
+    assert (stats.read, stats.written, stats.rejected, stats.deduplicated) == (4, 2, 1, 1)
@@ -0,0 +1,220 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import update
+
+from app.api import transactions
+from app.core.config import settings
+from app.db.models import Transaction
+from app.db.session import AsyncSessionLocal
+from app.models.schemas import FraudDetectionState, TransactionInput
+from app.services import job_queue
+from app.services.db_service import TransactionService
+from app.services.job_queue import AnalysisJobQueue
+
+
+def make_tx(transaction_id: str) -> TransactionInput:
+    return TransactionInput(
+        transaction_id=transaction_id,
+        customer_id="CU-001",
+        amount=100.0,
+        currency="PEN",
+        country="PE",
+        channel="web",
+        device_id="D-01",
+        timestamp=datetime(2025, 12, 17, 14, 15),
+        merchant_id="M-001",
+    )
+
+
+class FakeGraph:
+    """Approves every transaction once `release` is set; raises if `error` is given"""
+
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+        self.release = asyncio.Event()
+        self.release.set()
+        self.calls = 0
+
+    async def ainvoke(self, state: FraudDetectionState) -> dict:
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return {**dict(state), "decision": "APPROVE", "confidence": 0.9, "risk_score": 0.1}
+
+
+@pytest.fixture
+def graph(monkeypatch) -> FakeGraph:
+    fake = FakeGraph()
+    monkeypatch.setattr(job_queue, "get_fraud_graph", lambda: fake)
+    return fake
+
+
+async def add_jobs(db, *transaction_ids: str, status: str = "QUEUED") -> None:
+    await TransactionService.bulk_create_transactions(
+        db, [make_tx(transaction_id) for transaction_id in transaction_ids], status=status
+    )
+
+
+async def expire_lease(db, transaction_id: str) -> None:
+    await db.execute(
+        update(Transaction)
+        .where(Transaction.id == transaction_id)
+        .values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+    )
+    await db.commit()
+
+
+async def row(db, transaction_id: str) -> Transaction:
+    db.expire_all()
+    return await db.get(Transaction, transaction_id)
+
+
+async def claim(transaction_id: str) -> bool:
+    async with AsyncSessionLocal() as session:
+        return await TransactionService.claim_job(session, transaction_id)
+
+
+async def test_claim_takes_a_queued_job_once(db):
+    await add_jobs(db, "T-1")
+
+    assert await claim("T-1")
+    assert not await claim("T-1")  # lease vigente
+    tx = await row(db, "T-1")
+    assert tx.status == "PROCESSING"
+    assert tx.lease_expires_at > datetime.utcnow()
+
+
+async def test_concurrent_claims_of_a_job_have_one_winner(db):
+    await add_jobs(db, "T-1")
+
+    results = await asyncio.gather(*(claim("T-1") for _ in range(5)))
+
+    assert results.count(True) == 1
+
+
+async def test_expired_lease_is_claimed_again(db):
+    await add_jobs(db, "T-1", status="PROCESSING")
+    assert not await claim("T-1")
+
+    await expire_lease(db, "T-1")
+
+    assert await claim("T-1")
+    assert (await row(db, "T-1")).lease_expires_at > datetime.utcnow()
+
+
+async def test_finished_jobs_are_never_claimed(db):
+    await add_jobs(db, "T-1", status="COMPLETED")
+    await add_jobs(db, "T-2", status="FAILED")
+
+    assert not await claim("T-1")
+    assert not await claim("T-2")
+
+
+async def test_unfinished_jobs_page_through_queued_and_expired_leases(db):
+    await add_jobs(db, "T-1", "T-2", "T-3", "T-4", "T-5")
+    await add_jobs(db, "T-LIVE", "T-EXPIRED", status="PROCESSING")
+    await add_jobs(db, "T-DONE", status="COMPLETED")
+    await expire_lease(db, "T-EXPIRED")
+
+    found, after = [], None
+    while page := await TransactionService.get_unfinished_jobs(db, 2, after):
+        found += [tx.id for tx in page]
+        after = (page[-1].created_at, page[-1].id)
+
+    assert found == ["T-1", "T-2", "T-3", "T-4", "T-5", "T-EXPIRED"]
+
+
+async def test_recovery_after_a_restart_enqueues_every_unfinished_job(db):
+    await add_jobs(db, *(f"T-{i}" for i in range(5)))
+    await add_jobs(db, "T-LIVE", status="PROCESSING")
+
+    queue = AnalysisJobQueue(workers=1, max_depth=2)
+    assert await queue._recover() == 5
+    assert queue.depth == 5  # por encima de max_depth hasta que se vacíe
+
+
+async def test_failed_analysis_marks_the_job_failed(db, monkeypatch):
+    fake = FakeGraph(error=RuntimeError("LLM unavailable"))
+    monkeypatch.setattr(job_queue, "get_fraud_graph", lambda: fake)
+    await add_jobs(db, "T-1")
+    queue = AnalysisJobQueue(workers=1, max_depth=10)
+
+    await queue._process(make_tx("T-1"), {})
+
+    tx = await row(db, "T-1")
+    assert (tx.status, tx.error) == ("FAILED", "LLM unavailable")
+    assert queue.stats["failed"] == 1
+
+
+async def test_job_claimed_elsewhere_is_skipped(db, graph):
+    await add_jobs(db, "T-1", status="PROCESSING")
+    queue = AnalysisJobQueue(workers=1, max_depth=10)
+
+    await queue._process(make_tx("T-1"), {})
+
+    assert graph.calls == 0
+    assert queue.stats["skipped"] == 1
+
+
+async def test_worker_survives_a_job_it_cannot_even_mark_failed(db, monkeypatch):
+    fake = FakeGraph(error=RuntimeError("LLM unavailable"))
+    monkeypatch.setattr(job_queue, "get_fraud_graph", lambda: fake)
+
+    async def broken_set_status(*args, **kwargs):
+        raise OSError("database is down")
+
+    monkeypatch.setattr(TransactionService, "set_status", broken_set_status)
+    await add_jobs(db, "T-1", "T-2")
+    queue = AnalysisJobQueue(workers=1, max_depth=10)
+    await queue.start()
+    try:
+        for transaction_id in ("T-1", "T-2"):
+            assert queue.reserve()
+            queue.submit(make_tx(transaction_id))
+        await asyncio.wait_for(queue._queue.join(), 5)
+
+        assert fake.calls == 2
+        assert not any(task.done() for task in queue._tasks)
+    finally:
+        await queue.aclose()
+
+
+@pytest.fixture
+async def client(db, monkeypatch, graph):
+    queue = AnalysisJobQueue(workers=1, max_depth=1)
+    monkeypatch.setattr(transactions, "analysis_jobs", queue)
+    await queue.start()
+    app = FastAPI()
+    app.include_router(transactions.router, prefix="/api/transactions")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client, queue
+    await queue.aclose()
+
+
+async def test_full_queue_answers_503_with_retry_after(client, graph, db):
+    client, queue = client
+    graph.release.clear()  # el worker queda ocupado con el primer job
+
+    async def enqueue(transaction_id: str) -> httpx.Response:
+        body = make_tx(transaction_id).model_dump(mode="json")
+        return await client.post("/api/transactions/analyze?async=true", json=body)
+
+    assert (await enqueue("T-1")).status_code == 202
+    while graph.calls == 0:  # el worker tomó T-1 y la cola vuelve a estar vacía
+        await asyncio.sleep(0.01)
+    assert (await enqueue("T-2")).status_code == 202
+    response = await enqueue("T-3")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(settings.JOB_RETRY_AFTER_SECONDS)
+    assert await row(db, "T-3") is None
+
+    graph.release.set()
+    await asyncio.wait_for(queue._queue.join(), 5)
+    assert [(await row(db, t)).status for t in ("T-1", "T-2")] == ["COMPLETED", "COMPLETED"]
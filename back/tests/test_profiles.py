@@ -0,0 +1,76 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.core.lru import AsyncLoadingCache
+from app.db.models import CustomerProfileStatsDB
+from app.models.schemas import TransactionInput
+from app.services.db_service import ProfileService
+from app.services.profile_cache import profile_cache
+from app.services.profile_engine import new_profile, to_row
+
+
+def make_tx(transaction_id: str, amount: float = 100.0) -> TransactionInput:
+    return TransactionInput(
+        transaction_id=transaction_id,
+        customer_id="CU-001",
+        amount=amount,
+        currency="PEN",
+        country="PE",
+        channel="web",
+        device_id="D-01",
+        timestamp=datetime(2025, 12, 17, 14, 15),
+        merchant_id="M-001",
+    )
+
+
+@pytest.fixture(autouse=True)
+def empty_profile_cache():
+    profile_cache.clear()
+    yield
+    profile_cache.clear()
+
+
+async def stored_observations(db) -> int:
+    db.expire_all()
+    row = await db.get(CustomerProfileStatsDB, "CU-001")
+    return row.observations
+
+
+async def test_put_during_a_load_is_not_overwritten_by_the_load():
+    release = asyncio.Event()
+
+    async def loader(key):
+        await release.wait()
+        return "stale"
+
+    cache = AsyncLoadingCache(loader, max_entries=10)
+    load = asyncio.create_task(cache.get("CU-001"))
+    await asyncio.sleep(0)
+    cache.put("CU-001", "fresh")
+    release.set()
+
+    assert await load == "stale"  # quien esperaba la carga recibe lo que esta leyó
+    assert cache.peek("CU-001") == "fresh"
+
+
+async def test_approvals_accumulate_in_the_stored_profile(db):
+    await ProfileService.observe_approved([make_tx("T-1")])
+    await ProfileService.observe_approved([make_tx("T-2"), make_tx("T-3")])
+
+    assert await stored_observations(db) == 3
+    assert (await profile_cache.get("CU-001")).observations == 3
+
+
+async def test_update_builds_on_the_stored_row_not_a_stale_cache_entry(db):
+    # Otro worker ya llevó el perfil a 5 observaciones; esta caché se quedó en 1
+    stored = new_profile("CU-001", 100.0).model_copy(update={"observations": 5})
+    db.add(CustomerProfileStatsDB(**to_row(stored)))
+    await db.commit()
+    profile_cache.put("CU-001", stored.model_copy(update={"observations": 1}))
+
+    await ProfileService.observe_approved([make_tx("T-1")])
+
+    assert await stored_observations(db) == 6
+    assert (await profile_cache.get("CU-001")).observations == 6
@@ -0,0 +1,321 @@
+import asyncio
+import time
+from datetime import UTC, datetime
+from email.utils import format_datetime, formatdate
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.core import resilience
+from app.core.config import settings
+from app.core.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientEndpoint,
+    backoff_delay,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    """Stands in for the breaker's `time.monotonic` so its reset timeout can be crossed"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    # Solo el módulo de resiliencia: el event loop sigue usando el reloj real
+    monkeypatch.setattr(
+        resilience,
+        "time",
+        SimpleNamespace(monotonic=fake, perf_counter=time.perf_counter, time=time.time),
+    )
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "RESILIENCE_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "RESILIENCE_BACKOFF_BASE_SECONDS", 0.001)
+    monkeypatch.setattr(settings, "RESILIENCE_BACKOFF_MAX_SECONDS", 0.005)
+    monkeypatch.setattr(settings, "RESILIENCE_MAX_RETRY_AFTER_SECONDS", 10.0)
+    monkeypatch.setattr(settings, "RESILIENCE_BREAKER_FAILURES", 5)
+    monkeypatch.setattr(settings, "RESILIENCE_BREAKER_RESET_SECONDS", 30.0)
+    monkeypatch.setattr(settings, "RESILIENCE_HEDGE_ENABLED", False)
+
+
+def open_breaker(clock: FakeClock, threshold: int = 3) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=threshold, reset_timeout=30.0)
+    for _ in range(threshold):
+        breaker.acquire()
+        breaker.record_failure()
+    return breaker
+
+
+# --- Circuit breaker ---
+
+
+def test_breaker_opens_after_threshold_consecutive_failures(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30.0)
+    for _ in range(2):
+        breaker.acquire()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.acquire()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.acquire()
+    assert exc.value.retry_in == pytest.approx(30.0)
+    assert breaker.stats == {"opened": 1, "rejected": 1}
+
+
+def test_breaker_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30.0)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_lets_a_single_probe_through(clock):
+    breaker = open_breaker(clock)
+    clock.advance(30.1)
+
+    breaker.acquire()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.acquire()
+
+
+def test_failed_probe_reopens_the_circuit_for_a_full_period(clock):
+    breaker = open_breaker(clock)
+    clock.advance(30.1)
+    breaker.acquire()
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    clock.advance(29.0)
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+    clock.advance(1.1)
+    breaker.acquire()
+    assert breaker.state == HALF_OPEN
+
+
+async def test_cancelled_probe_releases_the_half_open_slot(clock):
+    endpoint = ResilientEndpoint("test")
+    endpoint.breaker = open_breaker(clock)
+    clock.advance(30.1)
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.Event().wait()
+
+    task = asyncio.create_task(endpoint.call(hang))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # Sin release() el circuito quedaría medio abierto con una prueba fantasma para siempre
+    assert endpoint.breaker.state == HALF_OPEN
+    endpoint.breaker.acquire()
+
+
+async def test_unexpected_exception_releases_without_a_verdict(clock):
+    endpoint = ResilientEndpoint("test")
+    endpoint.breaker = open_breaker(clock)
+    clock.advance(30.1)
+
+    async def broken():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        await endpoint.call(broken)
+    assert endpoint.breaker.state == HALF_OPEN
+    assert endpoint.stats["failures"] == 0
+    endpoint.breaker.acquire()
+
+
+# --- Retries ---
+
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after(httpx.Headers({"retry-after": "7"})) == 7.0
+    assert parse_retry_after(httpx.Headers({"retry-after": "1.5"})) == 1.5
+
+
+def test_parse_retry_after_ms_takes_precedence():
+    headers = httpx.Headers({"retry-after-ms": "250", "retry-after": "7"})
+    assert parse_retry_after(headers) == 0.25
+
+
+def test_parse_retry_after_invalid_ms_falls_back_to_retry_after():
+    headers = httpx.Headers({"retry-after-ms": "soon", "retry-after": "3"})
+    assert parse_retry_after(headers) == 3.0
+
+
+def test_parse_retry_after_http_date():
+    when = formatdate(time.time() + 30, usegmt=True)
+    assert parse_retry_after(httpx.Headers({"retry-after": when})) == pytest.approx(30, abs=1.5)
+
+
+def test_parse_retry_after_past_http_date_is_zero():
+    past = format_datetime(datetime(2020, 1, 1, tzinfo=UTC), usegmt=True)
+    assert parse_retry_after(httpx.Headers({"retry-after": past})) == 0.0
+
+
+def test_parse_retry_after_missing_or_garbage():
+    assert parse_retry_after(httpx.Headers()) is None
+    assert parse_retry_after(httpx.Headers({"retry-after": "tomorrow-ish"})) is None
+
+
+def test_backoff_uses_retry_after_as_a_floor():
+    for attempt in range(5):
+        assert backoff_delay(attempt, 2.0) >= 2.0
+        assert backoff_delay(attempt) <= settings.RESILIENCE_BACKOFF_MAX_SECONDS
+
+
+async def test_retries_a_failed_result_until_it_succeeds(clock):
+    endpoint = ResilientEndpoint("test")
+    results = iter([503, 503, 200])
+    discarded = []
+
+    async def send():
+        return next(results)
+
+    async def discard(result):
+        discarded.append(result)
+
+    result = await endpoint.call(
+        send, failure=lambda r: f"status_{r}" if r >= 500 else None, discard=discard
+    )
+    assert result == 200
+    assert endpoint.stats["retries"] == 2
+    assert discarded == [503, 503]
+    assert endpoint.breaker.state == CLOSED
+
+
+async def test_gives_up_when_retry_after_exceeds_the_maximum(clock):
+    endpoint = ResilientEndpoint("test")
+    calls = 0
+
+    async def send():
+        nonlocal calls
+        calls += 1
+        return 429
+
+    result = await endpoint.call(
+        send,
+        failure=lambda r: "status_429",
+        retry_after=lambda r: settings.RESILIENCE_MAX_RETRY_AFTER_SECONDS + 1,
+    )
+    # Se devuelve el 429 tal cual, sin esperar ni reintentar
+    assert result == 429
+    assert calls == 1
+    assert endpoint.stats["retries"] == 0
+
+
+async def test_stops_retrying_once_the_circuit_opens(clock, monkeypatch):
+    monkeypatch.setattr(settings, "RESILIENCE_BREAKER_FAILURES", 2)
+    monkeypatch.setattr(settings, "RESILIENCE_MAX_ATTEMPTS", 5)
+    endpoint = ResilientEndpoint("test")
+    calls = 0
+
+    async def send():
+        nonlocal calls
+        calls += 1
+        raise httpx.ConnectError("refused")
+
+    with pytest.raises(httpx.ConnectError):
+        await endpoint.call(send, retry_on=(httpx.TransportError,))
+    assert calls == 2
+    assert endpoint.breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        await endpoint.call(send, retry_on=(httpx.TransportError,))
+
+
+# --- Hedging ---
+
+
+def hedged_endpoint(monkeypatch, after: float = 0.01) -> ResilientEndpoint:
+    monkeypatch.setattr(settings, "RESILIENCE_HEDGE_ENABLED", True)
+    endpoint = ResilientEndpoint("test", idempotent=True)
+    endpoint._latencies.extend([after] * settings.RESILIENCE_HEDGE_MIN_SAMPLES)
+    return endpoint
+
+
+async def test_hedge_wins_and_the_slow_primary_is_cancelled(monkeypatch):
+    endpoint = hedged_endpoint(monkeypatch)
+    primary_cancelled = asyncio.Event()
+    calls = 0
+
+    async def send():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                primary_cancelled.set()
+                raise
+        return "hedge"
+
+    assert await endpoint.call(send) == "hedge"
+    await asyncio.wait_for(primary_cancelled.wait(), 1)
+    assert endpoint.stats["hedged"] == 1
+    assert endpoint.stats["hedge_wins"] == 1
+
+
+async def test_hedging_discards_the_losing_response(monkeypatch):
+    endpoint = hedged_endpoint(monkeypatch)
+    discarded = []
+    calls = 0
+
+    async def send():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            # El primario responde primero, pero con un error
+            await asyncio.sleep(0.03)
+            return "primary-503"
+        await asyncio.sleep(0.06)
+        return "hedge-200"
+
+    async def discard(result):
+        discarded.append(result)
+
+    result = await endpoint.call(
+        send, failure=lambda r: "status_503" if r.endswith("503") else None, discard=discard
+    )
+    assert result == "hedge-200"
+    assert discarded == ["primary-503"]
+
+
+async def test_no_hedging_while_the_circuit_is_not_closed(monkeypatch, clock):
+    endpoint = hedged_endpoint(monkeypatch)
+    assert endpoint.hedge_delay() == pytest.approx(0.01)
+    endpoint.breaker = open_breaker(clock)
+    assert endpoint.hedge_delay() is None
@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import pytest
+
+from app.agents.prescreen import prescreen_agent
+from app.core.config import settings
+from app.models.schemas import (
+    CustomerBehavior,
+    FraudDetectionState,
+    TransactionInput,
+    VelocityStat,
+)
+from app.services.features import extract_features
+from app.services.profile_engine import bootstrap_profile
+from app.services.rule_engine import get_rule_engine
+
+PROFILE = bootstrap_profile(
+    CustomerBehavior(
+        customer_id="CU-001",
+        usual_amount_avg=100.0,
+        usual_hours="08-20",
+        usual_countries="PE",
+        usual_devices="D-01",
+    )
+)
+
+NORMAL = {"amount": 80.0, "hour": 14}
+FP_01 = {"amount": 400.0, "hour": 3}  # más de 3x el promedio, de madrugada
+FP_02 = {"country": "US", "device_id": "D-99"}  # internacional y dispositivo nuevo
+
+
+def make_tx(amount: float = 80.0, hour: int = 14, **fields) -> TransactionInput:
+    return TransactionInput(
+        **{
+            "transaction_id": "T-1001",
+            "customer_id": "CU-001",
+            "amount": amount,
+            "currency": "PEN",
+            "country": "PE",
+            "channel": "web",
+            "device_id": "D-01",
+            "timestamp": datetime(2025, 12, 17, hour, 15),
+            "merchant_id": "M-001",
+            **fields,
+        }
+    )
+
+
+def make_state(tx: TransactionInput, **fields) -> FraudDetectionState:
+    return FraudDetectionState(transaction=tx, customer_profile=PROFILE, **fields)
+
+
+async def evaluate(tx: TransactionInput, velocity_alert: bool = False):
+    engine = await get_rule_engine()
+    return engine.evaluate(extract_features(tx, PROFILE, velocity_alert))
+
+
+def burst(count: int) -> list[VelocityStat]:
+    window = min(settings.VELOCITY_WINDOWS_SECONDS)
+    return [
+        VelocityStat(entity="customer", key="CU-001", window_seconds=window, count=count, amount=0)
+    ]
+
+
+async def test_habitual_transaction_is_approved():
+    result = await evaluate(make_tx(**NORMAL))
+
+    assert result.decision == "APPROVE"
+    assert result.matched == ()
+
+
+async def test_large_amount_at_night_is_challenged_by_fp_01():
+    result = await evaluate(make_tx(**FP_01))
+
+    assert result.decision == "CHALLENGE"
+    assert [p.policy_id for p in result.matched] == ["FP-01"]
+
+
+async def test_foreign_country_and_new_device_escalate_by_fp_02():
+    result = await evaluate(make_tx(**FP_02))
+
+    assert result.decision == "ESCALATE_TO_HUMAN"
+    assert [p.policy_id for p in result.matched] == ["FP-02"]
+
+
+async def test_most_severe_matching_policy_wins():
+    result = await evaluate(make_tx(**FP_01, **FP_02))
+
+    assert result.decision == "ESCALATE_TO_HUMAN"
+    assert [p.policy_id for p in result.matched] == ["FP-01", "FP-02"]
+
+
+async def test_ambiguous_cases_are_left_to_the_graph():
+    assert await evaluate(make_tx(amount=150.0, hour=14)) is None  # sobre el promedio
+    assert await evaluate(make_tx(**NORMAL), velocity_alert=True) is None
+    engine = await get_rule_engine()
+    assert engine.evaluate(extract_features(make_tx(**NORMAL), None)) is None
+
+
+async def test_prescreen_decides_unambiguous_cases():
+    update = await prescreen_agent(make_state(make_tx(**FP_01), model_score=0.2))
+
+    assert update["decision"] == "CHALLENGE"
+    assert update["agent_route"] == ["rule_engine"]
+
+
+@pytest.mark.parametrize("case", [NORMAL, FP_01, FP_02], ids=["approve", "fp-01", "fp-02"])
+async def test_velocity_alert_overrides_the_rule(case):
+    state = make_state(make_tx(**case), velocity=burst(settings.VELOCITY_COUNT_ALERTS[0]))
+
+    assert await prescreen_agent(state) == {}
+
+
+@pytest.mark.parametrize("case", [NORMAL, FP_01, FP_02], ids=["approve", "fp-01", "fp-02"])
+async def test_high_model_score_overrides_the_rule(case):
+    state = make_state(make_tx(**case), model_score=settings.RISK_MODEL_ALERT_SCORE)
+
+    assert await prescreen_agent(state) == {}
@@ -0,0 +1,73 @@
+import pytest
+
+from app.agents import external_threat_intel
+from app.core.config import settings
+from app.core.lru import AsyncLoadingCache
+from app.core.resilience import endpoints
+
+KEY = ("M-001", "PE")
+
+
+class FakeSearch:
+    """Stands in for `TavilySearch`: returns `result` like langchain-tavily does"""
+
+    result: dict = {}
+
+    def __init__(self, **kwargs):
+        pass
+
+    async def ainvoke(self, query):
+        return FakeSearch.result
+
+
+@pytest.fixture
+def llm_calls(monkeypatch) -> list[dict]:
+    calls = []
+
+    async def cascade(agent_name, prompt, inputs):
+        calls.append(inputs)
+        return {"found_threats": False, "signals": [], "citations": [], "confidence": 0.9}
+
+    monkeypatch.setattr(external_threat_intel, "TavilySearch", FakeSearch)
+    monkeypatch.setattr(external_threat_intel, "invoke_json_cascade", cascade)
+    monkeypatch.setattr(settings, "RESILIENCE_MAX_ATTEMPTS", 1)
+    endpoints.clear()
+    yield calls
+    endpoints.clear()
+
+
+def make_cache() -> AsyncLoadingCache:
+    return AsyncLoadingCache(
+        loader=external_threat_intel.lookup_merchant_threats,
+        max_entries=10,
+        ttl=3600,
+        negative_ttl=600,
+        is_negative=lambda response: not response.get("found_threats"),
+    )
+
+
+@pytest.mark.parametrize("resilience", [True, False])
+async def test_failed_search_is_not_analysed_nor_cached(monkeypatch, llm_calls, resilience):
+    monkeypatch.setattr(settings, "RESILIENCE_ENABLED", resilience)
+    FakeSearch.result = {"error": "HTTP 503 Service Unavailable"}
+    cache = make_cache()
+
+    with pytest.raises(RuntimeError, match="503"):
+        await cache.get(KEY)
+
+    assert llm_calls == []
+    assert cache.peek(KEY) is None
+
+
+async def test_search_after_an_outage_is_analysed_and_cached(llm_calls):
+    cache = make_cache()
+    FakeSearch.result = {"error": "HTTP 503 Service Unavailable"}
+    with pytest.raises(RuntimeError):
+        await cache.get(KEY)
+
+    FakeSearch.result = {"results": [{"url": "https://example.com", "content": "nada"}]}
+    response = await cache.get(KEY)
+
+    assert response["found_threats"] is False
+    assert len(llm_calls) == 1
+    assert cache.peek(KEY) == response
@@ -0,0 +1,229 @@
+from collections import defaultdict
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+import redis
+
+from app.core import lru
+from app.core.lru import LRUCache
+from app.models.schemas import TransactionInput
+from app.services.velocity import InMemoryVelocityStore, RedisVelocityStore, SlidingWindow
+
+START = datetime(2025, 12, 17, 3, 0, tzinfo=UTC)
+
+
+def make_tx(seconds: float, amount: float = 100.0, customer_id: str = "CU-001") -> TransactionInput:
+    return TransactionInput(
+        transaction_id=f"TX-{seconds}",
+        customer_id=customer_id,
+        amount=amount,
+        currency="PEN",
+        country="PE",
+        channel="web",
+        device_id="D-01",
+        timestamp=START + timedelta(seconds=seconds),
+        merchant_id="M-001",
+    )
+
+
+def totals(stats, entity: str = "customer") -> dict[int, tuple[int, float]]:
+    """(count, amount) per window of one entity"""
+    return {s.window_seconds: (s.count, s.amount) for s in stats if s.entity == entity}
+
+
+class FakePipeline:
+    """Queues the commands `RedisVelocityStore` uses and runs them on `execute`"""
+
+    def __init__(self, client: "FakeRedis"):
+        self.client = client
+        self.commands = []
+
+    def hincrby(self, name, key, amount):
+        self.commands.append(("hincrby", name, key, amount))
+
+    def hincrbyfloat(self, name, key, amount):
+        self.commands.append(("hincrbyfloat", name, key, amount))
+
+    def expire(self, name, seconds):
+        self.commands.append(("expire", name, seconds))
+
+    def hmget(self, name, *keys):
+        self.commands.append(("hmget", name, keys))
+
+    async def execute(self):
+        if self.client.down:
+            raise redis.ConnectionError("Connection refused")
+        results = []
+        for command, name, *args in self.commands:
+            bucket = self.client.hashes[name]
+            if command == "hincrby":
+                bucket[args[0]] = int(bucket.get(args[0], 0)) + args[1]
+                results.append(bucket[args[0]])
+            elif command == "hincrbyfloat":
+                bucket[args[0]] = float(bucket.get(args[0], 0)) + args[1]
+                results.append(bucket[args[0]])
+            elif command == "expire":
+                self.client.ttls[name] = args[0]
+                results.append(True)
+            else:
+                results.append([bucket.get(key) for key in args[0]])
+        return results
+
+
+class FakeRedis:
+    def __init__(self):
+        self.hashes = defaultdict(dict)
+        self.ttls = {}
+        self.down = False
+
+    def pipeline(self, transaction=True):
+        assert transaction is False
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = SimpleNamespace(now=1000.0)
+    # Solo el módulo del caché: el event loop sigue usando el reloj real
+    monkeypatch.setattr(lru, "time", SimpleNamespace(monotonic=lambda: fake.now))
+    return fake
+
+
+def test_window_expires_buckets_as_time_advances():
+    window = SlidingWindow(60, slots=6)
+    window.add(0, 10.0)
+    window.add(15, 20.0)
+    window.add(35, 5.0)
+
+    assert window.totals(59) == (3, 35.0)
+    assert window.totals(60) == (2, 25.0)  # sale el bucket [0, 10)
+    assert window.totals(70) == (1, 5.0)  # sale el bucket [10, 20)
+    assert window.totals(1000) == (0, 0.0)  # salto de más de una ventana
+
+
+def test_window_edge_has_the_resolution_of_one_bucket():
+    window = SlidingWindow(60, slots=6)
+    window.add(65, 1.0)
+
+    # Cuenta mientras su bucket [60, 70) está dentro de la ventana, aunque tenga >60 s
+    assert window.totals(119.9) == (1, 1.0)
+    assert window.totals(120) == (0, 0.0)
+
+
+def test_window_counts_out_of_order_events_inside_the_window():
+    window = SlidingWindow(60, slots=6)
+    window.add(50, 1.0)
+    window.add(20, 2.0)
+    window.add(0, 4.0)
+
+    assert window.totals(50) == (3, 7.0)
+    assert window.totals(60) == (2, 3.0)  # el evento tardío caduca con su propio bucket
+
+
+def test_window_drops_events_older_than_the_window():
+    window = SlidingWindow(60, slots=6)
+    window.add(100, 1.0)
+    window.add(35, 2.0)  # bucket 3 <= 10 - 6
+
+    assert window.totals(100) == (1, 1.0)
+
+
+def test_window_dump_load_round_trip():
+    window = SlidingWindow(60, slots=6)
+    for ts, amount in ((5, 1.0), (25, 2.0), (45, 4.0)):
+        window.add(ts, amount)
+
+    restored = SlidingWindow(60, slots=6)
+    restored.load(window.dump())
+
+    assert restored.totals(45) == window.totals(45) == (3, 7.0)
+    assert restored.totals(80) == window.totals(80) == (1, 4.0)
+
+
+def test_lru_items_skip_expired_entries_and_keep_the_order(clock):
+    cache = LRUCache(max_entries=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=10)
+    cache.set("c", 3)
+    clock.now += 30
+
+    assert cache.items() == [("a", 1), ("c", 3)]
+    cache.get("a")
+    assert [key for key, _ in cache.items()] == ["c", "a"]
+
+
+async def test_memory_store_totals_per_entity_and_window():
+    store = InMemoryVelocityStore([60, 600], slots=12, max_keys=100)
+    await store.record(make_tx(0, 10.0))
+    await store.record(make_tx(30, 20.0, customer_id="CU-002"))
+    stats = await store.record(make_tx(90, 30.0))
+
+    assert totals(stats) == {60: (1, 30.0), 600: (2, 40.0)}
+    assert totals(stats, "device") == {60: (1, 30.0), 600: (3, 60.0)}
+
+
+async def test_memory_store_snapshot_restore_round_trip(tmp_path):
+    path = tmp_path / "velocity.json"
+    store = InMemoryVelocityStore([60, 600], slots=12, max_keys=100, snapshot_path=str(path))
+    await store.record(make_tx(0, 10.0))
+    await store.record(make_tx(30, 20.0))
+    assert store.save() == 3  # customer, device y merchant
+
+    restored = InMemoryVelocityStore([60, 600], slots=12, max_keys=100, snapshot_path=str(path))
+    assert restored.restore() == 3
+    stats = await restored.record(make_tx(65, 40.0))
+
+    assert totals(stats) == {60: (2, 60.0), 600: (3, 70.0)}
+
+
+async def test_memory_store_ignores_a_snapshot_with_other_windows(tmp_path):
+    path = tmp_path / "velocity.json"
+    store = InMemoryVelocityStore([60, 600], slots=12, max_keys=100, snapshot_path=str(path))
+    await store.record(make_tx(0))
+    store.save()
+
+    other = InMemoryVelocityStore([60], slots=12, max_keys=100, snapshot_path=str(path))
+    assert other.restore() == 0
+    assert len(other.keys) == 0
+
+
+async def test_memory_store_does_not_save_expired_keys(tmp_path, clock):
+    path = tmp_path / "velocity.json"
+    store = InMemoryVelocityStore([60], slots=12, max_keys=100, snapshot_path=str(path))
+    await store.record(make_tx(0))
+    clock.now += 61
+    await store.record(make_tx(61, customer_id="CU-002"))
+
+    assert store.save() == 3  # solo las claves de CU-002 y sus device/merchant renovados
+
+
+async def test_redis_store_totals_and_bucket_expiry():
+    client = FakeRedis()
+    store = RedisVelocityStore(client, [60, 600], slots=12, prefix="velocity")
+    await store.record(make_tx(0, 10.0))
+    await store.record(make_tx(30, 20.0))
+    stats = await store.record(make_tx(60, 30.0))
+
+    # La ventana de 60 s ya no lee el bucket [0, 5) del primer evento
+    assert totals(stats) == {60: (2, 50.0), 600: (3, 60.0)}
+    bucket = int(START.timestamp() // 5)
+    assert client.ttls[f"velocity:60:customer:CU-001:{bucket}"] == 66
+
+
+async def test_redis_store_counts_out_of_order_events_by_event_time():
+    store = RedisVelocityStore(FakeRedis(), [60], slots=12, prefix="velocity")
+    await store.record(make_tx(100, 1.0))
+    late = await store.record(make_tx(50, 2.0))
+    stats = await store.record(make_tx(105, 4.0))
+
+    assert totals(late) == {60: (1, 2.0)}  # totales hasta su propio instante
+    assert totals(stats) == {60: (3, 7.0)}
+
+
+async def test_redis_store_returns_no_stats_when_redis_is_down():
+    client = FakeRedis()
+    client.down = True
+    store = RedisVelocityStore(client, [60], slots=12, prefix="velocity")
+
+    assert await store.record(make_tx(0)) == []
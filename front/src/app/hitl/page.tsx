@@ -1,7 +1,7 @@
 "use client";
 
 import AuditTrailModal from '@/components/AuditTrailModal';
-import { getHITLQueue, HITLItem, submitHITLReview } from '@/lib/api';
+import { claimHITLItems, getHITLQueue, HITLItem, submitHITLReview } from '@/lib/api';
 import { cn } from '@/lib/utils';
 import { format } from 'date-fns';
 import {
@@ -10,29 +10,44 @@ import {
   ExternalLink,
   FileText,
   Filter,
+  Inbox,
   MessageSquare,
   Search,
   XCircle
 } from 'lucide-react';
 import { useEffect, useState } from 'react';
 
+const REVIEWER_STORAGE_KEY = 'hitl_reviewer';
+const CLAIM_BATCH_SIZE = 10;
+
 export default function HITLQueuePage() {
   const [queue, setQueue] = useState<HITLItem[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [reviewer, setReviewer] = useState('analyst');
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const [isClaiming, setIsClaiming] = useState(false);
   const [selectedItem, setSelectedItem] = useState<HITLItem | null>(null);
   const [reviewNote, setReviewNote] = useState("");
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [showAuditId, setShowAuditId] = useState<string | null>(null);
 
   useEffect(() => {
-    fetchQueue();
+    const stored = localStorage.getItem(REVIEWER_STORAGE_KEY);
+    if (stored) setReviewer(stored);
+    fetchQueue(stored || reviewer);
   }, []);
 
-  const fetchQueue = async () => {
+  // Casos reclamados por el revisor primero, luego la primera página de pendientes
+  const fetchQueue = async (currentReviewer: string = reviewer) => {
     setIsLoading(true);
     try {
-      const data = await getHITLQueue();
-      setQueue(data);
+      const [claimed, pending] = await Promise.all([
+        getHITLQueue({ status: 'OWNED', assigned_to: currentReviewer }),
+        getHITLQueue({ status: 'PENDING' }),
+      ]);
+      setQueue([...claimed.items, ...pending.items]);
+      setNextCursor(pending.next_cursor);
     } catch (error) {
       console.error("Error fetching HITL queue:", error);
     } finally {
@@ -40,11 +55,38 @@ export default function HITLQueuePage() {
     }
   };
 
+  const fetchMorePending = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await getHITLQueue({ status: 'PENDING', cursor: nextCursor });
+      setQueue(prev => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error("Error fetching HITL queue:", error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
+  const handleClaim = async () => {
+    setIsClaiming(true);
+    try {
+      localStorage.setItem(REVIEWER_STORAGE_KEY, reviewer);
+      await claimHITLItems(reviewer, CLAIM_BATCH_SIZE);
+      fetchQueue();
+    } catch (error) {
+      console.error("Error claiming HITL items:", error);
+    } finally {
+      setIsClaiming(false);
+    }
+  };
+
   const handleReview = async (decision: 'APPROVE' | 'BLOCK') => {
     if (!selectedItem) return;
     setIsSubmitting(true);
     try {
-      await submitHITLReview(selectedItem.transaction_id, decision, reviewNote);
+      await submitHITLReview(selectedItem.transaction_id, decision, reviewNote, reviewer);
       setSelectedItem(null);
       setReviewNote("");
       fetchQueue();
@@ -74,6 +116,21 @@ export default function HITLQueuePage() {
                 className="w-full bg-slate-900 border border-slate-800 rounded-2xl py-3 pl-12 pr-4 focus:ring-2 focus:ring-blue-500 outline-none transition-all"
               />
             </div>
+            <input
+              type="text"
+              value={reviewer}
+              onChange={(e) => setReviewer(e.target.value)}
+              placeholder="Reviewer"
+              className="w-36 bg-slate-900 border border-slate-800 rounded-2xl py-3 px-4 focus:ring-2 focus:ring-blue-500 outline-none transition-all text-sm"
+            />
+            <button
+              onClick={handleClaim}
+              disabled={isClaiming || !reviewer}
+              className="flex items-center space-x-2 bg-blue-500/10 text-blue-400 border border-blue-500/20 hover:bg-blue-500 hover:text-white px-4 rounded-2xl text-sm font-bold transition-all disabled:opacity-50"
+            >
+              <Inbox className="h-4 w-4" />
+              <span>{isClaiming ? 'Claiming...' : `Claim ${CLAIM_BATCH_SIZE}`}</span>
+            </button>
             <button className="bg-slate-900 border border-slate-800 p-3 rounded-2xl hover:bg-slate-800 transition-colors">
               <Filter className="h-5 w-5" />
             </button>
@@ -111,11 +168,22 @@ export default function HITLQueuePage() {
                         </div>
                         <div>
                           <p className="font-mono text-sm font-bold text-white">{item.transaction_id}</p>
-                          <p className="text-xs text-slate-500">Escalated: {format(new Date(item.created_at), 'MMM d, HH:mm:ss')}</p>
+                          <p className="text-xs text-slate-500">
+                            Escalated: {format(new Date(item.created_at), 'MMM d, HH:mm:ss')} · Risk {item.risk_score.toFixed(2)} · {item.amount.toLocaleString()}
+                          </p>
                         </div>
                       </div>
                       <div className="flex items-center space-x-3">
-                        <span className="text-[10px] font-bold py-1 px-3 bg-amber-500/10 text-amber-500 rounded-full uppercase border border-amber-500/20 tracking-wider">PENDING</span>
+                        <span
+                          className={cn(
+                            "text-[10px] font-bold py-1 px-3 rounded-full uppercase border tracking-wider",
+                            item.status === 'OWNED'
+                              ? "bg-blue-500/10 text-blue-400 border-blue-500/20"
+                              : "bg-amber-500/10 text-amber-500 border-amber-500/20"
+                          )}
+                        >
+                          {item.status === 'OWNED' ? 'CLAIMED' : item.status}
+                        </span>
                         <ExternalLink className="h-4 w-4 text-slate-600" />
                       </div>
                     </div>
@@ -123,6 +191,18 @@ export default function HITLQueuePage() {
                 ))}
               </div>
             )}
+
+            {nextCursor && !isLoading && (
+              <div className="p-4 border-t border-slate-800 flex justify-center">
+                <button
+                  onClick={fetchMorePending}
+                  disabled={isLoadingMore}
+                  className="px-4 py-2 text-xs font-bold text-slate-300 bg-slate-800 hover:bg-slate-700 rounded-xl transition-all disabled:opacity-50"
+                >
+                  {isLoadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              </div>
+            )}
           </div>
         </div>
 
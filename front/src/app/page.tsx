@@ -5,7 +5,7 @@ import TransactionForm from '@/components/TransactionForm';
 import {
   FraudDetectionResult,
   getTransactions,
-  Transaction
+  TransactionListItem
 } from '@/lib/api';
 import { cn } from '@/lib/utils';
 import { format } from 'date-fns';
@@ -29,8 +29,10 @@ const decisionColors: Record<string, string> = {
 };
 
 export default function Dashboard() {
-  const [transactions, setTransactions] = useState<Transaction[]>([]);
+  const [transactions, setTransactions] = useState<TransactionListItem[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
   const [isFormOpen, setIsFormOpen] = useState(false);
   const [selectedAuditId, setSelectedAuditId] = useState<string | null>(null);
@@ -42,11 +44,10 @@ export default function Dashboard() {
   const fetchTransactions = async () => {
     setIsLoading(true);
     try {
-      const data = await getTransactions();
-      // Sort by creation date desc
-      setTransactions(data.sort((a, b) =>
-        new Date(b.created_at).getTime() - new Date(a.created_at).getTime()
-      ));
+      // The API returns the newest transactions first, one page at a time
+      const page = await getTransactions();
+      setTransactions(page.items);
+      setNextCursor(page.next_cursor);
     } catch (error) {
       console.error("Failed to fetch transactions:", error);
     } finally {
@@ -54,6 +55,20 @@ export default function Dashboard() {
     }
   };
 
+  const fetchMoreTransactions = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await getTransactions({ cursor: nextCursor });
+      setTransactions(prev => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error("Failed to fetch transactions:", error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const handleAnalysisSuccess = (result: FraudDetectionResult) => {
     // Refresh the list after a new analysis
     fetchTransactions();
@@ -214,6 +229,18 @@ export default function Dashboard() {
             </tbody>
           </table>
         </div>
+
+        {nextCursor && !isLoading && (
+          <div className="p-4 border-t border-slate-800 flex justify-center">
+            <button
+              onClick={fetchMoreTransactions}
+              disabled={isLoadingMore}
+              className="px-4 py-2 text-xs font-bold text-slate-300 bg-slate-800 hover:bg-slate-700 rounded-xl transition-all disabled:opacity-50"
+            >
+              {isLoadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
       </div>
 
       {isFormOpen && (
@@ -22,13 +22,20 @@ export default function TransactionForm({ onSuccess, onClose }: TransactionFormP
     merchant_id: 'M-001'
   });
   const [isSubmitting, setIsSubmitting] = useState(false);
+  const [completedAgents, setCompletedAgents] = useState<string[]>([]);
+  const [earlyDecision, setEarlyDecision] = useState<string | null>(null);
 
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     setIsSubmitting(true);
+    setCompletedAgents([]);
+    setEarlyDecision(null);
     try {
-      const { analyzeTransaction } = await import('@/lib/api');
-      const result = await analyzeTransaction(formData);
+      const { analyzeTransactionStream } = await import('@/lib/api');
+      const result = await analyzeTransactionStream(formData, {
+        onAgent: (event) => setCompletedAgents(prev => [...prev, event.node]),
+        onDecision: (event) => setEarlyDecision(event.decision),
+      });
       onSuccess(result);
       onClose();
     } catch (error) {
@@ -166,6 +173,13 @@ export default function TransactionForm({ onSuccess, onClose }: TransactionFormP
             </div>
           </div>
 
+          {isSubmitting && (
+            <div className="text-xs font-mono text-slate-400 space-y-1">
+              <p>Completed: {completedAgents.length ? completedAgents.join(' → ') : 'starting...'}</p>
+              {earlyDecision && <p className="text-blue-400">Decision: {earlyDecision}</p>}
+            </div>
+          )}
+
           <div className="flex justify-end space-x-4 pt-4">
             <button
               type="button"
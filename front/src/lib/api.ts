@@ -19,6 +19,8 @@ export interface Transaction {
   device_id: string;
   timestamp: string;
   merchant_id: string;
+  status?: 'PENDING' | 'QUEUED' | 'PROCESSING' | 'COMPLETED' | 'FAILED';
+  error?: string | null;
   decision?: string;
   confidence?: number;
   signals?: any;
@@ -31,6 +33,39 @@ export interface Transaction {
   created_at: string;
 }
 
+// Lightweight projection returned by the paginated listing
+export type TransactionListItem = Pick<
+  Transaction,
+  | 'id'
+  | 'customer_id'
+  | 'amount'
+  | 'currency'
+  | 'country'
+  | 'channel'
+  | 'device_id'
+  | 'timestamp'
+  | 'merchant_id'
+  | 'decision'
+  | 'confidence'
+  | 'processing_time_ms'
+  | 'created_at'
+> & { status: NonNullable<Transaction['status']> };
+
+export interface TransactionPage {
+  items: TransactionListItem[];
+  next_cursor: string | null;
+}
+
+export interface TransactionFilters {
+  limit?: number;
+  cursor?: string;
+  decision?: string;
+  customer_id?: string;
+  merchant_id?: string;
+  created_from?: string;
+  created_to?: string;
+}
+
 export interface TransactionInput {
   transaction_id: string;
   customer_id: string;
@@ -60,13 +95,28 @@ export interface HITLItem {
   id: number;
   transaction_id: string;
   status: 'PENDING' | 'OWNED' | 'REVIEWED';
+  risk_score: number;
+  amount: number;
   assigned_to: string | null;
+  lease_expires_at: string | null;
   reviewed_at: string | null;
   reviewer_decision: string | null;
   reviewer_comments: string | null;
   created_at: string;
 }
 
+export interface HITLPage {
+  items: HITLItem[];
+  next_cursor: string | null;
+}
+
+export interface HITLFilters {
+  limit?: number;
+  cursor?: string;
+  status?: HITLItem['status'];
+  assigned_to?: string;
+}
+
 export interface AuditTrail {
   id: number;
   transaction_id: string;
@@ -92,13 +142,87 @@ export const analyzeTransaction = async (data: TransactionInput) => {
   return response.data;
 };
 
-export const getHITLQueue = async () => {
-  const response = await api.get<HITLItem[]>('/api/hitl/queue');
+export interface AgentProgressEvent {
+  node: string;
+  evidences: any[];
+  signals: string[];
+  elapsed_ms: number;
+}
+
+export interface DecisionEvent {
+  transaction_id: string;
+  decision: FraudDetectionResult['decision'];
+  confidence: number | null;
+  elapsed_ms: number;
+}
+
+export interface AnalysisStreamHandlers {
+  onAgent?: (event: AgentProgressEvent) => void;
+  onDecision?: (event: DecisionEvent) => void;
+}
+
+/**
+ * Streams the analysis over Server-Sent Events: per-agent progress, the decision as
+ * soon as it exists and the full result at the end.
+ */
+export const analyzeTransactionStream = async (
+  data: TransactionInput,
+  handlers: AnalysisStreamHandlers = {}
+): Promise<FraudDetectionResult> => {
+  const response = await fetch(`${API_BASE_URL}/api/transactions/analyze/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify(data),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Analysis failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      const event = raw.match(/^event: (.*)$/m)?.[1];
+      const payload = raw.match(/^data: (.*)$/m)?.[1];
+      if (!event || !payload) continue;
+      const parsed = JSON.parse(payload);
+
+      if (event === 'agent') handlers.onAgent?.(parsed);
+      else if (event === 'decision') handlers.onDecision?.(parsed);
+      else if (event === 'result') return parsed as FraudDetectionResult;
+      else if (event === 'error') throw new Error(parsed.detail);
+    }
+  }
+  throw new Error('Analysis stream ended without a result');
+};
+
+export const getHITLQueue = async (filters: HITLFilters = {}) => {
+  const response = await api.get<HITLPage>('/api/hitl/queue', { params: filters });
+  return response.data;
+};
+
+export const claimHITLItems = async (reviewer: string, n: number = 10) => {
+  const response = await api.post<HITLItem[]>('/api/hitl/claim', null, { params: { reviewer, n } });
+  return response.data;
+};
+
+export const releaseHITLItem = async (transactionId: string, reviewer: string) => {
+  const response = await api.post(`/api/hitl/${transactionId}/release`, null, { params: { reviewer } });
   return response.data;
 };
 
-export const getTransactions = async () => {
-  const response = await api.get<Transaction[]>('/api/transactions');
+export const getTransactions = async (filters: TransactionFilters = {}) => {
+  const response = await api.get<TransactionPage>('/api/transactions/', { params: filters });
   return response.data;
 };
 
@@ -117,8 +241,13 @@ export const getTransactionSummary = async (transactionId: string) => {
   return response.data;
 };
 
-export const submitHITLReview = async (transactionId: string, decision: string, comments: string) => {
-  const response = await api.post(`/api/hitl/${transactionId}/review`, { decision, comments });
+export const submitHITLReview = async (
+  transactionId: string,
+  decision: string,
+  comments: string,
+  reviewer?: string
+) => {
+  const response = await api.post(`/api/hitl/${transactionId}/review`, { decision, comments, reviewer });
   return response.data;
 };
 